@@ -6,6 +6,7 @@ Main application entry point with Flask factory pattern
 from flask import Flask, request
 from flask_cors import CORS
 from config import ALLOWED_ORIGINS, FORCE_HTTPS, DB_CONFIG, ALLOW_WRITE_QUERIES, SERVER_HOST, SERVER_PORT, DEBUG_MODE
+from controllers import PublicController
 from routes import admin_bp, public_bp, upload_bp
 from routes.duty_routes import duty_bp
 from routes.vehicle_routes import vehicle_bp
@@ -19,6 +20,9 @@ from routes.officer_routes import officer_bp
 from routes.auth_routes import auth_bp
 from utils.responses import ResponseHelper
 from utils.logger import logger
+from utils.metrics import init_metrics
+from utils.query_profiler import init_query_profiler
+from utils.serialization import init_serialization
 
 
 def create_app():
@@ -31,6 +35,11 @@ def create_app():
     """
     app = Flask(__name__)
     
+    # Request timing (first, so wall time includes the other hooks)
+    init_metrics(app, gauges=PublicController.metrics_gauges)
+    init_query_profiler(app)
+    init_serialization(app)
+    
     # CORS configuration
     if ALLOWED_ORIGINS == '*':
         CORS(app, resources={r"/*": {"origins": "*"}})
@@ -90,7 +99,7 @@ if __name__ == '__main__':
     logger.info(f"Write Queries Allowed: {ALLOW_WRITE_QUERIES}")
     logger.info("="*60)
     
-    # Run development server
+    # Run development server (production: gunicorn -c gunicorn.conf.py wsgi:app)
     app.run(
         host=SERVER_HOST,
         port=SERVER_PORT,
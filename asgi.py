@@ -0,0 +1,114 @@
+"""
+ASGI Entry Point
+Async serving path for device traffic: live location pings, check-ins and
+compliance logs. Requests waiting on MySQL hold a coroutine instead of a
+thread, so one process keeps thousands of device connections open.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5001 --workers 4
+
+Everything else (admin, duties, reference data, the live location SSE
+stream) stays on the WSGI app (wsgi.py); nginx routes the device prefixes
+here (see README "Async Device API").
+"""
+
+import sys
+import os
+import asyncio
+
+# Add backend directory to Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+from quart import Quart, request
+from config import ALLOWED_ORIGINS, FORCE_HTTPS
+from controllers.async_controllers import error_response
+from models.async_db import get_async_pool, close_async_pool, get_async_pool_stats
+from routes.async_routes import async_live_location_bp, async_check_in_bp, async_compliance_bp
+from utils.logger import logger
+
+
+CORS_METHODS = 'GET, POST, PUT, OPTIONS'
+CORS_HEADERS = 'Content-Type, Authorization'
+
+
+def _allowed_origin(origin):
+    """Value for Access-Control-Allow-Origin, or None if the origin is not allowed"""
+    if ALLOWED_ORIGINS == '*':
+        return '*'
+    origins = [o.strip() for o in ALLOWED_ORIGINS.split(',')]
+    return origin if origin in origins else None
+
+
+def create_async_app():
+    """
+    Application factory for the async device API.
+
+    Returns:
+        Quart: Configured Quart application
+    """
+    app = Quart(__name__)
+
+    app.register_blueprint(async_live_location_bp)
+    app.register_blueprint(async_check_in_bp)
+    app.register_blueprint(async_compliance_bp)
+
+    @app.route('/health/async-pool', methods=['GET'])
+    async def async_pool_stats():
+        """GET /health/async-pool - Async MySQL pool usage"""
+        return {'success': True, 'data': get_async_pool_stats()}, 200
+
+    # Open the pool's minimum connections, load the live map snapshot and
+    # the geofence before serving, like wsgi.warm_up does for the WSGI workers
+    @app.before_serving
+    async def warm_up():
+        from models.live_location_model import LiveLocationModel
+        from models.duty_model import DutyModel
+        try:
+            await get_async_pool()
+            await asyncio.to_thread(LiveLocationModel.get_snapshot)
+            await asyncio.to_thread(DutyModel.build_geofence)
+            logger.info(f"Async worker {os.getpid()} warmed up")
+        except Exception as e:
+            logger.error(f"Async warm-up failed: {str(e)}")
+
+    @app.after_serving
+    async def shutdown():
+        await close_async_pool()
+
+    # HTTPS enforcement (if enabled) and CORS preflight
+    @app.before_request
+    async def before_request():
+        if FORCE_HTTPS and request.scheme != 'https' and request.headers.get('X-Forwarded-Proto') != 'https':
+            return error_response('HTTPS required', 403)
+        if request.method == 'OPTIONS':
+            return '', 204
+
+    @app.after_request
+    async def add_cors_headers(response):
+        origin = _allowed_origin(request.headers.get('Origin'))
+        if origin:
+            response.headers['Access-Control-Allow-Origin'] = origin
+            response.headers['Access-Control-Allow-Methods'] = CORS_METHODS
+            response.headers['Access-Control-Allow-Headers'] = CORS_HEADERS
+            if origin != '*':
+                response.headers['Vary'] = 'Origin'
+        return response
+
+    # Global error handlers
+    @app.errorhandler(404)
+    async def not_found(e):
+        return error_response('Endpoint not found', 404)
+
+    @app.errorhandler(405)
+    async def method_not_allowed(e):
+        return error_response('Method not allowed', 405)
+
+    @app.errorhandler(500)
+    async def internal_error(e):
+        logger.error(f"Internal server error: {str(e)}")
+        return error_response('Internal server error', 500)
+
+    return app
+
+
+app = create_async_app()
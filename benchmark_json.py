@@ -0,0 +1,225 @@
+"""
+JSON Serialization Benchmark
+Compares Flask's default JSON provider with the fast provider
+(utils/serialization.py) on payloads shaped like the main list endpoints,
+and the size/time cost of gzip and brotli on the result
+
+Usage:
+    # Synthetic rows with the same columns and types as the API returns
+    python benchmark_json.py --rows 2000 --repeat 20
+
+    # Real rows loaded through the models (needs database access)
+    python benchmark_json.py --from-db
+"""
+
+import argparse
+import gzip
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from utils.serialization import FastJSONProvider, orjson, brotli, GZIP_LEVEL, BROTLI_QUALITY
+
+
+def synthetic_duties(count):
+    """Rows shaped like DutyModel.get_all_duties"""
+    start = datetime(2025, 11, 15, 6, 0, 0)
+    duties = []
+    for index in range(count):
+        begins = start + timedelta(hours=index % 48)
+        duties.append({
+            'id': f"DUTY{index:06d}",
+            'type': random.choice(['patrol', 'naka', 'checkpost']),
+            'location_polygon': [
+                {'lat': 15.49 + random.random() / 100, 'lng': 73.82 + random.random() / 100}
+                for _ in range(6)
+            ],
+            'location_radius': 200,
+            'start_time': begins,
+            'end_time': begins + timedelta(hours=8),
+            'status': random.choice(['assigned', 'active', 'completed']),
+            'assigned_at': begins - timedelta(days=1),
+            'comments': 'Night patrol near the market area',
+            'check_in_time': None,
+            'check_out_time': None,
+            'created_at': begins - timedelta(days=1),
+            'updated_at': begins,
+            'officerUids': [f"OFF{(index * 3 + k) % 5000:05d}" for k in range(3)],
+            'officerNames': 'A. Naik, R. Desai, S. Gaonkar',
+            'vehicleIds': [f"VEH{index % 300:04d}"]
+        })
+    return duties
+
+
+def synthetic_live_locations(count, history=20):
+    """Rows shaped like LiveLocationModel.get_all_live_locations"""
+    now = datetime(2025, 11, 15, 12, 0, 0)
+    rows = []
+    for index in range(count):
+        latitude = Decimal(f"{15.4 + random.random() / 10:.7f}")
+        longitude = Decimal(f"{73.8 + random.random() / 10:.7f}")
+        rows.append({
+            'id': f"OFF{index:05d}",
+            'officer_id': f"OFF{index:05d}",
+            'latitude': latitude,
+            'longitude': longitude,
+            'speed': Decimal('4.20'),
+            'altitude': Decimal('12.00'),
+            'heading': Decimal('182.50'),
+            'accuracy': Decimal('8.00'),
+            'timestamp': now,
+            'local_time': now.isoformat(),
+            'currentLocation': {'latitude': float(latitude), 'longitude': float(longitude)},
+            'locations': [
+                {
+                    'latitude': float(latitude) + k / 10000,
+                    'longitude': float(longitude) + k / 10000,
+                    'timestamp': (now - timedelta(seconds=30 * k)).isoformat()
+                }
+                for k in range(history)
+            ],
+            'total_points': history,
+            'tracking_started': now - timedelta(hours=6),
+            'last_seen': now,
+            'last_updated': now,
+            'status': 'active',
+            'is_active': 1
+        })
+    return rows
+
+
+def synthetic_check_ins(count):
+    """Rows shaped like CheckInModel.get_all_check_ins"""
+    now = datetime(2025, 11, 15, 8, 0, 0)
+    return [
+        {
+            'id': f"CI{index:07d}",
+            'officer_id': f"OFF{index % 5000:05d}",
+            'duty_id': f"DUTY{index % 2000:06d}",
+            'check_in_type': 'check_in',
+            'location': {'latitude': 15.49, 'longitude': 73.82, 'accuracy': 9.5},
+            'selfie_image_url': f"https://storage.googleapis.com/bucket/selfies/{index}.jpg",
+            'device_info': {'model': 'SM-A525F', 'os': 'Android 13', 'app': '2.4.1'},
+            'verified': 1,
+            'verification_method': 'geolocation',
+            'compliance_score': Decimal('92.50'),
+            'timestamp': now + timedelta(minutes=index),
+            'officer_name': 'A. Naik'
+        }
+        for index in range(count)
+    ]
+
+
+def load_from_db(limit):
+    """Load real rows through the models"""
+    from models.duty_model import DutyModel
+    from models.live_location_model import LiveLocationModel
+    from models.check_in_model import CheckInModel
+    from models.officer_model import OfficerModel
+
+    duties = DutyModel.get_all_duties(limit=limit)
+    return {
+        'duties': duties['duties'] if isinstance(duties, dict) else duties,
+        'live_locations': LiveLocationModel.get_all_live_locations(),
+        'check_ins': CheckInModel.get_all_check_ins(limit),
+        'officers': OfficerModel.get_all_officers()
+    }
+
+
+def timed(function, repeat):
+    """Median seconds of ``repeat`` calls, and the last result"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def benchmark(datasets, repeat):
+    """
+    Serialize every dataset with each provider and compress the output.
+
+    Returns:
+        list: One result dict per (dataset, provider)
+    """
+    app = Flask(__name__)
+    providers = [('flask-default', DefaultJSONProvider(app))]
+    if orjson is not None:
+        providers.append(('orjson', FastJSONProvider(app)))
+    else:
+        providers.append(('fast (stdlib)', FastJSONProvider(app, use_orjson=False)))
+
+    results = []
+    for name, rows in datasets.items():
+        payload = {'success': True, 'data': rows}
+        for label, provider in providers:
+            seconds, body = timed(lambda: provider.dumps(payload).encode('utf-8'), repeat)
+            result = {
+                'dataset': name,
+                'rows': len(rows),
+                'serializer': label,
+                'ms': seconds * 1000,
+                'bytes': len(body)
+            }
+            gzip_seconds, gzipped = timed(lambda: gzip.compress(body, compresslevel=GZIP_LEVEL), max(1, repeat // 4))
+            result.update({'gzip_ms': gzip_seconds * 1000, 'gzip_bytes': len(gzipped)})
+            if brotli is not None:
+                br_seconds, compressed = timed(lambda: brotli.compress(body, quality=BROTLI_QUALITY), max(1, repeat // 4))
+                result.update({'br_ms': br_seconds * 1000, 'br_bytes': len(compressed)})
+            results.append(result)
+    return results
+
+
+def print_results(results):
+    """Print a comparison table"""
+    header = f"{'dataset':<16}{'rows':>7}  {'serializer':<15}{'ms':>9}{'KiB':>10}{'gzip KiB':>10}{'gzip ms':>9}"
+    if any('br_bytes' in result for result in results):
+        header += f"{'br KiB':>9}{'br ms':>8}"
+    print(header)
+    print('-' * len(header))
+
+    baseline = {}
+    for result in results:
+        line = (f"{result['dataset']:<16}{result['rows']:>7}  {result['serializer']:<15}"
+                f"{result['ms']:>9.2f}{result['bytes'] / 1024:>10.1f}"
+                f"{result['gzip_bytes'] / 1024:>10.1f}{result['gzip_ms']:>9.2f}")
+        if 'br_bytes' in result:
+            line += f"{result['br_bytes'] / 1024:>9.1f}{result['br_ms']:>8.2f}"
+        if result['dataset'] in baseline:
+            line += f"   {baseline[result['dataset']] / result['ms']:.1f}x faster"
+        else:
+            baseline[result['dataset']] = result['ms']
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON serialization of the main list endpoints')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows per synthetic dataset')
+    parser.add_argument('--repeat', type=int, default=20, help='Serializations per measurement')
+    parser.add_argument('--from-db', action='store_true', help='Use real rows loaded through the models')
+    args = parser.parse_args()
+
+    random.seed(7)
+    if args.from_db:
+        datasets = load_from_db(args.rows)
+    else:
+        datasets = {
+            'duties': synthetic_duties(args.rows),
+            'live_locations': synthetic_live_locations(args.rows),
+            'check_ins': synthetic_check_ins(args.rows)
+        }
+
+    print(f"orjson: {'yes' if orjson is not None else 'not installed'}, "
+          f"brotli: {'yes' if brotli is not None else 'not installed'}\n")
+    print_results(benchmark(datasets, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
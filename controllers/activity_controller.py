@@ -3,7 +3,8 @@ Activity Controller
 Handles activity business logic
 """
 
-from models.activity_model import ActivityModel
+from models.activity_model import ActivityModel, ACTIVITIES_EXPORT_COLUMNS
+from utils.export import export_response, parse_export_args
 from utils.logger import log_info, log_error
 from utils.responses import success_response, error_response
 
@@ -65,3 +66,18 @@ class ActivityController:
         except Exception as e:
             log_error(f"Error creating activity: {str(e)}")
             return error_response("Failed to create activity", 500)
+    
+    @staticmethod
+    def export_activities(start=None, end=None, officer_id=None, duty_id=None, fmt=None):
+        """Stream activities as NDJSON or CSV for audits"""
+        try:
+            args, error = parse_export_args(start, end, fmt)
+            if error:
+                return error_response(error, 400)
+            
+            start_time, end_time, fmt = args
+            rows = ActivityModel.export_activities(start_time, end_time, officer_id, duty_id)
+            return export_response('activities', rows, ACTIVITIES_EXPORT_COLUMNS, fmt, start_time, end_time)
+        except Exception as e:
+            log_error(f"Error exporting activities: {str(e)}")
+            return error_response("Failed to export activities", 500)
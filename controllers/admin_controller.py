@@ -6,6 +6,7 @@ Handles admin operations business logic
 from models.admin_model import AdminModel
 from utils.responses import ResponseHelper
 from utils.logger import logger, log_request, get_client_ip
+from utils.query_profiler import QUERY_PROFILING, query_profiler
 
 
 class AdminController:
@@ -49,3 +50,44 @@ class AdminController:
             logger.error(f"SQL execution error: {error_msg}")
             log_request(client_ip, query, 'error', error_msg)
             return ResponseHelper.internal_error()
+    
+    @staticmethod
+    def get_query_profiles(flagged_only=False):
+        """
+        List recent profiled requests and slow queries.
+        
+        Args:
+            flagged_only (bool): Only requests with repeated or slow statements
+            
+        Returns:
+            tuple: (response, status_code)
+        """
+        if not QUERY_PROFILING:
+            return ResponseHelper.error('Query profiling is disabled (set QUERY_PROFILING=true)', 404)
+        try:
+            return ResponseHelper.success_data(query_profiler.recent(flagged_only))
+        except Exception as e:
+            logger.error(f"Query profile listing error: {str(e)}")
+            return ResponseHelper.internal_error()
+    
+    @staticmethod
+    def get_query_profile(report_id):
+        """
+        Get the full statement report for one request.
+        
+        Args:
+            report_id (str): Id from the X-Query-Profile response header
+            
+        Returns:
+            tuple: (response, status_code)
+        """
+        if not QUERY_PROFILING:
+            return ResponseHelper.error('Query profiling is disabled (set QUERY_PROFILING=true)', 404)
+        try:
+            report = query_profiler.get_report(report_id)
+            if not report:
+                return ResponseHelper.error('Profile not found (only recent requests are kept)', 404)
+            return ResponseHelper.success_data(report)
+        except Exception as e:
+            logger.error(f"Query profile error: {str(e)}")
+            return ResponseHelper.internal_error()
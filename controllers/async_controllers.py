@@ -0,0 +1,314 @@
+"""
+Async Controllers
+Device-facing business logic for the async serving path (asgi.py)
+"""
+
+import asyncio
+from controllers.check_in_controller import validate_check_in
+from controllers.compliance_controller import validate_compliance_log
+from controllers.live_location_controller import (
+    parse_bulk_points, accept_known_officers, parse_bbox,
+    parse_nearby_args, parse_nearest_args, resolve_area, parse_trail_args
+)
+from models.async_models import AsyncCheckInModel, AsyncComplianceModel, AsyncLiveLocationModel
+from models.live_location_model import LiveLocationModel
+from models.location_ingest import get_ingest_stats
+from models.location_point_model import parse_point_time
+from utils.logger import log_info, log_error
+
+
+def success_response(data, status_code=200):
+    """
+    Success response for the async app (Quart serializes dicts to JSON).
+
+    Args:
+        data: Response data
+        status_code (int): HTTP status code
+
+    Returns:
+        tuple: (body, status_code)
+    """
+    return {'success': True, 'data': data}, status_code
+
+
+def error_response(message, status_code=400):
+    """
+    Error response for the async app.
+
+    Args:
+        message (str): Error message
+        status_code (int): HTTP status code
+
+    Returns:
+        tuple: (body, status_code)
+    """
+    return {'success': False, 'error': message}, status_code
+
+
+class AsyncCheckInController:
+    """Async controller for check-in operations"""
+
+    @staticmethod
+    async def get_all_check_ins(limit=100):
+        """Get all check-ins"""
+        try:
+            log_info(f"Fetching check-ins (limit: {limit})")
+            check_ins = await AsyncCheckInModel.get_all_check_ins(limit)
+            return success_response(check_ins)
+        except Exception as e:
+            log_error(f"Error fetching check-ins: {str(e)}")
+            return error_response("Failed to fetch check-ins", 500)
+
+    @staticmethod
+    async def get_check_ins_by_duty(duty_id):
+        """Get check-ins for specific duty"""
+        try:
+            log_info(f"Fetching check-ins for duty: {duty_id}")
+            check_ins = await AsyncCheckInModel.get_check_ins_by_duty(duty_id)
+            return success_response(check_ins)
+        except Exception as e:
+            log_error(f"Error fetching check-ins for duty {duty_id}: {str(e)}")
+            return error_response("Failed to fetch check-ins", 500)
+
+    @staticmethod
+    async def create_check_in(check_in_data):
+        """Create new check-in"""
+        try:
+            error = validate_check_in(check_in_data)
+            if error:
+                return error_response(error, 400)
+
+            log_info(f"Creating check-in: {check_in_data.get('id')}")
+            check_in_id = await AsyncCheckInModel.create_check_in(check_in_data)
+            return success_response({'id': check_in_id})
+        except Exception as e:
+            log_error(f"Error creating check-in: {str(e)}")
+            return error_response("Failed to create check-in", 500)
+
+
+class AsyncComplianceController:
+    """Async controller for compliance operations"""
+
+    @staticmethod
+    async def get_all_compliance_logs(limit=100):
+        """Get all compliance logs"""
+        try:
+            log_info(f"Fetching compliance logs (limit: {limit})")
+            logs = await AsyncComplianceModel.get_all_compliance_logs(limit)
+            return success_response(logs)
+        except Exception as e:
+            log_error(f"Error fetching compliance logs: {str(e)}")
+            return error_response("Failed to fetch compliance logs", 500)
+
+    @staticmethod
+    async def get_compliance_by_duty(duty_id):
+        """Get compliance logs for specific duty"""
+        try:
+            log_info(f"Fetching compliance logs for duty: {duty_id}")
+            logs = await AsyncComplianceModel.get_compliance_by_duty(duty_id)
+            return success_response(logs)
+        except Exception as e:
+            log_error(f"Error fetching compliance logs for duty {duty_id}: {str(e)}")
+            return error_response("Failed to fetch compliance logs", 500)
+
+    @staticmethod
+    async def create_compliance_log(log_data):
+        """Create new compliance log"""
+        try:
+            error = validate_compliance_log(log_data)
+            if error:
+                return error_response(error, 400)
+
+            log_info(f"Creating compliance log: {log_data.get('id')}")
+            log_id = await AsyncComplianceModel.create_compliance_log(log_data)
+            return success_response({'id': log_id})
+        except Exception as e:
+            log_error(f"Error creating compliance log: {str(e)}")
+            return error_response("Failed to create compliance log", 500)
+
+
+class AsyncLiveLocationController:
+    """
+    Async controller for live location operations.
+
+    Snapshot and delta reads use the shared in-memory snapshot; its
+    periodic reload from MySQL is synchronous, so they run in a worker
+    thread to keep the event loop free.
+    """
+
+    @staticmethod
+    async def get_all_live_locations():
+        """Get all live officer locations"""
+        try:
+            log_info("Fetching all live locations")
+            locations = await AsyncLiveLocationModel.get_all_live_locations()
+            return success_response(locations)
+        except Exception as e:
+            log_error(f"Error fetching live locations: {str(e)}")
+            return error_response("Failed to fetch live locations", 500)
+
+    @staticmethod
+    async def get_location_by_officer(officer_id):
+        """Get live location for specific officer"""
+        try:
+            log_info(f"Fetching live location for officer: {officer_id}")
+            location = await AsyncLiveLocationModel.get_location_by_officer(officer_id)
+
+            if not location:
+                return error_response("Location not found", 404)
+
+            return success_response(location)
+        except Exception as e:
+            log_error(f"Error fetching location for officer {officer_id}: {str(e)}")
+            return error_response("Failed to fetch location", 500)
+
+    @staticmethod
+    async def get_trail(officer_id, start, end, duty_id=None, zoom=None, tolerance=None, encoding=None):
+        """Get an officer's trail for a time window, simplified and encoded"""
+        try:
+            args, error = parse_trail_args(start, end, zoom, tolerance, encoding)
+            if error:
+                return error_response(error, 400)
+
+            start_time, end_time, zoom, tolerance, encoding = args
+            log_info(f"Fetching trail for officer {officer_id} from {start_time} to {end_time}")
+            return success_response(await asyncio.to_thread(
+                LiveLocationModel.get_encoded_trail,
+                officer_id, start_time, end_time, duty_id, zoom, tolerance, encoding
+            ))
+        except Exception as e:
+            log_error(f"Error fetching trail for officer {officer_id}: {str(e)}")
+            return error_response("Failed to fetch trail", 500)
+
+    @staticmethod
+    async def update_location(officer_id, location_data):
+        """Update officer's live location"""
+        try:
+            log_info(f"Updating location for officer: {officer_id}", event='location_ping')
+
+            # Batched ingest: acknowledge once the ping is queued for the next flush
+            if LiveLocationModel.queue_location(officer_id, location_data):
+                return success_response({"message": "Queued"}, 202)
+
+            # Batching disabled or queue full: write without holding a thread
+            await AsyncLiveLocationModel.update_location(officer_id, location_data)
+            return success_response({"message": "Success"})
+        except Exception as e:
+            log_error(f"Error updating location for officer {officer_id}: {str(e)}")
+            return error_response("Failed to update location", 500)
+
+    @staticmethod
+    async def bulk_update_locations(payload):
+        """
+        Accept many buffered GPS points (one or many officers) in one request.
+        Invalid points and points of unknown officers are reported back;
+        valid ones are written together.
+        """
+        try:
+            args, error, status = parse_bulk_points(payload)
+            if error:
+                return error_response(error, status)
+
+            grouped, rejected = args
+            known_ids = await AsyncLiveLocationModel.known_officer_ids(list(grouped))
+            points_by_officer = accept_known_officers(grouped, known_ids, rejected)
+            accepted_points = sum(len(points) for points in points_by_officer.values())
+
+            log_info(f"Bulk location update: {accepted_points} points "
+                     f"for {len(points_by_officer)} officers ({len(rejected)} rejected)", event='location_bulk')
+
+            accepted = await AsyncLiveLocationModel.ingest_points(points_by_officer) if points_by_officer else 0
+
+            return success_response({
+                'accepted': accepted,
+                'officers': len(points_by_officer),
+                'rejected': rejected
+            })
+        except Exception as e:
+            log_error(f"Error in bulk location update: {str(e)}")
+            return error_response("Failed to update locations", 500)
+
+    @staticmethod
+    async def get_snapshot(bbox=None, since=None):
+        """Get compact current positions for the live map"""
+        try:
+            bounds, error = parse_bbox(bbox)
+            if error:
+                return error_response(error, 400)
+
+            since_time = None
+            if since:
+                since_time = parse_point_time(since)
+                if since_time is None:
+                    return error_response("since must be an ISO 8601 timestamp", 400)
+
+            snapshot = await asyncio.to_thread(LiveLocationModel.get_snapshot, bounds, since_time)
+            return success_response(snapshot)
+        except Exception as e:
+            log_error(f"Error fetching live location snapshot: {str(e)}")
+            return error_response("Failed to fetch live location snapshot", 500)
+
+    @staticmethod
+    async def get_changes(cursor=None):
+        """Get live positions changed since a delta-sync cursor"""
+        try:
+            since_cursor = None
+            if cursor:
+                since_cursor = parse_point_time(cursor)
+                if since_cursor is None:
+                    return error_response("cursor must be a value returned by a previous call", 400)
+
+            changes = await asyncio.to_thread(LiveLocationModel.get_changes, since_cursor)
+            return success_response(changes)
+        except Exception as e:
+            log_error(f"Error fetching live location changes: {str(e)}")
+            return error_response("Failed to fetch live location changes", 500)
+
+    @staticmethod
+    async def get_nearby(lat, lng, radius=None):
+        """Get active officers within a radius of a point, nearest first"""
+        try:
+            args, error = parse_nearby_args(lat, lng, radius)
+            if error:
+                return error_response(error, 400)
+            return success_response(await asyncio.to_thread(LiveLocationModel.get_nearby, *args))
+        except Exception as e:
+            log_error(f"Error fetching nearby officers: {str(e)}")
+            return error_response("Failed to fetch nearby officers", 500)
+
+    @staticmethod
+    async def get_nearest(lat, lng, k=None, max_distance=None):
+        """Get the k active officers nearest to a point"""
+        try:
+            args, error = parse_nearest_args(lat, lng, k, max_distance)
+            if error:
+                return error_response(error, 400)
+            return success_response(await asyncio.to_thread(LiveLocationModel.get_nearest, *args))
+        except Exception as e:
+            log_error(f"Error fetching nearest officers: {str(e)}")
+            return error_response("Failed to fetch nearest officers", 500)
+
+    @staticmethod
+    async def get_within(polygon=None, duty_id=None):
+        """Get active officers inside a polygon or a duty's area"""
+        try:
+            area, error, status = await asyncio.to_thread(resolve_area, polygon, duty_id)
+            if error:
+                return error_response(error, status)
+
+            kind, shape = area
+            if kind == 'polygon':
+                return success_response(await asyncio.to_thread(LiveLocationModel.get_within, shape))
+            return success_response(await asyncio.to_thread(LiveLocationModel.get_nearby, *shape))
+        except Exception as e:
+            log_error(f"Error fetching officers within area: {str(e)}")
+            return error_response("Failed to fetch officers within area", 500)
+
+    @staticmethod
+    async def get_ingest_stats():
+        """Get batched location ingest statistics"""
+        try:
+            return success_response(get_ingest_stats())
+        except Exception as e:
+            log_error(f"Error fetching ingest stats: {str(e)}")
+            return error_response("Failed to fetch ingest stats", 500)
@@ -3,11 +3,34 @@ Check-in Controller
 Handles check-in business logic
 """
 
-from models.check_in_model import CheckInModel
+from models.check_in_model import CheckInModel, CHECK_INS_EXPORT_COLUMNS
+from utils.export import export_response, parse_export_args
 from utils.logger import log_info, log_error
 from utils.responses import success_response, error_response
 
 
+# Fields a device must send; shared with the async controllers
+REQUIRED_FIELDS = ('id', 'dutyId', 'checkInType', 'timestamp')
+
+
+def validate_check_in(data):
+    """
+    Validate a check-in payload.
+    
+    Args:
+        data: Parsed JSON body
+        
+    Returns:
+        str: Error message, or None if the payload is valid
+    """
+    if not isinstance(data, dict):
+        return "Request body must be a JSON object"
+    missing = [field for field in REQUIRED_FIELDS if not data.get(field)]
+    if missing:
+        return f"Missing required fields: {', '.join(missing)}"
+    return None
+
+
 class CheckInController:
     """Controller for check-in operations"""
     
@@ -37,9 +60,28 @@ class CheckInController:
     def create_check_in(check_in_data):
         """Create new check-in"""
         try:
+            error = validate_check_in(check_in_data)
+            if error:
+                return error_response(error, 400)
+            
             log_info(f"Creating check-in: {check_in_data.get('id')}")
             check_in_id = CheckInModel.create_check_in(check_in_data)
             return success_response({'id': check_in_id})
         except Exception as e:
             log_error(f"Error creating check-in: {str(e)}")
             return error_response("Failed to create check-in", 500)
+    
+    @staticmethod
+    def export_check_ins(start=None, end=None, officer_id=None, duty_id=None, fmt=None):
+        """Stream check-ins as NDJSON or CSV for audits"""
+        try:
+            args, error = parse_export_args(start, end, fmt)
+            if error:
+                return error_response(error, 400)
+            
+            start_time, end_time, fmt = args
+            rows = CheckInModel.export_check_ins(start_time, end_time, officer_id, duty_id)
+            return export_response('check-ins', rows, CHECK_INS_EXPORT_COLUMNS, fmt, start_time, end_time)
+        except Exception as e:
+            log_error(f"Error exporting check-ins: {str(e)}")
+            return error_response("Failed to export check-ins", 500)
@@ -3,11 +3,34 @@ Compliance Controller
 Handles compliance log business logic
 """
 
-from models.compliance_model import ComplianceModel
+from models.compliance_model import ComplianceModel, COMPLIANCE_EXPORT_COLUMNS
+from utils.export import export_response, parse_export_args
 from utils.logger import log_info, log_error
 from utils.responses import success_response, error_response
 
 
+# Fields a device must send; shared with the async controllers
+REQUIRED_FIELDS = ('id', 'action', 'timestamp')
+
+
+def validate_compliance_log(data):
+    """
+    Validate a compliance log payload.
+    
+    Args:
+        data: Parsed JSON body
+        
+    Returns:
+        str: Error message, or None if the payload is valid
+    """
+    if not isinstance(data, dict):
+        return "Request body must be a JSON object"
+    missing = [field for field in REQUIRED_FIELDS if not data.get(field)]
+    if missing:
+        return f"Missing required fields: {', '.join(missing)}"
+    return None
+
+
 class ComplianceController:
     """Controller for compliance operations"""
     
@@ -37,9 +60,28 @@ class ComplianceController:
     def create_compliance_log(log_data):
         """Create new compliance log"""
         try:
+            error = validate_compliance_log(log_data)
+            if error:
+                return error_response(error, 400)
+            
             log_info(f"Creating compliance log: {log_data.get('id')}")
             log_id = ComplianceModel.create_compliance_log(log_data)
             return success_response({'id': log_id})
         except Exception as e:
             log_error(f"Error creating compliance log: {str(e)}")
             return error_response("Failed to create compliance log", 500)
+    
+    @staticmethod
+    def export_compliance_logs(start=None, end=None, officer_id=None, duty_id=None, fmt=None):
+        """Stream compliance logs as NDJSON or CSV for audits"""
+        try:
+            args, error = parse_export_args(start, end, fmt)
+            if error:
+                return error_response(error, 400)
+            
+            start_time, end_time, fmt = args
+            rows = ComplianceModel.export_compliance_logs(start_time, end_time, officer_id, duty_id)
+            return export_response('compliance', rows, COMPLIANCE_EXPORT_COLUMNS, fmt, start_time, end_time)
+        except Exception as e:
+            log_error(f"Error exporting compliance logs: {str(e)}")
+            return error_response("Failed to export compliance logs", 500)
@@ -3,20 +3,65 @@ Duty Controller
 Handles duty business logic
 """
 
-from models.duty_model import DutyModel
+from controllers.live_location_controller import LiveLocationController, parse_replay_args
+from models.duty_model import DutyModel, DUTY_LIST_FIELDS, convert_iso_to_mysql
+from models.duty_index import to_datetime
 from utils.logger import log_info, log_error
 from utils.responses import success_response, error_response
 
 
+# Upper bound on duties accepted by one bulk request
+MAX_BULK_DUTIES = 1000
+
+# Page size limits for GET /api/duties
+DEFAULT_DUTY_PAGE_SIZE = 100
+MAX_DUTY_PAGE_SIZE = 500
+
+
 class DutyController:
     """Controller for duty operations"""
     
     @staticmethod
-    def get_all_duties():
-        """Get all duties"""
+    def get_all_duties(args=None):
+        """
+        Get duties. Without limit/cursor every matching duty is returned as a
+        list; with them, one keyset page {'duties', 'next_cursor'} is returned.
+        """
         try:
+            args = args or {}
+            
+            filters = {
+                'status': [status for status in (args.get('status') or '').split(',') if status],
+                'type': args.get('type'),
+                'start_from': convert_iso_to_mysql(args.get('from')),
+                'start_to': convert_iso_to_mysql(args.get('to'))
+            }
+            for key, param in (('start_from', 'from'), ('start_to', 'to')):
+                if filters[key] and to_datetime(filters[key]) is None:
+                    return error_response(f"{param} must be an ISO 8601 timestamp", 400)
+            
+            fields = None
+            if args.get('fields'):
+                fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+                unknown = set(fields) - DUTY_LIST_FIELDS
+                if unknown:
+                    return error_response(f"Unknown fields: {', '.join(sorted(unknown))}", 400)
+            
+            limit = None
+            cursor = args.get('cursor')
+            if args.get('limit') or cursor:
+                try:
+                    limit = int(args.get('limit') or DEFAULT_DUTY_PAGE_SIZE)
+                except ValueError:
+                    return error_response("limit must be an integer", 400)
+                if not 1 <= limit <= MAX_DUTY_PAGE_SIZE:
+                    return error_response(f"limit must be between 1 and {MAX_DUTY_PAGE_SIZE}", 400)
+            
             log_info("Fetching all duties")
-            duties = DutyModel.get_all_duties()
+            try:
+                duties = DutyModel.get_all_duties(filters, fields, limit, cursor)
+            except ValueError as e:
+                return error_response(str(e), 400)
             return success_response(duties)
         except Exception as e:
             log_error(f"Error fetching duties: {str(e)}")
@@ -37,6 +82,35 @@ class DutyController:
             log_error(f"Error fetching duty {duty_id}: {str(e)}")
             return error_response("Failed to fetch duty", 500)
     
+    @staticmethod
+    def replay_trail(duty_id, start=None, end=None, points=None):
+        """
+        Stream the trails of a duty's assigned officers. The window defaults
+        to the duty's start and end time.
+        """
+        try:
+            duty = DutyModel.get_duty_by_id(duty_id)
+            if not duty:
+                return error_response("Duty not found", 404)
+            
+            officer_ids = duty.get('officerUids') or []
+            if not officer_ids:
+                return error_response("Duty has no assigned officers", 422)
+            
+            args, error = parse_replay_args(
+                start or to_datetime(duty.get('start_time')),
+                end or to_datetime(duty.get('end_time')),
+                points
+            )
+            if error:
+                return error_response(error, 400)
+            
+            start_time, end_time, target = args
+            return LiveLocationController.replay_trails(officer_ids, start_time, end_time, target, duty_id)
+        except Exception as e:
+            log_error(f"Error replaying trail for duty {duty_id}: {str(e)}")
+            return error_response("Failed to replay trail", 500)
+    
     @staticmethod
     def get_active_duties():
         """Get all active duties"""
@@ -71,6 +145,32 @@ class DutyController:
             log_error(f"Error creating duty: {str(e)}\nTraceback: {traceback.format_exc()}")
             return error_response(f"Failed to create duty: {str(e)}", 500)
     
+    @staticmethod
+    def create_duties(payload):
+        """Create many duties in one transaction (roster import)"""
+        try:
+            duties = payload.get('duties') if isinstance(payload, dict) else payload
+            if not isinstance(duties, list) or not duties:
+                return error_response("Request must contain a non-empty duties array", 400)
+            
+            if len(duties) > MAX_BULK_DUTIES:
+                return error_response(f"Too many duties (max {MAX_BULK_DUTIES} per request)", 413)
+            
+            results = DutyModel.create_duties(duties)
+            summary = {
+                status: sum(1 for result in results if result['status'] == status)
+                for status in ('created', 'conflict', 'invalid')
+            }
+            log_info(f"Bulk duty create: {summary['created']} created, "
+                     f"{summary['conflict']} conflicts, {summary['invalid']} invalid")
+            
+            summary['results'] = results
+            return success_response(summary, 201 if summary['created'] else 200)
+        except Exception as e:
+            import traceback
+            log_error(f"Error in bulk duty create: {str(e)}\nTraceback: {traceback.format_exc()}")
+            return error_response(f"Failed to create duties: {str(e)}", 500)
+    
     @staticmethod
     def update_duty(duty_id, updates):
         """Update duty"""
@@ -127,3 +227,21 @@ class DutyController:
             import traceback
             log_error(f"Error checking officer conflicts: {str(e)}\nTraceback: {traceback.format_exc()}")
             return error_response(f"Failed to check conflicts: {str(e)}", 500)
+    
+    @staticmethod
+    def get_conflict_index_stats():
+        """Get duty conflict index statistics"""
+        try:
+            return success_response(DutyModel.get_conflict_index_stats())
+        except Exception as e:
+            log_error(f"Error fetching conflict index stats: {str(e)}")
+            return error_response("Failed to fetch conflict index stats", 500)
+    
+    @staticmethod
+    def get_geofence_stats():
+        """Get geofence engine statistics"""
+        try:
+            return success_response(DutyModel.get_geofence_stats())
+        except Exception as e:
+            log_error(f"Error fetching geofence stats: {str(e)}")
+            return error_response("Failed to fetch geofence stats", 500)
@@ -5,7 +5,7 @@ Handles saved duty location business logic
 
 from models.duty_location_model import DutyLocationModel
 from utils.logger import log_info, log_error
-from utils.responses import success_response, error_response
+from utils.responses import success_response, error_response, cached_response
 
 
 class DutyLocationController:
@@ -16,8 +16,8 @@ class DutyLocationController:
         """Get all saved duty locations"""
         try:
             log_info("Fetching all duty locations")
-            locations = DutyLocationModel.get_all_duty_locations()
-            return success_response(locations)
+            locations, etag = DutyLocationModel.get_all_duty_locations(with_etag=True)
+            return cached_response(locations, etag)
         except Exception as e:
             log_error(f"Error fetching duty locations: {str(e)}")
             return error_response("Failed to fetch duty locations", 500)
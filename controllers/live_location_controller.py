@@ -3,11 +3,335 @@ Live Location Controller
 Handles real-time location tracking business logic
 """
 
+import json
+import os
+from datetime import datetime, timedelta
+from flask import Response
+from models.duty_model import DutyModel
+from models.geofence import parse_polygon, to_float
 from models.live_location_model import LiveLocationModel
+from models.location_ingest import get_ingest_stats
+from models.location_point_model import parse_point_time
+from models.location_stream import LocationSubscription, location_stream_hub, format_sse
+from models.trail_codec import downsample
 from utils.logger import log_info, log_error
 from utils.responses import success_response, error_response
 
 
+# Upper bound on points accepted by one bulk request
+MAX_BULK_POINTS = 5000
+
+# Spatial query limits
+DEFAULT_NEARBY_RADIUS = 1000
+MAX_NEARBY_RADIUS = 50000
+DEFAULT_NEAREST = 5
+MAX_NEAREST = 100
+
+# Trail query limits
+MAX_TRAIL_WINDOW = timedelta(days=7)
+MAX_TRAIL_ZOOM = 22
+TRAIL_ENCODINGS = ('polyline', 'json')
+
+# Trail replay limits (points are per officer)
+MAX_REPLAY_WINDOW = timedelta(days=31)
+DEFAULT_REPLAY_POINTS = 1000
+MAX_REPLAY_POINTS = 20000
+REPLAY_CHUNK_POINTS = 500
+
+# Live stream tuning
+LIVE_STREAM_HEARTBEAT = float(os.getenv('LIVE_STREAM_HEARTBEAT', '15'))
+LIVE_STREAM_MAX_PENDING = int(os.getenv('LIVE_STREAM_MAX_PENDING', '1000'))
+LIVE_STREAM_MAX_LAG = float(os.getenv('LIVE_STREAM_MAX_LAG', '30'))
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _optional_float(value):
+    return float(value) if value is not None else None
+
+
+def _ndjson(record):
+    return json.dumps(record, separators=(',', ':')) + '\n'
+
+
+def validate_location_point(point, default_officer_id=None):
+    """
+    Validate a single GPS point.
+    
+    Args:
+        point (dict): Location data with latitude/longitude
+        default_officer_id (str, optional): Officer ID when the point has none
+        
+    Returns:
+        tuple: (officer_id, error) where error is None if the point is valid
+    """
+    if not isinstance(point, dict):
+        return None, "Point must be an object"
+    
+    officer_id = point.get('officerId') or point.get('officer_id') or default_officer_id
+    if not officer_id or not isinstance(officer_id, str):
+        return None, "Missing officerId"
+    
+    latitude = point.get('latitude')
+    longitude = point.get('longitude')
+    if not _is_number(latitude) or not -90 <= latitude <= 90:
+        return officer_id, "latitude must be a number between -90 and 90"
+    if not _is_number(longitude) or not -180 <= longitude <= 180:
+        return officer_id, "longitude must be a number between -180 and 180"
+    
+    for field in ('speed', 'heading', 'accuracy', 'altitude'):
+        if point.get(field) is not None and not _is_number(point[field]):
+            return officer_id, f"{field} must be a number"
+    
+    return officer_id, None
+
+
+def parse_bbox(bbox):
+    """
+    Parse a ``min_lng,min_lat,max_lng,max_lat`` query parameter.
+    
+    Returns:
+        tuple: (bounds, error) where bounds is None when bbox is empty
+    """
+    if not bbox:
+        return None, None
+    try:
+        bounds = tuple(float(part) for part in bbox.split(','))
+    except ValueError:
+        bounds = ()
+    if len(bounds) != 4:
+        return None, "bbox must be min_lng,min_lat,max_lng,max_lat"
+    return bounds, None
+
+
+def parse_position(lat, lng):
+    """
+    Parse ``lat``/``lng`` query parameters.
+    
+    Returns:
+        tuple: ((latitude, longitude), error)
+    """
+    latitude, longitude = to_float(lat), to_float(lng)
+    if latitude is None or not -90 <= latitude <= 90:
+        return None, "lat must be a number between -90 and 90"
+    if longitude is None or not -180 <= longitude <= 180:
+        return None, "lng must be a number between -180 and 180"
+    return (latitude, longitude), None
+
+
+def parse_nearby_args(lat, lng, radius=None):
+    """
+    Validate /nearby parameters.
+    
+    Returns:
+        tuple: ((latitude, longitude, radius), error)
+    """
+    position, error = parse_position(lat, lng)
+    if error:
+        return None, error
+    distance = DEFAULT_NEARBY_RADIUS if radius is None else to_float(radius)
+    if distance is None or not 0 < distance <= MAX_NEARBY_RADIUS:
+        return None, f"radius must be between 0 and {MAX_NEARBY_RADIUS} metres"
+    return (position[0], position[1], distance), None
+
+
+def parse_nearest_args(lat, lng, k=None, max_distance=None):
+    """
+    Validate /nearest parameters.
+    
+    Returns:
+        tuple: ((latitude, longitude, k, max_distance), error)
+    """
+    position, error = parse_position(lat, lng)
+    if error:
+        return None, error
+    count = DEFAULT_NEAREST if k is None else to_float(k)
+    if count is None or count != int(count) or not 1 <= count <= MAX_NEAREST:
+        return None, f"k must be an integer between 1 and {MAX_NEAREST}"
+    limit = None
+    if max_distance is not None:
+        limit = to_float(max_distance)
+        if limit is None or limit <= 0:
+            return None, "maxDistance must be a positive number of metres"
+    return (position[0], position[1], int(count), limit), None
+
+
+def parse_window(start, end, max_window):
+    """
+    Validate a trail time window.
+    
+    Args:
+        start: ISO 8601 string, epoch seconds/milliseconds (also as text) or datetime
+        end: Same formats as start
+        max_window (timedelta): Longest window allowed
+        
+    Returns:
+        tuple: ((start_time, end_time), error) with naive UTC datetimes
+    """
+    # Query strings carry epoch times as text
+    start_time, end_time = [
+        parse_point_time(to_float(value) if to_float(value) is not None else value)
+        for value in (start, end)
+    ]
+    if start_time is None or end_time is None:
+        return None, "start and end must be ISO 8601 timestamps or epoch times"
+    if end_time <= start_time:
+        return None, "end must be after start"
+    if end_time - start_time > max_window:
+        return None, f"Trail window cannot exceed {max_window.days} days"
+    return (start_time, end_time), None
+
+
+def parse_trail_args(start, end, zoom=None, tolerance=None, encoding=None):
+    """
+    Validate trail query parameters.
+    
+    Returns:
+        tuple: ((start_time, end_time, zoom, tolerance, encoding), error)
+    """
+    window, error = parse_window(start, end, MAX_TRAIL_WINDOW)
+    if error:
+        return None, error
+    start_time, end_time = window
+    
+    if zoom is not None:
+        zoom = to_float(zoom)
+        if zoom is None or not 0 <= zoom <= MAX_TRAIL_ZOOM:
+            return None, f"zoom must be between 0 and {MAX_TRAIL_ZOOM}"
+    if tolerance is not None:
+        tolerance = to_float(tolerance)
+        if tolerance is None or tolerance < 0:
+            return None, "tolerance must be a non-negative number of metres"
+    
+    encoding = encoding or 'polyline'
+    if encoding not in TRAIL_ENCODINGS:
+        return None, f"format must be one of: {', '.join(TRAIL_ENCODINGS)}"
+    return (start_time, end_time, zoom, tolerance, encoding), None
+
+
+def parse_replay_args(start, end, points=None):
+    """
+    Validate trail replay parameters.
+    
+    Returns:
+        tuple: ((start_time, end_time, target), error)
+    """
+    window, error = parse_window(start, end, MAX_REPLAY_WINDOW)
+    if error:
+        return None, error
+    
+    target = DEFAULT_REPLAY_POINTS if points is None else to_float(points)
+    if target is None or target != int(target) or not 2 <= target <= MAX_REPLAY_POINTS:
+        return None, f"points must be an integer between 2 and {MAX_REPLAY_POINTS}"
+    return (window[0], window[1], int(target)), None
+
+
+def resolve_area(polygon=None, duty_id=None):
+    """
+    Resolve the area of a /within query: a polygon, or a duty's area.
+    Duties with fewer than three vertices are circles of their radius.
+    
+    Returns:
+        tuple: (area, error, status) where area is ('polygon', vertices)
+               or ('circle', (latitude, longitude, radius))
+    """
+    radius = None
+    if polygon is None and duty_id:
+        duty = DutyModel.get_duty_by_id(duty_id)
+        if not duty:
+            return None, f"Duty {duty_id} not found", 404
+        location = duty.get('location') or {}
+        radius = location.get('radius')
+        vertices = parse_polygon(location.get('polygon'))
+        if not vertices:
+            return None, f"Duty {duty_id} has no area", 422
+    elif polygon is None:
+        return None, "Provide a polygon or a dutyId", 400
+    else:
+        vertices = parse_polygon(polygon)
+    
+    if len(vertices) >= 3:
+        return ('polygon', vertices), None, None
+    if vertices and radius:
+        latitude = sum(lat for lat, _ in vertices) / len(vertices)
+        longitude = sum(lng for _, lng in vertices) / len(vertices)
+        return ('circle', (latitude, longitude, float(radius))), None, None
+    return None, "polygon must have at least three [lat, lng] or {lat, lng} vertices", 400
+
+
+def _split_ids(value):
+    return [part.strip() for part in value.split(',') if part.strip()] if value else []
+
+
+def _point_time(point):
+    """Sort key for a point's timestamp; points without one sort oldest"""
+    return parse_point_time(point.get('timestamp')) or datetime.min
+
+
+def parse_bulk_points(payload):
+    """
+    Validate a bulk replay body and group its valid points by officer.
+    
+    Args:
+        payload: Request JSON: {'officerId', 'points'} or a list of points
+        
+    Returns:
+        tuple: ((grouped, rejected), error, status) where grouped maps
+               officer_id -> list of (index, point) and rejected lists
+               {'index', 'error'} for invalid points
+    """
+    if isinstance(payload, list):
+        points, default_officer_id = payload, None
+    elif isinstance(payload, dict):
+        points = payload.get('points')
+        default_officer_id = payload.get('officerId') or payload.get('officer_id')
+    else:
+        points, default_officer_id = None, None
+    
+    if not isinstance(points, list) or not points:
+        return None, "Request must contain a non-empty points array", 400
+    
+    if len(points) > MAX_BULK_POINTS:
+        return None, f"Too many points (max {MAX_BULK_POINTS} per request)", 413
+    
+    # Single validation pass, grouping valid points by officer
+    grouped = {}
+    rejected = []
+    for index, point in enumerate(points):
+        officer_id, error = validate_location_point(point, default_officer_id)
+        if error:
+            rejected.append({'index': index, 'error': error})
+            continue
+        grouped.setdefault(officer_id, []).append((index, point))
+    
+    return (grouped, rejected), None, None
+
+
+def accept_known_officers(grouped, known_ids, rejected):
+    """
+    Reject the points of officers that do not exist and order the rest.
+    
+    Args:
+        grouped (dict): officer_id -> list of (index, point) from parse_bulk_points
+        known_ids (set): Officer IDs found in the officers table
+        rejected (list): Rejections to extend (kept in request order)
+        
+    Returns:
+        dict: officer_id -> list of points ordered oldest to newest
+    """
+    points_by_officer = {}
+    for officer_id, indexed in grouped.items():
+        if officer_id not in known_ids:
+            rejected.extend({'index': index, 'error': f"Unknown officer {officer_id}"} for index, _ in indexed)
+            continue
+        points_by_officer[officer_id] = sorted((point for _, point in indexed), key=_point_time)
+    
+    rejected.sort(key=lambda item: item['index'])
+    return points_by_officer
+
+
 class LiveLocationController:
     """Controller for live location operations"""
     
@@ -37,13 +361,313 @@ class LiveLocationController:
             log_error(f"Error fetching location for officer {officer_id}: {str(e)}")
             return error_response("Failed to fetch location", 500)
     
+    @staticmethod
+    def get_trail(officer_id, start, end, duty_id=None, zoom=None, tolerance=None, encoding=None):
+        """Get an officer's trail for a time window, simplified and encoded"""
+        try:
+            args, error = parse_trail_args(start, end, zoom, tolerance, encoding)
+            if error:
+                return error_response(error, 400)
+            
+            start_time, end_time, zoom, tolerance, encoding = args
+            log_info(f"Fetching trail for officer {officer_id} from {start_time} to {end_time}")
+            return success_response(LiveLocationModel.get_encoded_trail(
+                officer_id, start_time, end_time, duty_id, zoom, tolerance, encoding
+            ))
+        except Exception as e:
+            log_error(f"Error fetching trail for officer {officer_id}: {str(e)}")
+            return error_response("Failed to fetch trail", 500)
+    
+    @staticmethod
+    def replay_trails(officer_ids, start_time, end_time, target, duty_id=None):
+        """
+        Stream officers' trails for a window as newline-delimited JSON.
+        
+        Each officer's points are read through a server-side cursor and
+        downsampled to about ``target`` points on the fly, so memory does
+        not grow with the window. Lines are a ``trail`` header per officer,
+        its ``point`` lines, and a final ``end`` line (or ``error`` if the
+        stream fails after it started).
+        
+        Args:
+            officer_ids (list): Officers to replay, in order
+            start_time (datetime): Window start (UTC, inclusive)
+            end_time (datetime): Window end (UTC, exclusive)
+            target (int): Points wanted per officer
+            duty_id (str, optional): Only points recorded for this duty
+            
+        Returns:
+            Response: Chunked application/x-ndjson response
+        """
+        log_info(f"Replaying trails for {len(officer_ids)} officer(s) from {start_time} to {end_time}")
+        return Response(
+            LiveLocationController._replay_lines(officer_ids, start_time, end_time, target, duty_id),
+            mimetype='application/x-ndjson',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
+    @staticmethod
+    def _replay_lines(officer_ids, start_time, end_time, target, duty_id):
+        """Generate replay_trails output in chunks of REPLAY_CHUNK_POINTS lines"""
+        sent = 0
+        try:
+            for officer_id in officer_ids:
+                count, points = LiveLocationModel.stream_trail(officer_id, start_time, end_time, duty_id)
+                yield _ndjson({
+                    'type': 'trail', 'officer_id': officer_id, 'duty_id': duty_id,
+                    'start': start_time.isoformat(), 'end': end_time.isoformat(),
+                    'raw_count': count, 'target': target
+                })
+                
+                chunk = []
+                for point in downsample(points, count, target):
+                    chunk.append(_ndjson({
+                        'type': 'point',
+                        'officer_id': officer_id,
+                        'ts': point['ts'].isoformat(),
+                        'latitude': float(point['latitude']),
+                        'longitude': float(point['longitude']),
+                        'speed': _optional_float(point.get('speed')),
+                        'heading': _optional_float(point.get('heading')),
+                        'accuracy': _optional_float(point.get('accuracy'))
+                    }))
+                    if len(chunk) >= REPLAY_CHUNK_POINTS:
+                        sent += len(chunk)
+                        yield ''.join(chunk)
+                        chunk = []
+                if chunk:
+                    sent += len(chunk)
+                    yield ''.join(chunk)
+            
+            yield _ndjson({'type': 'end', 'officers': len(officer_ids), 'points': sent})
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            log_error(f"Error replaying trails: {str(e)}")
+            yield _ndjson({'type': 'error', 'error': 'Trail replay failed', 'points': sent})
+    
     @staticmethod
     def update_location(officer_id, location_data):
         """Update officer's live location"""
         try:
-            log_info(f"Updating location for officer: {officer_id}")
-            success = LiveLocationModel.update_location(officer_id, location_data)
+            log_info(f"Updating location for officer: {officer_id}", event='location_ping')
+            
+            # Batched ingest: acknowledge once the ping is queued for the next flush
+            if LiveLocationModel.queue_location(officer_id, location_data):
+                return success_response({"message": "Queued"}, 202)
+            
+            # Batching disabled or queue full: write synchronously
+            LiveLocationModel.update_location(officer_id, location_data)
             return success_response({"message": "Success"})
         except Exception as e:
             log_error(f"Error updating location for officer {officer_id}: {str(e)}")
             return error_response("Failed to update location", 500)
+    
+    @staticmethod
+    def bulk_update_locations(payload):
+        """
+        Accept many buffered GPS points (one or many officers) in one request.
+        Invalid points and points of unknown officers are reported back;
+        valid ones are written together.
+        """
+        try:
+            args, error, status = parse_bulk_points(payload)
+            if error:
+                return error_response(error, status)
+            
+            grouped, rejected = args
+            known_ids = LiveLocationModel.known_officer_ids(list(grouped))
+            points_by_officer = accept_known_officers(grouped, known_ids, rejected)
+            accepted_points = sum(len(points) for points in points_by_officer.values())
+            
+            log_info(f"Bulk location update: {accepted_points} points "
+                     f"for {len(points_by_officer)} officers ({len(rejected)} rejected)", event='location_bulk')
+            
+            accepted = LiveLocationModel.ingest_points(points_by_officer) if points_by_officer else 0
+            
+            return success_response({
+                'accepted': accepted,
+                'officers': len(points_by_officer),
+                'rejected': rejected
+            })
+        except Exception as e:
+            log_error(f"Error in bulk location update: {str(e)}")
+            return error_response("Failed to update locations", 500)
+    
+    @staticmethod
+    def get_snapshot(bbox=None, since=None):
+        """Get compact current positions for the live map"""
+        try:
+            bounds, error = parse_bbox(bbox)
+            if error:
+                return error_response(error, 400)
+            
+            since_time = None
+            if since:
+                since_time = parse_point_time(since)
+                if since_time is None:
+                    return error_response("since must be an ISO 8601 timestamp", 400)
+            
+            return success_response(LiveLocationModel.get_snapshot(bounds, since_time))
+        except Exception as e:
+            log_error(f"Error fetching live location snapshot: {str(e)}")
+            return error_response("Failed to fetch live location snapshot", 500)
+    
+    @staticmethod
+    def get_changes(cursor=None):
+        """Get live positions changed since a delta-sync cursor"""
+        try:
+            since_cursor = None
+            if cursor:
+                since_cursor = parse_point_time(cursor)
+                if since_cursor is None:
+                    return error_response("cursor must be a value returned by a previous call", 400)
+            
+            return success_response(LiveLocationModel.get_changes(since_cursor))
+        except Exception as e:
+            log_error(f"Error fetching live location changes: {str(e)}")
+            return error_response("Failed to fetch live location changes", 500)
+    
+    @staticmethod
+    def get_nearby(lat, lng, radius=None):
+        """Get active officers within a radius of a point, nearest first"""
+        try:
+            args, error = parse_nearby_args(lat, lng, radius)
+            if error:
+                return error_response(error, 400)
+            return success_response(LiveLocationModel.get_nearby(*args))
+        except Exception as e:
+            log_error(f"Error fetching nearby officers: {str(e)}")
+            return error_response("Failed to fetch nearby officers", 500)
+    
+    @staticmethod
+    def get_nearest(lat, lng, k=None, max_distance=None):
+        """Get the k active officers nearest to a point"""
+        try:
+            args, error = parse_nearest_args(lat, lng, k, max_distance)
+            if error:
+                return error_response(error, 400)
+            return success_response(LiveLocationModel.get_nearest(*args))
+        except Exception as e:
+            log_error(f"Error fetching nearest officers: {str(e)}")
+            return error_response("Failed to fetch nearest officers", 500)
+    
+    @staticmethod
+    def get_within(polygon=None, duty_id=None):
+        """Get active officers inside a polygon or a duty's area"""
+        try:
+            area, error, status = resolve_area(polygon, duty_id)
+            if error:
+                return error_response(error, status)
+            
+            kind, shape = area
+            if kind == 'polygon':
+                return success_response(LiveLocationModel.get_within(shape))
+            return success_response(LiveLocationModel.get_nearby(*shape))
+        except Exception as e:
+            log_error(f"Error fetching officers within area: {str(e)}")
+            return error_response("Failed to fetch officers within area", 500)
+    
+    @staticmethod
+    def stream_locations(officers=None, duties=None, bbox=None, last_event_id=None):
+        """
+        Open a Server-Sent Events stream of position updates.
+        
+        The stream starts with a ``sync`` event (the delta since
+        ``last_event_id``, or every matching officer) followed by
+        ``position``/``remove`` events as writes are committed.
+        """
+        try:
+            bounds, error = parse_bbox(bbox)
+            if error:
+                return error_response(error, 400)
+            
+            cursor = None
+            if last_event_id:
+                cursor = parse_point_time(last_event_id)
+            
+            duty_ids = _split_ids(duties)
+            duty_officer_ids = set()
+            for duty_id in duty_ids:
+                duty = DutyModel.get_duty_by_id(duty_id)
+                if not duty:
+                    return error_response(f"Duty {duty_id} not found", 404)
+                duty_officer_ids.update(duty['officerUids'])
+            
+            subscription = LocationSubscription(
+                officer_ids=_split_ids(officers),
+                duty_ids=duty_ids,
+                duty_officer_ids=duty_officer_ids,
+                bbox=bounds,
+                max_pending=LIVE_STREAM_MAX_PENDING,
+                max_lag=LIVE_STREAM_MAX_LAG
+            )
+            # Subscribe before reading the sync state so no write falls in between
+            if not location_stream_hub.subscribe(subscription):
+                return error_response("Too many live location streams, use /delta polling instead", 503)
+            
+            try:
+                sync = LiveLocationController._initial_sync(subscription, cursor)
+            except Exception:
+                location_stream_hub.unsubscribe(subscription)
+                raise
+            
+            log_info(f"Live location stream opened ({location_stream_hub.stats()['subscribers']} subscribers)")
+            return Response(
+                LiveLocationController._stream_events(subscription, sync),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+        except Exception as e:
+            log_error(f"Error opening live location stream: {str(e)}")
+            return error_response("Failed to open live location stream", 500)
+    
+    @staticmethod
+    def get_stream_stats():
+        """Get live location stream hub statistics"""
+        try:
+            return success_response(location_stream_hub.stats())
+        except Exception as e:
+            log_error(f"Error fetching stream stats: {str(e)}")
+            return error_response("Failed to fetch stream stats", 500)
+    
+    @staticmethod
+    def _initial_sync(subscription, cursor):
+        """Delta since ``cursor`` restricted to the subscription's filters"""
+        changes = LiveLocationModel.get_changes(cursor)
+        changes['rows'] = [
+            row for row in changes['rows']
+            if subscription.route(row[0], {'latitude': row[2], 'longitude': row[3], 'active': True}) == 'position'
+        ]
+        changes['removed'] = [
+            officer_id for officer_id in changes['removed']
+            if subscription.route(officer_id, {'active': False})
+        ]
+        return format_sse('sync', json.dumps(changes), changes['cursor'])
+    
+    @staticmethod
+    def _stream_events(subscription, sync):
+        """Yield SSE messages until the client disconnects or falls behind"""
+        try:
+            yield "retry: 3000\n\n"
+            yield sync
+            while True:
+                messages = subscription.wait(LIVE_STREAM_HEARTBEAT)
+                if subscription.dropped:
+                    # Client reconnects with Last-Event-ID and gets a delta sync
+                    yield format_sse('dropped', json.dumps({'reason': 'slow consumer'}))
+                    return
+                if messages:
+                    yield ''.join(messages)
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            location_stream_hub.unsubscribe(subscription)
+    
+    @staticmethod
+    def get_ingest_stats():
+        """Get batched location ingest statistics"""
+        try:
+            return success_response(get_ingest_stats())
+        except Exception as e:
+            log_error(f"Error fetching ingest stats: {str(e)}")
+            return error_response("Failed to fetch ingest stats", 500)
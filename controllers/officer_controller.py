@@ -3,9 +3,10 @@ Officer Controller
 Handles officer business logic
 """
 
+from controllers.live_location_controller import LiveLocationController, parse_replay_args
 from models.officer_model import OfficerModel
 from utils.logger import log_info, log_error
-from utils.responses import success_response, error_response
+from utils.responses import success_response, error_response, cached_response
 
 
 class OfficerController:
@@ -16,8 +17,8 @@ class OfficerController:
         """Get all officers"""
         try:
             log_info("Fetching all officers")
-            officers = OfficerModel.get_all_officers()
-            return success_response(officers)
+            officers, etag = OfficerModel.get_all_officers(with_etag=True)
+            return cached_response(officers, etag)
         except Exception as e:
             log_error(f"Error fetching officers: {str(e)}")
             return error_response("Failed to fetch officers", 500)
@@ -37,6 +38,23 @@ class OfficerController:
             log_error(f"Error fetching officer {officer_id}: {str(e)}")
             return error_response("Failed to fetch officer", 500)
     
+    @staticmethod
+    def replay_trail(officer_id, start, end, points=None):
+        """Stream an officer's downsampled trail between two timestamps"""
+        try:
+            args, error = parse_replay_args(start, end, points)
+            if error:
+                return error_response(error, 400)
+            
+            if not OfficerModel.get_officer_by_id(officer_id):
+                return error_response("Officer not found", 404)
+            
+            start_time, end_time, target = args
+            return LiveLocationController.replay_trails([officer_id], start_time, end_time, target)
+        except Exception as e:
+            log_error(f"Error replaying trail for officer {officer_id}: {str(e)}")
+            return error_response("Failed to replay trail", 500)
+    
     @staticmethod
     def create_officer(data):
         """Create a new officer"""
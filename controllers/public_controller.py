@@ -4,10 +4,13 @@ Handles public API operations business logic
 """
 
 from datetime import datetime
+from flask import Response
 from models.officer_model import OfficerModel
-from models.db import check_health
-from utils.responses import ResponseHelper
-from utils.logger import logger, log_request, get_client_ip
+from models.db import check_health, get_pool_stats
+from models.cache import reference_cache
+from utils.responses import ResponseHelper, cached_response
+from utils.logger import logger, log_request, get_client_ip, get_log_stats
+from utils.metrics import request_metrics
 
 
 class PublicController:
@@ -42,6 +45,101 @@ class PublicController:
             log_request(client_ip, '/health', 'error', str(e))
             return ResponseHelper.internal_error()
     
+    @staticmethod
+    def get_pool_stats():
+        """
+        Get database connection pool statistics.
+        
+        Returns:
+            tuple: (response, status_code)
+        """
+        try:
+            return ResponseHelper.success_data(get_pool_stats())
+        except Exception as e:
+            logger.error(f"Pool stats error: {str(e)}")
+            return ResponseHelper.internal_error()
+    
+    @staticmethod
+    def get_cache_stats():
+        """
+        Get reference data cache statistics.
+        
+        Returns:
+            tuple: (response, status_code)
+        """
+        try:
+            return ResponseHelper.success_data(reference_cache.stats())
+        except Exception as e:
+            logger.error(f"Cache stats error: {str(e)}")
+            return ResponseHelper.internal_error()
+    
+    @staticmethod
+    def get_log_stats():
+        """
+        Get logging pipeline statistics.
+        
+        Returns:
+            tuple: (response, status_code)
+        """
+        try:
+            return ResponseHelper.success_data(get_log_stats())
+        except Exception as e:
+            logger.error(f"Log stats error: {str(e)}")
+            return ResponseHelper.internal_error()
+    
+    @staticmethod
+    def get_metrics():
+        """
+        Get request and DB metrics in Prometheus text format.
+        
+        Returns:
+            Response: text/plain exposition
+        """
+        try:
+            return Response(
+                request_metrics.render_prometheus(PublicController.metrics_gauges()),
+                mimetype='text/plain; version=0.0.4'
+            )
+        except Exception as e:
+            logger.error(f"Metrics error: {str(e)}")
+            return ResponseHelper.internal_error()
+    
+    @staticmethod
+    def metrics_gauges():
+        """
+        Current DB pool and log queue gauges of this process.
+        Also written into each worker's metrics snapshot.
+        
+        Returns:
+            dict: name -> (help, value)
+        """
+        pool = get_pool_stats()
+        gauges = {
+            'gph_db_pool_size': ('Open pool connections', pool['size']),
+            'gph_db_pool_checked_out': ('Pool connections in use', pool['checked_out']),
+            'gph_db_pool_waiting': ('Threads waiting for a pool connection', pool['waiting']),
+            'gph_db_pool_wait_seconds_avg': ('Average pool checkout wait', pool['wait_time_avg'])
+        }
+        logging_stats = get_log_stats()
+        if 'queued' in logging_stats:
+            gauges['gph_log_queue_depth'] = ('Log records waiting for the writer thread', logging_stats['queued'])
+            gauges['gph_log_dropped'] = ('Log records dropped because the queue was full', logging_stats['dropped'])
+        return gauges
+    
+    @staticmethod
+    def get_metrics_summary():
+        """
+        Get per-endpoint latency percentiles and query counts.
+        
+        Returns:
+            tuple: (response, status_code)
+        """
+        try:
+            return ResponseHelper.success_data(request_metrics.stats())
+        except Exception as e:
+            logger.error(f"Metrics summary error: {str(e)}")
+            return ResponseHelper.internal_error()
+    
     @staticmethod
     def get_all_officers():
         """
@@ -54,10 +152,10 @@ class PublicController:
         
         try:
             # Controller calls model function (thin controller)
-            officers = OfficerModel.get_all_officers()
+            officers, etag = OfficerModel.get_all_officers(with_etag=True)
             
             log_request(client_ip, '/officers', 'success')
-            return ResponseHelper.success_data(officers)
+            return cached_response(officers, etag)
         
         except Exception as e:
             logger.error(f"Error fetching officers: {str(e)}")
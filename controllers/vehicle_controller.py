@@ -5,7 +5,7 @@ Handles vehicle business logic
 
 from models.vehicle_model import VehicleModel
 from utils.logger import log_info, log_error
-from utils.responses import success_response, error_response
+from utils.responses import success_response, error_response, cached_response
 
 
 class VehicleController:
@@ -16,8 +16,8 @@ class VehicleController:
         """Get all vehicles"""
         try:
             log_info("Fetching all vehicles")
-            vehicles = VehicleModel.get_all_vehicles()
-            return success_response(vehicles)
+            vehicles, etag = VehicleModel.get_all_vehicles(with_etag=True)
+            return cached_response(vehicles, etag)
         except Exception as e:
             log_error(f"Error fetching vehicles: {str(e)}")
             return error_response("Failed to fetch vehicles", 500)
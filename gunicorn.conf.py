@@ -0,0 +1,128 @@
+"""
+Gunicorn Configuration
+Multi-worker production server settings, read from the environment
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Reload code and config without dropping requests with ``kill -HUP <master pid>``:
+new workers are started (and warmed up) while old ones finish their
+in-flight requests within ``graceful_timeout``.
+"""
+
+import multiprocessing
+import os
+import tempfile
+from dotenv import load_dotenv
+
+# Settings below come from .env like the rest of the app's configuration
+load_dotenv()
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, str(default)))
+
+
+# Workers share request metrics through snapshot files in this directory, so
+# /metrics reports the sum of all workers whichever one is scraped. Use a
+# separate directory per server running on the same host.
+os.environ.setdefault('METRICS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'gph-metrics'))
+
+# ============================================================================
+# SERVER SOCKET
+# ============================================================================
+
+bind = os.getenv('GUNICORN_BIND', f"{os.getenv('SERVER_HOST', '0.0.0.0')}:{os.getenv('SERVER_PORT', '5000')}")
+backlog = _env_int('GUNICORN_BACKLOG', 2048)
+
+# ============================================================================
+# WORKERS
+# ============================================================================
+
+# Each worker has its own DB pool: workers * DB_POOL_MAX_SIZE must stay below
+# the MySQL connection limit.
+workers = _env_int('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+
+# Threaded workers: requests mostly wait on MySQL, and each location stream
+# holds one thread for its lifetime. Streams per worker default to half the
+# threads (LIVE_STREAM_MAX_SUBSCRIBERS, always below threads); size
+# workers * threads for the expected control-room screens plus API traffic.
+worker_class = 'gthread'
+threads = _env_int('GUNICORN_THREADS', 8)
+
+# Recycle workers after this many requests (0 disables) to bound memory growth
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 0)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 0)
+
+# Loading the app in the master shares memory between workers but prevents
+# HUP from picking up code changes. Pools and caches are per-process either way.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+# ============================================================================
+# TIMEOUTS AND KEEP-ALIVE
+# ============================================================================
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Devices re-post every few seconds; keeping their connections open saves a
+# TCP/TLS handshake per ping. Behind nginx, set above its upstream keepalive_timeout.
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# ============================================================================
+# LOGGING
+# ============================================================================
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# ============================================================================
+# HOOKS
+# ============================================================================
+
+WARMUP_ENABLED = os.getenv('GUNICORN_WARMUP', 'true').lower() == 'true'
+
+
+def post_worker_init(worker):
+    """Warm up each worker after it loads the app and before it accepts requests"""
+    if not WARMUP_ENABLED:
+        return
+    from wsgi import warm_up
+    warm_up()
+
+
+def on_starting(server):
+    """Start with empty metrics; snapshots left by a previous run would be summed in"""
+    from utils.metrics import clear_multiproc_dir
+    clear_multiproc_dir(os.environ['METRICS_MULTIPROC_DIR'])
+
+
+def worker_exit(server, worker):
+    """
+    Write queued location pings, geofence violations and the final metrics
+    snapshot before a worker stops (SIGTERM, HUP reload or max_requests
+    recycling). A worker killed for exceeding ``timeout`` skips this.
+    """
+    from models.location_ingest import stop_ingest_queue
+    from models.duty_model import duty_geofence
+    from utils.metrics import request_metrics
+    try:
+        # Ingest first: its writes can report more violations
+        stop_ingest_queue()
+        if duty_geofence is not None:
+            duty_geofence.flush()
+    finally:
+        request_metrics.write_snapshot()
+
+
+def child_exit(server, worker):
+    """Keep an exited worker's counters so totals do not drop when it is replaced"""
+    from utils.metrics import mark_process_dead
+    mark_process_dead(worker.pid, os.environ['METRICS_MULTIPROC_DIR'])
+
+
+def when_ready(server):
+    server.log.info(
+        f"Serving on {bind} with {workers} workers x {threads} threads "
+        f"(keepalive {keepalive}s, graceful timeout {graceful_timeout}s)"
+    )
@@ -0,0 +1,239 @@
+"""
+Load Test Harness
+Measures throughput and latency percentiles of the main endpoints, and
+compares the Flask development server with the Gunicorn production mode
+
+Usage:
+    # Against a running server
+    python loadtest.py --url http://127.0.0.1:5000 -c 50 -d 30
+
+    # Start both servers in turn on a spare port and compare them
+    python loadtest.py --compare -c 50 -d 30
+
+    # Include location pings (writes to live_locations for that officer)
+    python loadtest.py --compare --ping-officer <officer uuid>
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+
+# (label, method, path) exercised round-robin by every client
+DEFAULT_ENDPOINTS = [
+    ('health', 'GET', '/health'),
+    ('officers', 'GET', '/officers'),
+    ('vehicles', 'GET', '/api/vehicles'),
+    ('duties_active', 'GET', '/api/duties/active'),
+    ('live_snapshot', 'GET', '/api/live-locations/snapshot'),
+]
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile.
+
+    Args:
+        sorted_values (list): Ascending samples
+        fraction (float): 0.0 - 1.0
+
+    Returns:
+        float: Sample at the requested rank, or 0.0 if there are none
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def run_load(base_url, endpoints, concurrency=20, duration=20.0, warmup=3.0, timeout=10.0):
+    """
+    Hit ``endpoints`` from ``concurrency`` keep-alive clients for ``duration``
+    seconds after ``warmup`` seconds of unrecorded traffic.
+
+    Args:
+        base_url (str): Server root, e.g. http://127.0.0.1:5000
+        endpoints (list): (label, method, path[, json body]) tuples
+        concurrency (int): Concurrent clients
+        duration (float): Measured seconds
+        warmup (float): Unmeasured seconds before recording starts
+        timeout (float): Per-request timeout
+
+    Returns:
+        dict: Per-endpoint and total {requests, errors, rps, p50, p95, p99, max}
+              with latencies in milliseconds
+    """
+    lock = threading.Lock()
+    samples = {endpoint[0]: [] for endpoint in endpoints}
+    errors = {endpoint[0]: 0 for endpoint in endpoints}
+    started = time.monotonic()
+    record_from = started + warmup
+    stop_at = record_from + duration
+
+    def client(offset):
+        session = requests.Session()
+        local_samples = {label: [] for label in samples}
+        local_errors = {label: 0 for label in samples}
+        i = offset
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                break
+            label, method, path, *body = endpoints[i % len(endpoints)]
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body[0] if body else None,
+                                            timeout=timeout)
+                failed = response.status_code >= 500
+            except requests.RequestException:
+                failed = True
+            elapsed = (time.perf_counter() - t0) * 1000.0
+            if now >= record_from:
+                if failed:
+                    local_errors[label] += 1
+                else:
+                    local_samples[label].append(elapsed)
+        with lock:
+            for label in samples:
+                samples[label].extend(local_samples[label])
+                errors[label] += local_errors[label]
+
+    threads = [threading.Thread(target=client, args=(n,), daemon=True) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    def summarize(values, error_count):
+        values = sorted(values)
+        return {
+            'requests': len(values),
+            'errors': error_count,
+            'rps': round(len(values) / duration, 1),
+            'p50': round(percentile(values, 0.50), 2),
+            'p95': round(percentile(values, 0.95), 2),
+            'p99': round(percentile(values, 0.99), 2),
+            'max': round(values[-1], 2) if values else 0.0
+        }
+
+    results = {label: summarize(samples[label], errors[label]) for label in samples}
+    results['TOTAL'] = summarize(
+        [value for values in samples.values() for value in values],
+        sum(errors.values())
+    )
+    return results
+
+
+def start_server(mode, port, workers=None, threads=None):
+    """
+    Start the development server or Gunicorn on ``port`` and wait until
+    /health answers.
+
+    Args:
+        mode (str): 'dev' or 'gunicorn'
+        port (int): Port to bind on 127.0.0.1
+
+    Returns:
+        subprocess.Popen: Server process
+    """
+    env = dict(os.environ, SERVER_HOST='127.0.0.1', SERVER_PORT=str(port), DEBUG_MODE='false')
+    if mode == 'dev':
+        command = [sys.executable, 'run.py']
+    else:
+        env['GUNICORN_BIND'] = f'127.0.0.1:{port}'
+        if workers:
+            env['GUNICORN_WORKERS'] = str(workers)
+        if threads:
+            env['GUNICORN_THREADS'] = str(threads)
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{mode} server exited with code {process.returncode}")
+        try:
+            requests.get(f'http://127.0.0.1:{port}/health', timeout=1)
+            return process
+        except requests.RequestException:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def print_results(title, results):
+    print(f"\n{title}")
+    print(f"{'endpoint':<16}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for label, row in results.items():
+        print(f"{label:<16}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10}"
+              f"{row['p50']:>10}{row['p95']:>10}{row['p99']:>10}{row['max']:>10}")
+
+
+def print_comparison(dev, prod):
+    print("\nGunicorn vs development server")
+    print(f"{'endpoint':<16}{'rps dev':>10}{'rps prod':>10}{'speedup':>9}{'p99 dev':>10}{'p99 prod':>10}")
+    for label in dev:
+        speedup = prod[label]['rps'] / dev[label]['rps'] if dev[label]['rps'] else float('inf')
+        print(f"{label:<16}{dev[label]['rps']:>10}{prod[label]['rps']:>10}{speedup:>8.2f}x"
+              f"{dev[label]['p99']:>10}{prod[label]['p99']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the backend endpoints')
+    parser.add_argument('--url', help='Test an already running server at this URL')
+    parser.add_argument('--compare', action='store_true', help='Start and compare dev server and Gunicorn')
+    parser.add_argument('--port', type=int, default=5055, help='Port used by --compare')
+    parser.add_argument('-c', '--concurrency', type=int, default=20)
+    parser.add_argument('-d', '--duration', type=float, default=20.0)
+    parser.add_argument('-w', '--warmup', type=float, default=3.0)
+    parser.add_argument('--workers', type=int, help='Gunicorn workers for --compare')
+    parser.add_argument('--threads', type=int, help='Gunicorn threads per worker for --compare')
+    parser.add_argument('--ping-officer', help='Also POST location pings for this officer id')
+    args = parser.parse_args()
+
+    endpoints = list(DEFAULT_ENDPOINTS)
+    if args.ping_officer:
+        endpoints.append(('location_ping', 'POST', f'/api/live-locations/officer/{args.ping_officer}',
+                          {'latitude': 15.4909, 'longitude': 73.8278, 'speed': 0, 'status': 'active'}))
+
+    options = dict(concurrency=args.concurrency, duration=args.duration, warmup=args.warmup)
+
+    if args.url:
+        print_results(args.url, run_load(args.url.rstrip('/'), endpoints, **options))
+        return
+
+    if not args.compare:
+        parser.error('pass --url or --compare')
+
+    base_url = f'http://127.0.0.1:{args.port}'
+    results = {}
+    for mode in ('dev', 'gunicorn'):
+        process = start_server(mode, args.port, workers=args.workers, threads=args.threads)
+        try:
+            results[mode] = run_load(base_url, endpoints, **options)
+        finally:
+            stop_server(process)
+        print_results(f"{mode} ({args.concurrency} clients, {args.duration:g}s)", results[mode])
+
+    print_comparison(results['dev'], results['gunicorn'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Location Points Retention Job
+Keeps location_points partitions rolling: creates upcoming monthly
+partitions and drops those older than the retention window.
+
+Run daily from cron, e.g.:
+    0 2 * * * cd /opt/backend && python location_retention.py
+"""
+
+import os
+import sys
+from datetime import datetime
+from models.location_point_model import LocationPointModel, ARCHIVE_ENABLED
+from utils.logger import logger
+
+MONTHS_AHEAD = int(os.getenv('LOCATION_POINTS_MONTHS_AHEAD', '3'))
+
+
+def run_retention(now=None):
+    """
+    Add future partitions and drop expired ones.
+    
+    Args:
+        now (datetime, optional): Reference time (defaults to UTC now)
+        
+    Returns:
+        dict: {'created': [...], 'archived': {...} or None, 'dropped': [...]}
+    """
+    now = now or datetime.utcnow()
+    
+    created = LocationPointModel.add_month_partitions(MONTHS_AHEAD, now)
+    
+    # Keep the current month plus RETENTION_MONTHS full months before it
+    cutoff = LocationPointModel.retention_cutoff(now)
+    
+    archived = None
+    if ARCHIVE_ENABLED:
+        # Only what is about to be dropped: partitions ending at or before the cutoff
+        expired = [upper for _, upper in LocationPointModel.get_partitions() if upper and upper <= cutoff]
+        if expired:
+            archived = LocationPointModel.archive_before(max(expired))
+            logger.info(f"Location retention: archived {archived['raw_points']} points as "
+                        f"{archived['trails']} trails ({archived['stored_points']} points kept)")
+    
+    dropped = LocationPointModel.drop_partitions_before(cutoff)
+    
+    logger.info(f"Location retention: created {created or 'none'}, "
+                f"removed {dropped or 'none'} (cutoff {cutoff:%Y-%m-%d})")
+    return {'created': created, 'archived': archived, 'dropped': dropped}
+
+
+if __name__ == '__main__':
+    try:
+        run_retention()
+    except Exception as e:
+        logger.error(f"Location retention failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,6 @@
+-- ============================================================================
+-- Duty Pagination Migration
+-- Supports keyset pagination of GET /api/duties on (created_at, id).
+-- ============================================================================
+
+ALTER TABLE duties ADD INDEX idx_created_at_id (created_at, id);
@@ -0,0 +1,17 @@
+-- ============================================================================
+-- Live Location Ingest Migration
+-- Makes officer_id unique on live_locations so location pings can be written
+-- with a single multi-row INSERT ... ON DUPLICATE KEY UPDATE
+-- ============================================================================
+
+-- Remove duplicate rows per officer, keeping the most recently updated one
+DELETE ll FROM live_locations ll
+JOIN live_locations newer
+  ON newer.officer_id = ll.officer_id
+ AND (COALESCE(newer.last_updated, '1970-01-01') > COALESCE(ll.last_updated, '1970-01-01')
+      OR (COALESCE(newer.last_updated, '1970-01-01') = COALESCE(ll.last_updated, '1970-01-01')
+          AND newer.id > ll.id));
+
+-- One live row per officer
+ALTER TABLE live_locations
+ADD UNIQUE KEY uniq_officer_id (officer_id);
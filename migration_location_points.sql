@@ -0,0 +1,32 @@
+-- ============================================================================
+-- Location Points Migration
+-- Append-only GPS history, range-partitioned by month on ts.
+-- Replaces rewriting the live_locations.locations / location_history JSON
+-- blobs on every update.
+-- ============================================================================
+
+-- Partitioned InnoDB tables cannot carry foreign keys, and every unique key
+-- must include the partitioning column, hence PRIMARY KEY (id, ts).
+-- p_history catches points older than the first monthly partition; run
+-- location_retention.py regularly to add future months and drop old ones.
+CREATE TABLE IF NOT EXISTS location_points (
+    id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    officer_id VARCHAR(50) NOT NULL,
+    duty_id VARCHAR(50),
+    ts DATETIME(3) NOT NULL,
+    latitude DECIMAL(10, 7) NOT NULL,
+    longitude DECIMAL(10, 7) NOT NULL,
+    speed DECIMAL(8, 2),
+    heading DECIMAL(6, 2),
+    accuracy DECIMAL(8, 2),
+    PRIMARY KEY (id, ts),
+    INDEX idx_officer_ts (officer_id, ts),
+    INDEX idx_duty_ts (duty_id, ts)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE COLUMNS (ts) (
+    PARTITION p_history VALUES LESS THAN ('2026-10-01'),
+    PARTITION p202610 VALUES LESS THAN ('2026-11-01'),
+    PARTITION p202611 VALUES LESS THAN ('2026-12-01'),
+    PARTITION p202612 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
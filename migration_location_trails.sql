@@ -0,0 +1,24 @@
+-- ============================================================================
+-- Location Trails Migration
+-- Archived GPS history: one simplified, polyline-encoded trail per officer,
+-- duty and UTC day. location_retention.py fills it (TRAIL_ARCHIVE_ENABLED=true)
+-- before dropping expired location_points partitions.
+-- ============================================================================
+
+-- duty_id is '' for points recorded without a duty, so it can be part of the
+-- primary key. path holds delta-encoded coordinates and times the seconds
+-- since start_ts (see models/trail_codec.py).
+CREATE TABLE IF NOT EXISTS location_trails (
+    officer_id VARCHAR(50) NOT NULL,
+    duty_id VARCHAR(50) NOT NULL DEFAULT '',
+    day DATE NOT NULL,
+    start_ts DATETIME(3) NOT NULL,
+    end_ts DATETIME(3) NOT NULL,
+    point_count INT UNSIGNED NOT NULL,
+    raw_count INT UNSIGNED NOT NULL,
+    coord_precision TINYINT UNSIGNED NOT NULL DEFAULT 5,
+    path MEDIUMTEXT NOT NULL,
+    times MEDIUMTEXT NOT NULL,
+    PRIMARY KEY (officer_id, day, duty_id),
+    INDEX idx_duty_day (duty_id, day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -3,7 +3,24 @@ Activity Model
 Handles activity/log data access
 """
 
-from .db import get_connection
+from .db import get_connection, stream_rows
+
+
+# Audit export; filters are appended by export_activities
+ACTIVITIES_EXPORT_QUERY = """
+    SELECT
+        a.id, a.timestamp, a.type, a.title, a.description, a.duty_id,
+        a.officer_id, a.officer_uid, o.staff_name as officer_name,
+        o.staff_id as officer_staff_id, a.location, a.created_at
+    FROM activities a
+    LEFT JOIN officers o ON a.officer_id = o.id
+    WHERE 1 = 1
+"""
+
+ACTIVITIES_EXPORT_COLUMNS = [
+    'id', 'timestamp', 'type', 'title', 'description', 'duty_id', 'officer_id',
+    'officer_uid', 'officer_name', 'officer_staff_id', 'location', 'created_at'
+]
 
 
 class ActivityModel:
@@ -64,6 +81,39 @@ class ActivityModel:
                 cursor.execute(query, (officer_id,))
                 return cursor.fetchall()
     
+    @staticmethod
+    def export_activities(start_time=None, end_time=None, officer_id=None, duty_id=None):
+        """
+        Stream activities for an audit export, oldest first, through a
+        server-side cursor.
+        
+        Args:
+            start_time (datetime, optional): Earliest timestamp (inclusive)
+            end_time (datetime, optional): Latest timestamp (exclusive)
+            officer_id (str, optional): Only this officer's activities
+            duty_id (str, optional): Only this duty's activities
+            
+        Yields:
+            dict: Rows with ACTIVITIES_EXPORT_COLUMNS
+        """
+        query = ACTIVITIES_EXPORT_QUERY
+        params = []
+        if start_time:
+            query += " AND a.timestamp >= %s"
+            params.append(start_time)
+        if end_time:
+            query += " AND a.timestamp < %s"
+            params.append(end_time)
+        if officer_id:
+            query += " AND a.officer_id = %s"
+            params.append(officer_id)
+        if duty_id:
+            query += " AND a.duty_id = %s"
+            params.append(duty_id)
+        
+        query += " ORDER BY a.timestamp ASC, a.id ASC"
+        yield from stream_rows(query, params)
+    
     @staticmethod
     def create_activity(activity_data):
         """Create new activity"""
@@ -0,0 +1,130 @@
+"""
+Async Database Connection Module
+aiomysql connection pool for the async device API (asgi.py)
+"""
+
+import asyncio
+import os
+import ssl
+from contextlib import asynccontextmanager
+import aiomysql
+import pymysql
+from config import DB_CONFIG
+from utils.logger import logger
+
+
+# ============================================================================
+# POOL CONFIGURATION
+# ============================================================================
+
+# Connections are only held while a query runs, so one pool serves many
+# more concurrent requests than it has connections.
+ASYNC_DB_POOL_MIN_SIZE = int(os.getenv('ASYNC_DB_POOL_MIN_SIZE', '2'))
+ASYNC_DB_POOL_MAX_SIZE = int(os.getenv('ASYNC_DB_POOL_MAX_SIZE', '20'))
+ASYNC_DB_POOL_RECYCLE = int(os.getenv('ASYNC_DB_POOL_RECYCLE', '1800'))
+
+_pool = None
+_pool_loop = None
+_pool_lock = None
+
+
+def _ssl_context():
+    """TLS settings equivalent to ssl_mode REQUIRED (encrypt, no CA check)"""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+async def get_async_pool():
+    """
+    Get the pool for the running event loop, creating it on first use.
+
+    Returns:
+        aiomysql.Pool: Pool bound to the current loop
+    """
+    global _pool, _pool_loop, _pool_lock
+    loop = asyncio.get_running_loop()
+
+    if _pool is not None and _pool_loop is loop:
+        return _pool
+
+    # A pool belongs to the loop that created it (one per worker process)
+    if _pool_loop is not loop:
+        _pool_lock = asyncio.Lock()
+        _pool_loop = loop
+        _pool = None
+
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await aiomysql.create_pool(
+                host=DB_CONFIG['host'],
+                port=int(DB_CONFIG.get('port', 3306)),
+                user=DB_CONFIG['user'],
+                password=DB_CONFIG['password'],
+                db=DB_CONFIG['database'],
+                ssl=_ssl_context(),
+                cursorclass=aiomysql.DictCursor,
+                autocommit=False,
+                minsize=ASYNC_DB_POOL_MIN_SIZE,
+                maxsize=ASYNC_DB_POOL_MAX_SIZE,
+                pool_recycle=ASYNC_DB_POOL_RECYCLE
+            )
+    return _pool
+
+
+@asynccontextmanager
+async def get_async_connection():
+    """
+    Async counterpart of models.db.get_connection.
+
+    Borrows a connection from the loop's pool; any uncommitted transaction
+    is rolled back before it is returned, and broken connections are closed
+    instead of reused.
+    """
+    pool = await get_async_pool()
+    conn = await pool.acquire()
+    broken = False
+    try:
+        yield conn
+    except Exception as e:
+        logger.error(f"Database connection error: {str(e)}")
+        broken = isinstance(e, (pymysql.err.OperationalError, pymysql.err.InterfaceError))
+        raise
+    finally:
+        if broken:
+            conn.close()
+        elif conn.get_transaction_status():
+            try:
+                await conn.rollback()
+            except Exception:
+                conn.close()
+        # The pool drops closed connections instead of reusing them
+        pool.release(conn)
+
+
+async def close_async_pool():
+    """Close the pool and wait for its connections to be released"""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+def get_async_pool_stats():
+    """
+    Get async pool usage statistics.
+
+    Returns:
+        dict: Size, free and in-use connection counts (empty before first use)
+    """
+    if _pool is None:
+        return {}
+    return {
+        'size': _pool.size,
+        'free': _pool.freesize,
+        'in_use': _pool.size - _pool.freesize,
+        'min_size': _pool.minsize,
+        'max_size': _pool.maxsize
+    }
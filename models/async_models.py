@@ -0,0 +1,177 @@
+"""
+Async Models
+aiomysql versions of the device-facing models (check-ins, compliance logs,
+live locations). SQL and row handling are shared with the sync models.
+"""
+
+import asyncio
+from .async_db import get_async_connection
+from .check_in_model import (
+    CheckInModel, CHECK_INS_QUERY, CHECK_INS_BY_DUTY_QUERY, CHECK_IN_INSERT_QUERY
+)
+from .compliance_model import (
+    ComplianceModel, COMPLIANCE_LOGS_QUERY, COMPLIANCE_BY_DUTY_QUERY, COMPLIANCE_INSERT_QUERY
+)
+from .live_location_model import (
+    LiveLocationModel, LIVE_LOCATIONS_QUERY, LIVE_LOCATION_BY_OFFICER_QUERY,
+    KNOWN_OFFICERS_QUERY, LIVE_TIMESTAMPS_QUERY
+)
+from .location_point_model import LocationPointModel
+
+
+async def _fetch_all(query, params=None):
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchall()
+
+
+async def _fetch_one(query, params=None):
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchone()
+
+
+async def _execute(query, params):
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params)
+        await conn.commit()
+
+
+class AsyncCheckInModel:
+    """Async model for check-in operations"""
+
+    @staticmethod
+    async def get_all_check_ins(limit=100):
+        """Get all check-ins"""
+        return [CheckInModel.parse_row(ci) for ci in await _fetch_all(CHECK_INS_QUERY, (limit,))]
+
+    @staticmethod
+    async def get_check_ins_by_duty(duty_id):
+        """Get check-ins for specific duty"""
+        return [CheckInModel.parse_row(ci) for ci in await _fetch_all(CHECK_INS_BY_DUTY_QUERY, (duty_id,))]
+
+    @staticmethod
+    async def create_check_in(check_in_data):
+        """Create new check-in"""
+        await _execute(CHECK_IN_INSERT_QUERY, CheckInModel.insert_params(check_in_data))
+        return check_in_data['id']
+
+
+class AsyncComplianceModel:
+    """Async model for compliance operations"""
+
+    @staticmethod
+    async def get_all_compliance_logs(limit=100):
+        """Get all compliance logs"""
+        return [ComplianceModel.parse_row(log) for log in await _fetch_all(COMPLIANCE_LOGS_QUERY, (limit,))]
+
+    @staticmethod
+    async def get_compliance_by_duty(duty_id):
+        """Get compliance logs for a specific duty"""
+        return [ComplianceModel.parse_row(log) for log in await _fetch_all(COMPLIANCE_BY_DUTY_QUERY, (duty_id,))]
+
+    @staticmethod
+    async def create_compliance_log(log_data):
+        """Create new compliance log"""
+        await _execute(COMPLIANCE_INSERT_QUERY, ComplianceModel.insert_params(log_data))
+        return log_data['id']
+
+
+class AsyncLiveLocationModel:
+    """
+    Async model for live location operations.
+
+    Writes go through the same statements as LiveLocationModel and feed the
+    same in-memory snapshot, stream hub and cache messages, so both serving
+    paths stay consistent. Snapshot, delta and batched-queue operations are
+    in-memory and are called on LiveLocationModel directly. The post-write
+    fan-out (cache messages, geofence checks) runs in a worker thread so it
+    never blocks the event loop.
+    """
+
+    @staticmethod
+    async def get_all_live_locations():
+        """Get all live officer locations with latest data"""
+        return [LiveLocationModel.parse_row(loc) for loc in await _fetch_all(LIVE_LOCATIONS_QUERY)]
+
+    @staticmethod
+    async def get_location_by_officer(officer_id):
+        """Get live location for specific officer"""
+        location = await _fetch_one(LIVE_LOCATION_BY_OFFICER_QUERY, (officer_id,))
+        return LiveLocationModel.parse_row(location) if location else None
+
+    @staticmethod
+    async def update_location(officer_id, location_data):
+        """Update officer's live location"""
+        return await AsyncLiveLocationModel.upsert_locations([(officer_id, location_data)])
+
+    @staticmethod
+    async def upsert_locations(pings):
+        """
+        Write many officers' live locations in a single statement.
+        A ping older than the stored live position only goes to history.
+
+        Args:
+            pings (list): List of (officer_id, location_data) tuples
+
+        Returns:
+            bool: True if successful
+        """
+        if pings:
+            await AsyncLiveLocationModel.ingest_points(LiveLocationModel.group_pings(pings))
+        return True
+
+    @staticmethod
+    async def ingest_points(points_by_officer):
+        """
+        Write buffered GPS points for many officers in one transaction.
+        The latest point per officer becomes the live location unless the
+        stored live position is newer.
+
+        Args:
+            points_by_officer (dict): officer_id -> list of location_data
+                                      dicts ordered oldest to newest
+
+        Returns:
+            int: Number of points written
+        """
+        officer_ids = [officer_id for officer_id, points in points_by_officer.items() if points]
+        if not officer_ids:
+            return 0
+        history = [
+            (officer_id, point)
+            for officer_id, points in points_by_officer.items()
+            for point in points
+        ]
+        rows = await _fetch_all(*LiveLocationModel.build_in_query(LIVE_TIMESTAMPS_QUERY, officer_ids))
+        pings = LiveLocationModel.latest_pings(points_by_officer, {row['officer_id']: row['timestamp'] for row in rows})
+        written_at = await AsyncLiveLocationModel._write(pings, history)
+        if pings:
+            await asyncio.to_thread(LiveLocationModel._after_write, pings, written_at)
+        return len(history)
+
+    @staticmethod
+    async def known_officer_ids(officer_ids):
+        """Find which officer IDs exist, in one query"""
+        if not officer_ids:
+            return set()
+        rows = await _fetch_all(*LiveLocationModel.build_in_query(KNOWN_OFFICERS_QUERY, officer_ids))
+        return {row['id'] for row in rows}
+
+    @staticmethod
+    async def _write(pings, history):
+        """Upsert live positions and append trail points in one transaction"""
+        upsert_query, upsert_params, written_at = LiveLocationModel.build_upsert(pings)
+        points_query, points_params, point_count = LocationPointModel.build_insert(history)
+
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                if pings:
+                    await cursor.execute(upsert_query, upsert_params)
+                if point_count:
+                    await cursor.execute(points_query, points_params)
+            await conn.commit()
+        return written_at
@@ -0,0 +1,395 @@
+"""
+Model Cache
+Versioned read-through cache for model reads, shared between worker
+processes through a cache backend
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from utils.logger import logger
+from .cache_backend import CacheBackendError, create_backend
+
+
+class CacheEntry:
+    """A cached value with the ETag of its JSON form"""
+
+    __slots__ = ('value', 'etag', 'version', 'expires_at')
+
+    def __init__(self, value, version, expires_at):
+        self.value = value
+        self.etag = compute_etag(value)
+        self.version = version
+        self.expires_at = expires_at
+
+
+def compute_etag(value):
+    """
+    Content hash of a JSON-serializable value, used as a strong ETag.
+
+    Args:
+        value: Cached data
+
+    Returns:
+        str: Hex digest (without quotes)
+    """
+    payload = json.dumps(value, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _encode_default(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, timedelta):
+        return {'__timedelta__': value.total_seconds()}
+    if isinstance(value, Decimal):
+        return {'__decimal__': str(value)}
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _decode_object(obj):
+    if len(obj) == 1:
+        (tag, value), = obj.items()
+        if tag == '__datetime__':
+            return datetime.fromisoformat(value)
+        if tag == '__date__':
+            return date.fromisoformat(value)
+        if tag == '__timedelta__':
+            return timedelta(seconds=value)
+        if tag == '__decimal__':
+            return Decimal(value)
+    return obj
+
+
+def encode_value(value):
+    """
+    Serialize model data for the shared backend. datetime, date, timedelta
+    and Decimal values (as returned by PyMySQL) survive the round trip.
+
+    Args:
+        value: Model data
+
+    Returns:
+        bytes: Encoded value
+    """
+    return json.dumps(value, default=_encode_default, separators=(',', ':')).encode('utf-8')
+
+
+def decode_value(data):
+    """
+    Args:
+        data (bytes): Output of encode_value
+
+    Returns:
+        Decoded model data
+    """
+    return json.loads(data, object_hook=_decode_object)
+
+
+class ReferenceCache:
+    """
+    Two-level read-through cache grouped into namespaces.
+
+    Reads are served from this process's memory. On a miss the entry is
+    looked up in the shared ``backend`` and only then loaded from MySQL,
+    so each worker does not repeat the same query.
+
+    Each namespace (e.g. 'officers') has a version number. Write methods
+    call ``invalidate`` after committing, which bumps the version locally
+    and in the backend and publishes an invalidation message that makes
+    every other worker drop its copies. Backend keys include the version,
+    so entries stored from a read that raced a write are never served. If
+    messages are lost, entries still expire after ``ttl`` seconds.
+
+    ``notify`` publishes a message without invalidating anything, for data
+    such as live locations that other workers patch in place; handlers are
+    registered with ``add_listener``.
+
+    Cached values are shared between requests and must be treated as
+    read-only.
+    """
+
+    def __init__(self, ttl=300.0, enabled=True, backend=None, channel='gph:cache',
+                 key_prefix='gph:cache:'):
+        """
+        Args:
+            ttl (float): Seconds an entry is served before it is reloaded
+            enabled (bool): When False every call goes to the loader
+            backend: Shared store (MemoryBackend or RedisBackend); None keeps
+                the cache local to this process
+            channel (str): Pub/sub channel for invalidation messages
+            key_prefix (str): Prefix for backend keys
+        """
+        self.ttl = ttl
+        self.enabled = enabled
+        self.backend = backend
+        self.channel = channel
+        self.key_prefix = key_prefix
+        self.origin = uuid.uuid4().hex
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._versions = {}
+        self._stats = {}
+        self._listeners = {}
+        self._subscribed_pid = None
+        self._backend_stats = {
+            'shared_hits': 0, 'errors': 0, 'messages_sent': 0, 'messages_received': 0, 'resyncs': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, namespace, key, loader):
+        """
+        Get a cached value, loading it on a miss.
+
+        Args:
+            namespace (str): Data set the key belongs to
+            key (str): Entry key within the namespace
+            loader (callable): Called with no arguments on a miss
+
+        Returns:
+            CacheEntry: Entry with ``value`` and ``etag``
+        """
+        if not self.enabled:
+            return CacheEntry(loader(), 0, 0.0)
+        self._ensure_subscribed()
+
+        now = time.monotonic()
+        with self._lock:
+            stats = self._namespace_stats(namespace)
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry.expires_at > now:
+                stats['hits'] += 1
+                return entry
+            if entry is not None:
+                stats['expired'] += 1
+            stats['misses'] += 1
+            version = self._versions.get(namespace, 0)
+
+        entry = CacheEntry(self._load(namespace, key, loader), version, now + self.ttl)
+
+        with self._lock:
+            if self._versions.get(namespace, 0) == version:
+                self._entries[(namespace, key)] = entry
+            else:
+                self._namespace_stats(namespace)['discarded'] += 1
+        return entry
+
+    def _load(self, namespace, key, loader):
+        """Read through the shared backend, falling back to the loader"""
+        if self.backend is None:
+            return loader()
+
+        try:
+            shared_version = int(self.backend.get(self._version_key(namespace)) or 0)
+            backend_key = f"{self.key_prefix}{namespace}:{shared_version}:{key}"
+            data = self.backend.get(backend_key)
+        except (CacheBackendError, OSError, ValueError) as e:
+            self._backend_error('read', e)
+            return loader()
+
+        if data is not None:
+            with self._lock:
+                self._backend_stats['shared_hits'] += 1
+            return decode_value(data)
+
+        value = loader()
+        try:
+            self.backend.set(backend_key, encode_value(value), self.ttl)
+        except (CacheBackendError, OSError, TypeError) as e:
+            self._backend_error('write', e)
+        return value
+
+    # ------------------------------------------------------------------
+    # Writes and messages
+    # ------------------------------------------------------------------
+
+    def invalidate(self, *namespaces):
+        """
+        Drop every entry of the given namespaces in all workers after a write.
+
+        Args:
+            *namespaces (str): Data sets that changed
+        """
+        for namespace in namespaces:
+            self._invalidate_local(namespace)
+        if self.backend is None or not self.enabled:
+            return
+
+        self._ensure_subscribed()
+        try:
+            for namespace in namespaces:
+                self.backend.incr(self._version_key(namespace))
+            self._publish({'namespaces': list(namespaces)})
+        except (CacheBackendError, OSError) as e:
+            self._backend_error('invalidate', e)
+
+    def notify(self, namespace, payload):
+        """
+        Send a message to the ``namespace`` listeners of the other workers.
+
+        Args:
+            namespace (str): Listener namespace
+            payload: Message data (encoded like cached values)
+        """
+        if self.backend is None or not self.enabled:
+            return
+
+        self._ensure_subscribed()
+        try:
+            self._publish({'namespace': namespace, 'payload': payload})
+        except (CacheBackendError, OSError, TypeError) as e:
+            self._backend_error('notify', e)
+
+    def add_listener(self, namespace, callback):
+        """
+        Register a handler for messages from other workers.
+
+        The callback receives the ``notify`` payload, or None when the
+        namespace was invalidated by another worker.
+
+        Args:
+            namespace (str): Namespace to listen on
+            callback (callable): Called as callback(payload)
+        """
+        with self._lock:
+            self._listeners.setdefault(namespace, []).append(callback)
+
+    def clear(self):
+        """Drop every entry of every namespace in this process"""
+        with self._lock:
+            namespaces = {namespace for namespace, _ in self._entries} | set(self._versions)
+        for namespace in namespaces:
+            self._invalidate_local(namespace)
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Per-namespace hits, misses, hit_ratio, invalidations,
+                  expired and discarded loads, entries and version, plus
+                  backend counters
+        """
+        with self._lock:
+            namespaces = {}
+            for namespace, counters in self._stats.items():
+                lookups = counters['hits'] + counters['misses']
+                namespaces[namespace] = dict(
+                    counters,
+                    hit_ratio=counters['hits'] / lookups if lookups else 0.0,
+                    entries=sum(1 for cache_key in self._entries if cache_key[0] == namespace),
+                    version=self._versions.get(namespace, 0)
+                )
+            backend = dict(self._backend_stats, name=self.backend.name if self.backend else None)
+        if self.backend is not None:
+            backend.update(self.backend.stats())
+        hits = sum(counters['hits'] for counters in namespaces.values())
+        lookups = hits + sum(counters['misses'] for counters in namespaces.values())
+        return {
+            'enabled': self.enabled,
+            'ttl': self.ttl,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+            'namespaces': namespaces,
+            'backend': backend
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _invalidate_local(self, namespace):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            for cache_key in [cache_key for cache_key in self._entries if cache_key[0] == namespace]:
+                del self._entries[cache_key]
+            self._namespace_stats(namespace)['invalidations'] += 1
+
+    def _publish(self, message):
+        message['origin'] = self.origin
+        self.backend.publish(self.channel, encode_value(message))
+        with self._lock:
+            self._backend_stats['messages_sent'] += 1
+
+    def _on_message(self, data):
+        message = decode_value(data)
+        if message.get('origin') == self.origin:
+            return
+        with self._lock:
+            self._backend_stats['messages_received'] += 1
+
+        if 'namespaces' in message:
+            for namespace in message['namespaces']:
+                self._invalidate_local(namespace)
+                self._call_listeners(namespace, None)
+        else:
+            self._call_listeners(message['namespace'], message.get('payload'))
+
+    def _on_reconnect(self):
+        """Messages may have been missed while disconnected; start over"""
+        with self._lock:
+            self._backend_stats['resyncs'] += 1
+        self.clear()
+        with self._lock:
+            namespaces = list(self._listeners)
+        for namespace in namespaces:
+            self._call_listeners(namespace, None)
+
+    def _call_listeners(self, namespace, payload):
+        with self._lock:
+            listeners = list(self._listeners.get(namespace, ()))
+        for callback in listeners:
+            try:
+                callback(payload)
+            except Exception as e:
+                logger.error(f"Cache listener for {namespace} failed: {str(e)}")
+
+    def _ensure_subscribed(self):
+        # Subscriptions do not survive fork(); each worker starts its own
+        pid = os.getpid()
+        if self.backend is None or self._subscribed_pid == pid:
+            return
+        with self._lock:
+            if self._subscribed_pid == pid:
+                return
+            self._subscribed_pid = pid
+        try:
+            self.backend.subscribe(self.channel, self._on_message, on_reconnect=self._on_reconnect)
+        except (CacheBackendError, OSError) as e:
+            self._backend_error('subscribe', e)
+
+    def _version_key(self, namespace):
+        return f"{self.key_prefix}{namespace}:version"
+
+    def _backend_error(self, action, error):
+        logger.error(f"Cache backend {action} failed: {str(error)}")
+        with self._lock:
+            self._backend_stats['errors'] += 1
+
+    def _namespace_stats(self, namespace):
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = {
+                'hits': 0, 'misses': 0, 'invalidations': 0, 'expired': 0, 'discarded': 0
+            }
+        return stats
+
+
+reference_cache = ReferenceCache(
+    ttl=float(os.getenv('REFERENCE_CACHE_TTL', '300')),
+    enabled=os.getenv('REFERENCE_CACHE_ENABLED', 'true').lower() == 'true',
+    backend=create_backend(),
+    channel=os.getenv('CACHE_CHANNEL', 'gph:cache')
+)
@@ -0,0 +1,341 @@
+"""
+Cache Backends
+Shared key/value and pub/sub stores behind the model cache: an in-process
+backend and a Redis backend
+"""
+
+import os
+import queue
+import threading
+import time
+from utils.logger import logger
+
+try:
+    import redis
+    from redis.backoff import NoBackoff
+    from redis.retry import Retry
+except ImportError:
+    redis = None
+
+
+class CacheBackendError(Exception):
+    """Raised when the shared cache store cannot be reached or rejects a command"""
+
+
+class MemoryBackend:
+    """
+    Backend that lives inside one process.
+
+    Values expire after their TTL and published messages are delivered
+    synchronously to the subscribers of this instance. Caches sharing one
+    instance behave like workers sharing a Redis server.
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._subscribers = {}
+
+    def get(self, key):
+        """
+        Args:
+            key (str): Key to read
+
+        Returns:
+            bytes: Stored value, or None if missing or expired
+        """
+        with self._lock:
+            item = self._values.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Args:
+            key (str): Key to write
+            value (bytes): Value to store
+            ttl (float, optional): Seconds before the value expires
+        """
+        with self._lock:
+            self._values[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    def incr(self, key):
+        """
+        Args:
+            key (str): Counter key
+
+        Returns:
+            int: Counter value after the increment
+        """
+        with self._lock:
+            value = int(self._values.get(key, (b'0', None))[0]) + 1
+            self._values[key] = (str(value).encode(), None)
+            return value
+
+    def publish(self, channel, message):
+        """
+        Args:
+            channel (str): Channel name
+            message (bytes): Message body
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for callback in subscribers:
+            callback(message)
+
+    def subscribe(self, channel, callback, on_reconnect=None):
+        """
+        Deliver messages published on ``channel`` to ``callback``.
+
+        Args:
+            channel (str): Channel name
+            callback (callable): Called with each message body
+            on_reconnect (callable, optional): Called when a lost
+                subscription is re-established (never, for this backend)
+        """
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Backend counters (none for this backend)
+        """
+        return {}
+
+    def close(self):
+        """Drop all subscriptions"""
+        with self._lock:
+            self._subscribers.clear()
+
+
+class RedisBackend:
+    """
+    Backend for servers that speak the Redis protocol (Redis, Valkey,
+    KeyDB, ...), using redis-py.
+
+    Commands use redis-py's thread-safe connection pool. After a connection
+    failure the backend is marked down for ``retry_after`` seconds and every
+    command fails at once with CacheBackendError instead of waiting on
+    another connect timeout. Publishes are queued (up to ``publish_queue``
+    messages, dropped beyond that) and sent by a background thread, so the
+    calling request never waits on the server. Each subscription runs on
+    its own connection and daemon thread and reconnects until the backend
+    is closed.
+    """
+
+    name = 'redis'
+
+    def __init__(self, url='redis://localhost:6379/0', timeout=2.0, retry_after=5.0,
+                 publish_queue=1000):
+        """
+        Args:
+            url (str): redis://[:password@]host[:port][/db]
+            timeout (float): Connect and command timeout, in seconds
+            retry_after (float): Seconds commands are skipped after a failure
+            publish_queue (int): Maximum messages waiting to be published
+        """
+        if redis is None:
+            raise CacheBackendError("CACHE_BACKEND=redis requires the redis package")
+
+        self.url = url
+        self.timeout = timeout
+        self.retry_after = retry_after
+        # One retry covers pooled connections the server closed while idle
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=timeout, socket_connect_timeout=timeout,
+            health_check_interval=30, retry=Retry(NoBackoff(), 1),
+            retry_on_error=[redis.ConnectionError]
+        )
+
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self._closed = threading.Event()
+        self._publish_queue = queue.Queue(maxsize=publish_queue)
+        self._publisher = None
+        self._publisher_pid = None
+        self._subscribers = []
+        self._stats = {'failures': 0, 'skipped': 0, 'published': 0, 'publish_dropped': 0}
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+
+    def get(self, key):
+        return self._call(self._client.get, key)
+
+    def set(self, key, value, ttl=None):
+        self._call(self._client.set, key, value, px=int(ttl * 1000) if ttl else None)
+
+    def incr(self, key):
+        return self._call(self._client.incr, key)
+
+    def publish(self, channel, message):
+        """Queue a message for the background publisher; never blocks"""
+        self._ensure_publisher()
+        try:
+            self._publish_queue.put_nowait((channel, message))
+        except queue.Full:
+            self._count('publish_dropped')
+
+    def available(self):
+        """
+        Returns:
+            bool: False while commands are being skipped after a failure
+        """
+        with self._lock:
+            return time.monotonic() >= self._down_until
+
+    def stats(self):
+        """
+        Returns:
+            dict: Failure, skip and publish counters, queue depth and availability
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['publish_queue'] = self._publish_queue.qsize()
+        stats['available'] = self.available()
+        return stats
+
+    def _call(self, command, *args, **kwargs):
+        """
+        Run one command unless the server was recently unreachable.
+
+        Raises:
+            CacheBackendError: If the server is down, unreachable or returns an error
+        """
+        with self._lock:
+            if time.monotonic() < self._down_until:
+                self._stats['skipped'] += 1
+                raise CacheBackendError(f"{self.url} unavailable, retrying later")
+        try:
+            return command(*args, **kwargs)
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            with self._lock:
+                self._down_until = time.monotonic() + self.retry_after
+                self._stats['failures'] += 1
+            raise CacheBackendError(f"{self.url}: {str(e)}")
+        except redis.RedisError as e:
+            raise CacheBackendError(str(e))
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    # ------------------------------------------------------------------
+    # Background publisher
+    # ------------------------------------------------------------------
+
+    def _ensure_publisher(self):
+        # Threads do not survive fork(); each worker starts its own
+        pid = os.getpid()
+        if self._publisher_pid == pid:
+            return
+        with self._lock:
+            if self._publisher_pid == pid:
+                return
+            self._publisher_pid = pid
+            self._publisher = threading.Thread(target=self._publish_loop, name='cache-publisher', daemon=True)
+            self._publisher.start()
+
+    def _publish_loop(self):
+        while not self._closed.is_set():
+            try:
+                channel, message = self._publish_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if not self.available():
+                # Other workers resynchronise when their subscription reconnects
+                self._count('publish_dropped')
+                continue
+            try:
+                self._call(self._client.publish, channel, message)
+                self._count('published')
+            except CacheBackendError as e:
+                self._count('publish_dropped')
+                logger.error(f"Cache publish to {channel} failed: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Pub/sub
+    # ------------------------------------------------------------------
+
+    def subscribe(self, channel, callback, on_reconnect=None):
+        """
+        Start a daemon thread delivering messages on ``channel`` to ``callback``.
+
+        Messages published while the connection is down are lost, so
+        ``on_reconnect`` is called after every resubscribe to let the caller
+        resynchronise.
+        """
+        thread = threading.Thread(
+            target=self._listen, args=(channel, callback, on_reconnect),
+            name=f'cache-subscriber-{channel}', daemon=True
+        )
+        self._subscribers.append(thread)
+        thread.start()
+
+    def close(self):
+        """Stop the publisher and subscriber threads and close connections"""
+        self._closed.set()
+        for thread in [self._publisher] + self._subscribers:
+            if thread is not None and thread.is_alive():
+                thread.join(1.0)
+        self._client.close()
+
+    def _listen(self, channel, callback, on_reconnect):
+        connected_before = False
+        while not self._closed.is_set():
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(channel)
+                if connected_before and on_reconnect:
+                    on_reconnect()
+                connected_before = True
+
+                while not self._closed.is_set():
+                    # Short waits so close() is noticed; health checks detect dead peers
+                    message = pubsub.get_message(timeout=0.5)
+                    if message is None or message['type'] != 'message':
+                        continue
+                    try:
+                        callback(message['data'])
+                    except Exception as e:
+                        logger.error(f"Cache message handler failed: {str(e)}")
+            except (redis.RedisError, OSError) as e:
+                if not self._closed.is_set():
+                    logger.error(f"Cache subscription to {channel} lost: {str(e)}")
+                    self._closed.wait(self.retry_after)
+            finally:
+                pubsub.close()
+
+
+def create_backend(kind=None, url=None):
+    """
+    Build the configured cache backend.
+
+    Args:
+        kind (str, optional): 'memory' or 'redis' (default: CACHE_BACKEND)
+        url (str, optional): Server URL for 'redis' (default: CACHE_REDIS_URL)
+
+    Returns:
+        MemoryBackend or RedisBackend
+    """
+    kind = (kind or os.getenv('CACHE_BACKEND', 'memory')).lower()
+    if kind == 'redis':
+        if redis is None:
+            logger.error("CACHE_BACKEND=redis requires the redis package, using memory")
+            return MemoryBackend()
+        return RedisBackend(
+            url or os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'),
+            retry_after=float(os.getenv('CACHE_REDIS_RETRY_SECONDS', '5'))
+        )
+    if kind != 'memory':
+        logger.error(f"Unknown CACHE_BACKEND '{kind}', using memory")
+    return MemoryBackend()
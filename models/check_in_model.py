@@ -4,7 +4,55 @@ Handles duty check-in/check-out data access
 """
 
 import json
-from .db import get_connection
+from .db import get_connection, stream_rows
+
+
+# Statements shared with the async model (models/async_models.py)
+CHECK_INS_QUERY = """
+    SELECT
+        ci.*,
+        o.staff_name as officer_name
+    FROM check_ins ci
+    LEFT JOIN officers o ON ci.officer_id = o.id
+    ORDER BY ci.timestamp DESC
+    LIMIT %s
+"""
+
+CHECK_INS_BY_DUTY_QUERY = """
+    SELECT
+        ci.*,
+        o.staff_name as officer_name
+    FROM check_ins ci
+    LEFT JOIN officers o ON ci.officer_id = o.id
+    WHERE ci.duty_id = %s
+    ORDER BY ci.timestamp ASC
+"""
+
+# Audit export; filters are appended by export_check_ins
+CHECK_INS_EXPORT_QUERY = """
+    SELECT
+        ci.id, ci.timestamp, ci.check_in_type, ci.duty_id, ci.officer_id,
+        ci.officer_uid, o.staff_name as officer_name, ci.location,
+        ci.verified, ci.verification_method, ci.compliance_score,
+        ci.selfie_image_url, ci.device_info, ci.created_at
+    FROM check_ins ci
+    LEFT JOIN officers o ON ci.officer_id = o.id
+    WHERE 1 = 1
+"""
+
+CHECK_INS_EXPORT_COLUMNS = [
+    'id', 'timestamp', 'check_in_type', 'duty_id', 'officer_id', 'officer_uid',
+    'officer_name', 'location', 'verified', 'verification_method',
+    'compliance_score', 'selfie_image_url', 'device_info', 'created_at'
+]
+
+CHECK_IN_INSERT_QUERY = """
+    INSERT INTO check_ins
+    (id, officer_id, officer_uid, duty_id, check_in_type, location,
+     selfie_image_url, device_info, verified, verification_method,
+     compliance_score, timestamp)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
 
 
 class CheckInModel:
@@ -15,81 +63,83 @@ class CheckInModel:
         """Get all check-ins"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                query = """
-                    SELECT 
-                        ci.*,
-                        o.staff_name as officer_name
-                    FROM check_ins ci
-                    LEFT JOIN officers o ON ci.officer_id = o.id
-                    ORDER BY ci.timestamp DESC
-                    LIMIT %s
-                """
-                cursor.execute(query, (limit,))
-                check_ins = cursor.fetchall()
-                
-                # Parse JSON fields
-                for ci in check_ins:
-                    if ci.get('location'):
-                        ci['location'] = json.loads(ci['location'])
-                    if ci.get('device_info'):
-                        ci['device_info'] = json.loads(ci['device_info'])
-                
-                return check_ins
+                cursor.execute(CHECK_INS_QUERY, (limit,))
+                return [CheckInModel.parse_row(ci) for ci in cursor.fetchall()]
     
     @staticmethod
     def get_check_ins_by_duty(duty_id):
         """Get check-ins for specific duty"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                query = """
-                    SELECT 
-                        ci.*,
-                        o.staff_name as officer_name
-                    FROM check_ins ci
-                    LEFT JOIN officers o ON ci.officer_id = o.id
-                    WHERE ci.duty_id = %s
-                    ORDER BY ci.timestamp ASC
-                """
-                cursor.execute(query, (duty_id,))
-                check_ins = cursor.fetchall()
-                
-                for ci in check_ins:
-                    if ci.get('location'):
-                        ci['location'] = json.loads(ci['location'])
-                    if ci.get('device_info'):
-                        ci['device_info'] = json.loads(ci['device_info'])
-                
-                return check_ins
+                cursor.execute(CHECK_INS_BY_DUTY_QUERY, (duty_id,))
+                return [CheckInModel.parse_row(ci) for ci in cursor.fetchall()]
+    
+    @staticmethod
+    def export_check_ins(start_time=None, end_time=None, officer_id=None, duty_id=None):
+        """
+        Stream check-ins for an audit export, oldest first, through a
+        server-side cursor.
+        
+        Args:
+            start_time (datetime, optional): Earliest timestamp (inclusive)
+            end_time (datetime, optional): Latest timestamp (exclusive)
+            officer_id (str, optional): Only this officer's check-ins
+            duty_id (str, optional): Only this duty's check-ins
+            
+        Yields:
+            dict: Parsed rows with CHECK_INS_EXPORT_COLUMNS
+        """
+        query = CHECK_INS_EXPORT_QUERY
+        params = []
+        if start_time:
+            query += " AND ci.timestamp >= %s"
+            params.append(start_time)
+        if end_time:
+            query += " AND ci.timestamp < %s"
+            params.append(end_time)
+        if officer_id:
+            query += " AND ci.officer_id = %s"
+            params.append(officer_id)
+        if duty_id:
+            query += " AND ci.duty_id = %s"
+            params.append(duty_id)
+            
+        query += " ORDER BY ci.timestamp ASC, ci.id ASC"
+        for ci in stream_rows(query, params):
+            yield CheckInModel.parse_row(ci)
     
     @staticmethod
     def create_check_in(check_in_data):
         """Create new check-in"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                query = """
-                    INSERT INTO check_ins 
-                    (id, officer_id, officer_uid, duty_id, check_in_type, location, 
-                     selfie_image_url, device_info, verified, verification_method, 
-                     compliance_score, timestamp)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                
-                location = json.dumps(check_in_data.get('location', {}))
-                device_info = json.dumps(check_in_data.get('deviceInfo', {}))
-                
-                cursor.execute(query, (
-                    check_in_data['id'],
-                    check_in_data.get('officerId') or check_in_data.get('officerUid'),
-                    check_in_data.get('officerUid'),
-                    check_in_data['dutyId'],
-                    check_in_data['checkInType'],
-                    location,
-                    check_in_data.get('selfieImageUrl'),
-                    device_info,
-                    check_in_data.get('verified', False),
-                    check_in_data.get('verificationMethod', 'geolocation'),
-                    check_in_data.get('complianceScore', 0),
-                    check_in_data['timestamp']
-                ))
+                cursor.execute(CHECK_IN_INSERT_QUERY, CheckInModel.insert_params(check_in_data))
                 conn.commit()
                 return check_in_data['id']
+    
+    @staticmethod
+    def parse_row(ci):
+        """Parse JSON fields of a check-in row"""
+        if ci.get('location'):
+            ci['location'] = json.loads(ci['location'])
+        if ci.get('device_info'):
+            ci['device_info'] = json.loads(ci['device_info'])
+        return ci
+    
+    @staticmethod
+    def insert_params(check_in_data):
+        """Parameters for CHECK_IN_INSERT_QUERY"""
+        return (
+            check_in_data['id'],
+            check_in_data.get('officerId') or check_in_data.get('officerUid'),
+            check_in_data.get('officerUid'),
+            check_in_data['dutyId'],
+            check_in_data['checkInType'],
+            json.dumps(check_in_data.get('location', {})),
+            check_in_data.get('selfieImageUrl'),
+            json.dumps(check_in_data.get('deviceInfo', {})),
+            check_in_data.get('verified', False),
+            check_in_data.get('verificationMethod', 'geolocation'),
+            check_in_data.get('complianceScore', 0),
+            check_in_data['timestamp']
+        )
@@ -4,7 +4,63 @@ Handles compliance log data access
 """
 
 import json
-from .db import get_connection
+from .db import get_connection, stream_rows
+
+
+# Statements shared with the async model (models/async_models.py)
+COMPLIANCE_LOGS_QUERY = """
+    SELECT
+        c.*,
+        o.staff_name as officer_name
+    FROM compliance c
+    LEFT JOIN officers o ON c.officer_id = o.id
+    ORDER BY c.timestamp DESC
+    LIMIT %s
+"""
+
+COMPLIANCE_BY_DUTY_QUERY = """
+    SELECT
+        c.*,
+        o.staff_name as officer_name
+    FROM compliance c
+    LEFT JOIN officers o ON c.officer_id = o.id
+    WHERE c.duty_id = %s
+    ORDER BY c.timestamp DESC
+"""
+
+# Audit export; filters are appended by export_compliance_logs
+COMPLIANCE_EXPORT_QUERY = """
+    SELECT
+        c.id, c.timestamp, c.action, c.duty_id, c.officer_id, c.officer_uid,
+        COALESCE(c.officer_name, o.staff_name) AS officer_name,
+        c.location, c.details, c.photo_url, c.created_at
+    FROM compliance c
+    LEFT JOIN officers o ON c.officer_id = o.id
+    WHERE 1 = 1
+"""
+
+COMPLIANCE_EXPORT_COLUMNS = [
+    'id', 'timestamp', 'action', 'duty_id', 'officer_id', 'officer_uid',
+    'officer_name', 'location', 'details', 'photo_url', 'created_at'
+]
+
+COMPLIANCE_INSERT_QUERY = """
+    INSERT INTO compliance
+    (id, duty_id, officer_id, officer_uid, officer_name, action,
+     location, timestamp, details, photo_url)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Server-generated logs (geofence violations) carry deterministic ids, so a
+# log reported by several workers is stored once
+COMPLIANCE_INSERT_IGNORE_QUERY = """
+    INSERT IGNORE INTO compliance
+    (id, duty_id, officer_id, officer_uid, officer_name, action,
+     location, timestamp, details, photo_url)
+    VALUES {rows}
+"""
+
+COMPLIANCE_INSERT_ROW = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
 
 
 class ComplianceModel:
@@ -15,73 +71,104 @@ class ComplianceModel:
         """Get all compliance logs"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                query = """
-                    SELECT 
-                        c.*,
-                        o.staff_name as officer_name
-                    FROM compliance c
-                    LEFT JOIN officers o ON c.officer_id = o.id
-                    ORDER BY c.timestamp DESC
-                    LIMIT %s
-                """
-                cursor.execute(query, (limit,))
-                logs = cursor.fetchall()
-                
-                # Parse JSON location field
-                for log in logs:
-                    if log.get('location'):
-                        log['location'] = json.loads(log['location'])
-                
-                return logs
+                cursor.execute(COMPLIANCE_LOGS_QUERY, (limit,))
+                return [ComplianceModel.parse_row(log) for log in cursor.fetchall()]
     
     @staticmethod
     def get_compliance_by_duty(duty_id):
         """Get compliance logs for a specific duty"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                query = """
-                    SELECT 
-                        c.*,
-                        o.staff_name as officer_name
-                    FROM compliance c
-                    LEFT JOIN officers o ON c.officer_id = o.id
-                    WHERE c.duty_id = %s
-                    ORDER BY c.timestamp DESC
-                """
-                cursor.execute(query, (duty_id,))
-                logs = cursor.fetchall()
-                
-                for log in logs:
-                    if log.get('location'):
-                        log['location'] = json.loads(log['location'])
-                
-                return logs
+                cursor.execute(COMPLIANCE_BY_DUTY_QUERY, (duty_id,))
+                return [ComplianceModel.parse_row(log) for log in cursor.fetchall()]
+    
+    @staticmethod
+    def export_compliance_logs(start_time=None, end_time=None, officer_id=None, duty_id=None):
+        """
+        Stream compliance logs for an audit export, oldest first, through a
+        server-side cursor.
+        
+        Args:
+            start_time (datetime, optional): Earliest timestamp (inclusive)
+            end_time (datetime, optional): Latest timestamp (exclusive)
+            officer_id (str, optional): Only this officer's logs
+            duty_id (str, optional): Only this duty's logs
+            
+        Yields:
+            dict: Parsed rows with COMPLIANCE_EXPORT_COLUMNS
+        """
+        query = COMPLIANCE_EXPORT_QUERY
+        params = []
+        if start_time:
+            query += " AND c.timestamp >= %s"
+            params.append(start_time)
+        if end_time:
+            query += " AND c.timestamp < %s"
+            params.append(end_time)
+        if officer_id:
+            query += " AND c.officer_id = %s"
+            params.append(officer_id)
+        if duty_id:
+            query += " AND c.duty_id = %s"
+            params.append(duty_id)
+            
+        # (timestamp, id) is idx_timestamp's order, so a date-range export needs no filesort
+        query += " ORDER BY c.timestamp ASC, c.id ASC"
+        for log in stream_rows(query, params):
+            yield ComplianceModel.parse_row(log)
     
     @staticmethod
     def create_compliance_log(log_data):
         """Create new compliance log"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                query = """
-                    INSERT INTO compliance 
-                    (id, duty_id, officer_id, officer_uid, officer_name, action, 
-                     location, timestamp, details, photo_url)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                
-                location = json.dumps(log_data.get('location', {}))
-                
-                cursor.execute(query, (
-                    log_data['id'],
-                    log_data.get('dutyId'),
-                    log_data.get('officerId') or log_data.get('officerUid'),
-                    log_data.get('officerUid'),
-                    log_data.get('officerName'),
-                    log_data['action'],
-                    location,
-                    log_data['timestamp'],
-                    log_data.get('details'),
-                    log_data.get('photoUrl')
-                ))
+                cursor.execute(COMPLIANCE_INSERT_QUERY, ComplianceModel.insert_params(log_data))
                 conn.commit()
                 return log_data['id']
+    
+    @staticmethod
+    def create_compliance_logs(logs):
+        """
+        Insert many compliance logs in one statement, skipping ids that
+        already exist.
+        
+        Args:
+            logs (list): Log dicts in create_compliance_log format
+            
+        Returns:
+            int: Number of rows inserted
+        """
+        if not logs:
+            return 0
+        params = []
+        for log_data in logs:
+            params.extend(ComplianceModel.insert_params(log_data))
+        query = COMPLIANCE_INSERT_IGNORE_QUERY.format(rows=', '.join([COMPLIANCE_INSERT_ROW] * len(logs)))
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                conn.commit()
+                return cursor.rowcount
+    
+    @staticmethod
+    def parse_row(log):
+        """Parse the JSON location field of a compliance row"""
+        if log.get('location'):
+            log['location'] = json.loads(log['location'])
+        return log
+    
+    @staticmethod
+    def insert_params(log_data):
+        """Parameters for COMPLIANCE_INSERT_QUERY"""
+        return (
+            log_data['id'],
+            log_data.get('dutyId'),
+            log_data.get('officerId') or log_data.get('officerUid'),
+            log_data.get('officerUid'),
+            log_data.get('officerName'),
+            log_data['action'],
+            json.dumps(log_data.get('location', {})),
+            log_data['timestamp'],
+            log_data.get('details'),
+            log_data.get('photoUrl')
+        )
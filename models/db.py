@@ -1,13 +1,97 @@
 """
 Database connection module
-Handles MySQL connection with SSL for Aiven
+Handles pooled MySQL connections with SSL for Aiven
 """
 
+import os
+import threading
+import time
 from contextlib import contextmanager
 import pymysql
-from pymysql.cursors import DictCursor
+from pymysql.constants import SERVER_STATUS
+from pymysql.cursors import DictCursor, SSDictCursor
 from config import DB_CONFIG
 from utils.logger import logger
+from utils.metrics import METRICS_ENABLED, request_metrics, current_trace
+from utils.query_profiler import QUERY_PROFILING, query_profiler
+from .pool import ConnectionPool
+
+
+# ============================================================================
+# POOL CONFIGURATION
+# ============================================================================
+
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '2'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+DB_POOL_IDLE_TIMEOUT = float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))
+DB_POOL_PING_INTERVAL = float(os.getenv('DB_POOL_PING_INTERVAL', '30'))
+DB_POOL_WAIT_TIMEOUT = float(os.getenv('DB_POOL_WAIT_TIMEOUT', '10'))
+
+# Rows read from the server per round trip by stream_rows
+STREAM_FETCH_SIZE = int(os.getenv('DB_STREAM_FETCH_SIZE', '1000'))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class MeteredCursor(DictCursor):
+    """
+    DictCursor that reports statement time and fetched rows to utils.metrics,
+    and every statement to the query profiler when QUERY_PROFILING is on
+    """
+
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            duration = time.perf_counter() - started
+            rows = len(self._rows or ())
+            request_metrics.record_query(duration, rows)
+            if QUERY_PROFILING:
+                query_profiler.record(self, query, args, duration, rows)
+
+
+def _connect():
+    """Open a new SSL connection configured for Aiven MySQL"""
+    ssl_config = DB_CONFIG.copy()
+    ssl_config['ssl'] = {'ssl_mode': 'REQUIRED'}
+    ssl_config['cursorclass'] = MeteredCursor if METRICS_ENABLED or QUERY_PROFILING else DictCursor
+    return pymysql.connect(**ssl_config)
+
+
+def _reset_connection(connection):
+    """Roll back any transaction left open so the next borrower starts clean"""
+    if connection.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+        connection.rollback()
+
+
+def get_pool():
+    """
+    Get the process-wide connection pool, creating it on first use.
+    A pool inherited across fork() is abandoned rather than shared.
+
+    Returns:
+        ConnectionPool: Pool for the current process
+    """
+    global _pool
+    pid = os.getpid()
+
+    if _pool is None or _pool.pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool.pid != pid:
+                _pool = ConnectionPool(
+                    _connect,
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    idle_timeout=DB_POOL_IDLE_TIMEOUT,
+                    max_lifetime=DB_POOL_MAX_LIFETIME,
+                    ping_interval=DB_POOL_PING_INTERVAL,
+                    wait_timeout=DB_POOL_WAIT_TIMEOUT,
+                    reset=_reset_connection
+                )
+    return _pool
 
 
 @contextmanager
@@ -15,22 +99,82 @@ def get_connection():
     """
     Context manager for database connections with SSL support.
     Configured for Aiven MySQL with required SSL mode.
+
+    Connections are borrowed from the process pool and returned on exit;
+    any uncommitted transaction is rolled back before reuse.
     """
-    connection = None
+    pool = get_pool()
+    slot = None
+    broken = False
     try:
-        # Add SSL configuration for Aiven
-        ssl_config = DB_CONFIG.copy()
-        ssl_config['ssl'] = {'ssl_mode': 'REQUIRED'}
-        ssl_config['cursorclass'] = DictCursor
-        
-        connection = pymysql.connect(**ssl_config)
-        yield connection
+        slot = pool.acquire()
+        trace = current_trace()
+        if trace is not None:
+            # Many checkouts per request is the usual sign of an N+1 loop
+            trace.connections += 1
+        yield slot.connection
     except Exception as e:
         logger.error(f"Database connection error: {str(e)}")
+        broken = isinstance(e, (pymysql.err.OperationalError, pymysql.err.InterfaceError))
         raise
     finally:
-        if connection:
-            connection.close()
+        if slot:
+            pool.release(slot, discard=broken)
+
+
+def stream_rows(query, params=None, fetch_size=STREAM_FETCH_SIZE):
+    """
+    Run a SELECT through an unbuffered (server-side) cursor and yield its
+    rows as they arrive, so memory does not grow with the result size.
+
+    The pooled connection is held until the generator is exhausted or
+    closed. If it is closed early (e.g. the client disconnected) or fails,
+    the connection is closed and dropped from the pool rather than reading
+    the unread rows from the server. Other queries cannot run on that
+    connection meanwhile, so use a separate get_connection() for lookups
+    made while streaming.
+
+    Args:
+        query (str): SELECT statement
+        params (list, optional): Query parameters
+        fetch_size (int): Rows fetched per round trip
+
+    Yields:
+        dict: Result rows
+    """
+    pool = get_pool()
+    slot = pool.acquire()
+    trace = current_trace()
+    if trace is not None:
+        trace.connections += 1
+
+    exhausted = False
+    try:
+        cursor = slot.connection.cursor(SSDictCursor)
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                exhausted = True
+                break
+            yield from rows
+        cursor.close()
+    except Exception as e:
+        logger.error(f"Database streaming error: {str(e)}")
+        raise
+    finally:
+        # Closing an unbuffered cursor with rows left reads all of them first
+        pool.release(slot, discard=not exhausted)
+
+
+def get_pool_stats():
+    """
+    Get connection pool usage statistics.
+
+    Returns:
+        dict: Checked-out/idle counts, wait times and create/eviction counters
+    """
+    return get_pool().stats()
 
 
 def check_health():
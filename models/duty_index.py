@@ -0,0 +1,295 @@
+"""
+Duty Interval Index
+In-memory per-officer schedule of open duties for conflict checks
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from utils.logger import logger
+
+
+# Duties in these states never conflict with new assignments
+CLOSED_STATUSES = ('complete', 'completed', 'cancelled')
+
+
+def to_datetime(value):
+    """
+    Convert a duty time to a naive datetime as stored in MySQL.
+
+    Args:
+        value: datetime, 'YYYY-MM-DD HH:MM:SS' or ISO 8601 string
+
+    Returns:
+        datetime: Parsed time, or None if the value is not usable
+    """
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        # Same wall-clock handling as convert_iso_to_mysql: the offset is dropped
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+class DutyIntervalIndex:
+    """
+    Sorted (start, end, duty_id) intervals per officer for open duties.
+
+    An overlap lookup bisects an officer's intervals to those starting
+    before the window ends and no earlier than the window start minus the
+    longest duty, so it never scans the officer's whole history.
+
+    The index is loaded with ``loader`` and patched by the duty write
+    methods of this process. It is reloaded when another worker reports a
+    duty write (``invalidate``) or when older than ``max_age`` seconds.
+    """
+
+    def __init__(self, loader, max_age=60.0):
+        """
+        Args:
+            loader (callable): Returns one row per (open duty, officer) with
+                id, type, status, start_time, end_time, officer_id, staff_id
+                and staff_name
+            max_age (float): Seconds before the index is reloaded
+        """
+        self.loader = loader
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._by_officer = {}
+        self._duties = {}
+        self._officers = {}
+        self._staff_ids = {}
+        self._max_span = timedelta(0)
+        self._loaded_mono = None
+        self._stale = False
+        self._stats = {'lookups': 0, 'reloads': 0, 'reload_errors': 0, 'updates': 0}
+
+    # ------------------------------------------------------------------
+    # Write side
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """
+        Rebuild the index from the database.
+
+        Returns:
+            bool: True if the index was loaded
+        """
+        try:
+            rows = self.loader()
+        except Exception as e:
+            logger.error(f"Duty interval index load failed: {str(e)}")
+            with self._lock:
+                self._stats['reload_errors'] += 1
+            return False
+
+        by_officer, duties, officers, staff_ids = {}, {}, {}, {}
+        max_span = timedelta(0)
+        for row in self._group(rows):
+            max_span = max(max_span, self._add(row, by_officer, duties, officers, staff_ids))
+        for intervals in by_officer.values():
+            intervals.sort()
+
+        with self._lock:
+            self._by_officer = by_officer
+            self._duties = duties
+            self._officers = officers
+            self._staff_ids = staff_ids
+            self._max_span = max_span
+            self._loaded_mono = time.monotonic()
+            self._stale = False
+            self._stats['reloads'] += 1
+        return True
+
+    def put(self, duty_id, rows):
+        """
+        Replace one duty's intervals after it was created or updated.
+
+        Args:
+            duty_id (str): Duty ID
+            rows (list): The duty's rows in loader format (empty if the duty
+                is closed or has no officers)
+        """
+        with self._lock:
+            self._remove_locked(duty_id)
+            for row in self._group(rows):
+                span = self._add(row, self._by_officer, self._duties, self._officers,
+                                 self._staff_ids, keep_sorted=True)
+                self._max_span = max(self._max_span, span)
+            self._stats['updates'] += 1
+
+    def remove(self, duty_id):
+        """
+        Drop a deleted duty.
+
+        Args:
+            duty_id (str): Duty ID
+        """
+        with self._lock:
+            self._remove_locked(duty_id)
+            self._stats['updates'] += 1
+
+    def invalidate(self):
+        """Reload on the next lookup, e.g. after another worker wrote duties"""
+        with self._lock:
+            self._stale = True
+
+    # ------------------------------------------------------------------
+    # Read side
+    # ------------------------------------------------------------------
+
+    def find_conflicts(self, officer_refs, start_time, end_time, exclude_duty_id=None):
+        """
+        Find open duties overlapping [start_time, end_time) for many officers.
+
+        Args:
+            officer_refs (list): Officer UUIDs and/or staff_ids
+            start_time: Window start (datetime or string)
+            end_time: Window end (datetime or string)
+            exclude_duty_id (str, optional): Duty ID to ignore (for updates)
+
+        Returns:
+            list: Conflict details in the same shape as
+                  DutyModel.find_conflicts, or None if the index is
+                  unavailable and the caller should query the database
+        """
+        start, end = to_datetime(start_time), to_datetime(end_time)
+        if start is None or end is None:
+            return None
+        if not self._ensure_loaded():
+            return None
+
+        conflicts = []
+        seen = set()
+        with self._lock:
+            self._stats['lookups'] += 1
+            for ref in officer_refs:
+                if not ref:
+                    continue
+                officer_id = self._staff_ids.get(ref) if len(str(ref)) < 20 else ref
+                if officer_id is None or officer_id in seen:
+                    continue
+                seen.add(officer_id)
+
+                intervals = self._by_officer.get(officer_id, ())
+                lo = bisect_left(intervals, (start - self._max_span,))
+                hi = bisect_left(intervals, (end,))
+                staff_id, staff_name = self._officers.get(officer_id, (None, None))
+                for duty_start, duty_end, duty_id in intervals[lo:hi]:
+                    if duty_end <= start or duty_id == exclude_duty_id:
+                        continue
+                    duty = self._duties[duty_id]
+                    conflicts.append({
+                        'officer_id': staff_id,
+                        'officer_name': staff_name,
+                        'duty_id': duty_id,
+                        'duty_type': duty['type'],
+                        'duty_start': duty_start.strftime('%Y-%m-%d %H:%M:%S'),
+                        'duty_end': duty_end.strftime('%Y-%m-%d %H:%M:%S'),
+                        'status': duty['status']
+                    })
+        return conflicts
+
+    def stats(self):
+        """
+        Get index counters.
+
+        Returns:
+            dict: Duty, officer and interval counts plus lookup/reload counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['duties'] = len(self._duties)
+            stats['officers'] = len(self._by_officer)
+            stats['intervals'] = sum(len(intervals) for intervals in self._by_officer.values())
+            stats['age'] = time.monotonic() - self._loaded_mono if self._loaded_mono else None
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self):
+        if not self._needs_reload():
+            return True
+        with self._lock:
+            loaded = self._loaded_mono
+
+        # One thread reloads; others keep using the previous copy if there is one
+        if not self._reload_lock.acquire(blocking=loaded is None):
+            return True
+        try:
+            if self._needs_reload():
+                return self.load() or loaded is not None
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def _needs_reload(self):
+        with self._lock:
+            if self._stale or self._loaded_mono is None:
+                return True
+            return time.monotonic() - self._loaded_mono >= self.max_age
+
+    @staticmethod
+    def _group(rows):
+        """Collapse loader rows (one per officer) into one record per duty"""
+        duties = {}
+        for row in rows:
+            duty = duties.get(row['id'])
+            if duty is None:
+                duty = duties[row['id']] = {
+                    'id': row['id'],
+                    'type': row['type'],
+                    'status': row['status'],
+                    'start': to_datetime(row['start_time']),
+                    'end': to_datetime(row['end_time']),
+                    'officers': []
+                }
+            if row.get('officer_id'):
+                duty['officers'].append((row['officer_id'], row.get('staff_id'), row.get('staff_name')))
+        return [
+            duty for duty in duties.values()
+            if duty['status'] not in CLOSED_STATUSES and duty['start'] and duty['end']
+        ]
+
+    @staticmethod
+    def _add(duty, by_officer, duties, officers, staff_ids, keep_sorted=False):
+        """Insert one grouped duty; returns its span"""
+        interval = (duty['start'], duty['end'], duty['id'])
+        duties[duty['id']] = {
+            'type': duty['type'],
+            'status': duty['status'],
+            'interval': interval,
+            'officers': [officer_id for officer_id, _, _ in duty['officers']]
+        }
+        for officer_id, staff_id, staff_name in duty['officers']:
+            intervals = by_officer.setdefault(officer_id, [])
+            if keep_sorted:
+                insort(intervals, interval)
+            else:
+                intervals.append(interval)
+            officers[officer_id] = (staff_id, staff_name)
+            if staff_id:
+                staff_ids[staff_id] = officer_id
+        return duty['end'] - duty['start']
+
+    def _remove_locked(self, duty_id):
+        duty = self._duties.pop(duty_id, None)
+        if duty is None:
+            return
+        for officer_id in duty['officers']:
+            intervals = self._by_officer.get(officer_id)
+            if not intervals:
+                continue
+            position = bisect_left(intervals, duty['interval'])
+            if position < len(intervals) and intervals[position] == duty['interval']:
+                intervals.pop(position)
+            if not intervals:
+                del self._by_officer[officer_id]
@@ -5,14 +5,25 @@ Handles saved duty location data access
 
 import json
 from .db import get_connection
+from .cache import reference_cache
+
+
+# Cache namespace invalidated by every duty location write
+CACHE_NAMESPACE = 'duty_locations'
 
 
 class DutyLocationModel:
     """Model for duty location operations"""
     
     @staticmethod
-    def get_all_duty_locations():
-        """Get all saved duty locations"""
+    def get_all_duty_locations(with_etag=False):
+        """Get all saved duty locations (cached); with_etag also returns the list's ETag"""
+        entry = reference_cache.get(CACHE_NAMESPACE, 'all', DutyLocationModel._load_all_duty_locations)
+        return (entry.value, entry.etag) if with_etag else entry.value
+    
+    @staticmethod
+    def _load_all_duty_locations():
+        """Load all saved duty locations from database"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
                 query = """
@@ -109,7 +120,8 @@ class DutyLocationModel:
                     location_data.get('updatedAt') or now
                 ))
                 conn.commit()
-                return location_id
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        return location_id
     
     @staticmethod
     def update_duty_location(location_id, updates):
@@ -133,7 +145,9 @@ class DutyLocationModel:
                 query = f"UPDATE duty_locations SET {', '.join(fields)} WHERE id = %s"
                 cursor.execute(query, values)
                 conn.commit()
-                return cursor.rowcount > 0
+                changed = cursor.rowcount > 0
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        return changed
     
     @staticmethod
     def delete_duty_location(location_id):
@@ -142,4 +156,6 @@ class DutyLocationModel:
             with conn.cursor() as cursor:
                 cursor.execute("DELETE FROM duty_locations WHERE id = %s", (location_id,))
                 conn.commit()
-                return cursor.rowcount > 0
+                changed = cursor.rowcount > 0
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        return changed
@@ -3,60 +3,198 @@ Duty Model
 Handles duty data access with parameterized queries
 """
 
+import base64
 import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from utils.logger import logger
 from .db import get_connection
+from .cache import reference_cache
+from .duty_index import DutyIntervalIndex, CLOSED_STATUSES, to_datetime
+from .geofence import GeofenceEngine
+from .compliance_model import ComplianceModel
+
+
+# Columns loaded into the conflict index; one row per (duty, officer)
+DUTY_INDEX_QUERY = """
+    SELECT d.id, d.type, d.status, d.start_time, d.end_time,
+           do.officer_id, o.staff_id, o.staff_name
+    FROM duties d
+    JOIN duty_officers do ON d.id = do.duty_id
+    JOIN officers o ON do.officer_id = o.id
+"""
+
+# Areas of open duties that have not ended (or start within a day), one row
+# per (duty, officer), for the geofence engine
+GEOFENCE_QUERY = """
+    SELECT d.id, d.status, d.start_time, d.end_time,
+           d.location_polygon, d.location_radius,
+           do.officer_id, o.staff_name
+    FROM duties d
+    JOIN duty_officers do ON d.id = do.duty_id
+    LEFT JOIN officers o ON do.officer_id = o.id
+    WHERE d.status NOT IN ({closed})
+    AND d.end_time >= %s AND d.start_time <= %s
+"""
+
+DUTY_INSERT_QUERY = """
+    INSERT INTO duties 
+    (id, type, location_polygon, location_radius, start_time, end_time, 
+     status, assigned_at, comments, last_updated)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+# Plain columns a duty list can be projected to with fields=
+DUTY_LIST_COLUMNS = {
+    'id', 'type', 'start_time', 'end_time', 'status', 'assigned_at', 'comments',
+    'check_in_time', 'check_out_time', 'created_at', 'updated_at', 'last_updated'
+}
+
+# Projectable fields; location, officers and vehicles are loaded only when asked for
+DUTY_LIST_FIELDS = DUTY_LIST_COLUMNS | {'location', 'officers', 'vehicles'}
+
+# Duty ids per IN query when loading officers and vehicles for a page
+ASSIGNMENT_CHUNK_SIZE = 1000
+
+# Cache namespace invalidated by every duty write (and officer/vehicle writes)
+CACHE_NAMESPACE = 'duties'
+
+
+def encode_duty_cursor(duty):
+    """Opaque keyset cursor pointing after ``duty`` in (created_at, id) order"""
+    created_at = duty['created_at']
+    key = [created_at.isoformat() if hasattr(created_at, 'isoformat') else created_at, duty['id']]
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+
+def decode_duty_cursor(token):
+    """
+    Decode a cursor from encode_duty_cursor.
+    
+    Returns:
+        tuple: (created_at, duty_id)
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, duty_id = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        return datetime.fromisoformat(created_at), str(duty_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def convert_iso_to_mysql(iso_string):
+    """Convert ISO 8601 datetime string to MySQL datetime format"""
+    if not iso_string:
+        return None
+    try:
+        # Parse ISO format (e.g., '2025-11-15T16:00:00.000Z')
+        dt = datetime.fromisoformat(iso_string.replace('Z', '+00:00'))
+        # Return MySQL format: 'YYYY-MM-DD HH:MM:SS'
+        return dt.strftime('%Y-%m-%d %H:%M:%S')
+    except:
+        return iso_string  # Return as-is if parsing fails
 
 
 class DutyModel:
     """Model for duty operations"""
     
     @staticmethod
-    def get_all_duties():
+    def get_all_duties(filters=None, fields=None, limit=None, cursor=None):
         """
-        Get all duties with officer and vehicle information.
+        Get duties with officer and vehicle information, newest first.
         
+        Args:
+            filters (dict, optional): 'status' (list), 'type', 'start_from'
+                and 'start_to' (start_time range, inclusive/exclusive)
+            fields (list, optional): Subset of DUTY_LIST_FIELDS to return;
+                'location', 'officers' and 'vehicles' are only loaded when listed
+            limit (int, optional): Page size; enables keyset pagination
+            cursor (str, optional): next_cursor from the previous page
+            
         Returns:
-            list: List of duty dictionaries with all fields
+            list: Duty dictionaries when limit is None, otherwise
+                  dict: {'duties': [...], 'next_cursor': str or None}
         """
+        filters = filters or {}
+        wanted = set(fields) if fields else DUTY_LIST_FIELDS
+        
+        # id and created_at are always selected; they form the page cursor
+        columns = ['id', 'created_at'] + sorted((wanted & DUTY_LIST_COLUMNS) - {'id', 'created_at'})
+        if 'location' in wanted:
+            columns += ['location_polygon', 'location_radius']
+        select = [f"d.{column}" for column in columns]
+        
+        conditions = []
+        params = []
+        if filters.get('status'):
+            conditions.append(f"d.status IN ({', '.join(['%s'] * len(filters['status']))})")
+            params.extend(filters['status'])
+        if filters.get('type'):
+            conditions.append("d.type = %s")
+            params.append(filters['type'])
+        if filters.get('start_from'):
+            conditions.append("d.start_time >= %s")
+            params.append(filters['start_from'])
+        if filters.get('start_to'):
+            conditions.append("d.start_time < %s")
+            params.append(filters['start_to'])
+        if cursor:
+            created_at, duty_id = decode_duty_cursor(cursor)
+            # Expanded form of (created_at, id) < (%s, %s) so idx_created_at_id is used
+            conditions.append("(d.created_at < %s OR (d.created_at = %s AND d.id < %s))")
+            params.extend([created_at, created_at, duty_id])
+        
+        query = f"SELECT {', '.join(select)} FROM duties d"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY d.created_at DESC, d.id DESC"
+        if limit is not None:
+            # One extra row tells us whether there is a next page
+            query += " LIMIT %s"
+            params.append(limit + 1)
+        
         with get_connection() as conn:
-            with conn.cursor() as cursor:
-                query = """
-                    SELECT 
-                        d.*,
-                        GROUP_CONCAT(DISTINCT do.officer_id ORDER BY do.officer_id SEPARATOR ',') as officer_uids,
-                        GROUP_CONCAT(DISTINCT o.staff_name ORDER BY do.officer_id SEPARATOR ', ') as officer_names,
-                        GROUP_CONCAT(DISTINCT dv.vehicle_id ORDER BY dv.vehicle_id SEPARATOR ',') as vehicle_ids
-                    FROM duties d
-                    LEFT JOIN duty_officers do ON d.id = do.duty_id
-                    LEFT JOIN officers o ON do.officer_id = o.id
-                    LEFT JOIN duty_vehicles dv ON d.id = dv.duty_id
-                    GROUP BY d.id
-                    ORDER BY d.created_at DESC
-                """
-                cursor.execute(query)
-                duties = cursor.fetchall()
+            with conn.cursor() as db_cursor:
+                db_cursor.execute(query, params)
+                duties = db_cursor.fetchall()
                 
-                # Parse JSON fields and split arrays
-                for duty in duties:
-                    # Always create location object
-                    if duty['location_polygon']:
-                        try:
-                            polygon_data = json.loads(duty['location_polygon'])
-                        except:
-                            polygon_data = []
-                    else:
-                        polygon_data = []
-                    
-                    duty['location'] = {
-                        'polygon': polygon_data,
-                        'radius': duty['location_radius'] or 500
-                    }
-                    
-                    duty['officerUids'] = duty['officer_uids'].split(',') if duty['officer_uids'] else []
-                    duty['officerNames'] = duty['officer_names'] if duty['officer_names'] else ''
-                    duty['vehicleIds'] = duty['vehicle_ids'].split(',') if duty['vehicle_ids'] else []
-                    
-                return duties
+                next_cursor = None
+                if limit is not None and len(duties) > limit:
+                    duties = duties[:limit]
+                    next_cursor = encode_duty_cursor(duties[-1])
+                
+                DutyModel._load_assignments(
+                    db_cursor,
+                    duties,
+                    location='location' in wanted,
+                    officers='officers' in wanted,
+                    vehicles='vehicles' in wanted
+                )
+        
+        if limit is None:
+            return duties
+        return {'duties': duties, 'next_cursor': next_cursor}
+    
+    @staticmethod
+    def _parse_location(duty):
+        """Build the duty's location object from location_polygon/location_radius"""
+        # Always create location object
+        if duty['location_polygon']:
+            try:
+                polygon_data = json.loads(duty['location_polygon'])
+            except:
+                polygon_data = []
+        else:
+            polygon_data = []
+        
+        duty['location'] = {
+            'polygon': polygon_data,
+            'radius': duty['location_radius'] or 500
+        }
     
     @staticmethod
     def get_duty_by_id(duty_id):
@@ -69,42 +207,20 @@ class DutyModel:
         Returns:
             dict: Duty dictionary or None if not found
         """
+        return reference_cache.get(
+            CACHE_NAMESPACE, f'id:{duty_id}', lambda: DutyModel._load_duty(duty_id)
+        ).value
+    
+    @staticmethod
+    def _load_duty(duty_id):
+        """Load one duty with its assignments from database"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                query = """
-                    SELECT 
-                        d.*,
-                        GROUP_CONCAT(DISTINCT do.officer_id ORDER BY do.officer_id SEPARATOR ',') as officer_uids,
-                        GROUP_CONCAT(DISTINCT o.staff_name ORDER BY do.officer_id SEPARATOR ', ') as officer_names,
-                        GROUP_CONCAT(DISTINCT dv.vehicle_id ORDER BY dv.vehicle_id SEPARATOR ',') as vehicle_ids
-                    FROM duties d
-                    LEFT JOIN duty_officers do ON d.id = do.duty_id
-                    LEFT JOIN officers o ON do.officer_id = o.id
-                    LEFT JOIN duty_vehicles dv ON d.id = dv.duty_id
-                    WHERE d.id = %s
-                    GROUP BY d.id
-                """
-                cursor.execute(query, (duty_id,))
+                cursor.execute("SELECT d.* FROM duties d WHERE d.id = %s", (duty_id,))
                 duty = cursor.fetchone()
                 
                 if duty:
-                    # Always create location object
-                    if duty['location_polygon']:
-                        try:
-                            polygon_data = json.loads(duty['location_polygon'])
-                        except:
-                            polygon_data = []
-                    else:
-                        polygon_data = []
-                    
-                    duty['location'] = {
-                        'polygon': polygon_data,
-                        'radius': duty['location_radius'] or 500
-                    }
-                    
-                    duty['officerUids'] = duty['officer_uids'].split(',') if duty['officer_uids'] else []
-                    duty['officerNames'] = duty['officer_names'] if duty['officer_names'] else ''
-                    duty['vehicleIds'] = duty['vehicle_ids'].split(',') if duty['vehicle_ids'] else []
+                    DutyModel._load_assignments(cursor, [duty])
                 
                 return duty
     
@@ -116,44 +232,22 @@ class DutyModel:
         Returns:
             list: List of active duty dictionaries
         """
+        return reference_cache.get(CACHE_NAMESPACE, 'active', DutyModel._load_active_duties).value
+    
+    @staticmethod
+    def _load_active_duties():
+        """Load active duties with their assignments from database"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
                 query = """
-                    SELECT 
-                        d.*,
-                        GROUP_CONCAT(DISTINCT do.officer_id ORDER BY do.officer_id SEPARATOR ',') as officer_uids,
-                        GROUP_CONCAT(DISTINCT o.staff_name ORDER BY do.officer_id SEPARATOR ', ') as officer_names,
-                        GROUP_CONCAT(DISTINCT dv.vehicle_id ORDER BY dv.vehicle_id SEPARATOR ',') as vehicle_ids
+                    SELECT d.*
                     FROM duties d
-                    LEFT JOIN duty_officers do ON d.id = do.duty_id
-                    LEFT JOIN officers o ON do.officer_id = o.id
-                    LEFT JOIN duty_vehicles dv ON d.id = dv.duty_id
                     WHERE d.status IN ('active', 'assigned', 'incomplete')
-                    GROUP BY d.id
                     ORDER BY d.start_time DESC
                 """
                 cursor.execute(query)
                 duties = cursor.fetchall()
-                
-                for duty in duties:
-                    # Always create location object
-                    if duty['location_polygon']:
-                        try:
-                            polygon_data = json.loads(duty['location_polygon'])
-                        except:
-                            polygon_data = []
-                    else:
-                        polygon_data = []
-                    
-                    duty['location'] = {
-                        'polygon': polygon_data,
-                        'radius': duty['location_radius'] or 500
-                    }
-                    
-                    duty['officerUids'] = duty['officer_uids'].split(',') if duty['officer_uids'] else []
-                    duty['officerNames'] = duty['officer_names'] if duty['officer_names'] else ''
-                    duty['vehicleIds'] = duty['vehicle_ids'].split(',') if duty['vehicle_ids'] else []
-                
+                DutyModel._load_assignments(cursor, duties)
                 return duties
     
     @staticmethod
@@ -167,47 +261,89 @@ class DutyModel:
         Returns:
             list: List of duty dictionaries assigned to the officer
         """
+        return reference_cache.get(
+            CACHE_NAMESPACE, f'officer:{officer_id}', lambda: DutyModel._load_officer_duties(officer_id)
+        ).value
+    
+    @staticmethod
+    def _load_officer_duties(officer_id):
+        """Load an officer's duties with their assignments from database"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
                 query = """
-                    SELECT 
-                        d.*,
-                        GROUP_CONCAT(DISTINCT do.officer_id ORDER BY do.officer_id SEPARATOR ',') as officer_uids,
-                        GROUP_CONCAT(DISTINCT o.staff_name ORDER BY do.officer_id SEPARATOR ', ') as officer_names,
-                        GROUP_CONCAT(DISTINCT dv.vehicle_id ORDER BY dv.vehicle_id SEPARATOR ',') as vehicle_ids
-                    FROM duties d
-                    INNER JOIN duty_officers do ON d.id = do.duty_id
-                    LEFT JOIN officers o ON do.officer_id = o.id
-                    LEFT JOIN duty_vehicles dv ON d.id = dv.duty_id
+                    SELECT d.*
+                    FROM duty_officers do
+                    INNER JOIN duties d ON d.id = do.duty_id
                     WHERE do.officer_id = %s
-                    GROUP BY d.id
                     ORDER BY d.start_time DESC
                 """
                 cursor.execute(query, (officer_id,))
                 duties = cursor.fetchall()
-                
-                # Parse JSON fields and split arrays
-                for duty in duties:
-                    # Always create location object
-                    if duty['location_polygon']:
-                        try:
-                            polygon_data = json.loads(duty['location_polygon'])
-                        except:
-                            polygon_data = []
-                    else:
-                        polygon_data = []
-                    
-                    duty['location'] = {
-                        'polygon': polygon_data,
-                        'radius': duty['location_radius'] or 500
-                    }
-                    
-                    duty['officerUids'] = duty['officer_uids'].split(',') if duty['officer_uids'] else []
-                    duty['officerNames'] = duty['officer_names'] if duty['officer_names'] else ''
-                    duty['vehicleIds'] = duty['vehicle_ids'].split(',') if duty['vehicle_ids'] else []
-                    
+                DutyModel._load_assignments(cursor, duties)
                 return duties
     
+    @staticmethod
+    def _load_assignments(cursor, duties, location=True, officers=True, vehicles=True):
+        """
+        Second phase of the duty loaders: attach location, officers and
+        vehicles to an already-fetched page of duties.
+        
+        Officers and vehicles for every duty on the page are fetched with one
+        IN query each (chunked for very large pages) and stitched here, so
+        rows never multiply across the junction tables and nothing depends
+        on group_concat_max_len.
+        
+        Args:
+            cursor: Open cursor
+            duties (list): Duty rows; modified in place
+            location (bool): Build the location object from the polygon
+            officers (bool): Attach officer_uids/officerUids/officerNames
+            vehicles (bool): Attach vehicle_ids/vehicleIds
+        """
+        duty_ids = [duty['id'] for duty in duties]
+        officer_rows = {duty_id: [] for duty_id in duty_ids}
+        vehicle_rows = {duty_id: [] for duty_id in duty_ids}
+        
+        for offset in range(0, len(duty_ids), ASSIGNMENT_CHUNK_SIZE):
+            chunk = duty_ids[offset:offset + ASSIGNMENT_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            
+            if officers:
+                cursor.execute(f"""
+                    SELECT do.duty_id, do.officer_id, o.staff_name
+                    FROM duty_officers do
+                    LEFT JOIN officers o ON do.officer_id = o.id
+                    WHERE do.duty_id IN ({placeholders})
+                    ORDER BY do.duty_id, do.officer_id
+                """, chunk)
+                for row in cursor.fetchall():
+                    officer_rows[row['duty_id']].append(row)
+            
+            if vehicles:
+                cursor.execute(f"""
+                    SELECT duty_id, vehicle_id
+                    FROM duty_vehicles
+                    WHERE duty_id IN ({placeholders})
+                    ORDER BY duty_id, vehicle_id
+                """, chunk)
+                for row in cursor.fetchall():
+                    vehicle_rows[row['duty_id']].append(row['vehicle_id'])
+        
+        for duty in duties:
+            if location:
+                DutyModel._parse_location(duty)
+            
+            if officers:
+                assigned = officer_rows[duty['id']]
+                duty['officerUids'] = [row['officer_id'] for row in assigned]
+                duty['officerNames'] = ', '.join(row['staff_name'] for row in assigned if row['staff_name'])
+                duty['officer_uids'] = ','.join(duty['officerUids']) or None
+                duty['officer_names'] = duty['officerNames'] or None
+            
+            if vehicles:
+                duty['vehicleIds'] = vehicle_rows[duty['id']]
+                duty['vehicle_ids'] = ','.join(duty['vehicleIds']) or None
+    
     @staticmethod
     def check_officer_conflicts(officer_ids, start_time, end_time, exclude_duty_id=None):
         """
@@ -226,66 +362,289 @@ class DutyModel:
         if not officer_ids or not start_time or not end_time:
             return {'has_conflicts': False, 'conflicts': []}
         
+        # Answer from the in-memory interval index; the database is the fallback
+        conflicts = None
+        if duty_interval_index is not None:
+            conflicts = duty_interval_index.find_conflicts(officer_ids, start_time, end_time, exclude_duty_id)
+        
+        if conflicts is None:
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    resolved_ids = DutyModel.resolve_officer_ids(cursor, officer_ids)
+                    conflicts = DutyModel.find_conflicts(
+                        cursor, resolved_ids, start_time, end_time, exclude_duty_id
+                    )
+        
+        return {
+            'has_conflicts': len(conflicts) > 0,
+            'conflicts': conflicts
+        }
+    
+    @staticmethod
+    def resolve_officer_ids(cursor, officer_refs):
+        """
+        Resolve officer references to officer UUIDs in one query.
+        Short references are treated as staff_ids (e.g. 'GP33239'); refs
+        that match no officer are skipped (see lookup_officers).
+        
+        Args:
+            cursor: Open cursor
+            officer_refs (list): Officer UUIDs and/or staff_ids
+            
+        Returns:
+            list: Officer UUIDs in input order, without duplicates
+        """
+        officers = DutyModel.lookup_officers(cursor, officer_refs)
+        resolved = []
+        for ref in officer_refs:
+            officer = officers.get(ref)
+            if officer and officer['id'] not in resolved:
+                resolved.append(officer['id'])
+        return resolved
+    
+    @staticmethod
+    def lookup_officers(cursor, officer_refs):
+        """
+        Look up officer references in one query. References shorter than
+        20 characters are staff_ids, longer ones officer UUIDs. Shared by
+        single and bulk duty writes so both accept the same references.
+        
+        Args:
+            cursor: Open cursor
+            officer_refs (iterable): Officer UUIDs and/or staff_ids
+            
+        Returns:
+            dict: ref -> {'id', 'staff_id', 'staff_name'}; unknown refs are absent
+        """
+        refs = list(dict.fromkeys(ref for ref in officer_refs if ref))
+        staff_ids = [ref for ref in refs if len(str(ref)) < 20]
+        uuids = [ref for ref in refs if len(str(ref)) >= 20]
+        if not refs:
+            return {}
+        
+        conditions, params = [], []
+        if uuids:
+            conditions.append(f"id IN ({', '.join(['%s'] * len(uuids))})")
+            params.extend(uuids)
+        if staff_ids:
+            conditions.append(f"staff_id IN ({', '.join(['%s'] * len(staff_ids))})")
+            params.extend(staff_ids)
+        cursor.execute(
+            f"SELECT id, staff_id, staff_name FROM officers WHERE {' OR '.join(conditions)}",
+            params
+        )
+        
+        by_id, by_staff_id = {}, {}
+        for row in cursor.fetchall():
+            by_id[row['id']] = row
+            if row.get('staff_id'):
+                by_staff_id.setdefault(row['staff_id'], row)
+        officers = {}
+        for ref in refs:
+            officer = by_staff_id.get(ref) if len(str(ref)) < 20 else by_id.get(ref)
+            if officer:
+                officers[ref] = officer
+        return officers
+    
+    @staticmethod
+    def find_conflicts(cursor, officer_ids, start_time, end_time, exclude_duty_id=None):
+        """
+        Find open duties overlapping a time range for many officers in one query.
+        
+        Args:
+            cursor: Open cursor
+            officer_ids (list): Resolved officer UUIDs
+            start_time (str): Start time of the duty
+            end_time (str): End time of the duty
+            exclude_duty_id (str, optional): Duty ID to ignore (for updates)
+            
+        Returns:
+            list: Conflict details ordered by the given officers
+        """
+        if not officer_ids:
+            return []
+        
+        placeholders = ', '.join(['%s'] * len(officer_ids))
+        query = f"""
+            SELECT d.id, d.type, d.start_time, d.end_time, d.status,
+                   do.officer_id, o.staff_id, o.staff_name
+            FROM duties d
+            JOIN duty_officers do ON d.id = do.duty_id
+            JOIN officers o ON do.officer_id = o.id
+            WHERE do.officer_id IN ({placeholders})
+            AND d.status NOT IN ('complete', 'completed', 'cancelled')
+            AND (
+                (d.start_time <= %s AND d.end_time > %s)
+                OR (d.start_time < %s AND d.end_time >= %s)
+                OR (d.start_time >= %s AND d.end_time <= %s)
+            )
+        """
+        params = list(officer_ids) + [start_time, start_time, end_time, end_time, start_time, end_time]
+        
+        # Exclude current duty if updating
+        if exclude_duty_id:
+            query += " AND d.id != %s"
+            params.append(exclude_duty_id)
+        
+        query += " ORDER BY d.start_time"
+        cursor.execute(query, params)
+        
+        order = {officer_id: index for index, officer_id in enumerate(officer_ids)}
+        rows = sorted(cursor.fetchall(), key=lambda row: order[row['officer_id']])
+        
+        return [
+            {
+                'officer_id': duty['staff_id'],
+                'officer_name': duty['staff_name'],
+                'duty_id': duty['id'],
+                'duty_type': duty['type'],
+                'duty_start': duty['start_time'].strftime('%Y-%m-%d %H:%M:%S') if duty['start_time'] else None,
+                'duty_end': duty['end_time'].strftime('%Y-%m-%d %H:%M:%S') if duty['end_time'] else None,
+                'status': duty['status']
+            }
+            for duty in rows
+        ]
+    
+    @staticmethod
+    def load_conflict_index_rows():
+        """
+        Load every open duty assignment for the conflict index.
+        
+        Returns:
+            list: One row per (duty, officer)
+        """
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                conflicts = []
-                
-                for officer_id in officer_ids:
-                    # Resolve staff_id to UUID if needed
-                    if officer_id and len(str(officer_id)) < 20:
-                        cursor.execute(
-                            "SELECT id FROM officers WHERE staff_id = %s LIMIT 1",
-                            (officer_id,)
-                        )
-                        officer_row = cursor.fetchone()
-                        if officer_row:
-                            actual_officer_id = officer_row['id']
-                        else:
-                            continue
-                    else:
-                        actual_officer_id = officer_id
-                    
-                    # Check for overlapping duties
-                    query = """
-                        SELECT d.id, d.type, d.start_time, d.end_time, d.status,
-                               o.staff_id, o.staff_name
-                        FROM duties d
-                        JOIN duty_officers do ON d.id = do.duty_id
-                        JOIN officers o ON do.officer_id = o.id
-                        WHERE do.officer_id = %s
-                        AND d.status NOT IN ('complete', 'completed', 'cancelled')
-                        AND (
-                            (d.start_time <= %s AND d.end_time > %s)
-                            OR (d.start_time < %s AND d.end_time >= %s)
-                            OR (d.start_time >= %s AND d.end_time <= %s)
-                        )
-                    """
-                    
-                    params = [actual_officer_id, start_time, start_time, end_time, end_time, start_time, end_time]
-                    
-                    # Exclude current duty if updating
-                    if exclude_duty_id:
-                        query += " AND d.id != %s"
-                        params.append(exclude_duty_id)
-                    
-                    cursor.execute(query, params)
-                    conflicting_duties = cursor.fetchall()
-                    
-                    for duty in conflicting_duties:
-                        conflicts.append({
-                            'officer_id': duty['staff_id'],
-                            'officer_name': duty['staff_name'],
-                            'duty_id': duty['id'],
-                            'duty_type': duty['type'],
-                            'duty_start': duty['start_time'].strftime('%Y-%m-%d %H:%M:%S') if duty['start_time'] else None,
-                            'duty_end': duty['end_time'].strftime('%Y-%m-%d %H:%M:%S') if duty['end_time'] else None,
-                            'status': duty['status']
-                        })
-                
-                return {
-                    'has_conflicts': len(conflicts) > 0,
-                    'conflicts': conflicts
-                }
+                placeholders = ', '.join(['%s'] * len(CLOSED_STATUSES))
+                cursor.execute(
+                    DUTY_INDEX_QUERY + f" WHERE d.status NOT IN ({placeholders})",
+                    CLOSED_STATUSES
+                )
+                return cursor.fetchall()
+    
+    @staticmethod
+    def build_conflict_index():
+        """
+        Load the conflict index now instead of on the first conflict check.
+        
+        Returns:
+            bool: True if the index is enabled and loaded
+        """
+        return duty_interval_index is not None and duty_interval_index.load()
+    
+    @staticmethod
+    def get_conflict_index_stats():
+        """
+        Get conflict index statistics for this process.
+        
+        Returns:
+            dict: Index counters, or {'enabled': False}
+        """
+        if duty_interval_index is None:
+            return {'enabled': False}
+        stats = duty_interval_index.stats()
+        stats['enabled'] = True
+        return stats
+    
+    @staticmethod
+    def load_geofence_rows():
+        """
+        Load the areas and officers of current and upcoming duties.
+        
+        Returns:
+            list: One row per (duty, officer)
+        """
+        now = datetime.utcnow()
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                placeholders = ', '.join(['%s'] * len(CLOSED_STATUSES))
+                cursor.execute(
+                    GEOFENCE_QUERY.format(closed=placeholders),
+                    list(CLOSED_STATUSES) + [now, now + timedelta(days=1)]
+                )
+                return cursor.fetchall()
+    
+    @staticmethod
+    def check_geofences(pings, written_at):
+        """
+        Check committed live-location pings against the officers' duty areas.
+        Violations are written to compliance in the background.
+        
+        Args:
+            pings (list): List of (officer_id, location_data) tuples
+            written_at (datetime): UTC time of the write
+            
+        Returns:
+            list: Violations reported for these pings (empty if disabled)
+        """
+        if duty_geofence is None:
+            return []
+        return duty_geofence.check(pings, written_at)
+    
+    @staticmethod
+    def build_geofence():
+        """
+        Load the geofence areas now instead of on the first ping.
+        
+        Returns:
+            bool: True if the geofence is enabled and loaded
+        """
+        return duty_geofence is not None and duty_geofence.load()
+    
+    @staticmethod
+    def get_geofence_stats():
+        """
+        Get geofence engine statistics for this process.
+        
+        Returns:
+            dict: Engine counters, or {'enabled': False}
+        """
+        if duty_geofence is None:
+            return {'enabled': False}
+        stats = duty_geofence.stats()
+        stats['enabled'] = True
+        return stats
+    
+    @staticmethod
+    def _reindex_duty(cursor, duty_id):
+        """Refresh one duty in the conflict index after a committed write"""
+        DutyModel._reindex_duties(cursor, [duty_id])
+    
+    @staticmethod
+    def _reindex_duties(cursor, duty_ids):
+        """Refresh duties in the conflict index after a committed write"""
+        if duty_geofence is not None:
+            duty_geofence.invalidate()
+        if duty_interval_index is None or not duty_ids:
+            return
+        try:
+            placeholders = ', '.join(['%s'] * len(duty_ids))
+            cursor.execute(DUTY_INDEX_QUERY + f" WHERE d.id IN ({placeholders})", list(duty_ids))
+            rows_by_duty = {duty_id: [] for duty_id in duty_ids}
+            for row in cursor.fetchall():
+                rows_by_duty[row['id']].append(row)
+            for duty_id, rows in rows_by_duty.items():
+                duty_interval_index.put(duty_id, rows)
+        except Exception as e:
+            # The periodic reload will pick the change up
+            logger.error(f"Failed to update duty conflict index for {len(duty_ids)} duties: {str(e)}")
+    
+    @staticmethod
+    def conflict_error(conflict):
+        """
+        Build the error raised when an officer is double-booked.
+        
+        Args:
+            conflict (dict): Entry from find_conflicts
+            
+        Returns:
+            ValueError: Exception describing the conflict
+        """
+        return ValueError(
+            f"Officer {conflict['officer_name']} ({conflict['officer_id']}) "
+            f"is already assigned to a {conflict['duty_type']} duty from "
+            f"{conflict['duty_start']} to {conflict['duty_end']}"
+        )
     
     @staticmethod
     def create_duty(duty_data):
@@ -298,21 +657,6 @@ class DutyModel:
         Returns:
             str: Created duty ID
         """
-        import uuid
-        from datetime import datetime
-        
-        def convert_iso_to_mysql(iso_string):
-            """Convert ISO 8601 datetime string to MySQL datetime format"""
-            if not iso_string:
-                return None
-            try:
-                # Parse ISO format (e.g., '2025-11-15T16:00:00.000Z')
-                dt = datetime.fromisoformat(iso_string.replace('Z', '+00:00'))
-                # Return MySQL format: 'YYYY-MM-DD HH:MM:SS'
-                return dt.strftime('%Y-%m-%d %H:%M:%S')
-            except:
-                return iso_string  # Return as-is if parsing fails
-        
         with get_connection() as conn:
             with conn.cursor() as cursor:
                 # Generate ID if not provided
@@ -322,96 +666,294 @@ class DutyModel:
                 start_time = convert_iso_to_mysql(duty_data.get('start_time') or duty_data.get('startTime'))
                 end_time = convert_iso_to_mysql(duty_data.get('end_time') or duty_data.get('endTime'))
                 
-                # Check for officer conflicts
-                officer_ids = duty_data.get('officerUids') or duty_data.get('officer_uids') or []
+                # Resolve officers (UUIDs or staff_ids) once for the conflict
+                # check and the junction rows - support both camelCase and snake_case
+                officer_refs = duty_data.get('officerUids') or duty_data.get('officer_uids') or []
+                officer_ids = DutyModel.resolve_officer_ids(cursor, officer_refs)
                 if officer_ids and start_time and end_time:
-                    conflict_check = DutyModel.check_officer_conflicts(officer_ids, start_time, end_time)
-                    if conflict_check['has_conflicts']:
+                    conflicts = DutyModel.find_conflicts(cursor, officer_ids, start_time, end_time)
+                    if conflicts:
                         # Raise exception with detailed conflict information
-                        conflict_details = conflict_check['conflicts'][0]  # Get first conflict
-                        raise ValueError(
-                            f"Officer {conflict_details['officer_name']} ({conflict_details['officer_id']}) "
-                            f"is already assigned to a {conflict_details['duty_type']} duty from "
-                            f"{conflict_details['duty_start']} to {conflict_details['duty_end']}"
-                        )
+                        raise DutyModel.conflict_error(conflicts[0])
                 
                 # Insert duty
-                query = """
-                    INSERT INTO duties 
-                    (id, type, location_polygon, location_radius, start_time, end_time, 
-                     status, assigned_at, comments, last_updated)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                
-                # Handle both nested location object and flat location_polygon field
-                if 'location_polygon' in duty_data and isinstance(duty_data['location_polygon'], (list, str)):
-                    # Direct polygon data provided (from Excel import)
-                    if isinstance(duty_data['location_polygon'], str):
-                        location_polygon = duty_data['location_polygon']  # Already JSON string
-                    else:
-                        location_polygon = json.dumps(duty_data['location_polygon'])  # Convert array to JSON
-                    location_radius = duty_data.get('location_radius', 500)
-                else:
-                    # Nested location object (from frontend)
-                    location = duty_data.get('location', {})
-                    location_polygon = json.dumps(location.get('polygon', []))
-                    location_radius = location.get('radius', 500)
-                
-                now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                
-                # start_time and end_time already converted above for conflict checking
-                assigned_at = convert_iso_to_mysql(duty_data.get('assigned_at') or duty_data.get('assignedAt')) or now
-                last_updated = convert_iso_to_mysql(duty_data.get('last_updated') or duty_data.get('lastUpdated')) or now
-                
-                cursor.execute(query, (
-                    duty_id,
-                    duty_data.get('type', 'patrol'),
-                    location_polygon,
-                    location_radius,
-                    start_time,
-                    end_time,
-                    duty_data.get('status', 'assigned'),
-                    assigned_at,
-                    duty_data.get('comments', ''),
-                    last_updated
-                ))
+                cursor.execute(
+                    DUTY_INSERT_QUERY,
+                    DutyModel._duty_values(duty_data, duty_id, start_time, end_time)
+                )
                 
-                # Link officers - support both camelCase and snake_case
-                # Handle both UUID ids and staff_ids
-                officer_ids = duty_data.get('officerUids') or duty_data.get('officer_uids') or []
-                for officer_ref in officer_ids:
-                    # Check if this is a staff_id (format like 'GP33239') or UUID
-                    if officer_ref and len(str(officer_ref)) < 20:  # Likely a staff_id, not a UUID
-                        # Look up the officer's UUID by staff_id
-                        cursor.execute(
-                            "SELECT id FROM officers WHERE staff_id = %s LIMIT 1",
-                            (officer_ref,)
-                        )
-                        officer_row = cursor.fetchone()
-                        if officer_row:
-                            officer_id = officer_row['id']
-                        else:
-                            # Staff ID not found, skip this officer
-                            continue
-                    else:
-                        officer_id = officer_ref
-                    
-                    cursor.execute(
+                # Link officers and vehicles
+                if officer_ids:
+                    cursor.executemany(
                         "INSERT INTO duty_officers (duty_id, officer_id) VALUES (%s, %s)",
-                        (duty_id, officer_id)
+                        [(duty_id, officer_id) for officer_id in officer_ids]
                     )
                 
-                # Link vehicles - support both camelCase and snake_case
                 vehicle_ids = duty_data.get('vehicleIds') or duty_data.get('vehicle_ids') or []
-                for vehicle_id in vehicle_ids:
-                    cursor.execute(
+                if vehicle_ids:
+                    cursor.executemany(
                         "INSERT INTO duty_vehicles (duty_id, vehicle_id) VALUES (%s, %s)",
-                        (duty_id, vehicle_id)
+                        [(duty_id, vehicle_id) for vehicle_id in vehicle_ids]
                     )
                 
                 conn.commit()
+                DutyModel._reindex_duty(cursor, duty_id)
+                reference_cache.invalidate(CACHE_NAMESPACE)
                 return duty_id
     
+    @staticmethod
+    def create_duties(duties_data):
+        """
+        Create many duties in one transaction.
+        
+        Officers are resolved and checked against existing duties with one
+        query each for the whole batch, and against earlier duties of the same
+        batch in memory. Duties that are invalid or conflict are skipped and
+        reported; the rest are inserted with multi-row inserts.
+        
+        Args:
+            duties_data (list): Duty dictionaries in create_duty format
+            
+        Returns:
+            list: One result per input duty in input order:
+                  {'index', 'id', 'status': 'created'|'conflict'|'invalid',
+                   'error'?, 'conflicts'?, 'skipped_officers'?, 'skipped_vehicles'?}
+        """
+        results = [None] * len(duties_data)
+        items = []
+        batch_ids = set()
+        
+        def reject(index, duty_id, error):
+            results[index] = {'index': index, 'id': duty_id, 'status': 'invalid', 'error': error}
+        
+        for index, duty_data in enumerate(duties_data):
+            if not isinstance(duty_data, dict):
+                reject(index, None, "Duty must be an object")
+                continue
+            
+            duty_id = duty_data.get('id') or str(uuid.uuid4())
+            start_time = convert_iso_to_mysql(duty_data.get('start_time') or duty_data.get('startTime'))
+            end_time = convert_iso_to_mysql(duty_data.get('end_time') or duty_data.get('endTime'))
+            start, end = to_datetime(start_time), to_datetime(end_time)
+            
+            if start is None or end is None:
+                reject(index, duty_id, "start_time and end_time must be ISO 8601 timestamps")
+            elif end <= start:
+                reject(index, duty_id, "end_time must be after start_time")
+            elif duty_id in batch_ids:
+                reject(index, duty_id, "Duplicate duty id in batch")
+            else:
+                batch_ids.add(duty_id)
+                items.append({
+                    'index': index,
+                    'id': duty_id,
+                    'data': duty_data,
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'start': start,
+                    'end': end,
+                    'officer_refs': duty_data.get('officerUids') or duty_data.get('officer_uids') or [],
+                    'vehicle_ids': duty_data.get('vehicleIds') or duty_data.get('vehicle_ids') or []
+                })
+        
+        if not items:
+            return results
+        
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                existing_ids = DutyModel._existing_ids(cursor, 'duties', [item['id'] for item in items])
+                officers = DutyModel.lookup_officers(
+                    cursor, [ref for item in items for ref in item['officer_refs']]
+                )
+                vehicles = DutyModel._existing_ids(
+                    cursor, 'vehicles', {vehicle_id for item in items for vehicle_id in item['vehicle_ids']}
+                )
+                
+                # Every open duty of every officer in the batch, in one query
+                officer_ids = {officers[ref]['id'] for item in items for ref in item['officer_refs'] if ref in officers}
+                booked = DutyModel._booked_intervals(
+                    cursor,
+                    officer_ids,
+                    min(item['start'] for item in items),
+                    max(item['end'] for item in items)
+                )
+                
+                accepted = []
+                for item in items:
+                    index, duty_id = item['index'], item['id']
+                    if duty_id in existing_ids:
+                        reject(index, duty_id, "Duty id already exists")
+                        continue
+                    
+                    item_officers = []
+                    for ref in item['officer_refs']:
+                        officer = officers.get(ref)
+                        if officer and officer not in item_officers:
+                            item_officers.append(officer)
+                    
+                    conflicts = [
+                        conflict
+                        for officer in item_officers
+                        for start, end, conflict in booked.get(officer['id'], ())
+                        if start < item['end'] and end > item['start']
+                    ]
+                    if conflicts:
+                        results[index] = {'index': index, 'id': duty_id, 'status': 'conflict', 'conflicts': conflicts}
+                        continue
+                    
+                    # Later duties in the batch conflict with this one
+                    for officer in item_officers:
+                        booked.setdefault(officer['id'], []).append((item['start'], item['end'], {
+                            'officer_id': officer['staff_id'],
+                            'officer_name': officer['staff_name'],
+                            'duty_id': duty_id,
+                            'duty_type': item['data'].get('type', 'patrol'),
+                            'duty_start': item['start'].strftime('%Y-%m-%d %H:%M:%S'),
+                            'duty_end': item['end'].strftime('%Y-%m-%d %H:%M:%S'),
+                            'status': item['data'].get('status', 'assigned'),
+                            'batch_index': index
+                        }))
+                    
+                    item['officer_ids'] = [officer['id'] for officer in item_officers]
+                    result = {'index': index, 'id': duty_id, 'status': 'created'}
+                    skipped_officers = [ref for ref in item['officer_refs'] if ref not in officers]
+                    if skipped_officers:
+                        result['skipped_officers'] = skipped_officers
+                    skipped_vehicles = [vehicle_id for vehicle_id in item['vehicle_ids'] if vehicle_id not in vehicles]
+                    if skipped_vehicles:
+                        result['skipped_vehicles'] = skipped_vehicles
+                    results[index] = result
+                    accepted.append(item)
+                
+                if accepted:
+                    cursor.executemany(DUTY_INSERT_QUERY, [
+                        DutyModel._duty_values(item['data'], item['id'], item['start_time'], item['end_time'])
+                        for item in accepted
+                    ])
+                    
+                    officer_rows = [
+                        (item['id'], officer_id)
+                        for item in accepted for officer_id in item['officer_ids']
+                    ]
+                    if officer_rows:
+                        cursor.executemany(
+                            "INSERT INTO duty_officers (duty_id, officer_id) VALUES (%s, %s)",
+                            officer_rows
+                        )
+                    
+                    vehicle_rows = [
+                        (item['id'], vehicle_id)
+                        for item in accepted for vehicle_id in dict.fromkeys(item['vehicle_ids'])
+                        if vehicle_id in vehicles
+                    ]
+                    if vehicle_rows:
+                        cursor.executemany(
+                            "INSERT INTO duty_vehicles (duty_id, vehicle_id) VALUES (%s, %s)",
+                            vehicle_rows
+                        )
+                    
+                    conn.commit()
+                    DutyModel._reindex_duties(cursor, [item['id'] for item in accepted])
+                    reference_cache.invalidate(CACHE_NAMESPACE)
+        
+        return results
+    
+    @staticmethod
+    def _existing_ids(cursor, table, ids):
+        """Return which of ``ids`` exist in ``table`` (duties or vehicles)"""
+        ids = list(ids)
+        if not ids:
+            return set()
+        placeholders = ', '.join(['%s'] * len(ids))
+        cursor.execute(f"SELECT id FROM {table} WHERE id IN ({placeholders})", ids)
+        return {row['id'] for row in cursor.fetchall()}
+    
+    @staticmethod
+    def _booked_intervals(cursor, officer_ids, window_start, window_end):
+        """
+        Load open duties overlapping a window for many officers.
+        
+        Returns:
+            dict: officer_id -> list of (start, end, conflict details)
+        """
+        booked = {}
+        officer_ids = list(officer_ids)
+        if not officer_ids:
+            return booked
+        
+        placeholders = ', '.join(['%s'] * len(officer_ids))
+        closed = ', '.join(['%s'] * len(CLOSED_STATUSES))
+        cursor.execute(
+            f"""
+                SELECT d.id, d.type, d.start_time, d.end_time, d.status,
+                       do.officer_id, o.staff_id, o.staff_name
+                FROM duties d
+                JOIN duty_officers do ON d.id = do.duty_id
+                JOIN officers o ON do.officer_id = o.id
+                WHERE do.officer_id IN ({placeholders})
+                AND d.status NOT IN ({closed})
+                AND d.start_time < %s AND d.end_time > %s
+                ORDER BY d.start_time
+            """,
+            officer_ids + list(CLOSED_STATUSES) + [window_end, window_start]
+        )
+        for duty in cursor.fetchall():
+            booked.setdefault(duty['officer_id'], []).append((duty['start_time'], duty['end_time'], {
+                'officer_id': duty['staff_id'],
+                'officer_name': duty['staff_name'],
+                'duty_id': duty['id'],
+                'duty_type': duty['type'],
+                'duty_start': duty['start_time'].strftime('%Y-%m-%d %H:%M:%S'),
+                'duty_end': duty['end_time'].strftime('%Y-%m-%d %H:%M:%S'),
+                'status': duty['status']
+            }))
+        return booked
+    
+    @staticmethod
+    def _duty_values(duty_data, duty_id, start_time, end_time):
+        """
+        Build the INSERT INTO duties parameters for one duty.
+        
+        Args:
+            duty_data (dict): Duty information
+            duty_id (str): Duty ID
+            start_time (str): Converted start time
+            end_time (str): Converted end time
+            
+        Returns:
+            tuple: Values in DUTY_INSERT_QUERY column order
+        """
+        # Handle both nested location object and flat location_polygon field
+        if 'location_polygon' in duty_data and isinstance(duty_data['location_polygon'], (list, str)):
+            # Direct polygon data provided (from Excel import)
+            if isinstance(duty_data['location_polygon'], str):
+                location_polygon = duty_data['location_polygon']  # Already JSON string
+            else:
+                location_polygon = json.dumps(duty_data['location_polygon'])  # Convert array to JSON
+            location_radius = duty_data.get('location_radius', 500)
+        else:
+            # Nested location object (from frontend)
+            location = duty_data.get('location', {})
+            location_polygon = json.dumps(location.get('polygon', []))
+            location_radius = location.get('radius', 500)
+        
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        assigned_at = convert_iso_to_mysql(duty_data.get('assigned_at') or duty_data.get('assignedAt')) or now
+        last_updated = convert_iso_to_mysql(duty_data.get('last_updated') or duty_data.get('lastUpdated')) or now
+        
+        return (
+            duty_id,
+            duty_data.get('type', 'patrol'),
+            location_polygon,
+            location_radius,
+            start_time,
+            end_time,
+            duty_data.get('status', 'assigned'),
+            assigned_at,
+            duty_data.get('comments', ''),
+            last_updated
+        )
+    
     @staticmethod
     def update_duty(duty_id, updates):
         """
@@ -424,20 +966,6 @@ class DutyModel:
         Returns:
             bool: True if successful
         """
-        from datetime import datetime
-        
-        def convert_iso_to_mysql(iso_string):
-            """Convert ISO 8601 datetime string to MySQL datetime format"""
-            if not iso_string:
-                return None
-            try:
-                # Parse ISO format (e.g., '2025-11-15T16:00:00.000Z')
-                dt = datetime.fromisoformat(iso_string.replace('Z', '+00:00'))
-                # Return MySQL format: 'YYYY-MM-DD HH:MM:SS'
-                return dt.strftime('%Y-%m-%d %H:%M:%S')
-            except:
-                return iso_string  # Return as-is if parsing fails
-        
         with get_connection() as conn:
             with conn.cursor() as cursor:
                 # Get current duty details for conflict checking
@@ -454,22 +982,21 @@ class DutyModel:
                 end_time = convert_iso_to_mysql(updates.get('end_time') or updates.get('endTime')) or current_duty['end_time']
                 
                 # Check for officer conflicts if officers are being updated
-                if 'officer_uids' in updates or 'officerUids' in updates:
+                officers_updated = 'officer_uids' in updates or 'officerUids' in updates
+                officer_ids = []
+                if officers_updated:
                     officer_uids = updates.get('officer_uids') or updates.get('officerUids') or []
-                    if officer_uids and start_time and end_time:
-                        conflict_check = DutyModel.check_officer_conflicts(
-                            officer_uids, 
+                    officer_ids = DutyModel.resolve_officer_ids(cursor, officer_uids)
+                    if officer_ids and start_time and end_time:
+                        conflicts = DutyModel.find_conflicts(
+                            cursor,
+                            officer_ids,
                             start_time.strftime('%Y-%m-%d %H:%M:%S') if hasattr(start_time, 'strftime') else start_time,
                             end_time.strftime('%Y-%m-%d %H:%M:%S') if hasattr(end_time, 'strftime') else end_time,
                             exclude_duty_id=duty_id
                         )
-                        if conflict_check['has_conflicts']:
-                            conflict_details = conflict_check['conflicts'][0]
-                            raise ValueError(
-                                f"Officer {conflict_details['officer_name']} ({conflict_details['officer_id']}) "
-                                f"is already assigned to a {conflict_details['duty_type']} duty from "
-                                f"{conflict_details['duty_start']} to {conflict_details['duty_end']}"
-                            )
+                        if conflicts:
+                            raise DutyModel.conflict_error(conflicts[0])
                 
                 # Build dynamic update query
                 fields = []
@@ -500,31 +1027,15 @@ class DutyModel:
                     values.append(updates['comments'])
                 
                 # Handle officer updates
-                if 'officer_uids' in updates or 'officerUids' in updates:
-                    officer_uids = updates.get('officer_uids') or updates.get('officerUids') or []
-                    
+                if officers_updated:
                     # Delete existing officer assignments
                     cursor.execute("DELETE FROM duty_officers WHERE duty_id = %s", (duty_id,))
                     
                     # Add new officer assignments
-                    for officer_ref in officer_uids:
-                        # Check if this is a staff_id or UUID
-                        if officer_ref and len(str(officer_ref)) < 20:  # Likely a staff_id
-                            cursor.execute(
-                                "SELECT id FROM officers WHERE staff_id = %s LIMIT 1",
-                                (officer_ref,)
-                            )
-                            officer_row = cursor.fetchone()
-                            if officer_row:
-                                officer_id = officer_row['id']
-                            else:
-                                continue
-                        else:
-                            officer_id = officer_ref
-                        
-                        cursor.execute(
+                    if officer_ids:
+                        cursor.executemany(
                             "INSERT INTO duty_officers (duty_id, officer_id) VALUES (%s, %s)",
-                            (duty_id, officer_id)
+                            [(duty_id, officer_id) for officer_id in officer_ids]
                         )
                 
                 # Always update last_updated timestamp
@@ -536,6 +1047,8 @@ class DutyModel:
                     cursor.execute(query, values)
                 
                 conn.commit()
+                DutyModel._reindex_duty(cursor, duty_id)
+                reference_cache.invalidate(CACHE_NAMESPACE)
                 
                 return True
     
@@ -554,4 +1067,36 @@ class DutyModel:
             with conn.cursor() as cursor:
                 cursor.execute("DELETE FROM duties WHERE id = %s", (duty_id,))
                 conn.commit()
+                if duty_interval_index is not None:
+                    duty_interval_index.remove(duty_id)
+                if duty_geofence is not None:
+                    duty_geofence.invalidate()
+                reference_cache.invalidate(CACHE_NAMESPACE)
                 return cursor.rowcount > 0
+
+
+duty_interval_index = DutyIntervalIndex(
+    DutyModel.load_conflict_index_rows,
+    max_age=float(os.getenv('DUTY_INDEX_MAX_AGE', '60'))
+) if os.getenv('DUTY_INDEX_ENABLED', 'true').lower() == 'true' else None
+
+duty_geofence = GeofenceEngine(
+    DutyModel.load_geofence_rows,
+    ComplianceModel.create_compliance_logs,
+    max_age=float(os.getenv('GEOFENCE_MAX_AGE', '60')),
+    tolerance=float(os.getenv('GEOFENCE_TOLERANCE_M', '25')),
+    max_accuracy=float(os.getenv('GEOFENCE_MAX_ACCURACY_M', '100')),
+    realert=float(os.getenv('GEOFENCE_REALERT_SECONDS', '900')),
+    max_pending=int(os.getenv('GEOFENCE_WRITE_QUEUE_SIZE', '10000'))
+) if os.getenv('GEOFENCE_ENABLED', 'false').lower() == 'true' else None
+
+
+def _on_remote_duty_change(payload):
+    """Another worker changed duties; reload the conflict index and geofence on next use"""
+    if duty_interval_index is not None:
+        duty_interval_index.invalidate()
+    if duty_geofence is not None:
+        duty_geofence.invalidate()
+
+
+reference_cache.add_listener(CACHE_NAMESPACE, _on_remote_duty_change)
@@ -0,0 +1,588 @@
+"""
+Geofence Engine
+Array-backed duty areas for checking live-location pings server-side
+"""
+
+import hashlib
+import json
+import math
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from utils.logger import logger, log_info
+from .duty_index import CLOSED_STATUSES, to_datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Equirectangular projection around each duty area; the error is far below
+# GPS accuracy at city scale
+METRES_PER_DEGREE = 111320.0
+
+# Radius used when a duty has no usable polygon (same default as DutyModel._parse_location)
+DEFAULT_RADIUS = 500
+
+EPOCH = datetime(1970, 1, 1)
+
+# Fewer (ping, duty) pairs than this are evaluated in a plain loop
+VECTORIZE_MIN_PAIRS = 32
+
+# Violations handed to the writer per call
+WRITE_BATCH_SIZE = 500
+
+
+def to_epoch(value):
+    """Seconds since the epoch for a naive UTC datetime or duty time string"""
+    moment = to_datetime(value)
+    return (moment - EPOCH).total_seconds() if moment is not None else None
+
+
+def to_float(value):
+    """Coordinate or accuracy as float, None if missing or not numeric"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def parse_polygon(value):
+    """
+    Parse a duty polygon into (lat, lng) vertices.
+
+    Accepts the JSON string or list stored in ``location_polygon``, with
+    vertices as {"lat", "lng"} / {"latitude", "longitude"} objects or
+    [lat, lng] pairs, or a GeoJSON Polygon ([lng, lat] order).
+
+    Args:
+        value: JSON string, list or dict
+
+    Returns:
+        list: (lat, lng) tuples; empty if the value is not usable
+    """
+    if isinstance(value, (str, bytes)):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+
+    geojson = False
+    if isinstance(value, dict):
+        if value.get('type') != 'Polygon' or not value.get('coordinates'):
+            return []
+        value, geojson = value['coordinates'][0], True
+    if not isinstance(value, list):
+        return []
+
+    vertices = []
+    for vertex in value:
+        if isinstance(vertex, dict):
+            lat = to_float(vertex.get('lat', vertex.get('latitude')))
+            lng = to_float(vertex.get('lng', vertex.get('longitude')))
+        elif isinstance(vertex, (list, tuple)) and len(vertex) >= 2:
+            lat, lng = to_float(vertex[0]), to_float(vertex[1])
+            if geojson:
+                lat, lng = lng, lat
+        else:
+            continue
+        if lat is not None and lng is not None:
+            vertices.append((lat, lng))
+
+    # A closing vertex equal to the first only adds a zero-length edge
+    if len(vertices) > 3 and vertices[0] == vertices[-1]:
+        vertices.pop()
+    return vertices
+
+
+class GeofenceSet:
+    """
+    Immutable geometry of the loaded duty areas.
+
+    Every duty is projected to metres around its own reference point.
+    Polygons become flat edge arrays (x1, y1, x2, y2) addressed by
+    per-duty offsets. Duties with one or two vertices become circles of
+    ``location_radius`` around them; duties without any are skipped. With NumPy
+    a batch of pings is evaluated with one set of array operations over
+    all (ping, duty, edge) combinations; small batches and installs
+    without NumPy run the same math in a loop.
+    """
+
+    def __init__(self, duties):
+        """
+        Args:
+            duties (list): Dicts with id, start, end, vertices, radius and
+                officers (list of (officer_id, name))
+        """
+        self.duty_ids = []
+        self.by_officer = {}
+        self.officer_names = {}
+        starts, ends, ref_lat, ref_lng, lng_scale, radius = [], [], [], [], [], []
+        edge_offset, edge_count, edges = [], [], []
+
+        for duty in duties:
+            vertices = duty['vertices']
+            if not vertices:
+                continue
+            index = len(self.duty_ids)
+            self.duty_ids.append(duty['id'])
+            for officer_id, name in duty['officers']:
+                self.by_officer.setdefault(officer_id, []).append(index)
+                self.officer_names[officer_id] = name
+
+            lat0 = sum(lat for lat, _ in vertices) / len(vertices)
+            lng0 = sum(lng for _, lng in vertices) / len(vertices)
+            scale = METRES_PER_DEGREE * math.cos(math.radians(lat0))
+            starts.append(duty['start'])
+            ends.append(duty['end'])
+            ref_lat.append(lat0)
+            ref_lng.append(lng0)
+            lng_scale.append(scale)
+
+            edge_offset.append(len(edges))
+            if len(vertices) >= 3:
+                points = [((lng - lng0) * scale, (lat - lat0) * METRES_PER_DEGREE) for lat, lng in vertices]
+                for position, (x1, y1) in enumerate(points):
+                    x2, y2 = points[(position + 1) % len(points)]
+                    edges.append((x1, y1, x2, y2))
+                edge_count.append(len(points))
+                radius.append(0.0)
+            else:
+                # One or two vertices: a circle around their midpoint
+                edge_count.append(0)
+                radius.append(float(duty['radius'] or DEFAULT_RADIUS))
+
+        self.edge_total = len(edges)
+        # Per-duty tuples for the loop, used for small batches and without NumPy
+        self.areas = list(zip(starts, ends, ref_lat, ref_lng, lng_scale, radius, edge_offset, edge_count))
+        self.edges = edges
+        self.vectorized = np is not None
+        if self.vectorized:
+            self.starts = np.array(starts, dtype=float)
+            self.ends = np.array(ends, dtype=float)
+            self.ref_lat = np.array(ref_lat, dtype=float)
+            self.ref_lng = np.array(ref_lng, dtype=float)
+            self.lng_scale = np.array(lng_scale, dtype=float)
+            self.radius = np.array(radius, dtype=float)
+            self.edge_offset = np.array(edge_offset, dtype=np.int64)
+            self.edge_count = np.array(edge_count, dtype=np.int64)
+            self.edge_array = np.array(edges, dtype=float).reshape(-1, 4)
+
+    def __len__(self):
+        return len(self.duty_ids)
+
+    def evaluate(self, points, at):
+        """
+        Signed distance from each ping to the area of every duty its
+        officer is on at time ``at``.
+
+        Args:
+            points (list): (officer_id, lat, lng) tuples
+            at (float): Epoch seconds (UTC) the duty windows are checked against
+
+        Returns:
+            list: (point_index, duty_id, metres) tuples; metres is negative
+                  inside the area and positive outside it
+        """
+        pair_point, pair_duty = [], []
+        for index, (officer_id, _, _) in enumerate(points):
+            for duty in self.by_officer.get(officer_id, ()):
+                pair_point.append(index)
+                pair_duty.append(duty)
+        if not pair_point:
+            return []
+
+        # Array setup costs more than looping over a handful of pairs
+        if self.vectorized and len(pair_point) >= VECTORIZE_MIN_PAIRS:
+            return self._evaluate_arrays(points, pair_point, pair_duty, at)
+        return self._evaluate_loop(points, pair_point, pair_duty, at)
+
+    def _evaluate_arrays(self, points, pair_point, pair_duty, at):
+        pair_point = np.array(pair_point, dtype=np.int64)
+        pair_duty = np.array(pair_duty, dtype=np.int64)
+        on_duty = (self.starts[pair_duty] <= at) & (at < self.ends[pair_duty])
+        pair_point, pair_duty = pair_point[on_duty], pair_duty[on_duty]
+        if not len(pair_point):
+            return []
+
+        coordinates = np.array([(lat, lng) for _, lat, lng in points], dtype=float)
+        x = (coordinates[pair_point, 1] - self.ref_lng[pair_duty]) * self.lng_scale[pair_duty]
+        y = (coordinates[pair_point, 0] - self.ref_lat[pair_duty]) * METRES_PER_DEGREE
+        distance = np.hypot(x, y) - self.radius[pair_duty]
+
+        polygon = np.flatnonzero(self.edge_count[pair_duty] > 0)
+        if len(polygon):
+            counts = self.edge_count[pair_duty[polygon]]
+            first = np.cumsum(counts) - counts
+            # One row per (pair, edge of that pair's polygon)
+            combo_pair = np.repeat(np.arange(len(polygon)), counts)
+            combo_edge = (np.arange(counts.sum()) - np.repeat(first, counts)
+                          + np.repeat(self.edge_offset[pair_duty[polygon]], counts))
+            px, py = x[polygon][combo_pair], y[polygon][combo_pair]
+            x1, y1, x2, y2 = self.edge_array[combo_edge].T
+            dx, dy = x2 - x1, y2 - y1
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # Ray casting: count edges crossed by a ray towards +x
+                crosses = ((y1 > py) != (y2 > py)) & (px < x1 + dx * (py - y1) / dy)
+                length = dx * dx + dy * dy
+                t = np.clip(np.where(length > 0, ((px - x1) * dx + (py - y1) * dy) / length, 0.0), 0.0, 1.0)
+            edge_distance = np.hypot(px - x1 - t * dx, py - y1 - t * dy)
+
+            inside = np.bincount(combo_pair, weights=crosses, minlength=len(polygon)) % 2 == 1
+            boundary = np.minimum.reduceat(edge_distance, first)
+            distance[polygon] = np.where(inside, -boundary, boundary)
+
+        return [
+            (int(point), self.duty_ids[duty], float(metres))
+            for point, duty, metres in zip(pair_point, pair_duty, distance)
+        ]
+
+    def _evaluate_loop(self, points, pair_point, pair_duty, at):
+        results = []
+        for point, duty in zip(pair_point, pair_duty):
+            start, end, lat0, lng0, scale, radius, offset, count = self.areas[duty]
+            if not (start <= at < end):
+                continue
+            _, lat, lng = points[point]
+            x = (lng - lng0) * scale
+            y = (lat - lat0) * METRES_PER_DEGREE
+
+            if not count:
+                results.append((point, self.duty_ids[duty], math.hypot(x, y) - radius))
+                continue
+
+            inside = False
+            boundary = math.inf
+            for x1, y1, x2, y2 in self.edges[offset:offset + count]:
+                dx, dy = x2 - x1, y2 - y1
+                if (y1 > y) != (y2 > y) and x < x1 + dx * (y - y1) / dy:
+                    inside = not inside
+                length = dx * dx + dy * dy
+                t = min(1.0, max(0.0, ((x - x1) * dx + (y - y1) * dy) / length)) if length > 0 else 0.0
+                boundary = min(boundary, math.hypot(x - x1 - t * dx, y - y1 - t * dy))
+            results.append((point, self.duty_ids[duty], -boundary if inside else boundary))
+        return results
+
+
+class GeofenceEngine:
+    """
+    Checks live-location pings against the areas of the officers' current
+    duties and reports officers who left them as compliance violations.
+
+    A ping is a violation when it is further outside the area than
+    ``tolerance`` plus its own GPS accuracy; fixes less accurate than
+    ``max_accuracy`` are ignored. One violation is reported when an
+    officer leaves an area and again every ``realert`` seconds while they
+    stay outside.
+
+    Duty areas are loaded with ``loader`` and reloaded on a background
+    thread when older than ``max_age`` seconds or after ``invalidate``, so
+    checking a ping never waits for the database. Violations go through a
+    bounded queue to a single background writer thread; ``flush`` writes
+    what is left when the worker exits.
+    """
+
+    def __init__(self, loader, writer, max_age=60.0, tolerance=25.0, max_accuracy=100.0, realert=900.0,
+                 max_pending=10000):
+        """
+        Args:
+            loader (callable): Returns one row per (open duty, officer) with
+                id, status, start_time, end_time, location_polygon,
+                location_radius, officer_id and staff_name
+            writer (callable): Called with a list of compliance log dicts
+            max_age (float): Seconds before duty areas are reloaded
+            tolerance (float): Metres outside an area that are still accepted
+            max_accuracy (float): Pings with a worse reported accuracy are skipped
+            realert (float): Seconds before an officer still outside is reported again
+            max_pending (int): Violations waiting to be written before new
+                ones are dropped
+        """
+        self.loader = loader
+        self.writer = writer
+        self.max_age = max_age
+        self.tolerance = tolerance
+        self.max_accuracy = max_accuracy
+        self.realert = realert
+
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._fences = None
+        self._loaded_mono = None
+        self._failed_mono = None
+        self._stale = False
+        self._outside = {}
+        self._write_queue = queue.Queue(maxsize=max_pending)
+        self._writer_pid = None
+        self._writer_thread = None
+        self._stopping = threading.Event()
+        self._stats = {
+            'pings': 0, 'checks': 0, 'skipped_inaccurate': 0, 'violations': 0,
+            'write_errors': 0, 'write_dropped': 0, 'reloads': 0, 'reload_errors': 0,
+            'check_seconds': 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Write side
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """
+        Rebuild the duty areas from the database.
+
+        Returns:
+            bool: True if the areas were loaded
+        """
+        try:
+            rows = self.loader()
+        except Exception as e:
+            logger.error(f"Geofence load failed: {str(e)}")
+            with self._lock:
+                self._failed_mono = time.monotonic()
+                self._stats['reload_errors'] += 1
+            return False
+
+        fences = GeofenceSet(self._group(rows))
+        duty_ids = set(fences.duty_ids)
+        with self._lock:
+            self._fences = fences
+            self._loaded_mono = time.monotonic()
+            self._stale = False
+            # Forget officers outside duties that ended or were removed
+            self._outside = {key: since for key, since in self._outside.items() if key[1] in duty_ids}
+            self._stats['reloads'] += 1
+        return True
+
+    def invalidate(self):
+        """Reload on the next check, e.g. after a duty was written"""
+        with self._lock:
+            self._stale = True
+
+    # ------------------------------------------------------------------
+    # Read side
+    # ------------------------------------------------------------------
+
+    def check(self, pings, at):
+        """
+        Check committed pings and report new violations.
+
+        Args:
+            pings (list): (officer_id, location_data) tuples
+            at (datetime): UTC time of the write
+
+        Returns:
+            list: Compliance log dicts for the violations reported now
+        """
+        fences = self._current()
+        if not fences:
+            return []
+
+        started = time.perf_counter()
+        points, accuracies = [], []
+        skipped = 0
+        for officer_id, location_data in pings:
+            if officer_id not in fences.by_officer:
+                continue
+            lat, lng = to_float(location_data.get('latitude')), to_float(location_data.get('longitude'))
+            if lat is None or lng is None:
+                continue
+            accuracy = to_float(location_data.get('accuracy')) or 0.0
+            if accuracy > self.max_accuracy:
+                skipped += 1
+                continue
+            points.append((officer_id, lat, lng))
+            accuracies.append(accuracy)
+
+        at_epoch = to_epoch(at)
+        results = fences.evaluate(points, at_epoch) if points else []
+
+        violations = []
+        with self._lock:
+            for index, duty_id, distance in results:
+                officer_id, lat, lng = points[index]
+                key = (officer_id, duty_id)
+                if distance <= self.tolerance + accuracies[index]:
+                    self._outside.pop(key, None)
+                    continue
+                reported = self._outside.get(key)
+                if reported is not None and at_epoch - reported < self.realert:
+                    continue
+                self._outside[key] = at_epoch
+                violations.append(self._violation(
+                    officer_id, fences.officer_names.get(officer_id), duty_id,
+                    lat, lng, accuracies[index], distance, at, at_epoch
+                ))
+            self._stats['pings'] += len(pings)
+            self._stats['checks'] += len(results)
+            self._stats['skipped_inaccurate'] += skipped
+            self._stats['violations'] += len(violations)
+            self._stats['check_seconds'] += time.perf_counter() - started
+
+        if violations:
+            for violation in violations:
+                log_info(
+                    f"GEOFENCE_VIOLATION officer={violation['officerId']} duty={violation['dutyId']} "
+                    f"distance={violation['distance']}m",
+                    event='geofence_violation'
+                )
+            self._enqueue(violations)
+        return violations
+
+    def flush(self, timeout=5):
+        """
+        Stop the writer thread and write every queued violation from the
+        calling thread. Called from Gunicorn's ``worker_exit`` hook.
+
+        Args:
+            timeout (float): Seconds to wait for the writer's current batch
+        """
+        self._stopping.set()
+        thread = self._writer_thread
+        if thread is not None and self._writer_pid == os.getpid():
+            thread.join(timeout)
+        # Later violations stay queued instead of starting a new writer
+        self._writer_pid = os.getpid()
+        while True:
+            batch = self._take([])
+            if not batch:
+                return
+            self._write(batch)
+
+    def stats(self):
+        """
+        Get engine counters.
+
+        Returns:
+            dict: Loaded duties/edges, officers currently outside and counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            fences = self._fences
+            stats['duties'] = len(fences) if fences else 0
+            stats['edges'] = fences.edge_total if fences else 0
+            stats['officers_outside'] = len(self._outside)
+            stats['write_queue'] = self._write_queue.qsize()
+            stats['vectorized'] = fences.vectorized if fences else np is not None
+            stats['age'] = time.monotonic() - self._loaded_mono if self._loaded_mono else None
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _current(self):
+        """Loaded areas (possibly None); starts a background reload when due"""
+        now = time.monotonic()
+        with self._lock:
+            fences = self._fences
+            due = self._stale or self._loaded_mono is None or now - self._loaded_mono >= self.max_age
+            # Back off after a failed load instead of retrying on every ping
+            if self._failed_mono is not None and now - self._failed_mono < min(self.max_age, 5.0):
+                due = False
+        if due and self._reload_lock.acquire(blocking=False):
+            threading.Thread(target=self._reload, name='geofence-reload', daemon=True).start()
+        return fences
+
+    def _reload(self):
+        try:
+            self.load()
+        finally:
+            self._reload_lock.release()
+
+    def _enqueue(self, violations):
+        self._ensure_writer()
+        dropped = 0
+        for violation in violations:
+            try:
+                self._write_queue.put_nowait(violation)
+            except queue.Full:
+                dropped += 1
+        if dropped:
+            logger.error(f"Geofence write queue full, dropped {dropped} violations")
+            with self._lock:
+                self._stats['write_dropped'] += dropped
+
+    def _ensure_writer(self):
+        # Threads do not survive fork(); each worker starts its own
+        pid = os.getpid()
+        if self._writer_pid == pid:
+            return
+        with self._lock:
+            if self._writer_pid == pid:
+                return
+            self._writer_pid = pid
+            self._writer_thread = threading.Thread(target=self._write_loop, name='geofence-writer', daemon=True)
+            self._writer_thread.start()
+
+    def _write_loop(self):
+        while not self._stopping.is_set():
+            try:
+                first = self._write_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._write(self._take([first]))
+
+    def _take(self, batch):
+        """Add queued violations to ``batch`` up to WRITE_BATCH_SIZE"""
+        while len(batch) < WRITE_BATCH_SIZE:
+            try:
+                batch.append(self._write_queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, violations):
+        try:
+            self.writer(violations)
+        except Exception as e:
+            logger.error(f"Failed to record {len(violations)} geofence violations: {str(e)}")
+            with self._lock:
+                self._stats['write_errors'] += 1
+
+    def _violation(self, officer_id, officer_name, duty_id, lat, lng, accuracy, distance, at, at_epoch):
+        """Compliance log for one violation (ComplianceModel.insert_params format)"""
+        # Same id for the same officer, duty and re-alert period, so workers
+        # reporting the same departure collapse into one row (INSERT IGNORE).
+        # Periods are fixed epoch buckets: two workers whose pings fall on
+        # either side of a boundary still store two rows.
+        period = int(at_epoch // self.realert) if self.realert > 0 else int(at_epoch)
+        digest = hashlib.sha1(f"{duty_id}|{officer_id}|{period}".encode('utf-8')).hexdigest()
+        return {
+            'id': f"GEO-{digest[:32]}",
+            'dutyId': duty_id,
+            'officerId': officer_id,
+            'officerName': officer_name,
+            'action': 'geofence-violation',
+            'location': {'latitude': lat, 'longitude': lng, 'accuracy': accuracy},
+            'timestamp': at,
+            'distance': round(distance, 1),
+            'details': f"Outside duty area by {distance:.0f} m"
+        }
+
+    @staticmethod
+    def _group(rows):
+        """Collapse loader rows (one per officer) into one record per duty"""
+        duties = {}
+        for row in rows:
+            duty = duties.get(row['id'])
+            if duty is None:
+                if row.get('status') in CLOSED_STATUSES:
+                    continue
+                start, end = to_epoch(row['start_time']), to_epoch(row['end_time'])
+                if start is None or end is None:
+                    continue
+                duty = duties[row['id']] = {
+                    'id': row['id'],
+                    'start': start,
+                    'end': end,
+                    'vertices': parse_polygon(row.get('location_polygon')),
+                    'radius': row.get('location_radius'),
+                    'officers': []
+                }
+            if row.get('officer_id'):
+                duty['officers'].append((row['officer_id'], row.get('staff_name')))
+        return list(duties.values())
@@ -3,8 +3,89 @@ Live Location Model
 Handles real-time officer location tracking
 """
 
+import itertools
 import json
+import os
+from datetime import datetime
+from utils.logger import logger
 from .db import get_connection
+from .cache import reference_cache
+from .location_ingest import get_ingest_queue
+from .location_point_model import LocationPointModel, ARCHIVE_ENABLED, TRAIL_PRECISION, parse_point_time
+from .trail_codec import encode_trail, simplify, zoom_tolerance
+from .live_location_snapshot import LiveLocationSnapshot
+from .location_stream import location_stream_hub
+from .duty_model import DutyModel
+
+
+# Cache channel namespace for location writes made by other workers
+CACHE_NAMESPACE = 'live_locations'
+
+# On-screen deviation allowed when a trail is simplified for a map zoom level
+TRAIL_PIXEL_TOLERANCE = float(os.getenv('TRAIL_PIXEL_TOLERANCE', '1.0'))
+
+# Multi-row upsert keyed on officer_id (uniq_officer_id); tracking_started
+# is only set when the row is first created. Trail points go to
+# location_points, so the legacy locations/location_history blobs are
+# no longer rewritten here. Write times are passed in (UTC, whole seconds)
+# so last_updated matches the snapshot and can serve as a sync cursor.
+# A ping older than the stored fix (e.g. a replayed offline backlog) only
+# refreshes last_seen/status; timestamp is assigned last because later
+# assignments see its new value.
+FRESHER_PING = "(VALUES(timestamp) IS NULL OR timestamp IS NULL OR VALUES(timestamp) >= timestamp)"
+
+UPSERT_QUERY = f"""
+    INSERT INTO live_locations 
+    (id, officer_id, latitude, longitude, speed, altitude, heading, accuracy,
+     timestamp, local_time, current_location, total_points,
+     tracking_started, last_seen, last_updated, status, is_active)
+    VALUES {{rows}}
+    ON DUPLICATE KEY UPDATE
+        latitude = IF({FRESHER_PING}, VALUES(latitude), latitude),
+        longitude = IF({FRESHER_PING}, VALUES(longitude), longitude),
+        speed = IF({FRESHER_PING}, VALUES(speed), speed),
+        altitude = IF({FRESHER_PING}, VALUES(altitude), altitude),
+        heading = IF({FRESHER_PING}, VALUES(heading), heading),
+        accuracy = IF({FRESHER_PING}, VALUES(accuracy), accuracy),
+        local_time = IF({FRESHER_PING}, VALUES(local_time), local_time),
+        current_location = IF({FRESHER_PING}, VALUES(current_location), current_location),
+        timestamp = IF({FRESHER_PING}, VALUES(timestamp), timestamp),
+        total_points = VALUES(total_points),
+        last_updated = VALUES(last_updated), last_seen = VALUES(last_seen),
+        status = VALUES(status), is_active = VALUES(is_active)
+"""
+
+UPSERT_ROW = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+
+# Current-position columns only: the legacy locations/location_history
+# blobs are no longer written, trails come from location_points
+LIVE_LOCATION_COLUMNS = """
+        ll.id, ll.officer_id, ll.latitude, ll.longitude, ll.speed,
+        ll.altitude, ll.heading, ll.accuracy, ll.timestamp, ll.local_time,
+        ll.current_location, ll.total_points, ll.tracking_started,
+        ll.last_seen, ll.last_updated, ll.status, ll.is_active,
+        o.staff_name as officer_name,
+        o.staff_designation as designation
+"""
+
+LIVE_LOCATIONS_QUERY = f"""
+    SELECT {LIVE_LOCATION_COLUMNS}
+    FROM live_locations ll
+    LEFT JOIN officers o ON ll.officer_id = o.id
+    WHERE ll.is_active = TRUE
+    ORDER BY ll.last_updated DESC
+"""
+
+KNOWN_OFFICERS_QUERY = "SELECT id FROM officers WHERE id IN ({ids})"
+
+LIVE_TIMESTAMPS_QUERY = "SELECT officer_id, timestamp FROM live_locations WHERE officer_id IN ({ids})"
+
+LIVE_LOCATION_BY_OFFICER_QUERY = f"""
+    SELECT {LIVE_LOCATION_COLUMNS}
+    FROM live_locations ll
+    LEFT JOIN officers o ON ll.officer_id = o.id
+    WHERE ll.officer_id = %s
+"""
 
 
 class LiveLocationModel:
@@ -14,62 +95,35 @@ class LiveLocationModel:
     def get_all_live_locations():
         """
         Get all live officer locations with latest data.
+        Only the current-position columns are read; trails are served
+        from location_points via get_trail.
         
         Returns:
             list: List of live location dictionaries
         """
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                query = """
-                    SELECT 
-                        ll.*,
-                        o.staff_name as officer_name,
-                        o.staff_designation as designation
-                    FROM live_locations ll
-                    LEFT JOIN officers o ON ll.officer_id = o.id
-                    WHERE ll.is_active = TRUE
-                    ORDER BY ll.last_updated DESC
-                """
-                cursor.execute(query)
-                locations = cursor.fetchall()
-                
-                # Parse JSON fields
-                for loc in locations:
-                    if loc.get('current_location'):
-                        loc['currentLocation'] = json.loads(loc['current_location'])
-                    if loc.get('location_history'):
-                        loc['locationHistory'] = json.loads(loc['location_history'])
-                    if loc.get('locations'):
-                        loc['locations'] = json.loads(loc['locations'])
-                
-                return locations
+                cursor.execute(LIVE_LOCATIONS_QUERY)
+                return [LiveLocationModel.parse_row(loc) for loc in cursor.fetchall()]
     
     @staticmethod
     def get_location_by_officer(officer_id):
-        """Get live location for specific officer"""
+        """
+        Get live location for specific officer.
+        Like get_all_live_locations, the trail is served by get_trail.
+        """
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                query = """
-                    SELECT 
-                        ll.*,
-                        o.staff_name as officer_name,
-                        o.staff_designation as designation
-                    FROM live_locations ll
-                    LEFT JOIN officers o ON ll.officer_id = o.id
-                    WHERE ll.officer_id = %s
-                """
-                cursor.execute(query, (officer_id,))
+                cursor.execute(LIVE_LOCATION_BY_OFFICER_QUERY, (officer_id,))
                 location = cursor.fetchone()
-                
-                if location:
-                    if location.get('current_location'):
-                        location['currentLocation'] = json.loads(location['current_location'])
-                    if location.get('location_history'):
-                        location['locationHistory'] = json.loads(location['location_history'])
-                    if location.get('locations'):
-                        location['locations'] = json.loads(location['locations'])
-                
-                return location
+                return LiveLocationModel.parse_row(location) if location else None
+    
+    @staticmethod
+    def parse_row(location):
+        """Parse JSON fields of a live_locations row"""
+        if location.get('current_location'):
+            location['currentLocation'] = json.loads(location['current_location'])
+        return location
     
     @staticmethod
     def update_location(officer_id, location_data):
@@ -83,67 +137,436 @@ class LiveLocationModel:
         Returns:
             bool: True if successful
         """
+        return LiveLocationModel.upsert_locations([(officer_id, location_data)])
+    
+    @staticmethod
+    def queue_location(officer_id, location_data):
+        """
+        Queue officer's live location for the next batched write.
+        
+        Args:
+            officer_id (str): Officer ID
+            location_data (dict): Location update data
+            
+        Returns:
+            bool: True if queued, False if batching is disabled or the queue
+                  is full and the caller should use update_location instead
+        """
+        ingest_queue = get_ingest_queue(LiveLocationModel.ingest_points)
+        if ingest_queue is None:
+            return False
+        return ingest_queue.submit(officer_id, location_data)
+    
+    @staticmethod
+    def upsert_locations(pings):
+        """
+        Write many officers' live locations in a single statement.
+        Every ping is appended to location_points; a ping older than the
+        stored live position is not upserted or published (see ingest_points).
+        
+        Args:
+            pings (list): List of (officer_id, location_data) tuples
+            
+        Returns:
+            bool: True if successful
+        """
+        if pings:
+            LiveLocationModel.ingest_points(LiveLocationModel.group_pings(pings))
+        return True
+    
+    @staticmethod
+    def group_pings(pings):
+        """
+        Group (officer_id, location_data) tuples per officer, keeping their order.
+        
+        Returns:
+            dict: officer_id -> list of location_data
+        """
+        points_by_officer = {}
+        for officer_id, location_data in pings:
+            points_by_officer.setdefault(officer_id, []).append(location_data)
+        return points_by_officer
+    
+    @staticmethod
+    def ingest_points(points_by_officer):
+        """
+        Write buffered GPS points for many officers in one transaction.
+        Every point is appended to location_points. The latest point per
+        officer becomes the live location unless the stored live position
+        is newer (a replayed backlog does not move the officer back).
+        
+        Args:
+            points_by_officer (dict): officer_id -> list of location_data
+                                      dicts ordered oldest to newest
+            
+        Returns:
+            int: Number of points written
+        """
+        officer_ids = [officer_id for officer_id, points in points_by_officer.items() if points]
+        if not officer_ids:
+            return 0
+        
+        history = [
+            (officer_id, point)
+            for officer_id, points in points_by_officer.items()
+            for point in points
+        ]
+        
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                # Check if location exists
-                cursor.execute("SELECT id FROM live_locations WHERE officer_id = %s", (officer_id,))
-                exists = cursor.fetchone()
-                
-                current_location = json.dumps(location_data.get('currentLocation', {}))
-                locations = json.dumps(location_data.get('locations', []))
-                
-                if exists:
-                    # Update existing
-                    query = """
-                        UPDATE live_locations 
-                        SET latitude = %s, longitude = %s, speed = %s, altitude = %s,
-                            heading = %s, accuracy = %s, timestamp = %s, local_time = %s,
-                            current_location = %s, locations = %s, total_points = %s,
-                            last_updated = NOW(), last_seen = NOW(), status = %s, is_active = %s
-                        WHERE officer_id = %s
-                    """
-                    cursor.execute(query, (
-                        location_data.get('latitude'),
-                        location_data.get('longitude'),
-                        location_data.get('speed', 0),
-                        location_data.get('altitude'),
-                        location_data.get('heading'),
-                        location_data.get('accuracy'),
-                        location_data.get('timestamp'),
-                        location_data.get('localTime'),
-                        current_location,
-                        locations,
-                        location_data.get('totalPoints', 0),
-                        location_data.get('status', 'active'),
-                        location_data.get('isActive', True),
-                        officer_id
-                    ))
-                else:
-                    # Insert new
-                    query = """
-                        INSERT INTO live_locations 
-                        (id, officer_id, latitude, longitude, speed, altitude, heading, accuracy,
-                         timestamp, local_time, current_location, locations, total_points,
-                         tracking_started, last_seen, last_updated, status, is_active)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW(), NOW(), %s, %s)
-                    """
-                    cursor.execute(query, (
-                        officer_id,
-                        officer_id,
-                        location_data.get('latitude'),
-                        location_data.get('longitude'),
-                        location_data.get('speed', 0),
-                        location_data.get('altitude'),
-                        location_data.get('heading'),
-                        location_data.get('accuracy'),
-                        location_data.get('timestamp'),
-                        location_data.get('localTime'),
-                        current_location,
-                        locations,
-                        location_data.get('totalPoints', 0),
-                        location_data.get('status', 'active'),
-                        location_data.get('isActive', True)
-                    ))
-                
+                cursor.execute(*LiveLocationModel.build_in_query(LIVE_TIMESTAMPS_QUERY, officer_ids))
+                live_times = {row['officer_id']: row['timestamp'] for row in cursor.fetchall()}
+                pings = LiveLocationModel.latest_pings(points_by_officer, live_times)
+                written_at = LiveLocationModel._upsert(cursor, pings) if pings else None
+                LocationPointModel.append_points(cursor, history)
                 conn.commit()
-                return True
+        
+        if pings:
+            LiveLocationModel._after_write(pings, written_at)
+        return len(history)
+    
+    @staticmethod
+    def known_officer_ids(officer_ids):
+        """
+        Find which officer IDs exist, in one query.
+        
+        Args:
+            officer_ids (list): Officer IDs to check
+            
+        Returns:
+            set: The IDs present in the officers table
+        """
+        if not officer_ids:
+            return set()
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(*LiveLocationModel.build_in_query(KNOWN_OFFICERS_QUERY, officer_ids))
+                return {row['id'] for row in cursor.fetchall()}
+    
+    @staticmethod
+    def latest_pings(points_by_officer, live_times):
+        """
+        Pick each officer's newest point as the live-location ping, skipping
+        officers whose stored live position is newer (shared with the async model).
+        
+        Args:
+            points_by_officer (dict): officer_id -> points ordered oldest to newest
+            live_times (dict): officer_id -> stored live_locations.timestamp
+            
+        Returns:
+            list: (officer_id, location_data) tuples for the upsert
+        """
+        pings = []
+        for officer_id, points in points_by_officer.items():
+            if not points:
+                continue
+            newest = points[-1]
+            point_time = parse_point_time(newest.get('timestamp'))
+            live_time = live_times.get(officer_id)
+            if point_time is not None and live_time is not None and point_time < live_time:
+                continue
+            pings.append((officer_id, newest))
+        return pings
+    
+    @staticmethod
+    def build_in_query(template, ids):
+        """Fill an ``IN ({ids})`` template with one placeholder per ID"""
+        return template.format(ids=', '.join(['%s'] * len(ids))), list(ids)
+    
+    @staticmethod
+    def get_snapshot(bbox=None, since=None):
+        """
+        Get compact current positions from the in-memory snapshot.
+        
+        Args:
+            bbox (tuple, optional): (min_lng, min_lat, max_lng, max_lat)
+            since (datetime, optional): Only officers seen at or after this time
+            
+        Returns:
+            dict: {'columns': [...], 'rows': [[...], ...], 'generated_at': str}
+        """
+        return live_location_snapshot.query(bbox=bbox, since=since)
+    
+    @staticmethod
+    def get_changes(cursor=None):
+        """
+        Get officers whose position or status changed since a sync cursor.
+        
+        Args:
+            cursor (datetime, optional): High-water mark from a previous call
+            
+        Returns:
+            dict: {'cursor', 'full', 'columns', 'rows', 'removed'}
+        """
+        return live_location_snapshot.changes_since(cursor)
+    
+    @staticmethod
+    def get_nearby(latitude, longitude, radius):
+        """
+        Get active officers within a radius, nearest first.
+        
+        Args:
+            latitude (float): Centre latitude
+            longitude (float): Centre longitude
+            radius (float): Radius in metres
+            
+        Returns:
+            dict: {'columns': [..., 'distance_m'], 'rows': [...], 'generated_at': str}
+        """
+        return live_location_snapshot.nearby(latitude, longitude, radius)
+    
+    @staticmethod
+    def get_nearest(latitude, longitude, k, max_distance=None):
+        """
+        Get the k active officers nearest to a point.
+        
+        Args:
+            latitude (float): Latitude
+            longitude (float): Longitude
+            k (int): Number of officers
+            max_distance (float, optional): Maximum distance in metres
+            
+        Returns:
+            dict: {'columns': [..., 'distance_m'], 'rows': [...], 'generated_at': str}
+        """
+        return live_location_snapshot.nearest(latitude, longitude, k, max_distance)
+    
+    @staticmethod
+    def get_within(vertices):
+        """
+        Get active officers inside a polygon.
+        
+        Args:
+            vertices (list): (lat, lng) tuples
+            
+        Returns:
+            dict: {'columns': [...], 'rows': [...], 'generated_at': str}
+        """
+        return live_location_snapshot.within(vertices)
+    
+    @staticmethod
+    def load_snapshot_rows(tombstones_since):
+        """
+        Load current-position rows for the live map snapshot: every active
+        officer plus officers deactivated since ``tombstones_since`` (needed
+        to tell delta-sync clients which officers to remove).
+        
+        Args:
+            tombstones_since (datetime): Oldest deactivation to include
+            
+        Returns:
+            list: Compact live location dictionaries with officer names
+        """
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT 
+                        ll.officer_id, ll.latitude, ll.longitude, ll.heading, ll.speed,
+                        ll.status, ll.is_active, ll.last_seen, ll.last_updated,
+                        o.staff_name as officer_name
+                    FROM live_locations ll
+                    LEFT JOIN officers o ON ll.officer_id = o.id
+                    WHERE ll.is_active = TRUE OR ll.last_updated >= %s
+                """
+                cursor.execute(query, (tombstones_since,))
+                return cursor.fetchall()
+    
+    @staticmethod
+    def get_trail(officer_id, start_time, end_time, duty_id=None):
+        """
+        Get an officer's recorded points between two timestamps.
+        
+        Args:
+            officer_id (str): Officer ID
+            start_time (datetime): Window start (inclusive)
+            end_time (datetime): Window end (exclusive)
+            duty_id (str, optional): Only points recorded for this duty
+            
+        Returns:
+            list: Point dictionaries ordered by time
+        """
+        points = LocationPointModel.get_trail(officer_id, start_time, end_time, duty_id)
+        if not ARCHIVE_ENABLED or start_time >= LocationPointModel.retention_cutoff():
+            return points
+        
+        # Part of the window is past retention; those points live in location_trails
+        archived = LocationPointModel.get_archived_trail(officer_id, start_time, end_time, duty_id)
+        if points:
+            archived = [point for point in archived if point['ts'] < points[0]['ts']]
+        return archived + points
+    
+    @staticmethod
+    def stream_trail(officer_id, start_time, end_time, duty_id=None):
+        """
+        Get an officer's points for a window as a stream, for windows too
+        long to load at once (archived points are loaded, raw points are
+        read through a server-side cursor).
+        
+        Args:
+            officer_id (str): Officer ID
+            start_time (datetime): Window start (inclusive)
+            end_time (datetime): Window end (exclusive)
+            duty_id (str, optional): Only points recorded for this duty
+            
+        Returns:
+            tuple: (point count, iterator of point dictionaries ordered by time)
+        """
+        count, first_ts = LocationPointModel.count_trail(officer_id, start_time, end_time, duty_id)
+        
+        archived = []
+        if ARCHIVE_ENABLED and start_time < LocationPointModel.retention_cutoff():
+            archived = LocationPointModel.get_archived_trail(officer_id, start_time, end_time, duty_id)
+            if first_ts is not None:
+                archived = [point for point in archived if point['ts'] < first_ts]
+        
+        points = LocationPointModel.iter_trail(officer_id, start_time, end_time, duty_id) if count else iter(())
+        return count + len(archived), itertools.chain(archived, points)
+    
+    @staticmethod
+    def get_encoded_trail(officer_id, start_time, end_time, duty_id=None,
+                          zoom=None, tolerance=None, encoding='polyline'):
+        """
+        Get a trail simplified for display and encoded compactly.
+        
+        Args:
+            officer_id (str): Officer ID
+            start_time (datetime): Window start (inclusive)
+            end_time (datetime): Window end (exclusive)
+            duty_id (str, optional): Only points recorded for this duty
+            zoom (float, optional): Map zoom; drops detail smaller than
+                TRAIL_PIXEL_TOLERANCE pixels at that zoom
+            tolerance (float, optional): Simplification tolerance in metres
+                (overrides zoom)
+            encoding (str): 'polyline' or 'json'
+            
+        Returns:
+            dict: encode_trail output (or 'points' for json) plus officer_id,
+                  duty_id, raw_count and the tolerance applied
+        """
+        points = LiveLocationModel.get_trail(officer_id, start_time, end_time, duty_id)
+        raw_count = len(points)
+        
+        if tolerance is None and zoom is not None and points:
+            tolerance = zoom_tolerance(zoom, float(points[0]['latitude']), TRAIL_PIXEL_TOLERANCE)
+        points = simplify(points, tolerance or 0)
+        
+        if encoding == 'json':
+            trail = {
+                'encoding': 'json',
+                'count': len(points),
+                'points': [
+                    {
+                        'ts': point['ts'].isoformat(),
+                        'latitude': float(point['latitude']),
+                        'longitude': float(point['longitude']),
+                        'speed': float(point['speed']) if point.get('speed') is not None else None,
+                        'heading': float(point['heading']) if point.get('heading') is not None else None
+                    }
+                    for point in points
+                ]
+            }
+        else:
+            trail = encode_trail(points, TRAIL_PRECISION)
+        
+        trail.update({
+            'officer_id': officer_id,
+            'duty_id': duty_id,
+            'raw_count': raw_count,
+            'tolerance_m': round(tolerance, 2) if tolerance else 0
+        })
+        return trail
+    
+    @staticmethod
+    def _upsert(cursor, pings):
+        """
+        Execute the multi-row live location upsert on an open cursor.
+        
+        Returns:
+            datetime: UTC write time stored as last_updated/last_seen
+        """
+        query, params, written_at = LiveLocationModel.build_upsert(pings)
+        cursor.execute(query, params)
+        return written_at
+    
+    @staticmethod
+    def build_upsert(pings):
+        """
+        Build the multi-row live location upsert (shared with the async model).
+        
+        Args:
+            pings (list): List of (officer_id, location_data) tuples
+            
+        Returns:
+            tuple: (query, params, written_at)
+        """
+        written_at = datetime.utcnow().replace(microsecond=0)
+        placeholders = []
+        params = []
+        for officer_id, location_data in pings:
+            placeholders.append(UPSERT_ROW)
+            params.extend((
+                officer_id,
+                officer_id,
+                location_data.get('latitude'),
+                location_data.get('longitude'),
+                location_data.get('speed', 0),
+                location_data.get('altitude'),
+                location_data.get('heading'),
+                location_data.get('accuracy'),
+                parse_point_time(location_data.get('timestamp')),
+                location_data.get('localTime'),
+                json.dumps(location_data.get('currentLocation', {})),
+                location_data.get('totalPoints', 0),
+                written_at,
+                written_at,
+                written_at,
+                location_data.get('status', 'active'),
+                location_data.get('isActive', True)
+            ))
+        
+        return UPSERT_QUERY.format(rows=', '.join(placeholders)), params, written_at
+    
+    @staticmethod
+    def _after_write(pings, written_at):
+        """Propagate committed location writes to this and the other workers"""
+        LiveLocationModel._apply_to_consumers(pings, written_at)
+        reference_cache.notify(CACHE_NAMESPACE, {'pings': pings, 'written_at': written_at})
+        # Only the worker that wrote the pings checks them
+        try:
+            DutyModel.check_geofences(pings, written_at)
+        except Exception as e:
+            logger.error(f"Geofence check failed: {str(e)}")
+    
+    @staticmethod
+    def _apply_to_consumers(pings, written_at):
+        """Propagate location writes to the in-memory snapshot and streams"""
+        try:
+            live_location_snapshot.apply(pings, written_at)
+        except Exception as e:
+            logger.error(f"Failed to update live location snapshot: {str(e)}")
+        try:
+            location_stream_hub.publish(pings, written_at)
+        except Exception as e:
+            logger.error(f"Failed to publish live location updates: {str(e)}")
+
+
+live_location_snapshot = LiveLocationSnapshot(
+    LiveLocationModel.load_snapshot_rows,
+    max_age=float(os.getenv('LIVE_SNAPSHOT_MAX_AGE', '5')),
+    tombstone_window=float(os.getenv('LIVE_SYNC_TOMBSTONE_SECONDS', '3600')),
+    grid_cell_size=float(os.getenv('LIVE_GRID_CELL_METRES', '250')),
+    sync_overlap=float(os.getenv('LIVE_SYNC_OVERLAP_SECONDS', '5'))
+)
+
+
+def _on_remote_locations(payload):
+    """Apply location writes reported by another worker"""
+    if payload is None:
+        # Messages may have been missed; reload from MySQL
+        live_location_snapshot.invalidate()
+        return
+    pings = [(officer_id, location_data) for officer_id, location_data in payload['pings']]
+    LiveLocationModel._apply_to_consumers(pings, payload['written_at'])
+
+
+reference_cache.add_listener(CACHE_NAMESPACE, _on_remote_locations)
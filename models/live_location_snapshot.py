@@ -0,0 +1,369 @@
+"""
+Live Location Snapshot
+In-memory current-position table served to dispatch map consoles
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from utils.logger import logger
+from .spatial_index import SpatialGrid
+
+
+# Column order of each row in the columnar snapshot response
+SNAPSHOT_COLUMNS = [
+    'officer_id', 'officer_name', 'latitude', 'longitude',
+    'heading', 'speed', 'status', 'last_seen'
+]
+
+
+def _to_float(value):
+    return float(value) if value is not None else None
+
+
+class LiveLocationSnapshot:
+    """
+    Cache of every active officer's current position.
+
+    Reads are answered from memory. The cache is patched in place by the
+    write path (``apply``) and fully reloaded from MySQL when it is older
+    than ``max_age`` seconds, which also picks up writes made by other
+    worker processes.
+
+    Officers deactivated within ``tombstone_window`` seconds are kept as
+    tombstones so delta-sync clients can be told to remove them. Each entry
+    carries its ``last_updated`` time, and the newest one is the sync cursor.
+    Write times are taken before commit and other workers' writes may only
+    show up on reload, so a write can become visible here with a time older
+    than a cursor already handed out. Deltas therefore start ``max_age +
+    sync_overlap`` seconds before the cursor and clients de-duplicate.
+
+    Active officers with a position are also kept in a spatial grid for
+    radius, nearest and polygon queries; it is patched by ``apply`` and
+    rebuilt on reload.
+    """
+
+    def __init__(self, loader, max_age=5.0, tombstone_window=3600.0, grid_cell_size=250.0,
+                 sync_overlap=5.0):
+        """
+        Args:
+            loader (callable): Called with the oldest deactivation time to
+                include; returns live_locations rows joined to officer names
+            max_age (float): Seconds before the cache is reloaded
+            tombstone_window (float): Seconds deactivated officers are kept
+            grid_cell_size (float): Spatial grid cell edge in metres
+            sync_overlap (float): Extra seconds re-sent before a delta cursor,
+                covering commit delay and clock skew between workers
+        """
+        self.loader = loader
+        self.sync_overlap = sync_overlap
+        self.max_age = max_age
+        self.tombstone_window = tombstone_window
+        self.grid_cell_size = grid_cell_size
+
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._entries = {}
+        self._grid = SpatialGrid(grid_cell_size)
+        self._loaded_at = None
+        self._loaded_mono = 0.0
+        self._stale = True
+        self._stats = {'reads': 0, 'reloads': 0, 'applied': 0, 'spatial_queries': 0}
+
+    # ------------------------------------------------------------------
+    # Write side
+    # ------------------------------------------------------------------
+
+    def apply(self, pings, written_at=None):
+        """
+        Patch cached positions after a successful write.
+
+        Args:
+            pings (list): List of (officer_id, location_data) tuples
+            written_at (datetime, optional): UTC time stored as last_updated
+        """
+        now = written_at or datetime.utcnow().replace(microsecond=0)
+        with self._lock:
+            for officer_id, location_data in pings:
+                entry = self._entries.get(officer_id)
+                if entry is None:
+                    # Officer name unknown to the cache; pick it up on reload
+                    self._stale = True
+                    continue
+
+                if location_data.get('latitude') is not None:
+                    entry['latitude'] = _to_float(location_data.get('latitude'))
+                    entry['longitude'] = _to_float(location_data.get('longitude'))
+                    entry['heading'] = _to_float(location_data.get('heading'))
+                    entry['speed'] = _to_float(location_data.get('speed', 0))
+                entry['status'] = location_data.get('status', 'active')
+                entry['is_active'] = bool(location_data.get('isActive', True))
+                entry['last_seen'] = now
+                entry['last_updated'] = now
+                self._place(entry)
+            self._stats['applied'] += len(pings)
+
+    def invalidate(self):
+        """Force a reload on the next read"""
+        with self._lock:
+            self._stale = True
+
+    # ------------------------------------------------------------------
+    # Read side
+    # ------------------------------------------------------------------
+
+    def query(self, bbox=None, since=None):
+        """
+        Get current positions in columnar form.
+
+        Args:
+            bbox (tuple, optional): (min_lng, min_lat, max_lng, max_lat)
+            since (datetime, optional): Only officers seen at or after this time
+
+        Returns:
+            dict: {'columns': [...], 'rows': [[...], ...], 'generated_at': str}
+        """
+        self._refresh_if_needed()
+
+        with self._lock:
+            self._stats['reads'] += 1
+            entries = [entry for entry in self._entries.values() if entry['is_active']]
+            generated_at = self._loaded_at
+
+        rows = []
+        for entry in entries:
+            if since and (entry['last_seen'] is None or entry['last_seen'] < since):
+                continue
+            if bbox and not self._in_bbox(entry, bbox):
+                continue
+            rows.append(self._row(entry))
+
+        return {
+            'columns': SNAPSHOT_COLUMNS,
+            'rows': rows,
+            'generated_at': generated_at.isoformat() if generated_at else None
+        }
+
+    def nearby(self, lat, lng, radius):
+        """
+        Get active officers within ``radius`` metres of a point.
+
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            radius (float): Metres
+
+        Returns:
+            dict: {'columns': [..., 'distance_m'], 'rows': [...], 'generated_at': str},
+                  nearest first
+        """
+        self._refresh_if_needed()
+        with self._lock:
+            self._stats['spatial_queries'] += 1
+            found = self._grid.within_radius(lat, lng, radius)
+            return self._distance_rows(found)
+
+    def nearest(self, lat, lng, k, max_distance=None):
+        """
+        Get the ``k`` active officers nearest to a point.
+
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            k (int): Number of officers
+            max_distance (float, optional): Ignore officers further than this (metres)
+
+        Returns:
+            dict: Same shape as ``nearby``
+        """
+        self._refresh_if_needed()
+        with self._lock:
+            self._stats['spatial_queries'] += 1
+            found = self._grid.nearest(lat, lng, k, max_distance)
+            return self._distance_rows(found)
+
+    def within(self, vertices):
+        """
+        Get active officers inside a polygon.
+
+        Args:
+            vertices (list): (lat, lng) tuples
+
+        Returns:
+            dict: {'columns': [...], 'rows': [...], 'generated_at': str}
+        """
+        self._refresh_if_needed()
+        with self._lock:
+            self._stats['spatial_queries'] += 1
+            officer_ids = self._grid.within_polygon(vertices)
+            return {
+                'columns': SNAPSHOT_COLUMNS,
+                'rows': [self._row(self._entries[officer_id]) for officer_id in officer_ids],
+                'generated_at': self._loaded_at.isoformat() if self._loaded_at else None
+            }
+
+    def changes_since(self, cursor=None):
+        """
+        Get officers changed since a sync cursor.
+
+        Officers updated at or after ``cursor`` minus the overlap window are
+        returned as rows and officers deactivated since then are listed in
+        ``removed``. Rows and removals already sent are sent again, so
+        clients must apply them idempotently (upsert by officer_id). A
+        missing cursor, or one older than the tombstone window, gets a full
+        resync with ``full`` set.
+
+        Args:
+            cursor (datetime, optional): ``cursor`` from the previous response
+
+        Returns:
+            dict: {'cursor', 'full', 'columns', 'rows', 'removed'}
+        """
+        self._refresh_if_needed()
+
+        with self._lock:
+            self._stats['reads'] += 1
+            entries = list(self._entries.values())
+            horizon = self._loaded_at - timedelta(seconds=self.tombstone_window)
+
+        full = cursor is None or cursor < horizon
+        since = cursor - timedelta(seconds=self.max_age + self.sync_overlap) if not full else None
+        rows = []
+        removed = []
+        high_water = cursor
+
+        for entry in entries:
+            updated = entry['last_updated']
+            if updated is not None and (high_water is None or updated > high_water):
+                high_water = updated
+
+            if full:
+                if entry['is_active']:
+                    rows.append(self._row(entry))
+            elif updated is not None and updated >= since:
+                if entry['is_active']:
+                    rows.append(self._row(entry))
+                else:
+                    removed.append(entry['officer_id'])
+
+        return {
+            'cursor': high_water.isoformat() if high_water else None,
+            'full': full,
+            'columns': SNAPSHOT_COLUMNS,
+            'rows': rows,
+            'removed': removed
+        }
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Entry count, reads, reloads and applied pings
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['grid_officers'] = len(self._grid)
+            stats['grid_cells'] = self._grid.cell_count
+            stats['age'] = time.monotonic() - self._loaded_mono if self._loaded_at else None
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _refresh_if_needed(self):
+        if not self._needs_reload():
+            return
+
+        # One thread reloads; concurrent readers keep serving the old copy
+        if not self._reload_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if self._needs_reload():
+                self._reload()
+        finally:
+            self._reload_lock.release()
+
+    def _needs_reload(self):
+        with self._lock:
+            if self._stale or self._loaded_at is None:
+                return True
+            return time.monotonic() - self._loaded_mono >= self.max_age
+
+    def _reload(self):
+        tombstones_since = datetime.utcnow() - timedelta(seconds=self.tombstone_window)
+        try:
+            rows = self.loader(tombstones_since)
+        except Exception as e:
+            logger.error(f"Live location snapshot reload failed: {str(e)}")
+            if self._loaded_at is None:
+                raise
+            return
+
+        entries = {}
+        for row in rows:
+            entries[row['officer_id']] = {
+                'officer_id': row['officer_id'],
+                'officer_name': row.get('officer_name'),
+                'latitude': _to_float(row.get('latitude')),
+                'longitude': _to_float(row.get('longitude')),
+                'heading': _to_float(row.get('heading')),
+                'speed': _to_float(row.get('speed')),
+                'status': row.get('status'),
+                'is_active': bool(row.get('is_active')),
+                'last_seen': row.get('last_seen'),
+                'last_updated': row.get('last_updated')
+            }
+
+        grid = SpatialGrid.build({
+            officer_id: (entry['latitude'], entry['longitude'])
+            for officer_id, entry in entries.items()
+            if entry['is_active'] and entry['latitude'] is not None and entry['longitude'] is not None
+        }, self.grid_cell_size)
+
+        with self._lock:
+            self._entries = entries
+            self._grid = grid
+            self._loaded_at = datetime.utcnow()
+            self._loaded_mono = time.monotonic()
+            self._stale = False
+            self._stats['reloads'] += 1
+
+    def _place(self, entry):
+        """Move an entry in the grid after it changed (lock held)"""
+        if entry['is_active'] and entry['latitude'] is not None and entry['longitude'] is not None:
+            self._grid.upsert(entry['officer_id'], entry['latitude'], entry['longitude'])
+        else:
+            self._grid.remove(entry['officer_id'])
+
+    def _distance_rows(self, found):
+        """Rows with a distance column for (distance, officer_id) results (lock held)"""
+        return {
+            'columns': SNAPSHOT_COLUMNS + ['distance_m'],
+            'rows': [self._row(self._entries[officer_id]) + [round(distance, 1)] for distance, officer_id in found],
+            'generated_at': self._loaded_at.isoformat() if self._loaded_at else None
+        }
+
+    @staticmethod
+    def _in_bbox(entry, bbox):
+        min_lng, min_lat, max_lng, max_lat = bbox
+        lat, lng = entry['latitude'], entry['longitude']
+        if lat is None or lng is None:
+            return False
+        return min_lat <= lat <= max_lat and min_lng <= lng <= max_lng
+
+    @staticmethod
+    def _row(entry):
+        last_seen = entry['last_seen']
+        return [
+            entry['officer_id'],
+            entry['officer_name'],
+            entry['latitude'],
+            entry['longitude'],
+            entry['heading'],
+            entry['speed'],
+            entry['status'],
+            last_seen.isoformat() if hasattr(last_seen, 'isoformat') else last_seen
+        ]
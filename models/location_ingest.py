@@ -0,0 +1,277 @@
+"""
+Location Ingest Queue
+Buffers live-location pings in memory and writes them to MySQL in batches
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from utils.logger import logger
+
+
+class LocationIngestQueue:
+    """
+    Bounded in-process queue drained by a background flusher thread.
+
+    Pings are collected until ``batch_size`` is reached or ``flush_interval``
+    seconds have passed since the first ping of the batch, grouped per
+    officer (oldest first) and handed to ``writer`` as one batch. The writer
+    keeps every ping as history and only coalesces the live-location upsert
+    to each officer's latest ping. When the queue is full, ``submit``
+    returns False so the caller can write synchronously instead
+    (backpressure).
+    """
+
+    def __init__(self, writer, max_queue=10000, batch_size=500, flush_interval=0.25,
+                 enqueue_timeout=0.05):
+        """
+        Args:
+            writer (callable): Called with a dict of officer_id -> list of
+                location_data dicts ordered oldest to newest; must write them
+                in one round trip
+            max_queue (int): Maximum pings waiting to be flushed
+            batch_size (int): Maximum pings per flush
+            flush_interval (float): Maximum seconds a ping waits before flushing
+            enqueue_timeout (float): Seconds ``submit`` blocks on a full queue
+        """
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.pid = os.getpid()
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'rejected': 0,
+            'flushed': 0,
+            'coalesced': 0,
+            'failed': 0,
+            'batches': 0,
+            'batch_size_last': 0,
+            'batch_size_max': 0,
+            'flush_latency_total': 0.0,
+            'flush_latency_max': 0.0,
+            'queue_delay_max': 0.0
+        }
+
+    def start(self):
+        """Start the background flusher thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='location-ingest', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """Stop the flusher after draining everything already queued"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._drain()
+
+    def submit(self, officer_id, location_data):
+        """
+        Queue a ping for the next batch.
+
+        Args:
+            officer_id (str): Officer ID
+            location_data (dict): Location update data
+
+        Returns:
+            bool: True if queued, False if the queue is full
+        """
+        try:
+            self._queue.put((officer_id, location_data, time.monotonic()),
+                            timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._count('rejected')
+            return False
+
+        self._count('submitted')
+        return True
+
+    def stats(self):
+        """
+        Snapshot of ingest counters.
+
+        Returns:
+            dict: Queue depth, batch sizes and flush latencies
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        batches = stats['batches']
+        stats['queue_depth'] = self._queue.qsize()
+        stats['batch_size_avg'] = stats['flushed'] / batches if batches else 0.0
+        stats['flush_latency_avg'] = stats['flush_latency_total'] / batches if batches else 0.0
+        stats['running'] = bool(self._thread and self._thread.is_alive())
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = first[2] + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    # Wake up regularly so stop() does not wait out a long interval
+                    batch.append(self._queue.get(timeout=min(remaining, 0.1)))
+                except queue.Empty:
+                    if self._stopping.is_set():
+                        break
+
+            self._flush(batch)
+
+    def _drain(self):
+        """Flush whatever is left in the queue from the calling thread"""
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._flush(batch)
+
+    def _flush(self, batch):
+        # Group pings per officer in arrival order; order of officers follows
+        # their first ping
+        points_by_officer = {}
+        for officer_id, location_data, _ in batch:
+            points_by_officer.setdefault(officer_id, []).append(location_data)
+
+        started = time.monotonic()
+        try:
+            self.writer(points_by_officer)
+            failed = 0
+        except Exception as e:
+            logger.error(f"Batched location write failed, retrying individually: {str(e)}")
+            failed = self._write_individually(points_by_officer)
+        latency = time.monotonic() - started
+
+        with self._lock:
+            stats = self._stats
+            stats['batches'] += 1
+            stats['flushed'] += len(batch) - failed
+            # Pings folded into another ping's live-location upsert
+            stats['coalesced'] += len(batch) - len(points_by_officer)
+            stats['failed'] += failed
+            stats['batch_size_last'] = len(batch)
+            stats['batch_size_max'] = max(stats['batch_size_max'], len(batch))
+            stats['flush_latency_total'] += latency
+            stats['flush_latency_max'] = max(stats['flush_latency_max'], latency)
+            stats['queue_delay_max'] = max(stats['queue_delay_max'], started - batch[0][2])
+
+    def _write_individually(self, points_by_officer):
+        """Isolate bad officers after a failed batch; returns the failed ping count"""
+        failed = 0
+        for officer_id, points in points_by_officer.items():
+            try:
+                self.writer({officer_id: points})
+            except Exception as e:
+                failed += len(points)
+                logger.error(f"Dropping {len(points)} location pings for officer {officer_id}: {str(e)}")
+        return failed
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+
+# ============================================================================
+# PROCESS-WIDE INSTANCE
+# ============================================================================
+
+LIVE_LOCATION_INGEST_MODE = os.getenv('LIVE_LOCATION_INGEST_MODE', 'sync').lower()
+LIVE_LOCATION_QUEUE_SIZE = int(os.getenv('LIVE_LOCATION_QUEUE_SIZE', '10000'))
+LIVE_LOCATION_BATCH_SIZE = int(os.getenv('LIVE_LOCATION_BATCH_SIZE', '500'))
+LIVE_LOCATION_FLUSH_MS = int(os.getenv('LIVE_LOCATION_FLUSH_MS', '250'))
+
+_ingest_queue = None
+_ingest_lock = threading.Lock()
+
+
+def get_ingest_queue(writer):
+    """
+    Get the running ingest queue for this process, or None when batched
+    ingest is disabled (LIVE_LOCATION_INGEST_MODE != 'batched').
+
+    Args:
+        writer (callable): Batch writer used if the queue has to be created
+
+    Returns:
+        LocationIngestQueue: Running queue, or None
+    """
+    global _ingest_queue
+    if LIVE_LOCATION_INGEST_MODE != 'batched':
+        return None
+
+    pid = os.getpid()
+    if _ingest_queue is None or _ingest_queue.pid != pid:
+        with _ingest_lock:
+            if _ingest_queue is None or _ingest_queue.pid != pid:
+                _ingest_queue = LocationIngestQueue(
+                    writer,
+                    max_queue=LIVE_LOCATION_QUEUE_SIZE,
+                    batch_size=LIVE_LOCATION_BATCH_SIZE,
+                    flush_interval=LIVE_LOCATION_FLUSH_MS / 1000.0
+                )
+                _ingest_queue.start()
+                atexit.register(_ingest_queue.stop)
+    return _ingest_queue
+
+
+def stop_ingest_queue(timeout=5):
+    """
+    Flush and stop this process's ingest queue, if one is running.
+    Called from Gunicorn's ``worker_exit`` hook so pings answered with 202
+    are written before a worker is stopped or recycled; atexit alone does
+    not run on every worker shutdown path.
+
+    Args:
+        timeout (float): Seconds to wait for the flusher thread's current batch
+
+    Returns:
+        int: Pings that were still queued when stopping
+    """
+    if _ingest_queue is None or _ingest_queue.pid != os.getpid():
+        return 0
+
+    pending = _ingest_queue.stats()['queue_depth']
+    _ingest_queue.stop(timeout)
+    if pending:
+        logger.info(f"Flushed {pending} queued location pings on worker exit")
+    return pending
+
+
+def get_ingest_stats():
+    """
+    Get ingest queue statistics for this process.
+
+    Returns:
+        dict: Queue counters, or {'mode': 'sync'} when batching is disabled
+    """
+    if _ingest_queue is None or _ingest_queue.pid != os.getpid():
+        return {'mode': LIVE_LOCATION_INGEST_MODE}
+
+    stats = _ingest_queue.stats()
+    stats['mode'] = LIVE_LOCATION_INGEST_MODE
+    return stats
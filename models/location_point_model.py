@@ -0,0 +1,466 @@
+"""
+Location Point Model
+Handles the append-only, monthly-partitioned GPS point history
+"""
+
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from .db import get_connection, stream_rows
+from .trail_codec import DEFAULT_PRECISION, decode_trail, encode_trail, simplify
+
+
+# Points older than the retention window are dropped with their partition.
+# With TRAIL_ARCHIVE_ENABLED they are first kept as simplified, encoded
+# trails in location_trails (migration_location_trails.sql).
+RETENTION_MONTHS = int(os.getenv('LOCATION_POINTS_RETENTION_MONTHS', '6'))
+ARCHIVE_ENABLED = os.getenv('TRAIL_ARCHIVE_ENABLED', 'false').lower() == 'true'
+ARCHIVE_TOLERANCE = float(os.getenv('TRAIL_ARCHIVE_TOLERANCE_METRES', '5'))
+TRAIL_PRECISION = int(os.getenv('TRAIL_PRECISION', str(DEFAULT_PRECISION)))
+
+
+POINT_INSERT_QUERY = """
+    INSERT INTO location_points
+    (officer_id, duty_id, ts, latitude, longitude, speed, heading, accuracy)
+    VALUES {rows}
+"""
+
+POINT_ROW = "(%s, %s, %s, %s, %s, %s, %s, %s)"
+
+TRAIL_UPSERT_QUERY = """
+    INSERT INTO location_trails
+    (officer_id, duty_id, day, start_ts, end_ts, point_count, raw_count,
+     coord_precision, path, times)
+    VALUES {rows}
+    ON DUPLICATE KEY UPDATE
+        start_ts = VALUES(start_ts), end_ts = VALUES(end_ts),
+        point_count = VALUES(point_count), raw_count = VALUES(raw_count),
+        coord_precision = VALUES(coord_precision),
+        path = VALUES(path), times = VALUES(times)
+"""
+
+TRAIL_ROW = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+
+PARTITION_NAME = re.compile(r'^p(\d{4})(\d{2})$')
+
+
+def parse_point_time(value):
+    """
+    Convert a device timestamp to a naive UTC datetime.
+
+    Args:
+        value: ISO 8601 string, epoch seconds/milliseconds, or datetime
+
+    Returns:
+        datetime: Naive UTC datetime, or None if the value is not usable
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Devices send epoch milliseconds; anything this large is not seconds
+        seconds = value / 1000.0 if value > 1e11 else value
+        return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+    elif isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def month_start(year, month):
+    while month > 12:
+        year, month = year + 1, month - 12
+    while month < 1:
+        year, month = year - 1, month + 12
+    return datetime(year, month, 1)
+
+
+class LocationPointModel:
+    """Model for location point history operations"""
+
+    @staticmethod
+    def append_points(cursor, officer_points):
+        """
+        Append GPS points in one multi-row insert on an open cursor.
+        Points without coordinates are skipped.
+
+        Args:
+            cursor: Cursor inside the caller's transaction
+            officer_points (list): List of (officer_id, location_data) tuples
+
+        Returns:
+            int: Number of points inserted
+        """
+        query, params, count = LocationPointModel.build_insert(officer_points)
+        if count:
+            cursor.execute(query, params)
+        return count
+
+    @staticmethod
+    def build_insert(officer_points):
+        """
+        Build the multi-row insert for append_points (shared with the async model).
+
+        Args:
+            officer_points (list): List of (officer_id, location_data) tuples
+
+        Returns:
+            tuple: (query, params, point count); query is None if no point has
+                   coordinates
+        """
+        placeholders = []
+        params = []
+        received_at = datetime.utcnow()
+
+        for officer_id, point in officer_points:
+            if point.get('latitude') is None or point.get('longitude') is None:
+                continue
+            placeholders.append(POINT_ROW)
+            params.extend((
+                officer_id,
+                point.get('dutyId') or point.get('duty_id'),
+                parse_point_time(point.get('timestamp')) or received_at,
+                point['latitude'],
+                point['longitude'],
+                point.get('speed'),
+                point.get('heading'),
+                point.get('accuracy')
+            ))
+
+        if not placeholders:
+            return None, [], 0
+        return POINT_INSERT_QUERY.format(rows=', '.join(placeholders)), params, len(placeholders)
+
+    @staticmethod
+    def get_trail(officer_id, start_time, end_time, duty_id=None):
+        """
+        Get an officer's points between two timestamps (range scan on
+        idx_officer_ts, pruned to the partitions covering the window).
+
+        Args:
+            officer_id (str): Officer ID
+            start_time (datetime): Window start (inclusive)
+            end_time (datetime): Window end (exclusive)
+            duty_id (str, optional): Only points recorded for this duty
+
+        Returns:
+            list: Point dictionaries ordered by time
+        """
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT ts, latitude, longitude, speed, heading, accuracy, duty_id
+                    FROM location_points
+                    WHERE officer_id = %s AND ts >= %s AND ts < %s
+                """
+                params = [officer_id, start_time, end_time]
+
+                if duty_id:
+                    query += " AND duty_id = %s"
+                    params.append(duty_id)
+
+                query += " ORDER BY ts ASC"
+                cursor.execute(query, params)
+                return cursor.fetchall()
+
+    @staticmethod
+    def count_trail(officer_id, start_time, end_time, duty_id=None):
+        """
+        Count an officer's points in a window without reading them
+        (index range scan on idx_officer_ts).
+        
+        Returns:
+            tuple: (count, time of the first point or None)
+        """
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT COUNT(*) AS points, MIN(ts) AS first_ts
+                    FROM location_points
+                    WHERE officer_id = %s AND ts >= %s AND ts < %s
+                """
+                params = [officer_id, start_time, end_time]
+                
+                if duty_id:
+                    query += " AND duty_id = %s"
+                    params.append(duty_id)
+                
+                cursor.execute(query, params)
+                row = cursor.fetchone()
+                return row['points'], row['first_ts']
+    
+    @staticmethod
+    def iter_trail(officer_id, start_time, end_time, duty_id=None):
+        """
+        Stream an officer's points in a window through an unbuffered
+        (server-side) cursor, so memory does not grow with the window.
+        The pooled connection is held until the generator is exhausted
+        or closed.
+        
+        Args:
+            officer_id (str): Officer ID
+            start_time (datetime): Window start (inclusive)
+            end_time (datetime): Window end (exclusive)
+            duty_id (str, optional): Only points recorded for this duty
+            
+        Yields:
+            dict: Points ordered by time, as returned by get_trail
+        """
+        query = """
+            SELECT ts, latitude, longitude, speed, heading, accuracy, duty_id
+            FROM location_points
+            WHERE officer_id = %s AND ts >= %s AND ts < %s
+        """
+        params = [officer_id, start_time, end_time]
+        
+        if duty_id:
+            query += " AND duty_id = %s"
+            params.append(duty_id)
+        
+        query += " ORDER BY ts ASC"
+        yield from stream_rows(query, params)
+    
+    # ------------------------------------------------------------------
+    # Archived trails
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def retention_cutoff(now=None):
+        """
+        Oldest time still held in location_points once retention has run
+        (the current month plus RETENTION_MONTHS full months before it).
+        """
+        now = now or datetime.utcnow()
+        return month_start(now.year, now.month - RETENTION_MONTHS)
+
+    @staticmethod
+    def get_archived_trail(officer_id, start_time, end_time, duty_id=None):
+        """
+        Get an officer's archived points between two timestamps.
+
+        Args:
+            officer_id (str): Officer ID
+            start_time (datetime): Window start (inclusive)
+            end_time (datetime): Window end (exclusive)
+            duty_id (str, optional): Only points recorded for this duty
+
+        Returns:
+            list: Point dictionaries ordered by time (speed, heading and
+                  accuracy are not archived and come back as None)
+        """
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT duty_id, start_ts, coord_precision, path, times
+                    FROM location_trails
+                    WHERE officer_id = %s AND day >= %s AND day <= %s
+                      AND start_ts < %s AND end_ts >= %s
+                """
+                params = [officer_id, start_time.date(), end_time.date(), end_time, start_time]
+
+                if duty_id:
+                    query += " AND duty_id = %s"
+                    params.append(duty_id)
+
+                cursor.execute(query, params)
+                trails = cursor.fetchall()
+
+        points = []
+        for trail in trails:
+            for point in decode_trail(trail):
+                if start_time <= point['ts'] < end_time:
+                    point.update(speed=None, heading=None, accuracy=None, duty_id=trail['duty_id'] or None)
+                    points.append(point)
+        points.sort(key=lambda point: point['ts'])
+        return points
+
+    @staticmethod
+    def archive_day(day, tolerance=ARCHIVE_TOLERANCE, precision=TRAIL_PRECISION):
+        """
+        Store one day of points as one encoded trail per officer and duty.
+        Each officer's day is read on its own (idx_officer_ts range scan),
+        so memory stays bounded by a single trail. Re-running a day
+        overwrites its trails.
+
+        Args:
+            day (date): UTC day to archive
+            tolerance (float): Simplification tolerance in metres (0 keeps every point)
+            precision (int): Decimal places kept for coordinates
+
+        Returns:
+            dict: {'trails': int, 'raw_points': int, 'stored_points': int}
+        """
+        start = datetime(day.year, day.month, day.day)
+        end = start + timedelta(days=1)
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT DISTINCT officer_id FROM location_points WHERE ts >= %s AND ts < %s",
+                    (start, end)
+                )
+                officer_ids = [row['officer_id'] for row in cursor.fetchall()]
+
+        summary = {'trails': 0, 'raw_points': 0, 'stored_points': 0}
+        for officer_id in officer_ids:
+            by_duty = {}
+            for point in LocationPointModel.get_trail(officer_id, start, end):
+                by_duty.setdefault(point.get('duty_id') or '', []).append(point)
+
+            params = []
+            for duty_key, points in by_duty.items():
+                kept = simplify(points, tolerance)
+                encoded = encode_trail(kept, precision)
+                params.extend((
+                    officer_id, duty_key, start.date(), points[0]['ts'], points[-1]['ts'],
+                    len(kept), len(points), precision, encoded['path'], encoded['times']
+                ))
+                summary['raw_points'] += len(points)
+                summary['stored_points'] += len(kept)
+
+            if by_duty:
+                with get_connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(TRAIL_UPSERT_QUERY.format(rows=', '.join([TRAIL_ROW] * len(by_duty))), params)
+                        conn.commit()
+                summary['trails'] += len(by_duty)
+
+        return summary
+
+    @staticmethod
+    def archive_before(horizon, tolerance=ARCHIVE_TOLERANCE):
+        """
+        Archive every day of points older than ``horizon``.
+
+        Args:
+            horizon (datetime): Points before this time are archived
+            tolerance (float): Simplification tolerance in metres
+
+        Returns:
+            dict: Totals as returned by archive_day, plus 'days'
+        """
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT MIN(ts) AS first_ts FROM location_points WHERE ts < %s", (horizon,))
+                row = cursor.fetchone()
+
+        totals = {'days': 0, 'trails': 0, 'raw_points': 0, 'stored_points': 0}
+        day = row['first_ts'].date() if row and row['first_ts'] else None
+        while day is not None and datetime(day.year, day.month, day.day) < horizon:
+            summary = LocationPointModel.archive_day(day, tolerance)
+            totals['days'] += 1
+            for key, value in summary.items():
+                totals[key] += value
+            day += timedelta(days=1)
+        return totals
+
+    # ------------------------------------------------------------------
+    # Partition maintenance
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_partitions():
+        """
+        List the partitions of location_points with their upper bounds.
+
+        Returns:
+            list: (name, upper_bound) tuples in ascending order; the bound is
+                  None for the MAXVALUE partition
+        """
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS bound
+                    FROM information_schema.PARTITIONS
+                    WHERE TABLE_SCHEMA = DATABASE()
+                      AND TABLE_NAME = 'location_points'
+                      AND PARTITION_NAME IS NOT NULL
+                    ORDER BY PARTITION_ORDINAL_POSITION
+                """)
+                partitions = []
+                for row in cursor.fetchall():
+                    bound = (row['bound'] or '').strip("'")
+                    try:
+                        upper = datetime.fromisoformat(bound)
+                    except ValueError:
+                        upper = None
+                    partitions.append((row['name'], upper))
+                return partitions
+
+    @staticmethod
+    def add_month_partitions(months_ahead=3, now=None):
+        """
+        Split p_future so every month up to ``months_ahead`` from now has
+        its own partition.
+
+        Args:
+            months_ahead (int): Number of future months to prepare
+            now (datetime, optional): Reference time (defaults to UTC now)
+
+        Returns:
+            list: Names of partitions created
+        """
+        now = now or datetime.utcnow()
+        bounds = [upper for _, upper in LocationPointModel.get_partitions() if upper]
+        last_upper = max(bounds) if bounds else None
+
+        definitions = []
+        created = []
+        for offset in range(months_ahead + 1):
+            month = month_start(now.year, now.month + offset)
+            # Only months above the highest existing bound can be split off p_future
+            if last_upper and month < last_upper:
+                continue
+            name = month.strftime('p%Y%m')
+            upper = month_start(month.year, month.month + 1)
+            definitions.append(f"PARTITION {name} VALUES LESS THAN ('{upper:%Y-%m-%d}')")
+            created.append(name)
+
+        if definitions:
+            definitions.append("PARTITION p_future VALUES LESS THAN (MAXVALUE)")
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "ALTER TABLE location_points REORGANIZE PARTITION p_future INTO ("
+                        + ', '.join(definitions) + ")"
+                    )
+
+        return created
+
+    @staticmethod
+    def drop_partitions_before(cutoff):
+        """
+        Remove history older than ``cutoff`` a whole partition at a time.
+        Monthly partitions are dropped; the catch-all p_history partition
+        is truncated once everything it can hold is past the cutoff.
+
+        Args:
+            cutoff (datetime): Oldest timestamp to keep
+
+        Returns:
+            list: Names of partitions dropped or truncated
+        """
+        dropped = []
+        truncated = []
+        for name, upper in LocationPointModel.get_partitions():
+            if upper is None or upper > cutoff:
+                continue
+            if PARTITION_NAME.match(name):
+                dropped.append(name)
+            else:
+                truncated.append(name)
+
+        if dropped or truncated:
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    if dropped:
+                        cursor.execute(f"ALTER TABLE location_points DROP PARTITION {', '.join(dropped)}")
+                    if truncated:
+                        cursor.execute(f"ALTER TABLE location_points TRUNCATE PARTITION {', '.join(truncated)}")
+
+        return dropped + truncated
@@ -0,0 +1,318 @@
+"""
+Location Stream Hub
+In-process fan-out of committed live-location writes to streaming subscribers
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from utils.logger import logger
+
+
+class LocationSubscription:
+    """
+    One streaming client's filters and pending events.
+
+    Pending events are keyed by officer, so a burst of updates for the same
+    officer collapses to the newest one and the buffer can never hold more
+    than one event per officer. A bbox subscriber also remembers which
+    officers it was last shown inside the box, so it can be told to remove
+    one that moves out. A subscriber that falls more than
+    ``max_pending`` officers or ``max_lag`` seconds behind is dropped.
+    """
+
+    def __init__(self, officer_ids=None, duty_ids=None, duty_officer_ids=None, bbox=None,
+                 max_pending=1000, max_lag=30.0):
+        """
+        Args:
+            officer_ids (iterable, optional): Only these officers
+            duty_ids (iterable, optional): Only pings tagged with these duties
+                or from officers in ``duty_officer_ids``
+            duty_officer_ids (iterable, optional): Officers assigned to ``duty_ids``
+            bbox (tuple, optional): (min_lng, min_lat, max_lng, max_lat)
+            max_pending (int): Pending officers before the subscriber is dropped
+            max_lag (float): Seconds the oldest pending event may wait
+        """
+        self.officer_ids = set(officer_ids) if officer_ids else None
+        self.duty_ids = set(duty_ids) if duty_ids else None
+        self.duty_officer_ids = set(duty_officer_ids or ())
+        self.bbox = bbox
+        self.max_pending = max_pending
+        self.max_lag = max_lag
+
+        self.dropped = False
+        self.delivered = 0
+        self.coalesced = 0
+
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()
+        self._oldest = None
+        self._inside = set()
+
+    def matches(self, officer_id, event):
+        """Check an event against this subscriber's filters"""
+        if not self._selects(officer_id, event):
+            return False
+        return not (self.bbox and event.get('active')) or self._in_bbox(event)
+
+    def route(self, officer_id, event):
+        """
+        Decide which event, if any, this subscriber should receive.
+
+        Unlike ``matches`` this remembers the officers delivered inside the
+        bbox, so an officer that moves out gets a ``remove`` instead of
+        silently disappearing from the feed.
+
+        Returns:
+            str: 'position', 'remove' or None when nothing is sent
+        """
+        if not self._selects(officer_id, event):
+            return None
+        if not event.get('active'):
+            if self.bbox:
+                with self._cond:
+                    self._inside.discard(officer_id)
+            return 'remove'
+        if not self.bbox:
+            return 'position'
+
+        inside = self._in_bbox(event)
+        with self._cond:
+            if inside:
+                self._inside.add(officer_id)
+                return 'position'
+            if officer_id in self._inside:
+                self._inside.discard(officer_id)
+                return 'remove'
+        return None
+
+    def _selects(self, officer_id, event):
+        """Officer and duty filters"""
+        if self.officer_ids is not None and officer_id not in self.officer_ids:
+            return False
+        if self.duty_ids is not None:
+            if event.get('duty_id') not in self.duty_ids and officer_id not in self.duty_officer_ids:
+                return False
+        return True
+
+    def _in_bbox(self, event):
+        """Check an event's position against the bbox"""
+        min_lng, min_lat, max_lng, max_lat = self.bbox
+        lat, lng = event.get('latitude'), event.get('longitude')
+        if lat is None or lng is None:
+            return False
+        return min_lat <= lat <= max_lat and min_lng <= lng <= max_lng
+
+    def offer(self, officer_id, message):
+        """
+        Queue a serialized event, replacing any pending one for the officer.
+
+        Returns:
+            bool: False if the subscriber was dropped as too slow
+        """
+        with self._cond:
+            if self.dropped:
+                return False
+
+            now = time.monotonic()
+            coalesce = officer_id in self._pending
+            if self._oldest is not None and (
+                    now - self._oldest > self.max_lag
+                    or (not coalesce and len(self._pending) >= self.max_pending)):
+                self.dropped = True
+                self._pending.clear()
+                self._cond.notify_all()
+                return False
+
+            if coalesce:
+                # Move to the end so delivery order follows the latest update
+                self._pending.pop(officer_id)
+                self.coalesced += 1
+            if self._oldest is None:
+                self._oldest = now
+            self._pending[officer_id] = message
+            self._cond.notify_all()
+            return True
+
+    def wait(self, timeout):
+        """
+        Block until events are pending, the subscriber is dropped or the
+        timeout passes.
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            list: Serialized events in arrival order (empty on timeout)
+        """
+        with self._cond:
+            if not self._pending and not self.dropped:
+                self._cond.wait(timeout)
+            messages = list(self._pending.values())
+            self._pending.clear()
+            self._oldest = None
+            self.delivered += len(messages)
+            return messages
+
+    def close(self):
+        """Wake up a waiting reader so it can exit"""
+        with self._cond:
+            self.dropped = True
+            self._cond.notify_all()
+
+
+class LocationStreamHub:
+    """
+    Fans location writes out to subscribers.
+
+    Each ping is turned into an SSE message once per write, however many
+    subscribers there are; delivering it is a filter check and a dict
+    assignment per subscriber. The hub only sees writes made by this
+    process.
+    """
+
+    def __init__(self, max_subscribers=200):
+        """
+        Args:
+            max_subscribers (int): Concurrent subscribers allowed
+        """
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._stats = {'published': 0, 'subscribed': 0, 'rejected': 0, 'dropped': 0}
+
+    def subscribe(self, subscription):
+        """
+        Register a subscriber.
+
+        Returns:
+            bool: False if the hub is at ``max_subscribers``
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self._stats['rejected'] += 1
+                return False
+            self._subscribers.add(subscription)
+            self._stats['subscribed'] += 1
+            return True
+
+    def unsubscribe(self, subscription):
+        """Remove a subscriber"""
+        with self._lock:
+            self._subscribers.discard(subscription)
+        subscription.close()
+
+    def publish(self, pings, written_at):
+        """
+        Deliver committed location writes to matching subscribers.
+
+        Args:
+            pings (list): List of (officer_id, location_data) tuples
+            written_at (datetime): UTC write time, used as the event id
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._stats['published'] += len(pings)
+        if not subscribers:
+            return
+
+        event_id = written_at.isoformat()
+        slow = []
+        for officer_id, location_data in pings:
+            event = position_event(officer_id, location_data, event_id)
+            data = json.dumps(event)
+            messages = {}
+            for subscription in subscribers:
+                if subscription.dropped:
+                    continue
+                kind = subscription.route(officer_id, event)
+                if kind is None:
+                    continue
+                if kind not in messages:
+                    messages[kind] = format_sse(kind, data, event_id)
+                if not subscription.offer(officer_id, messages[kind]):
+                    slow.append(subscription)
+
+        if slow:
+            with self._lock:
+                for subscription in slow:
+                    if subscription in self._subscribers:
+                        self._subscribers.discard(subscription)
+                        self._stats['dropped'] += 1
+            logger.warning(f"Dropped {len(slow)} slow live location stream subscriber(s)")
+
+    def stats(self):
+        """
+        Get hub counters.
+
+        Returns:
+            dict: Subscriber count, published pings, rejected and dropped subscribers
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['subscribers'] = len(self._subscribers)
+            stats['max_subscribers'] = self.max_subscribers
+        return stats
+
+
+def position_event(officer_id, location_data, event_id):
+    """Build the event payload sent to stream subscribers for one ping"""
+    def _float(key, default=None):
+        value = location_data.get(key, default)
+        return float(value) if value is not None else None
+
+    return {
+        'officer_id': officer_id,
+        'duty_id': location_data.get('dutyId') or location_data.get('duty_id'),
+        'latitude': _float('latitude'),
+        'longitude': _float('longitude'),
+        'heading': _float('heading'),
+        'speed': _float('speed', 0),
+        'status': location_data.get('status', 'active'),
+        'active': bool(location_data.get('isActive', True)),
+        'last_seen': event_id
+    }
+
+
+def format_sse(event, data, event_id=None):
+    """Format one Server-Sent Events message"""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def stream_capacity(threads, configured=None):
+    """
+    Streams one worker may hold. Each stream occupies a worker thread for
+    its lifetime, so at least one thread is always left for other requests.
+
+    Args:
+        threads (int): Request threads per worker (GUNICORN_THREADS)
+        configured (int, optional): LIVE_STREAM_MAX_SUBSCRIBERS, if set
+
+    Returns:
+        int: Subscriber cap (0 disables streaming on a single-thread worker)
+    """
+    ceiling = max(threads - 1, 0)
+    if configured is None:
+        return min(max(threads // 2, 1), ceiling)
+    if configured > ceiling:
+        logger.warning(
+            f"LIVE_STREAM_MAX_SUBSCRIBERS={configured} would use every one of the "
+            f"{threads} worker threads; capping at {ceiling}"
+        )
+    return min(configured, ceiling)
+
+
+# Default: half the worker's threads (GUNICORN_THREADS, as in gunicorn.conf.py)
+location_stream_hub = LocationStreamHub(
+    max_subscribers=stream_capacity(
+        int(os.getenv('GUNICORN_THREADS', '8')),
+        int(os.environ['LIVE_STREAM_MAX_SUBSCRIBERS']) if os.getenv('LIVE_STREAM_MAX_SUBSCRIBERS') else None
+    )
+)
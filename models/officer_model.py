@@ -5,19 +5,36 @@ Handles officer data access with parameterized queries
 
 import uuid
 from .db import get_connection
+from .cache import reference_cache
+
+
+# Cache namespace invalidated by every officer write
+CACHE_NAMESPACE = 'officers'
+# Cached duties embed officer names
+DUTY_CACHE_NAMESPACE = 'duties'
 
 
 class OfficerModel:
     """Model for officer operations"""
     
     @staticmethod
-    def get_all_officers():
+    def get_all_officers(with_etag=False):
         """
-        Get all officers from database using parameterized query.
+        Get all officers, served from the reference cache when fresh.
         
+        Args:
+            with_etag (bool): Also return the ETag of the list
+            
         Returns:
-            list: List of officer dictionaries with all fields
+            list: List of officer dictionaries with all fields, or
+                  (list, etag) if with_etag is True
         """
+        entry = reference_cache.get(CACHE_NAMESPACE, 'all', OfficerModel._load_all_officers)
+        return (entry.value, entry.etag) if with_etag else entry.value
+    
+    @staticmethod
+    def _load_all_officers():
+        """Load all officers from database using parameterized query"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
                 # Using parameterized query for safety
@@ -48,6 +65,14 @@ class OfficerModel:
         Returns:
             dict: Officer dictionary or None if not found
         """
+        return reference_cache.get(
+            CACHE_NAMESPACE, f'id:{officer_id}',
+            lambda: OfficerModel._load_officer(officer_id)
+        ).value
+    
+    @staticmethod
+    def _load_officer(officer_id):
+        """Load one officer from database"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
                 # Using parameterized query to prevent SQL injection
@@ -110,7 +135,8 @@ class OfficerModel:
                     officer_data.get('status', 'active')
                 ))
                 conn.commit()
-                return officer_id
+        reference_cache.invalidate(CACHE_NAMESPACE, DUTY_CACHE_NAMESPACE)
+        return officer_id
     
     @staticmethod
     def update_officer(officer_id, officer_data):
@@ -154,7 +180,9 @@ class OfficerModel:
                 
                 cursor.execute(query, tuple(values))
                 conn.commit()
-                return cursor.rowcount > 0
+                updated = cursor.rowcount > 0
+        reference_cache.invalidate(CACHE_NAMESPACE, DUTY_CACHE_NAMESPACE)
+        return updated
     
     @staticmethod
     def delete_officer(officer_id):
@@ -172,4 +200,6 @@ class OfficerModel:
                 query = "DELETE FROM officers WHERE id = %s"
                 cursor.execute(query, (officer_id,))
                 conn.commit()
-                return cursor.rowcount > 0
\ No newline at end of file
+                deleted = cursor.rowcount > 0
+        reference_cache.invalidate(CACHE_NAMESPACE, DUTY_CACHE_NAMESPACE)
+        return deleted
\ No newline at end of file
@@ -0,0 +1,310 @@
+"""
+Connection pool module
+Thread-safe pool of reusable database connections
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from utils.logger import logger
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available within the wait timeout"""
+
+
+class PooledConnection:
+    """A connection checked out of the pool plus its bookkeeping timestamps"""
+
+    __slots__ = ('connection', 'created_at', 'last_used')
+
+    def __init__(self, connection):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """
+    Thread-safe connection pool.
+
+    Connections are created lazily up to ``max_size`` and handed out
+    most-recently-used first so the warmest sockets are reused. Idle
+    connections above ``min_size`` are closed after ``idle_timeout``
+    seconds, every connection is recycled after ``max_lifetime`` seconds,
+    and a connection that sat idle longer than ``ping_interval`` seconds is
+    pinged before being handed out.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, idle_timeout=300,
+                 max_lifetime=1800, ping_interval=30, wait_timeout=10, reset=None):
+        """
+        Args:
+            connect (callable): Factory returning a new DB-API connection
+            min_size (int): Connections kept open even when idle
+            max_size (int): Hard limit on open connections
+            idle_timeout (float): Seconds before an idle connection is closed
+            max_lifetime (float): Seconds before a connection is recycled
+            ping_interval (float): Idle seconds after which checkout pings first
+            wait_timeout (float): Seconds to wait for a free connection
+            reset (callable, optional): Called with a connection on release to
+                discard any open transaction
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        self.wait_timeout = wait_timeout
+        self.reset = reset
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque()
+        self._size = 0
+        self._checked_out = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._stats = {
+            'acquired': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+            'creates': 0,
+            'create_errors': 0,
+            'evicted_idle': 0,
+            'evicted_lifetime': 0,
+            'evicted_broken': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Checkout / checkin
+    # ------------------------------------------------------------------
+
+    def acquire(self):
+        """
+        Check a connection out of the pool.
+
+        Returns:
+            PooledConnection: Slot wrapping a live connection
+
+        Raises:
+            PoolTimeoutError: If none is free within ``wait_timeout`` seconds
+        """
+        started = time.monotonic()
+        deadline = started + self.wait_timeout
+        expired = []
+        waited = False
+
+        try:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+
+                while True:
+                    expired.extend(self._collect_expired_locked(time.monotonic()))
+
+                    if self._idle:
+                        slot = self._idle.pop()
+                        break
+
+                    if self._size < self.max_size:
+                        # Reserve capacity now, connect outside the lock
+                        self._size += 1
+                        slot = None
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {self.wait_timeout}s waiting for a database "
+                            f"connection ({self._checked_out}/{self.max_size} checked out)"
+                        )
+
+                    waited = True
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+                self._checked_out += 1
+                self._stats['acquired'] += 1
+                wait_time = time.monotonic() - started
+                if waited:
+                    self._stats['waits'] += 1
+                self._stats['wait_time_total'] += wait_time
+                self._stats['wait_time_max'] = max(self._stats['wait_time_max'], wait_time)
+        finally:
+            for stale in expired:
+                self._close_quietly(stale.connection)
+
+        try:
+            if slot is None:
+                return self._create()
+            return self._validate(slot)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._checked_out -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, slot, discard=False):
+        """
+        Return a connection to the pool.
+
+        Args:
+            slot (PooledConnection): Slot obtained from ``acquire``
+            discard (bool): Close the connection instead of reusing it
+        """
+        now = time.monotonic()
+        reusable = not discard and not self._closed and self.pid == os.getpid()
+
+        if reusable and now - slot.created_at >= self.max_lifetime:
+            reusable = False
+            self._count('evicted_lifetime')
+
+        if reusable and self.reset:
+            try:
+                self.reset(slot.connection)
+            except Exception as e:
+                logger.warning(f"Discarding pooled connection after failed reset: {str(e)}")
+                reusable = False
+                self._count('evicted_broken')
+
+        with self._cond:
+            self._checked_out -= 1
+            if reusable:
+                slot.last_used = now
+                self._idle.append(slot)
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+        if not reusable:
+            self._close_quietly(slot.connection)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def prefill(self):
+        """Open connections until ``min_size`` are available"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+                self._checked_out += 1
+            try:
+                slot = self._create()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._checked_out -= 1
+                raise
+            self.release(slot)
+
+    def close(self):
+        """Close all idle connections and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for slot in idle:
+            self._close_quietly(slot.connection)
+
+    def stats(self):
+        """
+        Snapshot of pool usage counters.
+
+        Returns:
+            dict: Sizes, wait times and create/eviction counts
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'size': self._size,
+                'idle': len(self._idle),
+                'checked_out': self._checked_out,
+                'waiting': self._waiting,
+                'min_size': self.min_size,
+                'max_size': self.max_size
+            })
+
+        acquired = stats['acquired']
+        stats['wait_time_avg'] = stats['wait_time_total'] / acquired if acquired else 0.0
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _create(self):
+        try:
+            connection = self.connect()
+        except Exception:
+            self._count('create_errors')
+            raise
+        self._count('creates')
+        return PooledConnection(connection)
+
+    def _validate(self, slot):
+        """Ping a connection that has been idle for a while, replacing it if dead"""
+        if time.monotonic() - slot.last_used < self.ping_interval:
+            return slot
+
+        try:
+            slot.connection.ping(reconnect=False)
+            return slot
+        except Exception as e:
+            logger.warning(f"Replacing dead pooled connection: {str(e)}")
+            self._count('evicted_broken')
+            self._close_quietly(slot.connection)
+            return self._create()
+
+    def _collect_expired_locked(self, now):
+        """Pop idle connections past their idle timeout or lifetime (lock held)"""
+        expired = []
+        kept = deque()
+
+        # Oldest-used connections sit at the left of the deque
+        while self._idle:
+            slot = self._idle.popleft()
+            if now - slot.created_at >= self.max_lifetime:
+                self._stats['evicted_lifetime'] += 1
+                expired.append(slot)
+            elif (now - slot.last_used >= self.idle_timeout
+                  and self._size - len(expired) > self.min_size):
+                self._stats['evicted_idle'] += 1
+                expired.append(slot)
+            else:
+                kept.append(slot)
+
+        self._idle = kept
+        self._size -= len(expired)
+        return expired
+
+    def _count(self, key):
+        with self._cond:
+            self._stats[key] += 1
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -0,0 +1,267 @@
+"""
+Spatial Grid Index
+Uniform grid over current officer positions for radius, nearest and polygon queries
+"""
+
+import heapq
+import math
+from .geofence import METRES_PER_DEGREE
+
+
+def point_in_polygon(lat, lng, vertices):
+    """
+    Ray-casting test in degrees (fine for areas a few km across).
+
+    Args:
+        lat (float): Latitude
+        lng (float): Longitude
+        vertices (list): (lat, lng) tuples
+
+    Returns:
+        bool: True if the point is inside
+    """
+    inside = False
+    count = len(vertices)
+    for position in range(count):
+        lat1, lng1 = vertices[position]
+        lat2, lng2 = vertices[(position + 1) % count]
+        if (lat1 > lat) != (lat2 > lat) and lng < lng1 + (lng2 - lng1) * (lat - lat1) / (lat2 - lat1):
+            inside = not inside
+    return inside
+
+
+class SpatialGrid:
+    """
+    Officer positions bucketed into square cells of ``cell_size`` metres.
+
+    Cell width in longitude is fixed from a reference latitude (the first
+    position added, or the mean of a bulk build), so cells stay close to
+    square over a city or district. Distances are equirectangular around
+    the query point, accurate to well under a metre at dispatch ranges.
+
+    The grid is not locked; LiveLocationSnapshot calls it under its own lock.
+    """
+
+    def __init__(self, cell_size=250.0, ref_lat=None):
+        """
+        Args:
+            cell_size (float): Cell edge in metres
+            ref_lat (float, optional): Latitude the cell width is computed at
+        """
+        self.cell_size = cell_size
+        self._lat_step = cell_size / METRES_PER_DEGREE
+        self._lng_step = None
+        self._cells = {}
+        self._positions = {}
+        if ref_lat is not None:
+            self._set_reference(ref_lat)
+
+    @classmethod
+    def build(cls, positions, cell_size=250.0):
+        """
+        Build a grid from many positions at once.
+
+        Args:
+            positions (dict): officer_id -> (lat, lng)
+            cell_size (float): Cell edge in metres
+
+        Returns:
+            SpatialGrid: Populated grid
+        """
+        ref_lat = sum(lat for lat, _ in positions.values()) / len(positions) if positions else None
+        grid = cls(cell_size, ref_lat)
+        for officer_id, (lat, lng) in positions.items():
+            grid.upsert(officer_id, lat, lng)
+        return grid
+
+    def __len__(self):
+        return len(self._positions)
+
+    @property
+    def cell_count(self):
+        return len(self._cells)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def upsert(self, officer_id, lat, lng):
+        """Add an officer or move them to a new position"""
+        if self._lng_step is None:
+            self._set_reference(lat)
+        cell = self._cell(lat, lng)
+        previous = self._positions.get(officer_id)
+        if previous is not None and previous[2] != cell:
+            self._discard(officer_id, previous[2])
+        self._positions[officer_id] = (lat, lng, cell)
+        self._cells.setdefault(cell, {})[officer_id] = (lat, lng)
+
+    def remove(self, officer_id):
+        """Drop an officer (deactivated or without a position)"""
+        previous = self._positions.pop(officer_id, None)
+        if previous is not None:
+            self._discard(officer_id, previous[2])
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def within_radius(self, lat, lng, radius):
+        """
+        Officers within ``radius`` metres.
+
+        Args:
+            lat (float): Centre latitude
+            lng (float): Centre longitude
+            radius (float): Metres
+
+        Returns:
+            list: (distance_m, officer_id) tuples, nearest first
+        """
+        if not self._positions:
+            return []
+        lat_span = radius / METRES_PER_DEGREE
+        lng_span = radius / (METRES_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        scale = METRES_PER_DEGREE * math.cos(math.radians(lat))
+
+        found = []
+        for members in self._cells_in(lat - lat_span, lng - lng_span, lat + lat_span, lng + lng_span):
+            for officer_id, (officer_lat, officer_lng) in members.items():
+                distance = math.hypot((officer_lng - lng) * scale, (officer_lat - lat) * METRES_PER_DEGREE)
+                if distance <= radius:
+                    found.append((distance, officer_id))
+        found.sort()
+        return found
+
+    def nearest(self, lat, lng, k, max_distance=None):
+        """
+        The ``k`` officers nearest to a point.
+
+        Cells are searched in growing square rings around the point's cell
+        and the search stops once the k-th distance found is within the
+        area already covered. When a ring would have more cells than the
+        grid has occupied cells, the remaining officers are scanned directly.
+
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            k (int): Number of officers
+            max_distance (float, optional): Ignore officers further than this (metres)
+
+        Returns:
+            list: (distance_m, officer_id) tuples, nearest first
+        """
+        if not self._positions or k <= 0:
+            return []
+        scale = METRES_PER_DEGREE * math.cos(math.radians(lat))
+        limit = math.inf if max_distance is None else max_distance
+        # Smallest cell dimension in metres at the query latitude
+        step = min(self.cell_size, self._lng_step * scale)
+        centre_row, centre_col = self._cell(lat, lng)
+
+        found = []
+        visited = 0
+        ring = 0
+        while True:
+            if ring and 8 * ring > len(self._cells) - visited:
+                # Cheaper to scan every remaining cell than to keep expanding
+                cells = [
+                    members for (row, col), members in self._cells.items()
+                    if max(abs(row - centre_row), abs(col - centre_col)) >= ring
+                ]
+                ring = math.inf
+            else:
+                cells = self._ring(centre_row, centre_col, ring)
+
+            for members in cells:
+                visited += 1
+                for officer_id, (officer_lat, officer_lng) in members.items():
+                    distance = math.hypot((officer_lng - lng) * scale, (officer_lat - lat) * METRES_PER_DEGREE)
+                    if distance <= limit:
+                        found.append((distance, officer_id))
+
+            covered = ring * step
+            if ring == math.inf or visited >= len(self._cells) or covered >= limit:
+                break
+            if len(found) >= k and heapq.nsmallest(k, found)[-1][0] <= covered:
+                break
+            ring += 1
+
+        return heapq.nsmallest(k, found)
+
+    def within_polygon(self, vertices):
+        """
+        Officers inside a polygon.
+
+        Args:
+            vertices (list): (lat, lng) tuples, at least three
+
+        Returns:
+            list: Officer IDs
+        """
+        if not self._positions or len(vertices) < 3:
+            return []
+        lats = [lat for lat, _ in vertices]
+        lngs = [lng for _, lng in vertices]
+        min_lat, max_lat, min_lng, max_lng = min(lats), max(lats), min(lngs), max(lngs)
+
+        inside = []
+        for members in self._cells_in(min_lat, min_lng, max_lat, max_lng):
+            for officer_id, (lat, lng) in members.items():
+                if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng \
+                        and point_in_polygon(lat, lng, vertices):
+                    inside.append(officer_id)
+        return inside
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _set_reference(self, ref_lat):
+        self._lng_step = self.cell_size / (METRES_PER_DEGREE * max(math.cos(math.radians(ref_lat)), 1e-6))
+
+    def _cell(self, lat, lng):
+        return math.floor(lat / self._lat_step), math.floor(lng / self._lng_step)
+
+    def _discard(self, officer_id, cell):
+        members = self._cells.get(cell)
+        if members is not None:
+            members.pop(officer_id, None)
+            if not members:
+                del self._cells[cell]
+
+    def _cells_in(self, min_lat, min_lng, max_lat, max_lng):
+        """Occupied cells overlapping a lat/lng box"""
+        low_row, low_col = self._cell(min_lat, min_lng)
+        high_row, high_col = self._cell(max_lat, max_lng)
+        if (high_row - low_row + 1) * (high_col - low_col + 1) > len(self._cells):
+            # Large box: filtering the occupied cells is cheaper than probing
+            return [
+                members for (row, col), members in self._cells.items()
+                if low_row <= row <= high_row and low_col <= col <= high_col
+            ]
+        cells = []
+        for row in range(low_row, high_row + 1):
+            for col in range(low_col, high_col + 1):
+                members = self._cells.get((row, col))
+                if members:
+                    cells.append(members)
+        return cells
+
+    def _ring(self, centre_row, centre_col, ring):
+        """Occupied cells at Chebyshev distance ``ring`` from the centre cell"""
+        if ring == 0:
+            members = self._cells.get((centre_row, centre_col))
+            return [members] if members else []
+        cells = []
+        for col in range(centre_col - ring, centre_col + ring + 1):
+            for row in (centre_row - ring, centre_row + ring):
+                members = self._cells.get((row, col))
+                if members:
+                    cells.append(members)
+        for row in range(centre_row - ring + 1, centre_row + ring):
+            for col in (centre_col - ring, centre_col + ring):
+                members = self._cells.get((row, col))
+                if members:
+                    cells.append(members)
+        return cells
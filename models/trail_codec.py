@@ -0,0 +1,325 @@
+"""
+Trail Codec
+Compact encoding and simplification of officer GPS trails
+"""
+
+import math
+from datetime import timedelta
+from .geofence import METRES_PER_DEGREE, EPOCH, to_epoch, to_float
+
+
+# Decimal places kept for coordinates (5 = ~1.1 m, Google polyline default)
+DEFAULT_PRECISION = 5
+
+# Ground resolution of a 256 px Web Mercator tile at zoom 0, in metres per pixel
+EQUATOR_METRES_PER_PIXEL = 156543.03392
+
+
+def _append_number(value, out):
+    """Append one signed integer in polyline form (5-bit chunks, ASCII 63+)"""
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        out.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    out.append(chr(value + 63))
+
+
+def _read_numbers(text):
+    """Yield the signed integers stored in a polyline string"""
+    value = shift = 0
+    for char in text:
+        chunk = ord(char) - 63
+        value |= (chunk & 0x1f) << shift
+        shift += 5
+        if chunk < 0x20:
+            yield ~(value >> 1) if value & 1 else value >> 1
+            value = shift = 0
+
+
+def encode_polyline(coordinates, precision=DEFAULT_PRECISION):
+    """
+    Encode (lat, lng) pairs as a polyline string: coordinates are rounded
+    to ``precision`` decimals and stored as deltas from the previous point.
+    Precision 5 is the format read by Google Maps and Leaflet plugins.
+
+    Args:
+        coordinates (list): (lat, lng) tuples
+        precision (int): Decimal places kept
+
+    Returns:
+        str: Encoded polyline
+    """
+    factor = 10 ** precision
+    out = []
+    last_lat = last_lng = 0
+    for lat, lng in coordinates:
+        lat, lng = round(lat * factor), round(lng * factor)
+        _append_number(lat - last_lat, out)
+        _append_number(lng - last_lng, out)
+        last_lat, last_lng = lat, lng
+    return ''.join(out)
+
+
+def decode_polyline(text, precision=DEFAULT_PRECISION):
+    """
+    Decode a polyline string into (lat, lng) pairs.
+
+    Args:
+        text (str): Encoded polyline
+        precision (int): Decimal places it was encoded with
+
+    Returns:
+        list: (lat, lng) tuples
+    """
+    factor = 10 ** precision
+    numbers = _read_numbers(text)
+    coordinates = []
+    lat = lng = 0
+    for delta_lat in numbers:
+        lat += delta_lat
+        lng += next(numbers)
+        coordinates.append((lat / factor, lng / factor))
+    return coordinates
+
+
+def encode_series(values):
+    """Encode integers as a delta polyline string (one value per entry)"""
+    out = []
+    last = 0
+    for value in values:
+        _append_number(value - last, out)
+        last = value
+    return ''.join(out)
+
+
+def decode_series(text):
+    """Decode a string written by encode_series"""
+    values = []
+    total = 0
+    for delta in _read_numbers(text):
+        total += delta
+        values.append(total)
+    return values
+
+
+def encode_trail(points, precision=DEFAULT_PRECISION):
+    """
+    Encode trail points (location_points rows) as polyline strings.
+
+    ``path`` holds the coordinates and ``times`` the whole seconds since
+    ``start`` for each point. Speed, heading and accuracy are not kept.
+
+    Args:
+        points (list): Dicts with ts, latitude and longitude, ordered by time
+        precision (int): Decimal places kept for coordinates
+
+    Returns:
+        dict: {'encoding', 'precision', 'start', 'count', 'path', 'times'}
+    """
+    start = points[0]['ts'] if points else None
+    origin = to_epoch(start) if start is not None else 0
+    return {
+        'encoding': 'polyline',
+        'precision': precision,
+        'start': start.isoformat() if start is not None else None,
+        'count': len(points),
+        'path': encode_polyline(
+            [(float(point['latitude']), float(point['longitude'])) for point in points], precision
+        ),
+        'times': encode_series([round(to_epoch(point['ts']) - origin) for point in points])
+    }
+
+
+def decode_trail(trail):
+    """
+    Decode an encode_trail dict back into points.
+
+    Args:
+        trail (dict): Output of encode_trail (or a location_trails row with
+            start_ts, coord_precision, path and times)
+
+    Returns:
+        list: Dicts with ts (naive UTC datetime), latitude and longitude
+    """
+    start = trail.get('start_ts') or trail.get('start')
+    if start is None:
+        return []
+    origin = EPOCH + timedelta(seconds=round(to_epoch(start)))
+    precision = trail.get('coord_precision', trail.get('precision', DEFAULT_PRECISION))
+    coordinates = decode_polyline(trail['path'], precision)
+    offsets = decode_series(trail['times'])
+    return [
+        {'ts': origin + timedelta(seconds=offset), 'latitude': lat, 'longitude': lng}
+        for (lat, lng), offset in zip(coordinates, offsets)
+    ]
+
+
+def zoom_tolerance(zoom, latitude, pixels=1.0):
+    """
+    Metres covered by ``pixels`` screen pixels at a Web Mercator zoom level.
+
+    Args:
+        zoom (float): Map zoom (0-22)
+        latitude (float): Latitude the trail is drawn at
+        pixels (float): Allowed deviation on screen
+
+    Returns:
+        float: Tolerance in metres for simplify()
+    """
+    return pixels * EQUATOR_METRES_PER_PIXEL * math.cos(math.radians(latitude)) / (2 ** zoom)
+
+
+def simplify(points, tolerance, time_aware=True):
+    """
+    Douglas-Peucker simplification of a trail.
+
+    With ``time_aware`` the deviation of a point is measured against where
+    the officer would have been at that moment moving at constant speed
+    along the kept segment (synchronized Euclidean distance), so stops and
+    speed changes survive simplification, not only turns. Without it, the
+    plain distance to the segment is used.
+
+    Args:
+        points (list): Dicts with ts, latitude and longitude, ordered by time
+        tolerance (float): Largest deviation dropped, in metres
+        time_aware (bool): Measure deviations in space and time
+
+    Returns:
+        list: The kept points (first and last are always kept)
+    """
+    count = len(points)
+    if count <= 2 or not tolerance or tolerance <= 0:
+        return list(points)
+
+    scale = METRES_PER_DEGREE * math.cos(math.radians(to_float(points[0]['latitude']) or 0.0))
+    xs = [float(point['longitude']) * scale for point in points]
+    ys = [float(point['latitude']) * METRES_PER_DEGREE for point in points]
+    times = [to_epoch(point['ts']) for point in points] if time_aware else None
+
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    # Explicit stack: trails have tens of thousands of points
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        index, worst = _farthest(xs, ys, times, first, last)
+        if worst > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _farthest(xs, ys, times, first, last):
+    """Index and deviation of the point furthest from the first-last segment"""
+    x1, y1, x2, y2 = xs[first], ys[first], xs[last], ys[last]
+    dx, dy = x2 - x1, y2 - y1
+    worst, index = -1.0, first + 1
+
+    if times is not None and times[last] > times[first]:
+        start, span = times[first], times[last] - times[first]
+        for position in range(first + 1, last):
+            ratio = (times[position] - start) / span
+            distance = math.hypot(xs[position] - (x1 + dx * ratio), ys[position] - (y1 + dy * ratio))
+            if distance > worst:
+                worst, index = distance, position
+        return index, worst
+
+    length = dx * dx + dy * dy
+    for position in range(first + 1, last):
+        if length:
+            ratio = max(0.0, min(1.0, ((xs[position] - x1) * dx + (ys[position] - y1) * dy) / length))
+        else:
+            ratio = 0.0
+        distance = math.hypot(xs[position] - (x1 + dx * ratio), ys[position] - (y1 + dy * ratio))
+        if distance > worst:
+            worst, index = distance, position
+    return index, worst
+
+
+def downsample(points, total, target):
+    """
+    Reduce a stream of trail points to about ``target`` points with
+    Largest-Triangle-Three-Buckets.
+
+    Points are split into ``target - 2`` buckets by position, using the
+    expected ``total``. From each bucket the point forming the largest
+    triangle with the previously chosen point and the centre of the next
+    bucket is kept, so turns and detours survive and straight runs thin out.
+    Only two buckets are held at a time. The first and last points are
+    always kept, and a ``target`` below 3 keeps only those. If the stream turns out longer or shorter than ``total``,
+    slightly more or fewer points are returned.
+
+    Args:
+        points (iterable): Dicts with latitude and longitude, ordered by time
+        total (int): Expected number of points
+        target (int): Number of points wanted
+
+    Yields:
+        dict: The kept points, in order
+    """
+    points = iter(points)
+    first = next(points, None)
+    if first is None:
+        return
+    yield first
+    if total <= target:
+        yield from points
+        return
+    if target < 3:
+        # No buckets between the ends: keep only the last point
+        last = None
+        for last in points:
+            pass
+        if last is not None:
+            yield last
+        return
+
+    every = (total - 2) / (target - 2)
+    scale = METRES_PER_DEGREE * math.cos(math.radians(float(first['latitude'])))
+
+    def project(point):
+        return float(point['longitude']) * scale, float(point['latitude']) * METRES_PER_DEGREE
+
+    anchor = project(first)
+    previous, current, bucket = None, [], 0
+    for index, point in enumerate(points):
+        number = int(index / every)
+        if number != bucket and current:
+            if previous:
+                anchor, chosen = _largest_triangle(previous, anchor, _centre(current))
+                yield chosen
+            previous, current, bucket = current, [], number
+        current.append((project(point), point))
+
+    # The final point closes the trail; pick from what is left before it
+    closing = current.pop() if current else previous.pop() if previous else None
+    if closing is None:
+        return
+    if previous:
+        anchor, chosen = _largest_triangle(previous, anchor, _centre(current) if current else closing[0])
+        yield chosen
+    if current:
+        yield _largest_triangle(current, anchor, closing[0])[1]
+    yield closing[1]
+
+
+def _centre(bucket):
+    """Mean projected position of a bucket"""
+    return (sum(xy[0] for xy, _ in bucket) / len(bucket), sum(xy[1] for xy, _ in bucket) / len(bucket))
+
+
+def _largest_triangle(bucket, anchor, centre):
+    """(projected position, point) in ``bucket`` forming the largest triangle"""
+    ax, ay = anchor
+    cx, cy = centre
+    best, best_area = bucket[0], -1.0
+    for candidate in bucket:
+        (px, py), _ = candidate
+        area = abs((ax - cx) * (py - ay) - (ax - px) * (cy - ay))
+        if area > best_area:
+            best, best_area = candidate, area
+    return best
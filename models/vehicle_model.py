@@ -4,14 +4,27 @@ Handles vehicle data access
 """
 
 from .db import get_connection
+from .cache import reference_cache
+
+
+# Cache namespace invalidated by every vehicle write
+CACHE_NAMESPACE = 'vehicles'
+# Cached duties embed vehicle assignments
+DUTY_CACHE_NAMESPACE = 'duties'
 
 
 class VehicleModel:
     """Model for vehicle operations"""
     
     @staticmethod
-    def get_all_vehicles():
-        """Get all vehicles"""
+    def get_all_vehicles(with_etag=False):
+        """Get all vehicles (cached); with_etag also returns the list's ETag"""
+        entry = reference_cache.get(CACHE_NAMESPACE, 'all', VehicleModel._load_all_vehicles)
+        return (entry.value, entry.etag) if with_etag else entry.value
+    
+    @staticmethod
+    def _load_all_vehicles():
+        """Load all vehicles from database"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
                 query = """
@@ -23,7 +36,15 @@ class VehicleModel:
     
     @staticmethod
     def get_vehicle_by_id(vehicle_id):
-        """Get vehicle by ID"""
+        """Get vehicle by ID (cached)"""
+        return reference_cache.get(
+            CACHE_NAMESPACE, f'id:{vehicle_id}',
+            lambda: VehicleModel._load_vehicle(vehicle_id)
+        ).value
+    
+    @staticmethod
+    def _load_vehicle(vehicle_id):
+        """Load one vehicle from database"""
         with get_connection() as conn:
             with conn.cursor() as cursor:
                 query = "SELECT * FROM vehicles WHERE id = %s"
@@ -46,7 +67,8 @@ class VehicleModel:
                     vehicle_data.get('status', 'available')
                 ))
                 conn.commit()
-                return vehicle_data['id']
+        reference_cache.invalidate(CACHE_NAMESPACE, DUTY_CACHE_NAMESPACE)
+        return vehicle_data['id']
     
     @staticmethod
     def update_vehicle(vehicle_id, updates):
@@ -72,7 +94,9 @@ class VehicleModel:
                 query = f"UPDATE vehicles SET {', '.join(fields)} WHERE id = %s"
                 cursor.execute(query, values)
                 conn.commit()
-                return cursor.rowcount > 0
+                changed = cursor.rowcount > 0
+        reference_cache.invalidate(CACHE_NAMESPACE, DUTY_CACHE_NAMESPACE)
+        return changed
     
     @staticmethod
     def delete_vehicle(vehicle_id):
@@ -81,4 +105,6 @@ class VehicleModel:
             with conn.cursor() as cursor:
                 cursor.execute("DELETE FROM vehicles WHERE id = %s", (vehicle_id,))
                 conn.commit()
-                return cursor.rowcount > 0
+                changed = cursor.rowcount > 0
+        reference_cache.invalidate(CACHE_NAMESPACE, DUTY_CACHE_NAMESPACE)
+        return changed
@@ -35,6 +35,18 @@ def get_activities_by_officer(officer_id):
     return ActivityController.get_activities_by_officer(officer_id)
 
 
+@activity_bp.route('/export', methods=['GET'])
+def export_activities():
+    """GET /api/activities/export?start=&end=&officerId=&dutyId=&format=ndjson|csv - Stream activities for audits"""
+    return ActivityController.export_activities(
+        request.args.get('start'),
+        request.args.get('end'),
+        request.args.get('officerId'),
+        request.args.get('dutyId'),
+        request.args.get('format')
+    )
+
+
 @activity_bp.route('', methods=['POST'])
 def create_activity():
     """POST /api/activities - Create new activity"""
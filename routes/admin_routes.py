@@ -73,3 +73,66 @@ def execute_sql():
     
     # Execute query via controller
     return AdminController.execute_sql(query)
+
+
+@admin_bp.route('/query-profiles', methods=['GET'])
+def get_query_profiles():
+    """
+    Recent query profiles (QUERY_PROFILING mode only).
+    Requires x-admin-key header.
+    
+    Request:
+        GET /admin/query-profiles?flagged=true
+    
+    Response:
+        {
+            "success": true,
+            "data": {
+                "profiled_requests": 120,
+                "flagged_requests": 3,
+                "slow_query_count": 1,
+                "requests": [
+                    {"id": "3f2a9c0d1b7e", "method": "POST", "path": "/api/duties",
+                     "query_count": 27, "db_ms": 41.2, "repeated": 1, "slow": 0, ...}
+                ],
+                "slow_queries": [{"sql": "...", "ms": 512.4, "call_site": "...", "plan": [...]}]
+            }
+        }
+    """
+    auth_error = require_admin_key()
+    if auth_error:
+        return auth_error
+    
+    flagged_only = request.args.get('flagged', 'false').lower() == 'true'
+    return AdminController.get_query_profiles(flagged_only)
+
+
+@admin_bp.route('/query-profiles/<report_id>', methods=['GET'])
+def get_query_profile(report_id):
+    """
+    Full statement report for one request.
+    Requires x-admin-key header.
+    
+    Request:
+        GET /admin/query-profiles/<id from the X-Query-Profile header>
+    
+    Response:
+        {
+            "success": true,
+            "data": {
+                "id": "3f2a9c0d1b7e",
+                "query_count": 27,
+                "repeated": [
+                    {"shape": "SELECT id FROM officers WHERE staff_id = ?", "count": 12,
+                     "total_ms": 14.1, "call_sites": ["models/duty_model.py:380 ..."]}
+                ],
+                "slow": [...],
+                "statements": [{"shape": "...", "ms": 1.2, "rows": 1, "call_site": "..."}, ...]
+            }
+        }
+    """
+    auth_error = require_admin_key()
+    if auth_error:
+        return auth_error
+    
+    return AdminController.get_query_profile(report_id)
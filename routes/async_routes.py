@@ -0,0 +1,157 @@
+"""
+Async Routes
+Device-facing endpoints served by the async app (asgi.py). URL prefixes match
+live_location_bp, check_in_bp and compliance_bp so clients need no changes.
+"""
+
+from quart import Blueprint, request
+from controllers.async_controllers import (
+    AsyncCheckInController, AsyncComplianceController, AsyncLiveLocationController
+)
+
+async_live_location_bp = Blueprint('async_live_location', __name__, url_prefix='/api/live-locations')
+async_check_in_bp = Blueprint('async_check_in', __name__, url_prefix='/api/check-ins')
+async_compliance_bp = Blueprint('async_compliance', __name__, url_prefix='/api/compliance')
+
+
+# ============================================================================
+# LIVE LOCATIONS
+# ============================================================================
+
+@async_live_location_bp.route('', methods=['GET'])
+async def get_all_live_locations():
+    """GET /api/live-locations - Get all live officer locations"""
+    return await AsyncLiveLocationController.get_all_live_locations()
+
+
+@async_live_location_bp.route('/snapshot', methods=['GET'])
+async def get_snapshot():
+    """GET /api/live-locations/snapshot?bbox=minLng,minLat,maxLng,maxLat&since=ISO - Compact live map positions"""
+    return await AsyncLiveLocationController.get_snapshot(
+        request.args.get('bbox'),
+        request.args.get('since')
+    )
+
+
+@async_live_location_bp.route('/delta', methods=['GET'])
+async def get_changes():
+    """GET /api/live-locations/delta?cursor=... - Positions changed since the last sync"""
+    return await AsyncLiveLocationController.get_changes(request.args.get('cursor'))
+
+
+@async_live_location_bp.route('/nearby', methods=['GET'])
+async def get_nearby():
+    """GET /api/live-locations/nearby?lat=&lng=&radius=metres - Active officers within a radius, nearest first"""
+    return await AsyncLiveLocationController.get_nearby(
+        request.args.get('lat'),
+        request.args.get('lng'),
+        request.args.get('radius')
+    )
+
+
+@async_live_location_bp.route('/nearest', methods=['GET'])
+async def get_nearest():
+    """GET /api/live-locations/nearest?lat=&lng=&k=5&maxDistance=metres - The k nearest active officers"""
+    return await AsyncLiveLocationController.get_nearest(
+        request.args.get('lat'),
+        request.args.get('lng'),
+        request.args.get('k'),
+        request.args.get('maxDistance')
+    )
+
+
+@async_live_location_bp.route('/within', methods=['GET', 'POST'])
+async def get_within():
+    """GET /api/live-locations/within?dutyId=... or POST {"polygon": [...]} - Active officers inside an area"""
+    if request.method == 'POST':
+        payload = await request.get_json(silent=True) or {}
+        return await AsyncLiveLocationController.get_within(payload.get('polygon'), payload.get('dutyId'))
+    return await AsyncLiveLocationController.get_within(duty_id=request.args.get('dutyId'))
+
+
+@async_live_location_bp.route('/officer/<officer_id>', methods=['GET'])
+async def get_location_by_officer(officer_id):
+    """GET /api/live-locations/officer/:officerId - Get location for officer"""
+    return await AsyncLiveLocationController.get_location_by_officer(officer_id)
+
+
+@async_live_location_bp.route('/officer/<officer_id>/trail', methods=['GET'])
+async def get_trail(officer_id):
+    """GET /api/live-locations/officer/:officerId/trail?start=&end=&dutyId=&zoom=&tolerance=&format=polyline|json - Recorded trail"""
+    return await AsyncLiveLocationController.get_trail(
+        officer_id,
+        request.args.get('start'),
+        request.args.get('end'),
+        request.args.get('dutyId'),
+        request.args.get('zoom'),
+        request.args.get('tolerance'),
+        request.args.get('format')
+    )
+
+
+@async_live_location_bp.route('/officer/<officer_id>', methods=['PUT', 'POST'])
+async def update_location(officer_id):
+    """PUT/POST /api/live-locations/officer/:officerId - Update officer location"""
+    location_data = await request.get_json()
+    return await AsyncLiveLocationController.update_location(officer_id, location_data)
+
+
+@async_live_location_bp.route('/bulk', methods=['POST'])
+async def bulk_update_locations():
+    """POST /api/live-locations/bulk - Replay buffered GPS points for one or many officers"""
+    payload = await request.get_json(silent=True)
+    return await AsyncLiveLocationController.bulk_update_locations(payload)
+
+
+@async_live_location_bp.route('/ingest/stats', methods=['GET'])
+async def get_ingest_stats():
+    """GET /api/live-locations/ingest/stats - Batched ingest queue depth, batch sizes and flush latency"""
+    return await AsyncLiveLocationController.get_ingest_stats()
+
+
+# ============================================================================
+# CHECK-INS
+# ============================================================================
+
+@async_check_in_bp.route('', methods=['GET'])
+async def get_all_check_ins():
+    """GET /api/check-ins?limit=100 - Get all check-ins"""
+    limit = request.args.get('limit', 100, type=int)
+    return await AsyncCheckInController.get_all_check_ins(limit)
+
+
+@async_check_in_bp.route('/duty/<duty_id>', methods=['GET'])
+async def get_check_ins_by_duty(duty_id):
+    """GET /api/check-ins/duty/:dutyId - Get check-ins by duty"""
+    return await AsyncCheckInController.get_check_ins_by_duty(duty_id)
+
+
+@async_check_in_bp.route('', methods=['POST'])
+async def create_check_in():
+    """POST /api/check-ins - Create new check-in"""
+    check_in_data = await request.get_json(silent=True)
+    return await AsyncCheckInController.create_check_in(check_in_data)
+
+
+# ============================================================================
+# COMPLIANCE
+# ============================================================================
+
+@async_compliance_bp.route('', methods=['GET'])
+async def get_all_compliance_logs():
+    """GET /api/compliance?limit=100 - Get all compliance logs"""
+    limit = request.args.get('limit', 100, type=int)
+    return await AsyncComplianceController.get_all_compliance_logs(limit)
+
+
+@async_compliance_bp.route('/duty/<duty_id>', methods=['GET'])
+async def get_compliance_by_duty(duty_id):
+    """GET /api/compliance/duty/:dutyId - Get compliance logs by duty"""
+    return await AsyncComplianceController.get_compliance_by_duty(duty_id)
+
+
+@async_compliance_bp.route('', methods=['POST'])
+async def create_compliance_log():
+    """POST /api/compliance - Create new compliance log"""
+    log_data = await request.get_json(silent=True)
+    return await AsyncComplianceController.create_compliance_log(log_data)
@@ -22,6 +22,18 @@ def get_check_ins_by_duty(duty_id):
     return CheckInController.get_check_ins_by_duty(duty_id)
 
 
+@check_in_bp.route('/export', methods=['GET'])
+def export_check_ins():
+    """GET /api/check-ins/export?start=&end=&officerId=&dutyId=&format=ndjson|csv - Stream check-ins for audits"""
+    return CheckInController.export_check_ins(
+        request.args.get('start'),
+        request.args.get('end'),
+        request.args.get('officerId'),
+        request.args.get('dutyId'),
+        request.args.get('format')
+    )
+
+
 @check_in_bp.route('', methods=['POST'])
 def create_check_in():
     """POST /api/check-ins - Create new check-in"""
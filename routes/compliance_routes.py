@@ -22,6 +22,18 @@ def get_compliance_by_duty(duty_id):
     return ComplianceController.get_compliance_by_duty(duty_id)
 
 
+@compliance_bp.route('/export', methods=['GET'])
+def export_compliance_logs():
+    """GET /api/compliance/export?start=&end=&officerId=&dutyId=&format=ndjson|csv - Stream compliance logs for audits"""
+    return ComplianceController.export_compliance_logs(
+        request.args.get('start'),
+        request.args.get('end'),
+        request.args.get('officerId'),
+        request.args.get('dutyId'),
+        request.args.get('format')
+    )
+
+
 @compliance_bp.route('', methods=['POST'])
 def create_compliance_log():
     """POST /api/compliance - Create new compliance log"""
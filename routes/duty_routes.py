@@ -11,8 +11,8 @@ duty_bp = Blueprint('duty', __name__, url_prefix='/api/duties')
 
 @duty_bp.route('', methods=['GET'])
 def get_all_duties():
-    """GET /api/duties - Get all duties"""
-    return DutyController.get_all_duties()
+    """GET /api/duties?limit=&cursor=&status=&type=&from=&to=&fields= - Get duties"""
+    return DutyController.get_all_duties(request.args)
 
 
 @duty_bp.route('/active', methods=['GET'])
@@ -33,6 +33,17 @@ def get_duty(duty_id):
     return DutyController.get_duty(duty_id)
 
 
+@duty_bp.route('/<duty_id>/trail', methods=['GET'])
+def replay_duty_trail(duty_id):
+    """GET /api/duties/:id/trail?start=&end=&points=1000 - Stream assigned officers' trails for the duty window (NDJSON)"""
+    return DutyController.replay_trail(
+        duty_id,
+        request.args.get('start'),
+        request.args.get('end'),
+        request.args.get('points')
+    )
+
+
 @duty_bp.route('', methods=['POST'])
 def create_duty():
     """POST /api/duties - Create new duty"""
@@ -40,6 +51,13 @@ def create_duty():
     return DutyController.create_duty(duty_data)
 
 
+@duty_bp.route('/bulk', methods=['POST'])
+def create_duties():
+    """POST /api/duties/bulk - Create many duties in one transaction"""
+    payload = request.get_json()
+    return DutyController.create_duties(payload)
+
+
 @duty_bp.route('/<duty_id>', methods=['PUT', 'PATCH'])
 def update_duty(duty_id):
     """PUT/PATCH /api/duties/:id - Update duty"""
@@ -58,3 +76,15 @@ def check_officer_conflicts():
     """POST /api/duties/check-conflicts - Check for officer scheduling conflicts"""
     data = request.get_json()
     return DutyController.check_officer_conflicts(data)
+
+
+@duty_bp.route('/conflict-index/stats', methods=['GET'])
+def get_conflict_index_stats():
+    """GET /api/duties/conflict-index/stats - In-memory conflict index counters"""
+    return DutyController.get_conflict_index_stats()
+
+
+@duty_bp.route('/geofence/stats', methods=['GET'])
+def get_geofence_stats():
+    """GET /api/duties/geofence/stats - Geofence engine counters"""
+    return DutyController.get_geofence_stats()
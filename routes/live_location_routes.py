@@ -15,14 +15,103 @@ def get_all_live_locations():
     return LiveLocationController.get_all_live_locations()
 
 
+@live_location_bp.route('/snapshot', methods=['GET'])
+def get_snapshot():
+    """GET /api/live-locations/snapshot?bbox=minLng,minLat,maxLng,maxLat&since=ISO - Compact live map positions"""
+    return LiveLocationController.get_snapshot(
+        request.args.get('bbox'),
+        request.args.get('since')
+    )
+
+
+@live_location_bp.route('/delta', methods=['GET'])
+def get_changes():
+    """GET /api/live-locations/delta?cursor=... - Positions changed since the last sync"""
+    return LiveLocationController.get_changes(request.args.get('cursor'))
+
+
+@live_location_bp.route('/nearby', methods=['GET'])
+def get_nearby():
+    """GET /api/live-locations/nearby?lat=&lng=&radius=metres - Active officers within a radius, nearest first"""
+    return LiveLocationController.get_nearby(
+        request.args.get('lat'),
+        request.args.get('lng'),
+        request.args.get('radius')
+    )
+
+
+@live_location_bp.route('/nearest', methods=['GET'])
+def get_nearest():
+    """GET /api/live-locations/nearest?lat=&lng=&k=5&maxDistance=metres - The k nearest active officers"""
+    return LiveLocationController.get_nearest(
+        request.args.get('lat'),
+        request.args.get('lng'),
+        request.args.get('k'),
+        request.args.get('maxDistance')
+    )
+
+
+@live_location_bp.route('/within', methods=['GET', 'POST'])
+def get_within():
+    """GET /api/live-locations/within?dutyId=... or POST {"polygon": [...]} - Active officers inside an area"""
+    if request.method == 'POST':
+        payload = request.get_json(silent=True) or {}
+        return LiveLocationController.get_within(payload.get('polygon'), payload.get('dutyId'))
+    return LiveLocationController.get_within(duty_id=request.args.get('dutyId'))
+
+
+@live_location_bp.route('/stream', methods=['GET'])
+def stream_locations():
+    """GET /api/live-locations/stream?officers=A,B&duties=D1&bbox=... - Server-Sent Events position stream"""
+    return LiveLocationController.stream_locations(
+        request.args.get('officers'),
+        request.args.get('duties'),
+        request.args.get('bbox'),
+        request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    )
+
+
+@live_location_bp.route('/stream/stats', methods=['GET'])
+def get_stream_stats():
+    """GET /api/live-locations/stream/stats - Stream subscriber counters"""
+    return LiveLocationController.get_stream_stats()
+
+
 @live_location_bp.route('/officer/<officer_id>', methods=['GET'])
 def get_location_by_officer(officer_id):
     """GET /api/live-locations/officer/:officerId - Get location for officer"""
     return LiveLocationController.get_location_by_officer(officer_id)
 
 
+@live_location_bp.route('/officer/<officer_id>/trail', methods=['GET'])
+def get_trail(officer_id):
+    """GET /api/live-locations/officer/:officerId/trail?start=&end=&dutyId=&zoom=&tolerance=&format=polyline|json - Recorded trail"""
+    return LiveLocationController.get_trail(
+        officer_id,
+        request.args.get('start'),
+        request.args.get('end'),
+        request.args.get('dutyId'),
+        request.args.get('zoom'),
+        request.args.get('tolerance'),
+        request.args.get('format')
+    )
+
+
 @live_location_bp.route('/officer/<officer_id>', methods=['PUT', 'POST'])
 def update_location(officer_id):
     """PUT/POST /api/live-locations/officer/:officerId - Update officer location"""
     location_data = request.get_json()
     return LiveLocationController.update_location(officer_id, location_data)
+
+
+@live_location_bp.route('/bulk', methods=['POST'])
+def bulk_update_locations():
+    """POST /api/live-locations/bulk - Replay buffered GPS points for one or many officers"""
+    payload = request.get_json(silent=True)
+    return LiveLocationController.bulk_update_locations(payload)
+
+
+@live_location_bp.route('/ingest/stats', methods=['GET'])
+def get_ingest_stats():
+    """GET /api/live-locations/ingest/stats - Batched ingest queue depth, batch sizes and flush latency"""
+    return LiveLocationController.get_ingest_stats()
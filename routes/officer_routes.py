@@ -18,6 +18,16 @@ def get_officer(officer_id):
     """GET /api/officers/:id - Get single officer"""
     return OfficerController.get_officer(officer_id)
 
+@officer_bp.route('/officers/<officer_id>/trail', methods=['GET'])
+def replay_officer_trail(officer_id):
+    """GET /api/officers/:id/trail?start=&end=&points=1000 - Stream the officer's downsampled trail (NDJSON)"""
+    return OfficerController.replay_trail(
+        officer_id,
+        request.args.get('start'),
+        request.args.get('end'),
+        request.args.get('points')
+    )
+
 @officer_bp.route('/officers', methods=['POST'])
 def create_officer():
     """POST /api/officers - Create a new officer"""
@@ -30,6 +30,136 @@ def health_check():
     return PublicController.health_check()
 
 
+@public_bp.route('/health/db-pool', methods=['GET'])
+def db_pool_stats():
+    """
+    Database connection pool statistics endpoint.
+    
+    Request:
+        GET /health/db-pool
+    
+    Response:
+        {
+            "success": true,
+            "data": {
+                "size": 4,
+                "idle": 3,
+                "checked_out": 1,
+                "waiting": 0,
+                "wait_time_avg": 0.0004,
+                "creates": 4,
+                "evicted_idle": 0,
+                ...
+            }
+        }
+    """
+    return PublicController.get_pool_stats()
+
+
+@public_bp.route('/health/cache', methods=['GET'])
+def cache_stats():
+    """
+    Reference data cache statistics endpoint.
+    
+    Request:
+        GET /health/cache
+    
+    Response:
+        {
+            "success": true,
+            "data": {
+                "enabled": true,
+                "ttl": 300.0,
+                "hit_ratio": 0.97,
+                "namespaces": {
+                    "officers": {"hits": 310, "misses": 9, "hit_ratio": 0.97,
+                                 "invalidations": 4, "expired": 2, ...},
+                    ...
+                }
+            }
+        }
+    """
+    return PublicController.get_cache_stats()
+
+
+@public_bp.route('/health/logging', methods=['GET'])
+def log_stats():
+    """
+    Logging pipeline statistics endpoint.
+    
+    Request:
+        GET /health/logging
+    
+    Response:
+        {
+            "success": true,
+            "data": {
+                "mode": "async",
+                "format": "json",
+                "sampled_out": {"location_ping": 9900},
+                "queued": 12,
+                "capacity": 10000,
+                "dropped": 0,
+                "writer_alive": true
+            }
+        }
+    """
+    return PublicController.get_log_stats()
+
+
+@public_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus metrics endpoint.
+    
+    Request:
+        GET /metrics
+    
+    Response (text/plain; version=0.0.4):
+        gph_http_requests_total{worker="812",method="GET",endpoint="/api/duties",status="200"} 42
+        gph_http_request_duration_seconds_bucket{...,le="0.1"} 40
+        gph_http_request_db_seconds_bucket{...}
+        gph_http_request_queries_bucket{...}
+        gph_http_request_rows_bucket{...}
+        gph_http_response_bytes_bucket{...}
+        gph_db_pool_checked_out{worker="812"} 1
+        ...
+    """
+    return PublicController.get_metrics()
+
+
+@public_bp.route('/health/metrics', methods=['GET'])
+def metrics_summary():
+    """
+    Per-endpoint latency summary endpoint.
+    
+    Request:
+        GET /health/metrics
+    
+    Response:
+        {
+            "success": true,
+            "data": {
+                "totals": {"queries": 1250, "db_time": 3.2, "rows": 48210, ...},
+                "endpoints": {
+                    "GET /api/duties": {
+                        "requests": 42,
+                        "responses": {"200": 42},
+                        "avg_queries": 3.0,
+                        "avg_connections": 2.0,
+                        "avg_rows": 240.5,
+                        "wall_ms": {"p50": 38.1, "p95": 92.4, "p99": 98.5},
+                        "db_ms": {"p50": 21.0, "p95": 47.5, "p99": 49.5},
+                        "queries": {"p50": 3, "p95": 4.6, "p99": 4.9},
+                        "avg_bytes": 51234
+                    }
+                }
+            }
+        }
+    """
+    return PublicController.get_metrics_summary()
+
+
 @public_bp.route('/officers', methods=['GET'])
 def get_officers():
     """
@@ -37,6 +167,7 @@ def get_officers():
     
     Request:
         GET /officers
+        If-None-Match: "<etag>"   (optional; 304 if unchanged)
     
     Response:
         {
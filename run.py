@@ -11,13 +11,11 @@ backend_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, backend_dir)
 
 # Import and run the app
-from app import create_app
 from utils.logger import logger
+from wsgi import app, warm_up
 from config import DB_CONFIG, ALLOWED_ORIGINS, FORCE_HTTPS, ALLOW_WRITE_QUERIES, SERVER_HOST, SERVER_PORT, DEBUG_MODE
 
 if __name__ == '__main__':
-    app = create_app()
-    
     logger.info("="*60)
     logger.info("Police Patrolling App - Flask Backend Server Starting")
     logger.info("="*60)
@@ -27,7 +25,10 @@ if __name__ == '__main__':
     logger.info(f"Write Queries Allowed: {ALLOW_WRITE_QUERIES}")
     logger.info("="*60)
     
-    # Run development server
+    # Open pool connections and load in-memory indexes before serving requests
+    warm_up()
+    
+    # Run development server (production: gunicorn -c gunicorn.conf.py wsgi:app)
     app.run(
         host=SERVER_HOST,
         port=SERVER_PORT,
@@ -13,6 +13,8 @@ DROP TABLE IF EXISTS check_ins;
 DROP TABLE IF EXISTS duty_compliance;
 DROP TABLE IF EXISTS duty_officers;
 DROP TABLE IF EXISTS live_locations;
+DROP TABLE IF EXISTS location_points;
+DROP TABLE IF EXISTS location_trails;
 DROP TABLE IF EXISTS notifications;
 DROP TABLE IF EXISTS officer_credits;
 DROP TABLE IF EXISTS mobile_patrols;
@@ -91,7 +93,8 @@ CREATE TABLE duties (
     INDEX idx_type (type),
     INDEX idx_start_time (start_time),
     INDEX idx_end_time (end_time),
-    INDEX idx_assigned_at (assigned_at)
+    INDEX idx_assigned_at (assigned_at),
+    INDEX idx_created_at_id (created_at, id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ============================================================================
@@ -148,12 +151,64 @@ CREATE TABLE live_locations (
     status ENUM('online', 'offline', 'active', 'inactive') DEFAULT 'offline',
     is_active BOOLEAN DEFAULT true,
     FOREIGN KEY (officer_id) REFERENCES officers(id) ON DELETE CASCADE,
+    UNIQUE KEY uniq_officer_id (officer_id),
     INDEX idx_officer_id (officer_id),
     INDEX idx_status (status),
     INDEX idx_location (latitude, longitude),
     INDEX idx_last_updated (last_updated)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- ============================================================================
+-- LOCATION POINTS TABLE (append-only GPS history)
+-- ============================================================================
+-- Partitioned InnoDB tables cannot carry foreign keys, and every unique key
+-- must include the partitioning column, hence PRIMARY KEY (id, ts).
+-- p_history catches points older than the first monthly partition; run
+-- location_retention.py regularly to add future months and drop old ones.
+CREATE TABLE location_points (
+    id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    officer_id VARCHAR(50) NOT NULL,
+    duty_id VARCHAR(50),
+    ts DATETIME(3) NOT NULL,
+    latitude DECIMAL(10, 7) NOT NULL,
+    longitude DECIMAL(10, 7) NOT NULL,
+    speed DECIMAL(8, 2),
+    heading DECIMAL(6, 2),
+    accuracy DECIMAL(8, 2),
+    PRIMARY KEY (id, ts),
+    INDEX idx_officer_ts (officer_id, ts),
+    INDEX idx_duty_ts (duty_id, ts)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE COLUMNS (ts) (
+    PARTITION p_history VALUES LESS THAN ('2026-10-01'),
+    PARTITION p202610 VALUES LESS THAN ('2026-11-01'),
+    PARTITION p202611 VALUES LESS THAN ('2026-12-01'),
+    PARTITION p202612 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+-- ============================================================================
+-- LOCATION TRAILS TABLE (archived GPS history)
+-- ============================================================================
+-- One simplified, polyline-encoded trail per officer, duty and UTC day,
+-- filled by location_retention.py (TRAIL_ARCHIVE_ENABLED=true) before
+-- expired location_points partitions are dropped. duty_id is '' for points
+-- recorded without a duty, so it can be part of the primary key.
+CREATE TABLE location_trails (
+    officer_id VARCHAR(50) NOT NULL,
+    duty_id VARCHAR(50) NOT NULL DEFAULT '',
+    day DATE NOT NULL,
+    start_ts DATETIME(3) NOT NULL,
+    end_ts DATETIME(3) NOT NULL,
+    point_count INT UNSIGNED NOT NULL,
+    raw_count INT UNSIGNED NOT NULL,
+    coord_precision TINYINT UNSIGNED NOT NULL DEFAULT 5,
+    path MEDIUMTEXT NOT NULL,
+    times MEDIUMTEXT NOT NULL,
+    PRIMARY KEY (officer_id, day, duty_id),
+    INDEX idx_duty_day (duty_id, day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- ============================================================================
 -- NOTIFICATIONS TABLE
 -- ============================================================================
@@ -0,0 +1,182 @@
+"""
+Async Device API Tests
+Tests shared payload validation and the async check-in, compliance and live
+location endpoints against a stand-in database connection
+"""
+
+import pytest
+import sys
+import os
+import asyncio
+import contextlib
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from controllers.check_in_controller import validate_check_in
+from controllers.compliance_controller import validate_compliance_log
+
+
+class TestPayloadValidation:
+    """Test validators shared by the sync and async controllers"""
+
+    def test_check_in_requires_fields(self):
+        """Test that missing check-in fields are named in the error"""
+        assert validate_check_in(None) == "Request body must be a JSON object"
+        assert validate_check_in({'id': 'C1', 'dutyId': 'D1'}) == \
+            "Missing required fields: checkInType, timestamp"
+        assert validate_check_in({
+            'id': 'C1', 'dutyId': 'D1', 'checkInType': 'check_in', 'timestamp': '2024-01-01T08:00:00'
+        }) is None
+
+    def test_compliance_requires_fields(self):
+        """Test that missing compliance fields are named in the error"""
+        assert validate_compliance_log([]) == "Request body must be a JSON object"
+        assert validate_compliance_log({'id': 'L1'}) == "Missing required fields: action, timestamp"
+        assert validate_compliance_log({'id': 'L1', 'action': 'left_zone', 'timestamp': 't'}) is None
+
+
+class FakeCursor:
+    """Async cursor recording statements and returning canned rows"""
+
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        self.db.executed.append((query, params))
+        self.rows = self.db.rows
+
+    async def fetchall(self):
+        return self.rows
+
+    async def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeDatabase:
+    """Stand-in for the aiomysql pool"""
+
+    def __init__(self):
+        self.executed = []
+        self.commits = 0
+        self.rows = []
+        self.after_write_threads = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    async def commit(self):
+        self.commits += 1
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        yield self
+
+
+@pytest.fixture
+def async_app(monkeypatch):
+    """Async app wired to a fake database"""
+    reason = 'async app tests need quart and aiomysql (pip install -r requirements.txt)'
+    pytest.importorskip('quart', reason=reason)
+    pytest.importorskip('aiomysql', reason=reason)
+    import models.async_models as async_models
+    from models.live_location_model import LiveLocationModel
+    from asgi import create_async_app
+
+    db = FakeDatabase()
+    written = []
+
+    def after_write(pings, written_at):
+        written.append(pings)
+        db.after_write_threads.append(threading.current_thread())
+
+    monkeypatch.setattr(async_models, 'get_async_connection', db.connection)
+    monkeypatch.setattr(LiveLocationModel, 'queue_location', staticmethod(lambda *args: False))
+    monkeypatch.setattr(LiveLocationModel, '_after_write', staticmethod(after_write))
+    return create_async_app(), db, written
+
+
+def _call(app, method, path, **kwargs):
+    async def run():
+        client = app.test_client()
+        response = await getattr(client, method)(path, **kwargs)
+        return response.status_code, await response.get_json()
+    return asyncio.run(run())
+
+
+class TestAsyncDeviceApi:
+    """Test the async serving path"""
+
+    def test_create_check_in(self, async_app):
+        """Test that a valid check-in is inserted and committed"""
+        app, db, _ = async_app
+        status, body = _call(app, 'post', '/api/check-ins', json={
+            'id': 'C1', 'dutyId': 'D1', 'checkInType': 'check_in', 'timestamp': '2024-01-01T08:00:00'
+        })
+        assert status == 200
+        assert body['data'] == {'id': 'C1'}
+        assert 'INSERT INTO check_ins' in db.executed[0][0]
+        assert db.commits == 1
+
+    def test_invalid_check_in_is_rejected(self, async_app):
+        """Test that validation runs before any statement"""
+        app, db, _ = async_app
+        status, body = _call(app, 'post', '/api/check-ins', json={'id': 'C1'})
+        assert status == 400
+        assert body['success'] is False
+        assert db.executed == []
+
+    def test_compliance_rows_are_parsed(self, async_app):
+        """Test that JSON columns are decoded like the sync model"""
+        app, db, _ = async_app
+        db.rows = [{'id': 'L1', 'location': '{"latitude": 15.4}'}]
+        status, body = _call(app, 'get', '/api/compliance/duty/D1')
+        assert status == 200
+        assert body['data'][0]['location'] == {'latitude': 15.4}
+        assert db.executed[0][1] == ('D1',)
+
+    def test_location_update_feeds_live_consumers(self, async_app):
+        """Test that an async write updates the snapshot and trail in one transaction"""
+        app, db, written = async_app
+        status, _ = _call(app, 'put', '/api/live-locations/officer/O1',
+                          json={'latitude': 15.4, 'longitude': 73.8})
+        assert status == 200
+        # Stored timestamp lookup, then the upsert and history insert
+        assert len(db.executed) == 3
+        assert db.executed[0][0].startswith('SELECT officer_id, timestamp')
+        assert db.commits == 1
+        assert written[0][0][0] == 'O1'
+        # Cache messages and geofence checks must not run on the event loop
+        assert db.after_write_threads[0] is not threading.main_thread()
+
+    def test_bulk_rejects_invalid_points(self, async_app):
+        """Test that bulk replay shares point and officer validation with the sync controller"""
+        app, db, _ = async_app
+        db.rows = [{'id': 'O1', 'officer_id': 'O1', 'timestamp': None}]
+        status, body = _call(app, 'post', '/api/live-locations/bulk', json={
+            'officerId': 'O1',
+            'points': [
+                {'latitude': 15.4, 'longitude': 73.8},
+                {'latitude': 120, 'longitude': 73.8},
+                {'officerId': 'O9', 'latitude': 15.4, 'longitude': 73.8}
+            ]
+        })
+        assert status == 200
+        assert body['data']['accepted'] == 1
+        assert [item['index'] for item in body['data']['rejected']] == [1, 2]
+        assert body['data']['rejected'][1]['error'] == 'Unknown officer O9'
+
+    def test_unknown_endpoint(self, async_app):
+        """Test the JSON 404 handler"""
+        app, _, _ = async_app
+        status, body = _call(app, 'get', '/api/duties')
+        assert status == 404
+        assert body == {'success': False, 'error': 'Endpoint not found'}
@@ -0,0 +1,144 @@
+"""
+Bulk Location Tests
+Tests the bulk replay endpoint: validation, unknown officers and stale backlogs
+"""
+
+import pytest
+import sys
+import os
+import contextlib
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models.live_location_model as live_location_model
+from app import create_app
+from models.live_location_model import LiveLocationModel
+
+
+class RecordingConnection:
+    """Connection answering officer and live-timestamp lookups and recording statements"""
+
+    def __init__(self, officers, live_times):
+        self.officers = officers
+        self.live_times = live_times
+        self.queries = []
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        self.queries.append((' '.join(query.split()), params))
+
+    def fetchall(self):
+        query, params = self.queries[-1]
+        if 'FROM officers' in query:
+            return [{'id': officer_id} for officer_id in params if officer_id in self.officers]
+        return [{'officer_id': officer_id, 'timestamp': self.live_times[officer_id]}
+                for officer_id in params if officer_id in self.live_times]
+
+    def commit(self):
+        self.commits += 1
+
+    def statements(self, table):
+        return [(query, params) for query, params in self.queries if query.startswith(f'INSERT INTO {table}')]
+
+
+@pytest.fixture
+def database(monkeypatch):
+    conn = RecordingConnection({'GP1', 'GP2'}, {'GP2': datetime(2025, 11, 16, 12, 0)})
+    written = []
+    monkeypatch.setattr(live_location_model, 'get_connection', contextlib.contextmanager(lambda: (yield conn)))
+    monkeypatch.setattr(LiveLocationModel, 'queue_location', staticmethod(lambda *args: False))
+    monkeypatch.setattr(LiveLocationModel, '_after_write',
+                        staticmethod(lambda pings, written_at: written.append(pings)))
+    conn.written = written
+    return conn
+
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def point(officer_id, minute, latitude=15.49):
+    return {'officerId': officer_id, 'latitude': latitude, 'longitude': 73.82,
+            'timestamp': f'2025-11-16T09:{minute:02d}:00Z'}
+
+
+class TestBulkUpdate:
+    """Test POST /api/live-locations/bulk"""
+
+    def test_writes_history_and_latest_position(self, client, database):
+        """Test that every point is appended and the newest becomes the live row"""
+        response = client.post('/api/live-locations/bulk', json={'points': [
+            point('GP1', 5, 15.5), point('GP1', 1), point('GP1', 3)
+        ]})
+        assert response.status_code == 200
+        assert response.get_json()['data'] == {'accepted': 3, 'officers': 1, 'rejected': []}
+
+        (_, history), = database.statements('location_points')
+        assert history[2::8] == [datetime(2025, 11, 16, 9, 1), datetime(2025, 11, 16, 9, 3),
+                                 datetime(2025, 11, 16, 9, 5)]
+        (upsert, params), = database.statements('live_locations')
+        assert 'IF((VALUES(timestamp) IS NULL' in upsert
+        assert params[2] == 15.5
+        assert database.commits == 1
+        assert [officer_id for officer_id, _ in database.written[0]] == ['GP1']
+
+    def test_unknown_officer_is_rejected(self, client, database):
+        """Test that points of an officer missing from officers do not fail the batch"""
+        response = client.post('/api/live-locations/bulk', json={'officerId': 'GP1', 'points': [
+            point('GP9', 1), {'latitude': 15.49, 'longitude': 73.82}, point('GP9', 2), {'latitude': 'x'}
+        ]})
+        data = response.get_json()['data']
+        assert response.status_code == 200
+        assert data['accepted'] == 1
+        assert data['officers'] == 1
+        assert [item['index'] for item in data['rejected']] == [0, 2, 3]
+        assert data['rejected'][0]['error'] == 'Unknown officer GP9'
+        assert all('GP9' not in params for _, params in database.statements('location_points'))
+
+    def test_stale_backlog_keeps_live_position(self, client, database):
+        """Test that a backlog older than the live row only goes to history"""
+        response = client.post('/api/live-locations/bulk', json={'points': [point('GP2', 1), point('GP2', 2)]})
+        assert response.get_json()['data']['accepted'] == 2
+        assert len(database.statements('location_points')) == 1
+        assert database.statements('live_locations') == []
+        assert database.written == []
+
+    def test_validation(self, client, database):
+        """Test empty and oversized requests"""
+        assert client.post('/api/live-locations/bulk', json={'points': []}).status_code == 400
+        assert client.post('/api/live-locations/bulk', json=[point('GP1', 1)] * 5001).status_code == 413
+        assert database.queries == []
+
+
+class TestUpdateLocation:
+    """Test the single-ping write behind PUT /api/live-locations/officer/<id>"""
+
+    def test_stale_ping_is_not_published(self, database):
+        """Test that an older ping goes to history only and never reaches the fan-out"""
+        LiveLocationModel.update_location('GP2', point('GP2', 1))
+
+        assert len(database.statements('location_points')) == 1
+        assert database.statements('live_locations') == []
+        assert database.written == []
+
+    def test_fresh_ping_is_published(self, database):
+        """Test that a newer ping updates the live row and is published"""
+        LiveLocationModel.update_location('GP2', dict(point('GP2', 1), timestamp='2025-11-16T13:00:00Z'))
+
+        assert len(database.statements('live_locations')) == 1
+        assert [officer_id for officer_id, _ in database.written[0]] == ['GP2']
@@ -0,0 +1,237 @@
+"""
+Cache Backend Tests
+Tests shared cache backends and cross-worker invalidation
+"""
+
+import pytest
+import sys
+import os
+import socket
+import socketserver
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.cache import ReferenceCache, encode_value, decode_value
+from models.cache_backend import CacheBackendError, MemoryBackend, RedisBackend
+
+redis = pytest.importorskip('redis')
+
+
+def encode_command(args):
+    """Encode a RESP array of bulk strings"""
+    parts = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        arg = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+    return b''.join(parts)
+
+
+def read_reply(reader):
+    """Read one RESP value (arrays and bulk strings are all clients send)"""
+    line = reader.readline()
+    if not line.endswith(b'\r\n'):
+        raise EOFError()
+    kind, payload = line[:1], line[1:-2]
+    if kind == b'$':
+        return reader.read(int(payload) + 2)[:-2]
+    if kind == b'*':
+        return [read_reply(reader) for _ in range(int(payload))]
+    return payload
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """Local stand-in for a Redis server: GET, SET [PX], INCRBY, PUBLISH, SUBSCRIBE"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), RespHandler)
+        self.values = {}
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return 'redis://127.0.0.1:%d/0' % self.server_address[1]
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except EOFError:
+                return
+            name, args = command[0].upper(), command[1:]
+            with server.lock:
+                if name == b'GET':
+                    self._send_bulk(server.values.get(args[0]))
+                elif name == b'SET':
+                    server.values[args[0]] = args[1]
+                    self.wfile.write(b'+OK\r\n')
+                elif name == b'INCRBY':
+                    value = int(server.values.get(args[0], b'0')) + int(args[1])
+                    server.values[args[0]] = str(value).encode()
+                    self.wfile.write(b':%d\r\n' % value)
+                elif name == b'PUBLISH':
+                    receivers = server.subscribers.get(args[0], [])
+                    for wfile in receivers:
+                        wfile.write(encode_command((b'message', args[0], args[1])))
+                    self.wfile.write(b':%d\r\n' % len(receivers))
+                elif name == b'SUBSCRIBE':
+                    server.subscribers.setdefault(args[0], []).append(self.wfile)
+                    self.wfile.write(b'*3\r\n$9\r\nsubscribe\r\n' + encode_command((args[0],))[4:] + b':1\r\n')
+                else:
+                    self.wfile.write(b'-ERR unknown command\r\n')
+
+    def _send_bulk(self, value):
+        if value is None:
+            self.wfile.write(b'$-1\r\n')
+        else:
+            self.wfile.write(b'$%d\r\n%s\r\n' % (len(value), value))
+
+
+@pytest.fixture
+def resp_server():
+    server = RespStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestCacheCodec:
+    """Test value encoding for the shared backend"""
+
+    def test_round_trips_mysql_types(self):
+        """Test that datetimes and decimals come back with their types"""
+        value = [{'id': 'O1', 'created_at': datetime(2025, 11, 16, 9, 30), 'lat': Decimal('15.4909')}]
+        assert decode_value(encode_value(value)) == value
+
+
+class TestSharedCache:
+    """Test two workers sharing one backend"""
+
+    def test_shared_hit_and_cross_worker_invalidation(self):
+        """Test that one worker's load is reused and its writes invalidate the other"""
+        backend = MemoryBackend()
+        worker_a = ReferenceCache(backend=backend)
+        worker_b = ReferenceCache(backend=backend)
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return [{'id': 'O1', 'updated_at': datetime(2025, 11, 16, 9, 0)}]
+
+        entry_a = worker_a.get('officers', 'all', loader)
+        entry_b = worker_b.get('officers', 'all', loader)
+        assert len(loads) == 1
+        assert entry_b.value == entry_a.value
+        assert entry_b.etag == entry_a.etag
+        assert worker_b.stats()['backend']['shared_hits'] == 1
+
+        worker_b.invalidate('officers')
+        assert worker_a.stats()['namespaces']['officers']['entries'] == 0
+        worker_a.get('officers', 'all', loader)
+        assert len(loads) == 2
+
+    def test_notify_reaches_other_workers_only(self):
+        """Test that listeners receive payloads from other workers"""
+        backend = MemoryBackend()
+        worker_a = ReferenceCache(backend=backend)
+        worker_b = ReferenceCache(backend=backend)
+        received_a, received_b = [], []
+        worker_a.add_listener('live_locations', received_a.append)
+        worker_b.add_listener('live_locations', received_b.append)
+        worker_a.get('officers', 'all', list)
+        worker_b.get('officers', 'all', list)
+
+        worker_a.notify('live_locations', {'pings': [['O1', {'latitude': 15.49}]]})
+        assert received_a == []
+        assert received_b == [{'pings': [['O1', {'latitude': 15.49}]]}]
+
+
+class TestRedisBackend:
+    """Test the Redis backend against a local stand-in"""
+
+    def test_commands(self, resp_server):
+        """Test GET/SET/INCR over the wire"""
+        backend = RedisBackend(resp_server.url)
+        try:
+            assert backend.get('missing') is None
+            backend.set('key', b'value', ttl=60)
+            assert backend.get('key') == b'value'
+            assert backend.incr('counter') == 1
+            assert backend.incr('counter') == 2
+        finally:
+            backend.close()
+
+    def test_invalidation_between_workers(self, resp_server):
+        """Test that a write on one worker drops the other worker's entry"""
+        backend_a, backend_b = RedisBackend(resp_server.url), RedisBackend(resp_server.url)
+        worker_a = ReferenceCache(backend=backend_a)
+        worker_b = ReferenceCache(backend=backend_b)
+        try:
+            worker_a.get('vehicles', 'all', lambda: [{'id': 'V1'}])
+            assert worker_b.get('vehicles', 'all', lambda: pytest.fail('not shared')).value == [{'id': 'V1'}]
+            assert wait_for(lambda: len(resp_server.subscribers.get(b'gph:cache', [])) == 2)
+
+            worker_b.invalidate('vehicles')
+            assert wait_for(lambda: worker_a.stats()['namespaces']['vehicles']['entries'] == 0)
+            assert worker_a.get('vehicles', 'all', lambda: [{'id': 'V2'}]).value == [{'id': 'V2'}]
+        finally:
+            backend_a.close()
+            backend_b.close()
+
+    def test_failure_short_circuits(self):
+        """Test that commands fail fast for retry_after seconds after a failure"""
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        backend = RedisBackend('redis://127.0.0.1:%d/0' % port, timeout=0.5, retry_after=60)
+        try:
+            with pytest.raises(CacheBackendError):
+                backend.get('key')
+            assert backend.available() is False
+            started = time.monotonic()
+            with pytest.raises(CacheBackendError):
+                backend.get('key')
+            assert time.monotonic() - started < 0.01
+            assert backend.stats()['skipped'] == 1
+
+            # Publishes never block the caller; while down they are dropped
+            backend.publish('channel', b'message')
+            assert wait_for(lambda: backend.stats()['publish_dropped'] == 1)
+        finally:
+            backend.close()
+
+    def test_publish_is_queued(self, resp_server):
+        """Test that publish returns before the server is contacted"""
+        backend = RedisBackend(resp_server.url, publish_queue=1)
+        try:
+            with resp_server.lock:
+                backend.publish('channel', b'one')
+                backend.publish('channel', b'two')
+                backend.publish('channel', b'three')
+            assert wait_for(lambda: backend.stats()['published'] >= 1)
+            assert backend.stats()['publish_dropped'] >= 1
+        finally:
+            backend.close()
@@ -0,0 +1,183 @@
+"""
+Duty Conflict Tests
+Tests set-based officer resolution and conflict detection in DutyModel
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.duty_model import DutyModel
+
+
+OFFICER_UUID = 'a1b2c3d4-0000-0000-0000-000000000001'
+
+
+class FakeCursor:
+    """Cursor that records statements and returns queued result sets"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append((query, params))
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+
+class TestDutyConflicts:
+    """Test duty conflict helpers"""
+
+    def test_resolves_staff_ids_in_one_query(self):
+        """Test that staff_ids and UUIDs are resolved together and unknown ones skipped"""
+        cursor = FakeCursor([[
+            {'id': 'uuid-1', 'staff_id': 'GP001'},
+            {'id': 'uuid-2', 'staff_id': 'GP002'},
+            {'id': OFFICER_UUID, 'staff_id': 'GP003'}
+        ]])
+        resolved = DutyModel.resolve_officer_ids(
+            cursor, ['GP002', OFFICER_UUID, 'GP404', 'GP001', 'GP002']
+        )
+
+        assert resolved == ['uuid-2', OFFICER_UUID, 'uuid-1']
+        assert len(cursor.statements) == 1
+        assert sorted(cursor.statements[0][1]) == ['GP001', 'GP002', 'GP404', OFFICER_UUID]
+
+    def test_unknown_uuids_are_skipped(self):
+        """Test that UUIDs are checked like staff_ids, as in bulk create"""
+        unknown = 'ffffffff-0000-0000-0000-000000000009'
+        cursor = FakeCursor([[{'id': OFFICER_UUID, 'staff_id': 'GP003', 'staff_name': 'C'}]])
+        officers = DutyModel.lookup_officers(cursor, [unknown, OFFICER_UUID])
+
+        assert list(officers) == [OFFICER_UUID]
+        assert officers[OFFICER_UUID]['staff_name'] == 'C'
+        assert 'staff_id IN' not in cursor.statements[0][0]
+        assert DutyModel.resolve_officer_ids(FakeCursor([[]]), [unknown]) == []
+
+    def test_no_refs_no_query(self):
+        """Test that an empty roster skips the officers lookup"""
+        cursor = FakeCursor([])
+        assert DutyModel.resolve_officer_ids(cursor, [None, '']) == []
+        assert cursor.statements == []
+
+    def test_finds_conflicts_for_all_officers_in_one_query(self):
+        """Test that one overlap query covers the roster, in roster order"""
+        start = datetime(2025, 11, 16, 9, 0)
+        end = datetime(2025, 11, 16, 17, 0)
+        cursor = FakeCursor([[
+            {'id': 'D2', 'type': 'naka', 'start_time': start, 'end_time': end,
+             'status': 'assigned', 'officer_id': 'uuid-2', 'staff_id': 'GP002', 'staff_name': 'B'},
+            {'id': 'D1', 'type': 'patrol', 'start_time': start, 'end_time': end,
+             'status': 'active', 'officer_id': 'uuid-1', 'staff_id': 'GP001', 'staff_name': 'A'}
+        ]])
+        conflicts = DutyModel.find_conflicts(
+            cursor, ['uuid-1', 'uuid-2'], '2025-11-16 10:00:00', '2025-11-16 12:00:00',
+            exclude_duty_id='D9'
+        )
+
+        assert [conflict['duty_id'] for conflict in conflicts] == ['D1', 'D2']
+        assert conflicts[0]['officer_id'] == 'GP001'
+        assert conflicts[0]['duty_start'] == '2025-11-16 09:00:00'
+        assert len(cursor.statements) == 1
+        assert cursor.statements[0][1][:2] == ['uuid-1', 'uuid-2']
+        assert cursor.statements[0][1][-1] == 'D9'
+
+    def test_no_officers_no_query(self):
+        """Test that an empty roster has no conflicts"""
+        cursor = FakeCursor([])
+        assert DutyModel.find_conflicts(cursor, [], '2025-11-16', '2025-11-17') == []
+        assert cursor.statements == []
+
+
+class ScriptedConnection:
+    """Connection whose cursor answers queries by matching SQL fragments"""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.statements = []
+        self.batches = []
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        self.statements.append(query)
+        self.last = query
+
+    def executemany(self, query, rows):
+        # Keyed by table: INSERT INTO <table> ...
+        self.batches.append((query.split()[2], list(rows)))
+
+    def fetchall(self):
+        for fragment, rows in self.answers.items():
+            if fragment in self.last:
+                return rows
+        return []
+
+    def commit(self):
+        self.commits += 1
+
+
+class TestBulkDutyCreate:
+    """Test DutyModel.create_duties"""
+
+    def test_reports_conflicts_within_batch_and_with_existing(self, monkeypatch):
+        """Test per-item results and a single transaction for accepted duties"""
+        import contextlib
+        import models.duty_model as duty_model
+
+        conn = ScriptedConnection({
+            'FROM officers': [
+                {'id': 'uuid-1', 'staff_id': 'GP001', 'staff_name': 'A'},
+                {'id': 'uuid-2', 'staff_id': 'GP002', 'staff_name': 'B'}
+            ],
+            'FROM vehicles': [{'id': 'V1'}],
+            'FROM duties WHERE id IN': [{'id': 'EXISTING'}],
+            'd.start_time < %s': [
+                {'id': 'OLD', 'type': 'naka', 'status': 'assigned', 'officer_id': 'uuid-2',
+                 'staff_id': 'GP002', 'staff_name': 'B',
+                 'start_time': datetime(2025, 11, 16, 6), 'end_time': datetime(2025, 11, 16, 9)}
+            ]
+        })
+        monkeypatch.setattr(duty_model, 'get_connection', contextlib.contextmanager(lambda: (yield conn)))
+        monkeypatch.setattr(duty_model, 'duty_interval_index', None)
+
+        results = DutyModel.create_duties([
+            {'id': 'N1', 'startTime': '2025-11-16T10:00:00Z', 'endTime': '2025-11-16T12:00:00Z',
+             'officerUids': ['GP001', 'GP404'], 'vehicleIds': ['V1', 'V9']},
+            {'id': 'N2', 'startTime': '2025-11-16T11:00:00Z', 'endTime': '2025-11-16T13:00:00Z',
+             'officerUids': ['GP001']},
+            {'id': 'N3', 'startTime': '2025-11-16T08:00:00Z', 'endTime': '2025-11-16T10:00:00Z',
+             'officerUids': ['GP002']},
+            {'id': 'EXISTING', 'startTime': '2025-11-17T08:00:00Z', 'endTime': '2025-11-17T10:00:00Z'},
+            {'id': 'N5', 'startTime': 'tomorrow', 'endTime': '2025-11-17T10:00:00Z'},
+            {'id': 'N6', 'startTime': '2025-11-18T08:00:00Z', 'endTime': '2025-11-18T10:00:00Z',
+             'officerUids': ['GP002']}
+        ])
+
+        assert [result['status'] for result in results] == [
+            'created', 'conflict', 'conflict', 'invalid', 'invalid', 'created'
+        ]
+        assert results[0]['skipped_officers'] == ['GP404']
+        assert results[0]['skipped_vehicles'] == ['V9']
+        assert results[1]['conflicts'][0]['batch_index'] == 0
+        assert results[2]['conflicts'][0]['duty_id'] == 'OLD'
+
+        inserted = dict(conn.batches)
+        assert [row[0] for row in inserted['duties']] == ['N1', 'N6']
+        assert inserted['duty_officers'] == [('N1', 'uuid-1'), ('N6', 'uuid-2')]
+        assert inserted['duty_vehicles'] == [('N1', 'V1')]
+        assert conn.commits == 1
@@ -0,0 +1,89 @@
+"""
+Duty Interval Index Tests
+Tests in-memory overlap lookups and incremental updates of the duty index
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.duty_index import DutyIntervalIndex
+
+
+OFFICER_A = 'a1b2c3d4-0000-0000-0000-000000000001'
+OFFICER_B = 'a1b2c3d4-0000-0000-0000-000000000002'
+
+
+def row(duty_id, officer_id, start, end, status='assigned', duty_type='patrol'):
+    return {
+        'id': duty_id,
+        'type': duty_type,
+        'status': status,
+        'start_time': start,
+        'end_time': end,
+        'officer_id': officer_id,
+        'staff_id': 'GP' + officer_id[-3:],
+        'staff_name': 'Officer ' + officer_id[-3:]
+    }
+
+
+def at(hour, day=16):
+    return datetime(2025, 11, day, hour, 0)
+
+
+@pytest.fixture
+def index():
+    rows = [
+        row('D1', OFFICER_A, at(8), at(12)),
+        row('D2', OFFICER_A, at(14), at(18)),
+        row('D3', OFFICER_B, at(0, day=15), at(0, day=18)),
+        row('D4', OFFICER_B, at(9), at(10), status='completed'),
+    ]
+    index = DutyIntervalIndex(lambda: rows, max_age=3600)
+    assert index.load()
+    return index
+
+
+class TestDutyIntervalIndex:
+    """Test duty interval index"""
+
+    def test_finds_overlaps(self, index):
+        """Test half-open overlap semantics and closed-duty filtering"""
+        conflicts = index.find_conflicts([OFFICER_A, OFFICER_B], '2025-11-16 11:00:00', '2025-11-16 14:00:00')
+        assert [conflict['duty_id'] for conflict in conflicts] == ['D1', 'D3']
+        assert conflicts[0]['officer_id'] == 'GP001'
+        assert conflicts[0]['duty_start'] == '2025-11-16 08:00:00'
+
+    def test_touching_intervals_do_not_conflict(self, index):
+        """Test that a duty ending at the window start is not a conflict"""
+        assert index.find_conflicts([OFFICER_A], at(12), at(14)) == []
+
+    def test_resolves_staff_ids_and_excludes_duty(self, index):
+        """Test staff_id lookup and exclude_duty_id"""
+        conflicts = index.find_conflicts(['GP001'], '2025-11-16T07:00:00Z', '2025-11-16T20:00:00Z',
+                                         exclude_duty_id='D2')
+        assert [conflict['duty_id'] for conflict in conflicts] == ['D1']
+        assert index.find_conflicts(['GP999'], at(0), at(23)) == []
+
+    def test_put_and_remove(self, index):
+        """Test that writes keep the index current"""
+        index.put('D1', [row('D1', OFFICER_B, at(20), at(22))])
+        assert index.find_conflicts([OFFICER_A], at(9), at(10)) == []
+        assert [c['duty_id'] for c in index.find_conflicts([OFFICER_B], at(21), at(23))] == ['D3', 'D1']
+
+        index.put('D2', [row('D2', OFFICER_A, at(14), at(18), status='completed')])
+        index.remove('D3')
+        assert index.find_conflicts([OFFICER_A, OFFICER_B], at(13), at(19)) == []
+        assert index.stats()['duties'] == 1
+
+    def test_unavailable_index_returns_none(self):
+        """Test that a failed load tells the caller to use the database"""
+        def failing_loader():
+            raise RuntimeError("database down")
+
+        index = DutyIntervalIndex(failing_loader)
+        assert index.find_conflicts([OFFICER_A], at(8), at(9)) is None
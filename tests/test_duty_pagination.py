@@ -0,0 +1,112 @@
+"""
+Duty Pagination Tests
+Tests keyset cursors, SQL filters and field projection of get_all_duties
+"""
+
+import pytest
+import sys
+import os
+import contextlib
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models.duty_model as duty_model
+from models.duty_model import DutyModel, encode_duty_cursor, decode_duty_cursor
+
+
+class RecordingConnection:
+    """Connection returning fixed duty/officer/vehicle rows and recording queries"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.officer_rows = []
+        self.vehicle_rows = []
+        self.queries = []
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        self.queries.append((' '.join(query.split()), params))
+
+    def fetchall(self):
+        query = self.queries[-1][0]
+        if 'FROM duty_officers' in query:
+            return self.officer_rows
+        if 'FROM duty_vehicles' in query:
+            return self.vehicle_rows
+        return [dict(row) for row in self.rows]
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    rows = [
+        {'id': f'D{second}', 'created_at': datetime(2025, 11, 16, 9, 0, second), 'type': 'naka'}
+        for second in (3, 2, 1)
+    ]
+    conn = RecordingConnection(rows)
+    monkeypatch.setattr(duty_model, 'get_connection', contextlib.contextmanager(lambda: (yield conn)))
+    return conn
+
+
+class TestDutyPagination:
+    """Test duty list pagination"""
+
+    def test_cursor_round_trip(self):
+        """Test that a cursor decodes to the row's keyset position"""
+        cursor = encode_duty_cursor({'id': 'D7', 'created_at': datetime(2025, 11, 16, 9, 0, 7)})
+        assert decode_duty_cursor(cursor) == (datetime(2025, 11, 16, 9, 0, 7), 'D7')
+        with pytest.raises(ValueError):
+            decode_duty_cursor('not-a-cursor')
+
+    def test_page_uses_keyset_filters_and_projection(self, connection):
+        """Test that filters and the cursor go into SQL and extra rows are trimmed"""
+        cursor = encode_duty_cursor({'id': 'D9', 'created_at': datetime(2025, 11, 16, 9, 0, 9)})
+        page = DutyModel.get_all_duties(
+            {'status': ['assigned', 'active'], 'type': 'naka'}, ['id', 'type'], limit=2, cursor=cursor
+        )
+
+        query, params = connection.queries[0]
+        assert 'location_polygon' not in query and 'GROUP_CONCAT' not in query
+        assert 'd.status IN (%s, %s)' in query and 'd.type = %s' in query
+        assert 'ORDER BY d.created_at DESC, d.id DESC LIMIT %s' in query
+        assert params[-1] == 3 and params[-2] == 'D9'
+
+        assert [duty['id'] for duty in page['duties']] == ['D3', 'D2']
+        assert decode_duty_cursor(page['next_cursor'])[1] == 'D2'
+
+    def test_unpaginated_returns_list(self, connection):
+        """Test that the legacy call still returns every duty as a list"""
+        connection.rows = [dict(row, location_polygon='[]', location_radius=None)
+                           for row in connection.rows]
+        duties = DutyModel.get_all_duties()
+        assert isinstance(duties, list) and len(duties) == 3
+        assert duties[0]['location'] == {'polygon': [], 'radius': 500}
+        assert 'LIMIT' not in connection.queries[0][0]
+
+    def test_officers_and_vehicles_loaded_in_two_queries(self, connection):
+        """Test that the page's officers and vehicles are batched and stitched"""
+        connection.officer_rows = [
+            {'duty_id': 'D3', 'officer_id': 'uuid-1', 'staff_name': 'A'},
+            {'duty_id': 'D3', 'officer_id': 'uuid-2', 'staff_name': 'B'},
+            {'duty_id': 'D1', 'officer_id': 'uuid-1', 'staff_name': 'A'}
+        ]
+        connection.vehicle_rows = [{'duty_id': 'D3', 'vehicle_id': 'V1'}]
+
+        duties = DutyModel.get_all_duties(fields=['id', 'officers', 'vehicles'])
+
+        assert len(connection.queries) == 3
+        assert connection.queries[1][1] == ['D3', 'D2', 'D1']
+        assert duties[0]['officerUids'] == ['uuid-1', 'uuid-2']
+        assert duties[0]['officerNames'] == 'A, B'
+        assert duties[0]['vehicleIds'] == ['V1']
+        assert duties[1]['officerUids'] == [] and duties[1]['officer_uids'] is None
+        assert duties[2]['vehicleIds'] == []
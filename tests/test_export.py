@@ -0,0 +1,192 @@
+"""
+Export Tests
+Tests streaming NDJSON/CSV exports of compliance logs, check-ins and activities
+"""
+
+import pytest
+import sys
+import os
+import csv
+import io
+import json
+import types
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models.db as db
+import models.activity_model as activity_model
+import models.check_in_model as check_in_model
+import models.compliance_model as compliance_model
+from app import create_app
+from utils.export import parse_export_args
+
+
+START = datetime(2025, 11, 1, 0, 0, 0)
+
+
+def compliance_rows(count):
+    for index in range(count):
+        yield {
+            'id': f'C{index}', 'timestamp': START + timedelta(minutes=index), 'action': 'check-in',
+            'duty_id': 'D1', 'officer_id': 'GP1', 'officer_uid': 'GP1', 'officer_name': 'Officer, "A"',
+            'location': json.dumps({'lat': 15.49, 'lng': 73.82}), 'details': None, 'photo_url': None,
+            'created_at': START
+        }
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """Replace stream_rows in the models; record queries and rows pulled"""
+    recorded = {'queries': [], 'pulled': 0}
+
+    def fake_stream_rows(query, params=None):
+        recorded['queries'].append((' '.join(query.split()), params))
+        for row in compliance_rows(recorded.get('count', 3)):
+            recorded['pulled'] += 1
+            yield row
+
+    for module in (compliance_model, check_in_model, activity_model):
+        monkeypatch.setattr(module, 'stream_rows', fake_stream_rows)
+    return recorded
+
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+class TestParseExportArgs:
+    """Test export parameter validation"""
+
+    def test_ranges(self):
+        """Test ISO timestamps, date-only end and open ranges"""
+        assert parse_export_args('2025-11-01', '2025-11-30') == (
+            (datetime(2025, 11, 1), datetime(2025, 12, 1), 'ndjson'), None)
+        assert parse_export_args('2025-11-01T10:00:00Z', None, 'CSV') == (
+            (datetime(2025, 11, 1, 10), None, 'csv'), None)
+        assert parse_export_args() == ((None, None, 'ndjson'), None)
+
+    def test_errors(self):
+        """Test bad dates, reversed ranges and unknown formats"""
+        assert parse_export_args('yesterday')[1]
+        assert parse_export_args('2025-11-02', '2025-11-01T00:00:00')[1]
+        assert parse_export_args(fmt='xlsx')[1]
+
+
+class TestExportEndpoints:
+    """Test the streamed export responses"""
+
+    def test_ndjson_with_filters(self, client, queries):
+        """Test NDJSON rows, parsed JSON columns and SQL filters"""
+        response = client.get('/api/compliance/export?start=2025-11-01&end=2025-11-30&officerId=GP1&dutyId=D1')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert 'compliance-20251101-20251201.ndjson' in response.headers['Content-Disposition']
+
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [row['id'] for row in rows] == ['C0', 'C1', 'C2']
+        assert rows[0]['location'] == {'lat': 15.49, 'lng': 73.82}
+        assert rows[1]['timestamp'] == '2025-11-01T00:01:00'
+
+        query, params = queries['queries'][0]
+        assert 'c.timestamp >= %s AND c.timestamp < %s AND c.officer_id = %s AND c.duty_id = %s' in query
+        assert query.endswith('ORDER BY c.timestamp ASC, c.id ASC')
+        assert params == [datetime(2025, 11, 1), datetime(2025, 12, 1), 'GP1', 'D1']
+
+    def test_csv(self, client, queries):
+        """Test CSV header, quoting and nested JSON as text"""
+        response = client.get('/api/check-ins/export?format=csv')
+        assert response.mimetype == 'text/csv'
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        assert rows[0][:3] == ['id', 'timestamp', 'check_in_type']
+        assert len(rows) == 4
+        header = rows[0]
+        assert rows[1][header.index('officer_name')] == 'Officer, "A"'
+        assert json.loads(rows[1][header.index('location')]) == {'lat': 15.49, 'lng': 73.82}
+        assert 'WHERE 1 = 1 ORDER BY ci.timestamp' in queries['queries'][0][0]
+
+    def test_streams_lazily(self, client, queries):
+        """Test that the first chunk is sent before every row is read"""
+        queries['count'] = 100000
+        response = client.get('/api/activities/export')
+        assert response.is_streamed
+        chunks = iter(response.response)
+        first = next(chunks)
+        assert first.count(b'\n') == 500
+        assert queries['pulled'] < 1000
+        response.close()
+
+    def test_failure_mid_stream(self, client, monkeypatch):
+        """Test that an NDJSON export that fails ends with an error line"""
+        def failing(query, params=None):
+            yield from compliance_rows(2)
+            raise RuntimeError('connection lost')
+
+        monkeypatch.setattr(compliance_model, 'stream_rows', failing)
+        lines = client.get('/api/compliance/export').get_data(as_text=True).splitlines()
+        assert len(lines) == 3
+        assert 'error' in json.loads(lines[-1])
+
+    def test_validation(self, client):
+        """Test that bad parameters are rejected before streaming"""
+        response = client.get('/api/activities/export?start=not-a-date')
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+
+class TestStreamRows:
+    """Test connection handling of the unbuffered row stream"""
+
+    @pytest.fixture
+    def pool(self, monkeypatch):
+        class Cursor:
+            closed = False
+
+            def __init__(self):
+                self.remaining = 2500
+
+            def execute(self, query, params=None):
+                pass
+
+            def fetchmany(self, size):
+                batch = min(size, self.remaining)
+                self.remaining -= batch
+                return [{'id': index} for index in range(batch)]
+
+            def close(self):
+                # A real SSDictCursor reads every unread row here
+                Cursor.closed = True
+
+        class Pool:
+            def __init__(self):
+                self.released = []
+
+            def acquire(self):
+                return types.SimpleNamespace(connection=types.SimpleNamespace(cursor=lambda cls: Cursor()))
+
+            def release(self, slot, discard=False):
+                self.released.append(discard)
+
+        pool = Pool()
+        pool.cursor_class = Cursor
+        monkeypatch.setattr(db, 'get_pool', lambda: pool)
+        return pool
+
+    def test_exhausted_stream_keeps_connection(self, pool):
+        """Test that a fully read stream returns its connection for reuse"""
+        assert len(list(db.stream_rows('SELECT 1', fetch_size=1000))) == 2500
+        assert pool.cursor_class.closed
+        assert pool.released == [False]
+
+    def test_early_close_discards_connection(self, pool):
+        """Test that an abandoned stream drops the connection instead of draining it"""
+        rows = db.stream_rows('SELECT 1', fetch_size=1000)
+        next(rows)
+        rows.close()
+        assert not pool.cursor_class.closed
+        assert pool.released == [True]
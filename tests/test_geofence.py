@@ -0,0 +1,180 @@
+"""
+Geofence Engine Tests
+Tests polygon parsing, vectorized point-in-area checks and violation reporting
+"""
+
+import pytest
+import sys
+import os
+import json
+import time
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models.geofence as geofence_module
+from models.geofence import GeofenceEngine, GeofenceSet, parse_polygon, to_epoch
+
+
+OFFICER_A = 'a1b2c3d4-0000-0000-0000-000000000001'
+OFFICER_B = 'a1b2c3d4-0000-0000-0000-000000000002'
+
+# ~1.1 km square around Panaji
+SQUARE = [
+    {'lat': 15.490, 'lng': 73.820}, {'lat': 15.490, 'lng': 73.830},
+    {'lat': 15.500, 'lng': 73.830}, {'lat': 15.500, 'lng': 73.820}
+]
+
+NOW = datetime(2025, 11, 16, 10, 0, 0)
+
+
+def rows():
+    return [
+        {'id': 'D1', 'status': 'active', 'start_time': datetime(2025, 11, 16, 8), 'end_time': datetime(2025, 11, 16, 12),
+         'location_polygon': json.dumps(SQUARE), 'location_radius': 500, 'officer_id': OFFICER_A, 'staff_name': 'A'},
+        {'id': 'D2', 'status': 'assigned', 'start_time': datetime(2025, 11, 16, 8), 'end_time': datetime(2025, 11, 16, 12),
+         'location_polygon': json.dumps([{'lat': 15.40, 'lng': 73.90}]), 'location_radius': 200,
+         'officer_id': OFFICER_B, 'staff_name': 'B'},
+        {'id': 'D3', 'status': 'assigned', 'start_time': datetime(2025, 11, 16, 14), 'end_time': datetime(2025, 11, 16, 18),
+         'location_polygon': json.dumps(SQUARE), 'location_radius': None, 'officer_id': OFFICER_B, 'staff_name': 'B'},
+    ]
+
+
+def fences():
+    return GeofenceSet(GeofenceEngine._group(rows()))
+
+
+class TestParsePolygon:
+    """Test the accepted polygon formats"""
+
+    def test_formats(self):
+        """Test objects, pairs and GeoJSON (closed ring) give the same vertices"""
+        expected = [(15.49, 73.82), (15.49, 73.83), (15.5, 73.83)]
+        assert parse_polygon(json.dumps([{'latitude': 15.49, 'longitude': 73.82},
+                                          {'lat': 15.49, 'lng': 73.83}, {'lat': 15.5, 'lng': 73.83}])) == expected
+        assert parse_polygon([[15.49, 73.82], [15.49, 73.83], [15.5, 73.83]]) == expected
+        assert parse_polygon({'type': 'Polygon', 'coordinates': [[[73.82, 15.49], [73.83, 15.49],
+                                                                    [73.83, 15.5], [73.82, 15.49]]]}) == expected
+
+    def test_unusable_values(self):
+        """Test that bad input gives no vertices instead of raising"""
+        assert parse_polygon('not json') == []
+        assert parse_polygon(None) == []
+        assert parse_polygon([{'lat': 'x'}, 'y']) == []
+
+
+class TestGeofenceSet:
+    """Test signed distances with and without NumPy"""
+
+    @pytest.fixture(params=['numpy', 'python'])
+    def areas(self, request, monkeypatch):
+        if request.param == 'numpy':
+            if geofence_module.np is None:
+                pytest.skip('NumPy not installed')
+            monkeypatch.setattr(geofence_module, 'VECTORIZE_MIN_PAIRS', 1)
+        else:
+            monkeypatch.setattr(geofence_module, 'np', None)
+        return fences()
+
+    def test_polygon_inside_and_outside(self, areas):
+        """Test that distance is negative inside and positive outside"""
+        points = [(OFFICER_A, 15.495, 73.825), (OFFICER_A, 15.495, 73.835)]
+        results = areas.evaluate(points, to_epoch(NOW))
+        assert [(index, duty) for index, duty, _ in results] == [(0, 'D1'), (1, 'D1')]
+        # Centre is ~535 m from the nearest edge; 0.005 deg east is ~536 m outside
+        assert -560 < results[0][2] < -520
+        assert 520 < results[1][2] < 560
+
+    def test_circle_and_duty_window(self, areas):
+        """Test radius areas and that duties outside their window are ignored"""
+        results = areas.evaluate([(OFFICER_B, 15.40, 73.90)], to_epoch(NOW))
+        assert len(results) == 1
+        assert results[0][1] == 'D2'
+        assert results[0][2] == pytest.approx(-200.0)
+        assert areas.evaluate([(OFFICER_B, 15.40, 73.90)], to_epoch(datetime(2025, 11, 16, 13))) == []
+
+    def test_unknown_officer(self, areas):
+        """Test that officers without duties are not evaluated"""
+        assert areas.evaluate([('someone-else', 15.495, 73.825)], to_epoch(NOW)) == []
+
+
+    def test_vectorized_matches_loop(self, monkeypatch):
+        """Test that the array and loop paths agree on a batch of pings"""
+        if geofence_module.np is None:
+            pytest.skip('NumPy not installed')
+        areas = fences()
+        points = [(OFFICER_A if k % 2 else OFFICER_B, 15.48 + k * 0.0007, 73.815 + k * 0.0005) for k in range(60)]
+        vectorized = areas._evaluate_arrays(points, *self._pairs(areas, points), to_epoch(NOW))
+        looped = areas._evaluate_loop(points, *self._pairs(areas, points), to_epoch(NOW))
+        assert [(p, d) for p, d, _ in vectorized] == [(p, d) for p, d, _ in looped]
+        assert [m for _, _, m in vectorized] == pytest.approx([m for _, _, m in looped])
+
+    @staticmethod
+    def _pairs(areas, points):
+        pairs = [(index, duty) for index, (officer_id, _, _) in enumerate(points)
+                 for duty in areas.by_officer.get(officer_id, ())]
+        return [p for p, _ in pairs], [d for _, d in pairs]
+
+class TestGeofenceEngine:
+    """Test violation reporting"""
+
+    @pytest.fixture
+    def engine(self):
+        written = []
+        engine = GeofenceEngine(rows, written.extend, max_age=3600, tolerance=25, realert=900)
+        engine.written = written
+        assert engine.load()
+        return engine
+
+    def test_reports_on_leaving_then_realerts(self, engine):
+        """Test one violation on leaving the area, then one per re-alert period"""
+        outside = [(OFFICER_A, {'latitude': '15.495', 'longitude': '73.835', 'accuracy': 10})]
+        first = engine.check(outside, NOW)
+        assert len(first) == 1
+        assert first[0]['action'] == 'geofence-violation'
+        assert first[0]['dutyId'] == 'D1'
+
+        assert engine.check(outside, datetime(2025, 11, 16, 10, 5)) == []
+        assert len(engine.check(outside, datetime(2025, 11, 16, 10, 16))) == 1
+
+        deadline = time.time() + 2
+        while len(engine.written) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(engine.written) == 2
+
+    def test_returning_inside_resets(self, engine):
+        """Test that leaving again after coming back is reported immediately"""
+        outside = [(OFFICER_A, {'latitude': 15.495, 'longitude': 73.835})]
+        inside = [(OFFICER_A, {'latitude': 15.495, 'longitude': 73.825})]
+        assert len(engine.check(outside, NOW)) == 1
+        assert engine.check(inside, datetime(2025, 11, 16, 10, 1)) == []
+        assert len(engine.check(outside, datetime(2025, 11, 16, 10, 2))) == 1
+
+    def test_tolerance_and_accuracy(self, engine):
+        """Test that GPS accuracy widens the area and poor fixes are skipped"""
+        # ~54 m east of the boundary
+        near = {'latitude': 15.495, 'longitude': 73.8305}
+        assert engine.check([(OFFICER_A, dict(near, accuracy=35))], NOW) == []
+        assert len(engine.check([(OFFICER_A, dict(near, accuracy=20))], NOW)) == 1
+        assert engine.check([(OFFICER_A, dict(near, accuracy=500))], NOW) == []
+        assert engine.stats()['skipped_inaccurate'] == 1
+
+    def test_writes_through_bounded_queue(self):
+        """Test that violations beyond the queue are dropped and flush writes the rest"""
+        written = []
+        engine = GeofenceEngine(rows, written.extend, max_age=3600, realert=900, max_pending=1)
+        assert engine.load()
+        # Stop the writer first so the queue fills deterministically
+        engine.flush()
+
+        outside = [(OFFICER_A, {'latitude': 15.495, 'longitude': 73.835})]
+        assert len(engine.check(outside, NOW)) == 1
+        assert len(engine.check(outside, datetime(2025, 11, 16, 10, 16))) == 1
+        stats = engine.stats()
+        assert stats['write_queue'] == 1
+        assert stats['write_dropped'] == 1
+
+        engine.flush()
+        assert len(written) == 1
+        assert engine.stats()['write_queue'] == 0
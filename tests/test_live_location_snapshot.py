@@ -0,0 +1,95 @@
+"""
+Live Location Snapshot Tests
+Tests the in-memory live map snapshot and delta sync
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.live_location_snapshot import LiveLocationSnapshot
+
+
+def make_row(officer_id, last_updated, is_active=True):
+    return {
+        'officer_id': officer_id,
+        'officer_name': f'Officer {officer_id}',
+        'latitude': 15.49,
+        'longitude': 73.82,
+        'heading': None,
+        'speed': 0,
+        'status': 'active' if is_active else 'inactive',
+        'is_active': is_active,
+        'last_seen': last_updated,
+        'last_updated': last_updated
+    }
+
+
+@pytest.fixture
+def base_time():
+    return datetime.utcnow().replace(microsecond=0) - timedelta(seconds=60)
+
+
+class TestLiveLocationSnapshot:
+    """Test live location snapshot"""
+
+    def test_query_filters_bbox(self, base_time):
+        """Test that only active officers inside the bbox are returned"""
+        rows = [make_row('A', base_time), make_row('B', base_time, is_active=False)]
+        snapshot = LiveLocationSnapshot(lambda since: rows, max_age=60)
+        assert [row[0] for row in snapshot.query()['rows']] == ['A']
+        assert snapshot.query(bbox=(0, 0, 1, 1))['rows'] == []
+
+    def test_first_sync_is_full(self, base_time):
+        """Test that a call without a cursor returns every active officer"""
+        rows = [make_row('A', base_time), make_row('B', base_time, is_active=False)]
+        snapshot = LiveLocationSnapshot(lambda since: rows, max_age=60)
+        changes = snapshot.changes_since(None)
+        assert changes['full'] is True
+        assert [row[0] for row in changes['rows']] == ['A']
+        assert changes['removed'] == []
+        assert changes['cursor'] == base_time.isoformat()
+
+    def test_delta_returns_changed_and_removed(self, base_time):
+        """Test that a cursor yields only updates and deactivations since it"""
+        rows = [make_row('A', base_time), make_row('B', base_time), make_row('C', base_time)]
+        snapshot = LiveLocationSnapshot(lambda since: rows, max_age=60, sync_overlap=0)
+        cursor = snapshot.changes_since(None)['cursor']
+
+        written_at = base_time + timedelta(seconds=65)
+        snapshot.apply([
+            ('B', {'latitude': 15.5, 'longitude': 73.9}),
+            ('C', {'isActive': False, 'status': 'inactive'})
+        ], written_at)
+
+        changes = snapshot.changes_since(datetime.fromisoformat(cursor) + timedelta(seconds=61))
+        assert changes['full'] is False
+        assert [row[0] for row in changes['rows']] == ['B']
+        assert changes['removed'] == ['C']
+        assert changes['cursor'] == written_at.isoformat()
+
+    def test_expired_cursor_forces_full_sync(self, base_time):
+        """Test that a cursor older than the tombstone window resyncs"""
+        rows = [make_row('A', base_time)]
+        snapshot = LiveLocationSnapshot(lambda since: rows, max_age=60, tombstone_window=10)
+        changes = snapshot.changes_since(base_time - timedelta(hours=1))
+        assert changes['full'] is True
+        assert [row[0] for row in changes['rows']] == ['A']
+
+    def test_delta_resends_late_writes(self, base_time):
+        """Test that a write stamped before the cursor but seen later is sent"""
+        rows = [make_row('A', base_time), make_row('B', base_time)]
+        snapshot = LiveLocationSnapshot(lambda since: rows, max_age=5, sync_overlap=2)
+        snapshot.changes_since(None)
+        snapshot.apply([('A', {'latitude': 15.5, 'longitude': 73.9})], base_time + timedelta(seconds=10))
+        cursor = datetime.fromisoformat(snapshot.changes_since(None)['cursor'])
+
+        # Another worker's write, stamped 6 s before the cursor, arrives late
+        snapshot.apply([('B', {'latitude': 15.6, 'longitude': 73.9})], base_time + timedelta(seconds=4))
+        changes = snapshot.changes_since(cursor)
+        assert sorted(row[0] for row in changes['rows']) == ['A', 'B']
+        assert changes['cursor'] == cursor.isoformat()
@@ -0,0 +1,93 @@
+"""
+Location Ingest Tests
+Tests batching, coalescing and backpressure of the location ingest queue
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models.location_ingest as location_ingest
+from models.location_ingest import LocationIngestQueue, get_ingest_queue, stop_ingest_queue
+
+
+class RecordingWriter:
+    """Batch writer that records every batch it receives"""
+
+    def __init__(self, fail_for=None):
+        self.batches = []
+        self.fail_for = fail_for
+        self.flushed = threading.Event()
+
+    def __call__(self, points_by_officer):
+        if self.fail_for and self.fail_for in points_by_officer:
+            raise ValueError("bad ping")
+        self.batches.append(dict(points_by_officer))
+        self.flushed.set()
+
+
+class TestLocationIngestQueue:
+    """Test location ingest queue"""
+
+    def test_groups_every_ping_per_officer(self):
+        """Test that a batch hands over every ping, grouped per officer oldest first"""
+        writer = RecordingWriter()
+        ingest = LocationIngestQueue(writer, flush_interval=10)
+        ingest.submit('A', {'latitude': 1})
+        ingest.submit('B', {'latitude': 2})
+        ingest.submit('A', {'latitude': 3})
+        ingest.stop()
+
+        assert writer.batches == [{'A': [{'latitude': 1}, {'latitude': 3}], 'B': [{'latitude': 2}]}]
+        assert list(writer.batches[0]) == ['A', 'B']
+        stats = ingest.stats()
+        assert stats['flushed'] == 3
+        assert stats['coalesced'] == 1
+
+    def test_background_flush(self):
+        """Test that the flusher thread writes queued pings"""
+        writer = RecordingWriter()
+        ingest = LocationIngestQueue(writer, flush_interval=0.01)
+        ingest.start()
+        ingest.submit('A', {'latitude': 1})
+        assert writer.flushed.wait(timeout=2)
+        ingest.stop()
+        assert writer.batches[0] == {'A': [{'latitude': 1}]}
+
+    def test_rejects_when_full(self):
+        """Test backpressure when the queue is full"""
+        ingest = LocationIngestQueue(RecordingWriter(), max_queue=1, enqueue_timeout=0)
+        assert ingest.submit('A', {}) is True
+        assert ingest.submit('B', {}) is False
+        assert ingest.stats()['rejected'] == 1
+
+    def test_failed_batch_isolates_bad_ping(self):
+        """Test that one bad ping does not drop the rest of its batch"""
+        writer = RecordingWriter(fail_for='BAD')
+        ingest = LocationIngestQueue(writer)
+        ingest.submit('A', {})
+        ingest.submit('BAD', {})
+        ingest.submit('BAD', {})
+        ingest.stop()
+
+        assert writer.batches == [{'A': [{}]}]
+        assert ingest.stats()['failed'] == 2
+
+    def test_stop_flushes_queue_on_worker_exit(self, monkeypatch):
+        """Test that pings still queued at worker exit are written"""
+        monkeypatch.setattr(location_ingest, 'LIVE_LOCATION_INGEST_MODE', 'batched')
+        monkeypatch.setattr(location_ingest, 'LIVE_LOCATION_FLUSH_MS', 60000)
+        monkeypatch.setattr(location_ingest, '_ingest_queue', None)
+        writer = RecordingWriter()
+
+        ingest = get_ingest_queue(writer)
+        ingest.submit('A', {'latitude': 1})
+        ingest.submit('B', {'latitude': 2})
+
+        assert stop_ingest_queue(timeout=2) in (1, 2)
+        assert {officer_id for batch in writer.batches for officer_id in batch} == {'A', 'B'}
+        assert not ingest.stats()['running']
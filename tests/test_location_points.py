@@ -0,0 +1,141 @@
+"""
+Location Point Tests
+Tests history inserts and monthly partition maintenance of location_points
+"""
+
+import pytest
+import sys
+import os
+import contextlib
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models.location_point_model as location_point_model
+from models.location_point_model import LocationPointModel
+
+
+class RecordingConnection:
+    """Connection returning fixed partition rows and recording statements"""
+
+    def __init__(self, partitions=()):
+        self.partitions = [{'name': name, 'bound': bound} for name, bound in partitions]
+        self.queries = []
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        self.queries.append((' '.join(query.split()), params))
+
+    def fetchall(self):
+        return self.partitions
+
+    def statements(self):
+        return [query for query, _ in self.queries if query.startswith('ALTER')]
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    def install(partitions=()):
+        conn = RecordingConnection(partitions)
+        monkeypatch.setattr(location_point_model, 'get_connection',
+                            contextlib.contextmanager(lambda: (yield conn)))
+        return conn
+    return install
+
+
+class TestAppendPoints:
+    """Test the multi-row history insert"""
+
+    def test_inserts_every_point_in_one_statement(self):
+        """Test row values, timestamp parsing and skipped points"""
+        conn = RecordingConnection()
+        count = LocationPointModel.append_points(conn, [
+            ('GP1', {'latitude': 15.49, 'longitude': 73.82, 'timestamp': '2025-11-16T09:00:00+05:30',
+                     'dutyId': 'D1', 'speed': 1.5}),
+            ('GP1', {'latitude': 15.50, 'longitude': 73.83, 'timestamp': 1763283605000}),
+            ('GP2', {'latitude': None, 'longitude': 73.83}),
+        ])
+
+        assert count == 2
+        assert len(conn.queries) == 1
+        query, params = conn.queries[0]
+        assert query.count('(%s, %s, %s, %s, %s, %s, %s, %s)') == 2
+        assert params[:8] == ['GP1', 'D1', datetime(2025, 11, 16, 3, 30), 15.49, 73.82, 1.5, None, None]
+        assert params[8:11] == ['GP1', None, datetime(2025, 11, 16, 9, 0, 5)]
+
+    def test_nothing_to_insert(self):
+        """Test that points without coordinates issue no statement"""
+        conn = RecordingConnection()
+        assert LocationPointModel.append_points(conn, [('GP1', {})]) == 0
+        assert conn.queries == []
+
+
+class TestPartitions:
+    """Test monthly partition maintenance"""
+
+    PARTITIONS = [
+        ('p_history', "'2025-09-01'"),
+        ('p202509', "'2025-10-01'"),
+        ('p202510', "'2025-11-01'"),
+        ('p202511', "'2025-12-01'"),
+        ('p_future', 'MAXVALUE'),
+    ]
+
+    def test_add_month_partitions_splits_future(self, connect):
+        """Test that only months past the last bound are split off p_future"""
+        conn = connect(self.PARTITIONS)
+        created = LocationPointModel.add_month_partitions(months_ahead=2, now=datetime(2025, 11, 20))
+
+        assert created == ['p202512', 'p202601']
+        assert conn.statements() == [
+            "ALTER TABLE location_points REORGANIZE PARTITION p_future INTO ("
+            "PARTITION p202512 VALUES LESS THAN ('2026-01-01'), "
+            "PARTITION p202601 VALUES LESS THAN ('2026-02-01'), "
+            "PARTITION p_future VALUES LESS THAN (MAXVALUE))"
+        ]
+
+    def test_add_month_partitions_when_prepared(self, connect):
+        """Test that nothing is altered when every month already exists"""
+        conn = connect(self.PARTITIONS)
+        assert LocationPointModel.add_month_partitions(months_ahead=0, now=datetime(2025, 11, 20)) == []
+        assert conn.statements() == []
+
+    def test_drop_partitions_before(self, connect):
+        """Test that expired months are dropped and p_history truncated"""
+        conn = connect(self.PARTITIONS)
+        removed = LocationPointModel.drop_partitions_before(datetime(2025, 10, 1))
+
+        assert removed == ['p202509', 'p_history']
+        assert conn.statements() == [
+            'ALTER TABLE location_points DROP PARTITION p202509',
+            'ALTER TABLE location_points TRUNCATE PARTITION p_history',
+        ]
+
+    def test_drop_keeps_partitions_spanning_cutoff(self, connect):
+        """Test that a partition still holding points at the cutoff is kept"""
+        conn = connect(self.PARTITIONS)
+        assert LocationPointModel.drop_partitions_before(datetime(2025, 8, 15)) == []
+        assert conn.statements() == []
+
+
+class TestLiveLocationRow:
+    """Test that live location reads no longer return the legacy history blobs"""
+
+    def test_officer_query_selects_current_position_only(self):
+        """Test that the per-officer read names its columns instead of ll.*"""
+        from models.live_location_model import LIVE_LOCATION_BY_OFFICER_QUERY, LiveLocationModel
+
+        assert 'll.*' not in LIVE_LOCATION_BY_OFFICER_QUERY
+        assert 'location_history' not in LIVE_LOCATION_BY_OFFICER_QUERY
+        row = LiveLocationModel.parse_row({'current_location': '{"lat": 15.49}', 'location_history': '[]'})
+        assert row['currentLocation'] == {'lat': 15.49}
+        assert 'locationHistory' not in row
@@ -0,0 +1,105 @@
+"""
+Location Stream Tests
+Tests filtering, coalescing and slow-consumer handling of the stream hub
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.location_stream import LocationStreamHub, LocationSubscription, stream_capacity
+
+
+WRITTEN_AT = datetime(2025, 11, 16, 9, 0, 0)
+
+
+def ping(latitude=15.49, longitude=73.82, **extra):
+    data = {'latitude': latitude, 'longitude': longitude}
+    data.update(extra)
+    return data
+
+
+@pytest.fixture
+def hub():
+    return LocationStreamHub(max_subscribers=5)
+
+
+class TestLocationStreamHub:
+    """Test location stream hub"""
+
+    def test_filters_by_officer_duty_and_bbox(self, hub):
+        """Test that subscribers only receive matching officers"""
+        by_officer = LocationSubscription(officer_ids=['A'])
+        by_duty = LocationSubscription(duty_ids=['D1'], duty_officer_ids=['B'])
+        by_bbox = LocationSubscription(bbox=(73.0, 15.0, 74.0, 16.0))
+        for subscription in (by_officer, by_duty, by_bbox):
+            hub.subscribe(subscription)
+
+        hub.publish([
+            ('A', ping()),
+            ('B', ping(latitude=20.0)),
+            ('C', ping(dutyId='D1'))
+        ], WRITTEN_AT)
+
+        assert len(by_officer.wait(0)) == 1
+        assert len(by_duty.wait(0)) == 2
+        assert len(by_bbox.wait(0)) == 2
+
+    def test_coalesces_updates_per_officer(self, hub):
+        """Test that only the newest pending update per officer is kept"""
+        subscription = LocationSubscription()
+        hub.subscribe(subscription)
+
+        hub.publish([('A', ping(latitude=1.0))], WRITTEN_AT)
+        hub.publish([('A', ping(latitude=2.0)), ('B', ping())], WRITTEN_AT)
+
+        messages = subscription.wait(0)
+        assert len(messages) == 2
+        assert '"latitude": 2.0' in messages[0]
+        assert subscription.coalesced == 1
+
+    def test_officer_leaving_bbox_is_removed(self, hub):
+        """Test that a bbox subscriber is told when a shown officer moves out"""
+        subscription = LocationSubscription(bbox=(73.0, 15.0, 74.0, 16.0))
+        hub.subscribe(subscription)
+
+        hub.publish([('A', ping()), ('B', ping(latitude=20.0))], WRITTEN_AT)
+        assert [message.split('\n')[1] for message in subscription.wait(0)] == ['event: position']
+
+        hub.publish([('A', ping(latitude=20.0)), ('B', ping(latitude=21.0))], WRITTEN_AT)
+        messages = subscription.wait(0)
+        assert len(messages) == 1
+        assert 'event: remove' in messages[0] and '"officer_id": "A"' in messages[0]
+
+        hub.publish([('A', ping(latitude=20.5))], WRITTEN_AT)
+        assert subscription.wait(0) == []
+
+    def test_drops_slow_consumer(self, hub):
+        """Test that a subscriber too far behind is dropped"""
+        subscription = LocationSubscription(max_pending=2)
+        hub.subscribe(subscription)
+
+        hub.publish([('A', ping()), ('B', ping()), ('C', ping())], WRITTEN_AT)
+
+        assert subscription.dropped
+        assert subscription.wait(0) == []
+        assert hub.stats()['subscribers'] == 0
+        assert hub.stats()['dropped'] == 1
+
+    def test_rejects_over_capacity(self):
+        """Test that subscribe fails once the hub is full"""
+        hub = LocationStreamHub(max_subscribers=1)
+        assert hub.subscribe(LocationSubscription())
+        assert not hub.subscribe(LocationSubscription())
+
+    def test_capacity_stays_below_worker_threads(self):
+        """Test that streams can never take every worker thread"""
+        assert stream_capacity(8) == 4
+        assert stream_capacity(2) == 1
+        assert stream_capacity(1) == 0
+        assert stream_capacity(8, configured=200) == 7
+        assert stream_capacity(8, configured=6) == 6
@@ -0,0 +1,93 @@
+"""
+Logging Pipeline Tests
+Tests JSON formatting, event sampling and the non-blocking queue handler
+"""
+
+import pytest
+import sys
+import os
+import json
+import logging
+import queue
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import JsonFormatter, SamplingFilter, DroppingQueueHandler, parse_sample_rates
+
+
+def make_record(message, level=logging.INFO, args=None, **extra):
+    record = logging.LogRecord('utils.logger', level, __file__, 1, message, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestJsonFormatter:
+    """Test structured log lines"""
+
+    def test_fields_are_merged(self):
+        """Test that extra fields become top-level JSON keys"""
+        record = make_record('REQUEST_LOG', event='request', fields={'client_ip': '10.0.0.1', 'status': 'success'})
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry['level'] == 'INFO'
+        assert entry['event'] == 'request'
+        assert entry['client_ip'] == '10.0.0.1'
+        assert entry['ts'].endswith('Z')
+
+    def test_exception_text_included(self):
+        """Test that tracebacks are kept on one line as a field"""
+        try:
+            raise ValueError('bad ping')
+        except ValueError:
+            record = make_record('failed')
+            record.exc_info = sys.exc_info()
+        line = JsonFormatter().format(record)
+        assert '\n' not in line
+        assert 'ValueError: bad ping' in json.loads(line)['exc']
+
+
+class TestSamplingFilter:
+    """Test high-volume event sampling"""
+
+    def test_keeps_one_in_n(self):
+        """Test that 1 in N records of a sampled event pass"""
+        sampler = SamplingFilter({'location_ping': 0.1})
+        kept = [sampler.filter(make_record('ping', event='location_ping')) for _ in range(100)]
+        assert sum(kept) == 10
+        assert sampler.dropped['location_ping'] == 90
+
+    def test_other_records_pass(self):
+        """Test that untagged records and warnings are never sampled"""
+        sampler = SamplingFilter({'location_ping': 0.0})
+        assert sampler.filter(make_record('plain'))
+        assert sampler.filter(make_record('ping failed', logging.ERROR, event='location_ping'))
+        assert not sampler.filter(make_record('ping', event='location_ping'))
+
+    def test_parse_sample_rates(self):
+        """Test event:rate parsing with clamping"""
+        assert parse_sample_rates('location_ping:0.01, location_bulk:2,') == {
+            'location_ping': 0.01, 'location_bulk': 1.0
+        }
+        assert parse_sample_rates('') == {}
+
+
+class TestDroppingQueueHandler:
+    """Test the bounded queue handler"""
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test that records beyond capacity are counted and discarded"""
+        handler = DroppingQueueHandler(queue.Queue(2))
+        for index in range(5):
+            handler.handle(make_record('ping %s', args=(index,)))
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+
+    def test_record_prepared_for_writer_thread(self):
+        """Test that args are merged but formatting is left to the writer"""
+        handler = DroppingQueueHandler(queue.Queue())
+        handler.handle(make_record('officer %s', args=('O1',), event='location_ping'))
+        queued = handler.queue.get_nowait()
+        assert queued.msg == 'officer O1'
+        assert queued.args is None
+        assert queued.event == 'location_ping'
@@ -0,0 +1,139 @@
+"""
+Connection Pool Tests
+Tests pool checkout, recycling and eviction without a live database
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    """Minimal stand-in for a PyMySQL connection"""
+
+    def __init__(self):
+        self.open = True
+        self.pings = 0
+        self.alive = True
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.alive:
+            raise ConnectionError("gone away")
+
+    def close(self):
+        self.open = False
+
+
+@pytest.fixture
+def created():
+    """List of connections opened by the pool under test"""
+    return []
+
+
+def make_pool(created, **kwargs):
+    def connect():
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+    return ConnectionPool(connect, **kwargs)
+
+
+class TestConnectionPool:
+    """Test connection pool behaviour"""
+
+    def test_reuses_released_connection(self, created):
+        """Test that a released connection is handed out again"""
+        pool = make_pool(created, min_size=0, max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+        assert second.connection is first.connection
+        assert len(created) == 1
+        assert pool.stats()['creates'] == 1
+
+    def test_wait_timeout(self, created):
+        """Test that checkout fails once max_size is exhausted"""
+        pool = make_pool(created, max_size=1, wait_timeout=0.05)
+        pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+        assert pool.stats()['timeouts'] == 1
+
+    def test_waiter_gets_released_connection(self, created):
+        """Test that a blocked checkout resumes when a connection is returned"""
+        pool = make_pool(created, max_size=1, wait_timeout=2)
+        slot = pool.acquire()
+        result = {}
+
+        def borrower():
+            result['slot'] = pool.acquire()
+
+        thread = threading.Thread(target=borrower)
+        thread.start()
+        pool.release(slot)
+        thread.join(timeout=2)
+        assert result['slot'].connection is slot.connection
+        assert pool.stats()['waits'] == 1
+
+    def test_max_lifetime_recycles(self, created):
+        """Test that connections past max_lifetime are closed on release"""
+        pool = make_pool(created, min_size=0, max_lifetime=0)
+        slot = pool.acquire()
+        pool.release(slot)
+        assert not slot.connection.open
+        assert pool.stats()['evicted_lifetime'] == 1
+        assert pool.stats()['size'] == 0
+
+    def test_idle_eviction_keeps_min_size(self, created):
+        """Test that idle eviction never shrinks the pool below min_size"""
+        pool = make_pool(created, min_size=1, max_size=3, idle_timeout=0)
+        slots = [pool.acquire() for _ in range(3)]
+        for slot in slots:
+            pool.release(slot)
+        pool.acquire()
+        stats = pool.stats()
+        assert stats['evicted_idle'] == 2
+        assert stats['size'] == 1
+
+    def test_dead_connection_replaced_on_checkout(self, created):
+        """Test that a failed liveness ping swaps in a fresh connection"""
+        pool = make_pool(created, min_size=0, ping_interval=0)
+        slot = pool.acquire()
+        pool.release(slot)
+        slot.connection.alive = False
+        replacement = pool.acquire()
+        assert replacement.connection is not slot.connection
+        assert pool.stats()['evicted_broken'] == 1
+
+    def test_discard_on_release(self, created):
+        """Test that a discarded connection is closed and frees capacity"""
+        pool = make_pool(created, min_size=0, max_size=1)
+        slot = pool.acquire()
+        pool.release(slot, discard=True)
+        assert not slot.connection.open
+        assert pool.stats()['size'] == 0
+        assert pool.acquire().connection is not slot.connection
+
+    def test_reset_called_on_release(self, created):
+        """Test that the reset hook runs before a connection is reused"""
+        reset_calls = []
+        pool = make_pool(created, min_size=0)
+        pool.reset = reset_calls.append
+        slot = pool.acquire()
+        pool.release(slot)
+        assert reset_calls == [slot.connection]
+
+    def test_prefill(self, created):
+        """Test that prefill opens min_size idle connections"""
+        pool = make_pool(created, min_size=3, max_size=5)
+        pool.prefill()
+        stats = pool.stats()
+        assert stats['idle'] == 3
+        assert stats['checked_out'] == 0
@@ -0,0 +1,121 @@
+"""
+Query Profiler Tests
+Tests statement normalization, N+1 detection and slow query capture
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.metrics import start_trace, end_trace
+from utils.query_profiler import QueryProfiler, statement_shape
+
+
+class FakeCursor:
+    """Cursor stand-in for mogrify/EXPLAIN"""
+
+    def __init__(self, connection=None):
+        self.connection = connection
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mogrify(self, query, args):
+        return query % tuple(repr(arg) for arg in args)
+
+    def execute(self, query):
+        self.executed.append(query)
+
+    def fetchall(self):
+        return [{'table': 'duties', 'type': 'ALL', 'key': None, 'rows': 5000, 'filtered': 10.0, 'Extra': 'Using where'}]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cursors = []
+
+    def cursor(self, cursor_class=None):
+        cursor = FakeCursor(self)
+        self.cursors.append(cursor)
+        return cursor
+
+
+class TestStatementShape:
+    """Test SQL normalization"""
+
+    def test_values_are_replaced(self):
+        """Test that statements differing only in values share a shape"""
+        assert statement_shape("SELECT * FROM officers WHERE staff_id = 'GP01'") == \
+            statement_shape("SELECT *\n  FROM officers WHERE staff_id = %s")
+
+    def test_value_lists_collapse(self):
+        """Test that IN lists and multi-row VALUES of any length compare equal"""
+        assert statement_shape("SELECT * FROM duties WHERE id IN (%s, %s, %s)") == \
+            "SELECT * FROM duties WHERE id IN (...)"
+        assert statement_shape("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y'), (3, 'z')") == \
+            "INSERT INTO t (a, b) VALUES (...)"
+
+
+class TestQueryProfiler:
+    """Test per-request profiling"""
+
+    def _run(self, profiler, statements):
+        trace = start_trace()
+        try:
+            for query, args, duration in statements:
+                profiler.record(FakeCursor(FakeConnection()), query, args, duration, 1)
+        finally:
+            end_trace()
+        return profiler.finish(trace, 'POST', '/api/duties', 201, 0.05)
+
+    def test_repeated_statement_flagged(self):
+        """Test that a statement issued in a loop is reported with its call site"""
+        profiler = QueryProfiler(history=10, slow_ms=1000, repeat_threshold=3)
+        statements = [("SELECT id FROM officers WHERE staff_id = %s", (f"GP{i}",), 0.001) for i in range(5)]
+        statements.append(("SELECT * FROM duties WHERE id = %s", ('D1',), 0.001))
+
+        report = self._run(profiler, statements)
+
+        assert report['query_count'] == 6
+        assert len(report['repeated']) == 1
+        assert report['repeated'][0]['count'] == 5
+        assert 'tests/test_query_profiler.py' in report['repeated'][0]['call_sites'][0]
+        assert profiler.get_report(report['id']) is report
+        assert profiler.recent(flagged_only=True)['requests'][0]['repeated'] == 1
+
+    def test_below_threshold_not_flagged(self):
+        """Test that a few repeats are not reported"""
+        profiler = QueryProfiler(history=10, slow_ms=1000, repeat_threshold=3)
+        report = self._run(profiler, [("SELECT 1", None, 0.001)] * 3)
+        assert report['repeated'] == []
+        assert profiler.recent(flagged_only=True)['requests'] == []
+
+    def test_slow_select_explained(self):
+        """Test that slow SELECTs carry their final SQL and EXPLAIN plan"""
+        profiler = QueryProfiler(history=10, slow_ms=100, repeat_threshold=3)
+        report = self._run(profiler, [
+            ("SELECT * FROM duties WHERE status = %s", ('active',), 0.25),
+            ("UPDATE duties SET status = %s", ('completed',), 0.3)
+        ])
+
+        select, update = report['slow']
+        assert select['sql'] == "SELECT * FROM duties WHERE status = 'active'"
+        assert select['plan'][0]['type'] == 'ALL'
+        assert update['plan'] is None
+        assert profiler.recent()['slow_query_count'] == 2
+
+    def test_history_is_bounded(self):
+        """Test that old reports are evicted"""
+        profiler = QueryProfiler(history=2, slow_ms=1000, repeat_threshold=3)
+        first = self._run(profiler, [])
+        self._run(profiler, [])
+        self._run(profiler, [])
+        assert profiler.get_report(first['id']) is None
+        assert len(profiler.recent()['requests']) == 2
@@ -0,0 +1,107 @@
+"""
+Reference Cache Tests
+Tests TTL, invalidation, counters and ETag handling of the reference cache
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.cache import ReferenceCache
+
+
+class CountingLoader:
+    """Loader that returns a new list on every call"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return [{'id': 'V1', 'version': self.calls}]
+
+
+class TestReferenceCache:
+    """Test reference cache"""
+
+    def test_hits_until_invalidated(self):
+        """Test that reads are served from memory until a write invalidates"""
+        cache = ReferenceCache(ttl=300)
+        loader = CountingLoader()
+
+        first = cache.get('vehicles', 'all', loader)
+        second = cache.get('vehicles', 'all', loader)
+        assert loader.calls == 1
+        assert second.etag == first.etag
+
+        cache.invalidate('vehicles')
+        third = cache.get('vehicles', 'all', loader)
+        assert loader.calls == 2
+        assert third.etag != first.etag
+
+        stats = cache.stats()['namespaces']['vehicles']
+        assert (stats['hits'], stats['misses'], stats['invalidations']) == (1, 2, 1)
+        assert stats['hit_ratio'] == pytest.approx(1 / 3)
+
+    def test_expires_after_ttl(self):
+        """Test that entries are reloaded once the TTL has passed"""
+        cache = ReferenceCache(ttl=0)
+        loader = CountingLoader()
+        cache.get('officers', 'all', loader)
+        cache.get('officers', 'all', loader)
+        assert loader.calls == 2
+        assert cache.stats()['namespaces']['officers']['expired'] == 1
+
+    def test_load_racing_a_write_is_not_stored(self):
+        """Test that data read before an invalidation is not cached"""
+        cache = ReferenceCache(ttl=300)
+        loading = threading.Event()
+        release = threading.Event()
+
+        def slow_loader():
+            loading.set()
+            release.wait(5)
+            return ['stale']
+
+        reader = threading.Thread(target=cache.get, args=('officers', 'all', slow_loader))
+        reader.start()
+        loading.wait(5)
+        cache.invalidate('officers')
+        release.set()
+        reader.join(5)
+
+        assert cache.get('officers', 'all', lambda: ['fresh']).value == ['fresh']
+        assert cache.stats()['namespaces']['officers']['discarded'] == 1
+
+    def test_disabled_cache_always_loads(self):
+        """Test that a disabled cache calls the loader every time"""
+        cache = ReferenceCache(enabled=False)
+        loader = CountingLoader()
+        cache.get('vehicles', 'all', loader)
+        cache.get('vehicles', 'all', loader)
+        assert loader.calls == 2
+
+
+class TestCachedResponse:
+    """Test ETag / If-None-Match handling"""
+
+    def test_not_modified_when_etag_matches(self):
+        """Test that a matching If-None-Match returns 304 without a body"""
+        from flask import Flask
+        from utils.responses import cached_response
+
+        app = Flask(__name__)
+        with app.test_request_context(headers={'If-None-Match': '"abc"'}):
+            response, status = cached_response([{'id': 1}], 'abc')
+            assert status == 304
+            assert response.get_data() == b''
+            assert response.headers['ETag'] == '"abc"'
+
+        with app.test_request_context(headers={'If-None-Match': '"old"'}):
+            response, status = cached_response([{'id': 1}], 'abc')
+            assert status == 200
+            assert response.get_json()['data'] == [{'id': 1}]
@@ -0,0 +1,165 @@
+"""
+Request Metrics Tests
+Tests histograms, per-request DB accounting and Prometheus rendering
+"""
+
+import pytest
+import sys
+import os
+from flask import Flask, jsonify
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+from utils.metrics import (
+    Histogram, RequestMetrics, init_metrics, start_trace, end_trace,
+    clear_multiproc_dir, mark_process_dead
+)
+import utils.metrics as metrics_module
+
+
+class TestHistogram:
+    """Test fixed-bucket histogram"""
+
+    def test_quantiles_interpolate_within_bucket(self):
+        """Test that estimates fall inside the bucket holding the rank"""
+        histogram = Histogram((10, 20, 40))
+        for value in [5] * 50 + [15] * 45 + [35] * 5:
+            histogram.observe(value)
+
+        assert histogram.count == 100
+        assert 5 <= histogram.quantile(0.5) <= 10
+        assert 10 < histogram.quantile(0.95) <= 20
+        assert 20 < histogram.quantile(0.99) <= 35
+
+    def test_quantiles_clamped_to_observed_range(self):
+        """Test that identical observations report their exact value"""
+        histogram = Histogram((0, 1, 2, 5))
+        for _ in range(10):
+            histogram.observe(1)
+        assert histogram.quantile(0.5) == 1
+        assert histogram.quantile(0.99) == 1
+
+    def test_values_above_last_bucket(self):
+        """Test that overflow values count toward +Inf"""
+        histogram = Histogram((1, 2))
+        histogram.observe(7)
+        assert list(histogram.cumulative()) == [(1, 0), (2, 0), ('+Inf', 1)]
+        assert histogram.quantile(0.5) == 7
+
+
+class TestRequestMetrics:
+    """Test per-request accounting"""
+
+    def test_queries_counted_against_current_request(self):
+        """Test that statements are attributed to the active trace"""
+        registry = RequestMetrics()
+        trace = start_trace()
+        try:
+            registry.record_query(0.002, 10)
+            registry.record_query(0.003, 1)
+        finally:
+            end_trace()
+        registry.record_query(0.001, 0)
+
+        assert trace.queries == 2
+        assert trace.rows == 11
+        assert trace.db_time == pytest.approx(0.005)
+        assert registry.stats()['totals']['untracked_queries'] == 1
+
+    def test_prometheus_output(self):
+        """Test exposition format of counters and histograms"""
+        registry = RequestMetrics()
+        trace = start_trace()
+        end_trace()
+        trace.queries = 3
+        registry.record_request('GET', '/api/duties', 200, trace, 0.04, 2048)
+
+        text = registry.render_prometheus({'gph_db_pool_size': ('Open pool connections', 4)})
+        assert '# TYPE gph_http_request_duration_seconds histogram' in text
+        assert 'method="GET",endpoint="/api/duties",status="200"} 1' in text
+        assert 'endpoint="/api/duties",le="0.05"} 1' in text
+        assert 'gph_http_request_queries_sum' in text
+        assert 'gph_db_pool_size{worker=' in text
+        assert text.endswith('\n')
+
+
+def record(registry, status=200):
+    trace = start_trace()
+    end_trace()
+    registry.record_request('GET', '/api/duties', status, trace, 0.04, 2048)
+
+
+def write_worker(directory, pid, requests, gauges=None):
+    """Write the snapshot another worker would have written"""
+    registry = RequestMetrics()
+    for _ in range(requests):
+        record(registry)
+    snapshot = registry.snapshot(gauges or {})
+    snapshot['pid'] = pid
+    with open(os.path.join(directory, f"metrics_{pid}.json"), 'w') as f:
+        json.dump(snapshot, f)
+
+
+class TestMultiprocess:
+    """Test metrics shared between Gunicorn workers"""
+
+    def test_scrape_sums_all_workers(self, tmp_path):
+        """Test that any worker reports the totals of every worker"""
+        registry = RequestMetrics(str(tmp_path))
+        record(registry)
+        record(registry, status=500)
+        write_worker(str(tmp_path), 1, 3, {'gph_db_pool_size': ('Open pool connections', 2)})
+
+        text = registry.render_prometheus({'gph_db_pool_size': ('Open pool connections', 4)})
+        assert 'gph_http_requests_total{method="GET",endpoint="/api/duties",status="200"} 4' in text
+        assert 'gph_http_requests_total{method="GET",endpoint="/api/duties",status="500"} 1' in text
+        assert 'gph_http_request_duration_seconds_count{method="GET",endpoint="/api/duties"} 5' in text
+        assert 'gph_db_pool_size{worker="1"} 2' in text
+        assert f'gph_db_pool_size{{worker="{os.getpid()}"}} 4' in text
+        assert registry.stats()['endpoints']['GET /api/duties']['requests'] == 5
+
+    def test_exited_worker_counters_are_kept(self, tmp_path):
+        """Test that a recycled worker's counters stay in the totals"""
+        registry = RequestMetrics(str(tmp_path))
+        write_worker(str(tmp_path), 1, 3, {'gph_db_pool_size': ('Open pool connections', 2)})
+
+        mark_process_dead(1, str(tmp_path))
+        mark_process_dead(2, str(tmp_path))
+
+        text = registry.render_prometheus({})
+        assert 'status="200"} 3' in text
+        assert 'worker="1"' not in text
+
+        clear_multiproc_dir(str(tmp_path))
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestFlaskHooks:
+    """Test init_metrics on a Flask app"""
+
+    def test_endpoint_uses_url_rule(self, monkeypatch):
+        """Test that requests are grouped by rule, not by concrete path"""
+        registry = RequestMetrics()
+        monkeypatch.setattr(metrics_module, 'request_metrics', registry)
+        monkeypatch.setattr(metrics_module, 'METRICS_ENABLED', True)
+
+        app = Flask(__name__)
+        init_metrics(app)
+
+        @app.route('/items/<item_id>')
+        def get_item(item_id):
+            registry.record_query(0.001, 1)
+            return jsonify({'id': item_id})
+
+        client = app.test_client()
+        client.get('/items/1')
+        client.get('/items/2')
+        client.get('/missing')
+
+        endpoints = registry.stats()['endpoints']
+        assert endpoints['GET /items/<item_id>']['requests'] == 2
+        assert endpoints['GET /items/<item_id>']['avg_queries'] == 1
+        assert endpoints['GET /items/<item_id>']['avg_bytes'] > 0
+        assert endpoints['GET unmatched']['responses'] == {'404': 1}
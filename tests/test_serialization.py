@@ -0,0 +1,116 @@
+"""
+Serialization Tests
+Tests the fast JSON provider and response compression
+"""
+
+import pytest
+import sys
+import os
+import gzip
+from datetime import datetime
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, Response, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+import utils.serialization as serialization_module
+from utils.serialization import FastJSONProvider, init_serialization
+from utils.responses import cached_response
+
+
+ROW = {
+    'id': 'DUTY000001',
+    'start_time': datetime(2025, 11, 15, 6, 30, 0),
+    'latitude': Decimal('15.4909000'),
+    'officerUids': ['OFF00001', 'OFF00002'],
+    'comments': None
+}
+
+
+def make_app(monkeypatch, compression=True, min_bytes=64):
+    monkeypatch.setattr(serialization_module, 'RESPONSE_COMPRESSION', compression)
+    monkeypatch.setattr(serialization_module, 'COMPRESSION_MIN_BYTES', min_bytes)
+    app = Flask(__name__)
+    init_serialization(app)
+
+    @app.route('/large')
+    def large():
+        return jsonify({'success': True, 'data': [ROW] * 50})
+
+    @app.route('/small')
+    def small():
+        return jsonify({'success': True})
+
+    @app.route('/stream')
+    def stream():
+        return Response((b'{"n": %d}\n' % i for i in range(100)), mimetype='application/x-ndjson')
+
+    @app.route('/cached')
+    def cached():
+        return cached_response({'success': True, 'data': [ROW] * 50}, 'abc123')
+
+    return app
+
+
+class TestFastJSONProvider:
+    """Test output parity with Flask's default provider"""
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_matches_default_provider(self, use_orjson):
+        """Test that datetimes and Decimals serialize exactly as before"""
+        app = Flask(__name__)
+        fast = FastJSONProvider(app, use_orjson=use_orjson)
+        default = DefaultJSONProvider(app)
+        assert fast.loads(fast.dumps(ROW)) == default.loads(default.dumps(ROW))
+
+    def test_bytes_encoded(self):
+        """Test that UTF-8 bytes become text and binary becomes base64"""
+        fast = FastJSONProvider(Flask(__name__))
+        assert fast.loads(fast.dumps({'a': b'plain', 'b': b'\xff\x00'})) == {'a': 'plain', 'b': '/wA='}
+
+    def test_stdlib_fallback(self, monkeypatch):
+        """Test that JSON_SERIALIZER=stdlib disables orjson"""
+        monkeypatch.setattr(serialization_module, 'JSON_SERIALIZER', 'stdlib')
+        app = Flask(__name__)
+        init_serialization(app)
+        assert isinstance(app.json, FastJSONProvider)
+        assert app.json.use_orjson is False
+
+
+class TestCompression:
+    """Test response compression"""
+
+    def test_large_body_gzipped(self, monkeypatch):
+        """Test that bodies above the threshold are compressed"""
+        monkeypatch.setattr(serialization_module, 'brotli', None)
+        client = make_app(monkeypatch).test_client()
+        response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert gzip.decompress(response.data).startswith(b'{')
+
+    def test_small_and_streamed_bodies_untouched(self, monkeypatch):
+        """Test that small and streamed responses are sent as-is"""
+        client = make_app(monkeypatch).test_client()
+        for path in ('/small', '/stream'):
+            response = client.get(path, headers={'Accept-Encoding': 'gzip'})
+            assert 'Content-Encoding' not in response.headers
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test that nothing is compressed unless RESPONSE_COMPRESSION is set"""
+        client = make_app(monkeypatch, compression=False).test_client()
+        response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+
+    def test_etag_weakened_and_revalidates(self, monkeypatch):
+        """Test that compressed responses carry a weak ETag that still yields 304"""
+        monkeypatch.setattr(serialization_module, 'brotli', None)
+        client = make_app(monkeypatch).test_client()
+        response = client.get('/cached', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['ETag'] == 'W/"abc123"'
+
+        revalidated = client.get('/cached', headers={'Accept-Encoding': 'gzip', 'If-None-Match': 'W/"abc123"'})
+        assert revalidated.status_code == 304
@@ -0,0 +1,123 @@
+"""
+Spatial Index Tests
+Tests grid radius, nearest and polygon queries against a brute-force scan
+"""
+
+import pytest
+import sys
+import os
+import math
+import random
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.geofence import METRES_PER_DEGREE
+from models.live_location_snapshot import LiveLocationSnapshot
+from models.spatial_index import SpatialGrid, point_in_polygon
+
+
+CENTRE = (15.49, 73.82)
+
+# ~2 km square north-east of the centre
+SQUARE = [(15.49, 73.82), (15.49, 73.84), (15.51, 73.84), (15.51, 73.82)]
+
+
+def distance(lat, lng, other_lat, other_lng):
+    scale = METRES_PER_DEGREE * math.cos(math.radians(lat))
+    return math.hypot((other_lng - lng) * scale, (other_lat - lat) * METRES_PER_DEGREE)
+
+
+@pytest.fixture
+def positions():
+    generator = random.Random(7)
+    return {
+        f'officer-{index}': (CENTRE[0] + generator.uniform(-0.1, 0.1), CENTRE[1] + generator.uniform(-0.1, 0.1))
+        for index in range(2000)
+    }
+
+
+class TestSpatialGrid:
+    """Test grid queries match a full scan"""
+
+    def test_within_radius(self, positions):
+        """Test that radius queries return exactly the officers in range, nearest first"""
+        grid = SpatialGrid.build(positions, cell_size=250)
+        for radius in (50, 800, 5000):
+            found = grid.within_radius(CENTRE[0], CENTRE[1], radius)
+            expected = sorted(officer for officer, (lat, lng) in positions.items()
+                              if distance(CENTRE[0], CENTRE[1], lat, lng) <= radius)
+            assert sorted(officer for _, officer in found) == expected
+            assert [d for d, _ in found] == sorted(d for d, _ in found)
+
+    def test_nearest(self, positions):
+        """Test k-nearest against a brute-force sort, including a far-away point"""
+        grid = SpatialGrid.build(positions, cell_size=250)
+        for lat, lng in (CENTRE, (15.7, 74.1)):
+            expected = sorted((distance(lat, lng, *position), officer) for officer, position in positions.items())
+            assert [officer for _, officer in grid.nearest(lat, lng, 10)] == [officer for _, officer in expected[:10]]
+
+        capped = grid.nearest(CENTRE[0], CENTRE[1], 50, max_distance=300)
+        assert all(d <= 300 for d, _ in capped)
+
+    def test_within_polygon(self, positions):
+        """Test polygon queries against a point-in-polygon scan"""
+        grid = SpatialGrid.build(positions, cell_size=250)
+        expected = sorted(officer for officer, (lat, lng) in positions.items() if point_in_polygon(lat, lng, SQUARE))
+        assert sorted(grid.within_polygon(SQUARE)) == expected
+        assert grid.within_polygon(SQUARE[:2]) == []
+
+    def test_upsert_moves_and_remove(self):
+        """Test that moving an officer changes cells and removal empties them"""
+        grid = SpatialGrid(cell_size=100)
+        grid.upsert('A', *CENTRE)
+        grid.upsert('A', CENTRE[0] + 0.01, CENTRE[1])
+        assert len(grid) == 1
+        assert grid.cell_count == 1
+        assert grid.within_radius(CENTRE[0], CENTRE[1], 100) == []
+        assert grid.nearest(CENTRE[0], CENTRE[1], 1)[0][1] == 'A'
+
+        grid.remove('A')
+        assert len(grid) == 0
+        assert grid.cell_count == 0
+        assert grid.nearest(CENTRE[0], CENTRE[1], 1) == []
+
+
+class TestSnapshotSpatialQueries:
+    """Test that the snapshot keeps its grid in step with writes"""
+
+    @staticmethod
+    def make_row(officer_id, lat, lng, last_updated):
+        return {
+            'officer_id': officer_id,
+            'officer_name': f'Officer {officer_id}',
+            'latitude': lat,
+            'longitude': lng,
+            'heading': None,
+            'speed': 0,
+            'status': 'active',
+            'is_active': True,
+            'last_seen': last_updated,
+            'last_updated': last_updated
+        }
+
+    def test_apply_updates_grid(self):
+        """Test nearby, nearest and within after moves and deactivation"""
+        now = datetime.utcnow().replace(microsecond=0) - timedelta(seconds=30)
+        rows = [
+            self.make_row('A', 15.4905, 73.8205, now),
+            self.make_row('B', 15.5200, 73.8600, now),
+        ]
+        snapshot = LiveLocationSnapshot(lambda since: rows, max_age=60)
+
+        nearby = snapshot.nearby(CENTRE[0], CENTRE[1], 500)
+        assert nearby['columns'][-1] == 'distance_m'
+        assert [row[0] for row in nearby['rows']] == ['A']
+
+        snapshot.apply([('B', {'latitude': 15.4910, 'longitude': 73.8210}),
+                        ('A', {'isActive': False, 'status': 'inactive'})])
+        assert [row[0] for row in snapshot.nearby(CENTRE[0], CENTRE[1], 500)['rows']] == ['B']
+        assert [row[0] for row in snapshot.nearest(CENTRE[0], CENTRE[1], 5)['rows']] == ['B']
+        assert [row[0] for row in snapshot.within(SQUARE)['rows']] == ['B']
+        assert snapshot.stats()['grid_officers'] == 1
@@ -0,0 +1,95 @@
+"""
+Trail Codec Tests
+Tests polyline encoding, trail round trips and time-aware simplification
+"""
+
+import pytest
+import sys
+import os
+import json
+import math
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.trail_codec import (
+    decode_polyline, decode_series, decode_trail, encode_polyline, encode_series,
+    encode_trail, simplify, zoom_tolerance
+)
+
+
+START = datetime(2025, 11, 16, 8, 0, 0)
+
+
+def patrol(hours=8, interval=5):
+    """A patrol that walks a 1 km loop, pausing 10 minutes each hour"""
+    points = []
+    seconds = 0
+    while seconds < hours * 3600:
+        minute = (seconds // 60) % 60
+        angle = 2 * math.pi * (seconds % 1200) / 1200 if minute >= 10 else 0.0
+        points.append({
+            'ts': START + timedelta(seconds=seconds),
+            'latitude': 15.49 + 0.0015 * math.sin(angle),
+            'longitude': 73.82 + 0.0015 * math.cos(angle),
+            'speed': 1.4, 'heading': 90.0, 'accuracy': 8.0, 'duty_id': 'DUTY001'
+        })
+        seconds += interval
+    return points
+
+
+class TestPolyline:
+    """Test the integer encoding"""
+
+    def test_google_reference(self):
+        """Test the reference example from the polyline format documentation"""
+        coordinates = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+        encoded = encode_polyline(coordinates)
+        assert encoded == '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+        assert decode_polyline(encoded) == coordinates
+
+    def test_series_round_trip(self):
+        """Test deltas that go up, down and stay flat"""
+        values = [0, 5, 5, 3, 1000, 1000000, -7]
+        assert decode_series(encode_series(values)) == values
+
+
+class TestTrail:
+    """Test trail encoding and simplification"""
+
+    def test_round_trip_and_size(self):
+        """Test that a patrol survives encoding within ~1 m and shrinks tenfold"""
+        points = patrol()
+        encoded = encode_trail(points)
+        decoded = decode_trail(encoded)
+
+        assert encoded['count'] == len(decoded) == len(points)
+        assert decoded[-1]['ts'] == points[-1]['ts']
+        assert max(abs(a['latitude'] - b['latitude']) for a, b in zip(points, decoded)) <= 0.000005
+
+        verbose = json.dumps([dict(point, ts=point['ts'].isoformat()) for point in points])
+        assert len(verbose) > 10 * len(json.dumps(encoded))
+
+    def test_straight_line_collapses(self):
+        """Test that evenly spaced points on a line keep only the ends"""
+        points = [{'ts': START + timedelta(seconds=k), 'latitude': 15.49 + k * 1e-5, 'longitude': 73.82}
+                  for k in range(50)]
+        assert simplify(points, 1.0) == [points[0], points[-1]]
+
+    def test_time_aware_keeps_stops(self):
+        """Test that a stop on a straight road survives only in time-aware mode"""
+        points = []
+        for k in range(30):
+            # Moves for 10 s, waits 60 s at the same spot, then moves on
+            step = k if k < 10 else 10 if k < 20 else k - 10
+            points.append({'ts': START + timedelta(seconds=k if k < 10 else 9 + (k - 9) * 6),
+                           'latitude': 15.49 + step * 1e-4, 'longitude': 73.82})
+        assert len(simplify(points, 5.0, time_aware=False)) == 2
+        assert len(simplify(points, 5.0)) > 2
+
+    def test_zoom_tolerance(self):
+        """Test that one pixel halves with each zoom level"""
+        assert zoom_tolerance(0, 0) == pytest.approx(156543.03392)
+        assert zoom_tolerance(15, 15.49) == pytest.approx(zoom_tolerance(14, 15.49) / 2)
+        assert 4 < zoom_tolerance(15, 15.49) < 5
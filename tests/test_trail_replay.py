@@ -0,0 +1,200 @@
+"""
+Trail Replay Tests
+Tests streaming LTTB downsampling and the NDJSON replay endpoints
+"""
+
+import pytest
+import sys
+import os
+import json
+import types
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models.db as db
+from app import create_app
+from models.duty_model import DutyModel
+from models.live_location_model import LiveLocationModel
+from models.location_point_model import LocationPointModel
+from models.officer_model import OfficerModel
+from models.trail_codec import downsample
+
+
+START = datetime(2025, 11, 16, 8, 0, 0)
+
+
+def walk(count, detour_at=None, duty_id=None):
+    """Points heading east every 5 s, with an optional one-point detour north"""
+    for index in range(count):
+        yield {
+            'ts': START + timedelta(seconds=5 * index),
+            'latitude': 15.49 + (0.01 if index == detour_at else 0.0),
+            'longitude': 73.82 + index * 1e-5,
+            'speed': 2.0, 'heading': 90.0, 'accuracy': 5.0, 'duty_id': duty_id
+        }
+
+
+class TestDownsample:
+    """Test streaming Largest-Triangle-Three-Buckets"""
+
+    def test_target_count_and_ends(self):
+        """Test that the target count is met and the ends are kept"""
+        kept = list(downsample(walk(10000), 10000, 250))
+        assert len(kept) == 250
+        assert kept[0]['ts'] == START
+        assert kept[-1]['ts'] == START + timedelta(seconds=5 * 9999)
+        assert [point['ts'] for point in kept] == sorted(point['ts'] for point in kept)
+
+    def test_keeps_detour(self):
+        """Test that a single outlying point survives heavy downsampling"""
+        kept = list(downsample(walk(5000, detour_at=3210), 5000, 50))
+        assert any(point['latitude'] > 15.495 for point in kept)
+
+    def test_small_or_miscounted_streams(self):
+        """Test pass-through below the target and streams that differ from the count"""
+        assert len(list(downsample(walk(10), 10, 100))) == 10
+        assert list(downsample(iter(()), 0, 10)) == []
+        assert 90 <= len(list(downsample(walk(1100), 1000, 100))) <= 115
+        assert len(list(downsample(walk(900), 1000, 100))) <= 100
+
+    def test_target_two_keeps_only_ends(self):
+        """Test that the smallest accepted target does not return the raw trail"""
+        points = list(walk(1001))
+        kept = list(downsample(iter(points), 1001, 2))
+        assert kept == [points[0], points[-1]]
+        assert len(list(downsample(walk(2), 2, 2))) == 2
+
+    def test_reads_lazily(self):
+        """Test that output starts before the stream is consumed"""
+        consumed = []
+
+        def tracked():
+            for point in walk(100000):
+                consumed.append(point)
+                yield point
+
+        stream = downsample(tracked(), 100000, 1000)
+        for _ in range(5):
+            next(stream)
+        assert len(consumed) < 1000
+
+
+class TestIterTrail:
+    """Test the server-side cursor path"""
+
+    def test_fetches_in_batches_and_closes(self, monkeypatch):
+        """Test that rows are fetched with fetchmany and the cursor is closed"""
+        rows = list(walk(2500))
+
+        class StreamingCursor:
+            closed = False
+            batches = []
+
+            def execute(self, query, params=None):
+                self.query = query
+
+            def fetchmany(self, size):
+                batch = rows[sum(self.batches):sum(self.batches) + size]
+                self.batches.append(len(batch))
+                return batch
+
+            def close(self):
+                StreamingCursor.closed = True
+
+        cursor = StreamingCursor()
+
+        class Connection:
+            def cursor(self, cursor_class=None):
+                assert cursor_class is db.SSDictCursor
+                return cursor
+
+        class Pool:
+            released = []
+
+            def acquire(self):
+                return types.SimpleNamespace(connection=Connection())
+
+            def release(self, slot, discard=False):
+                self.released.append(discard)
+
+        monkeypatch.setattr(db, 'get_pool', Pool)
+        points = list(LocationPointModel.iter_trail('GP1', START, START + timedelta(hours=4)))
+        assert len(points) == 2500
+        assert cursor.batches == [1000, 1000, 500, 0]
+        assert 'ORDER BY ts' in cursor.query
+        assert StreamingCursor.closed
+        assert Pool.released == [False]
+
+
+class TestReplayEndpoints:
+    """Test the NDJSON replay responses"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        def stream_trail(officer_id, start, end, duty_id=None):
+            # 3000 points for D1 and 1000 for D2; no duty returns both
+            points = [] if duty_id == 'D2' else list(walk(3000, duty_id='D1'))
+            points += [] if duty_id == 'D1' else list(walk(1000, duty_id='D2'))
+            return len(points), iter(points)
+
+        monkeypatch.setattr(LiveLocationModel, 'stream_trail', staticmethod(stream_trail))
+        monkeypatch.setattr(OfficerModel, 'get_officer_by_id',
+                            staticmethod(lambda officer_id: {'id': officer_id} if officer_id == 'GP1' else None))
+        monkeypatch.setattr(DutyModel, 'get_duty_by_id', staticmethod(lambda duty_id: {
+            'id': duty_id, 'officerUids': ['GP1', 'GP2'],
+            'start_time': datetime(2025, 11, 16, 8), 'end_time': datetime(2025, 11, 16, 16)
+        }))
+        app = create_app()
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+
+    @staticmethod
+    def lines(response):
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def test_officer_replay(self, client):
+        """Test header, downsampled points and end line for one officer"""
+        response = client.get('/api/officers/GP1/trail?start=2025-11-16T08:00:00Z&end=2025-11-16T16:00:00Z&points=200')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.is_streamed
+
+        lines = self.lines(response)
+        assert lines[0]['type'] == 'trail'
+        assert lines[0]['raw_count'] == 4000
+        assert sum(1 for line in lines if line['type'] == 'point') == 200
+        assert lines[-1] == {'type': 'end', 'officers': 1, 'points': 200}
+
+    def test_duty_replay_defaults_to_duty_window(self, client):
+        """Test that a duty replays every assigned officer over the duty window"""
+        lines = self.lines(client.get('/api/duties/D1/trail?points=100'))
+        headers = [line for line in lines if line['type'] == 'trail']
+        assert [header['officer_id'] for header in headers] == ['GP1', 'GP2']
+        assert headers[0]['start'] == '2025-11-16T08:00:00'
+        assert headers[0]['duty_id'] == 'D1'
+        assert lines[-1]['points'] == 200
+
+    def test_duty_replay_excludes_other_duties(self, client, monkeypatch):
+        """Test that a duty replay only reads points recorded for that duty"""
+        requested = []
+        original = LiveLocationModel.stream_trail
+
+        def recording(officer_id, start, end, duty_id=None):
+            requested.append(duty_id)
+            return original(officer_id, start, end, duty_id)
+
+        monkeypatch.setattr(LiveLocationModel, 'stream_trail', staticmethod(recording))
+        lines = self.lines(client.get('/api/duties/D1/trail?points=5000'))
+        assert requested == ['D1', 'D1']
+        assert all(line['raw_count'] == 3000 for line in lines if line['type'] == 'trail')
+        assert lines[-1]['points'] == 6000
+
+    def test_validation(self, client):
+        """Test window, point count and unknown officer errors"""
+        assert client.get('/api/officers/GP1/trail?start=2025-11-16T08:00:00Z').status_code == 400
+        assert client.get('/api/officers/GP1/trail?start=2025-10-01T00:00:00Z&end=2025-11-16T00:00:00Z').status_code == 400
+        assert client.get('/api/officers/GP1/trail?start=1763280000&end=1763283600&points=1').status_code == 400
+        assert client.get('/api/officers/GP9/trail?start=1763280000&end=1763283600').status_code == 404
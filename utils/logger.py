@@ -4,7 +4,13 @@ Handles request logging and application logging
 """
 
 import sys
+import os
+import json
+import atexit
+import itertools
 import logging
+import logging.handlers
+import queue
 from datetime import datetime
 from flask import request
 
@@ -12,17 +18,204 @@ from flask import request
 # LOGGING CONFIGURATION
 # ============================================================================
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    datefmt='%Y-%m-%dT%H:%M:%S',
-    handlers=[
-        logging.FileHandler('sql_queries.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# sync: handlers write on the calling thread
+# async: records go through a bounded queue to a background writer thread
+LOG_MODE = os.getenv('LOG_MODE', 'sync').lower()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+LOG_FILE = os.getenv('LOG_FILE', 'sql_queries.log')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', '0'))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN', '')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# event:rate pairs, e.g. "location_ping:0.01,location_bulk:0.1"
+LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+
+TEXT_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with structured fields from ``extra``"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.utcfromtimestamp(record.created).isoformat(timespec='milliseconds') + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key in ('event', 'sampled'):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep 1 in N records of high-volume events (``extra={'event': ...}``).
+    Kept records carry ``sampled="1/N"`` so counts can be scaled back up.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.intervals = {
+            event: max(1, round(1 / rate)) for event, rate in rates.items() if rate > 0
+        }
+        self.muted = {event for event, rate in rates.items() if rate <= 0}
+        self._counters = {event: itertools.count() for event in self.intervals}
+        self.dropped = {event: 0 for event in rates}
+
+    def filter(self, record):
+        event = getattr(record, 'event', None)
+        if event is None or record.levelno > logging.INFO:
+            return True
+        if event in self.muted:
+            self.dropped[event] += 1
+            return False
+        interval = self.intervals.get(event)
+        if interval is None or interval == 1:
+            return True
+        if next(self._counters[event]) % interval:
+            self.dropped[event] += 1
+            return False
+        record.sampled = f"1/{interval}"
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks: when the queue is full the record is
+    dropped and counted instead of waiting for the writer thread.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge args and render tracebacks here; formatting happens on the
+        # writer thread so JSON/text output stays the handlers' choice
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_sample_rates(value):
+    """
+    Parse ``event:rate`` pairs.
+
+    Args:
+        value (str): e.g. "location_ping:0.01,location_bulk:0.1"
+
+    Returns:
+        dict: event -> rate between 0 and 1
+    """
+    rates = {}
+    for pair in value.split(','):
+        event, _, rate = pair.partition(':')
+        if event.strip() and rate.strip():
+            rates[event.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+def _file_handler():
+    if LOG_ROTATE_WHEN:
+        return logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
+    if LOG_MAX_BYTES > 0:
+        return logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
+    return logging.FileHandler(LOG_FILE, encoding='utf-8')
+
+
+_sampling_filter = SamplingFilter(parse_sample_rates(LOG_SAMPLE_RATES))
+_queue_handler = None
+_listener = None
+
+
+def _start_listener(handlers):
+    """Start a writer thread draining a fresh queue into the real handlers"""
+    global _listener
+    _queue_handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _configure_logging():
+    """Install the configured handlers on the root logger (unless already configured)"""
+    global _queue_handler
+
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    formatter = JsonFormatter() if LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT, DATE_FORMAT)
+    handlers = [_file_handler(), logging.StreamHandler(sys.stdout)]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root.setLevel(logging.INFO)
+
+    if LOG_MODE == 'async':
+        _queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        root.addHandler(_queue_handler)
+        _start_listener(handlers)
+        # A forked worker (GUNICORN_PRELOAD) does not inherit the writer thread
+        os.register_at_fork(after_in_child=lambda: _start_listener(handlers))
+        # Write out whatever is still queued on shutdown
+        atexit.register(lambda: _listener.stop())
+    else:
+        for handler in handlers:
+            root.addHandler(handler)
+
+
+_configure_logging()
 
 logger = logging.getLogger(__name__)
+# Sampled events are logged through this logger (log_info/log_request)
+logger.addFilter(_sampling_filter)
+
+
+def get_log_stats():
+    """
+    Get logging pipeline statistics.
+
+    Returns:
+        dict: Mode, queue depth and drop counters
+    """
+    stats = {
+        'mode': LOG_MODE,
+        'format': LOG_FORMAT,
+        'sampled_out': dict(_sampling_filter.dropped)
+    }
+    if _queue_handler is not None:
+        stats.update({
+            'queued': _queue_handler.queue.qsize(),
+            'capacity': LOG_QUEUE_SIZE,
+            'dropped': _queue_handler.dropped,
+            'writer_alive': bool(_listener and _listener._thread and _listener._thread.is_alive())
+        })
+    return stats
 
 
 def log_request(client_ip, query_or_path, status, error_msg=None):
@@ -51,7 +244,8 @@ def log_request(client_ip, query_or_path, status, error_msg=None):
     if error_msg:
         log_entry['error'] = error_msg
     
-    logger.info(f"REQUEST_LOG: {log_entry}")
+    # JSON output carries the entry as fields instead of a stringified dict
+    logger.info(f"REQUEST_LOG: {log_entry}", extra={'event': 'request', 'fields': log_entry})
 
 
 def get_client_ip():
@@ -66,14 +260,19 @@ def get_client_ip():
     return request.remote_addr or 'unknown'
 
 
-def log_info(message):
+def log_info(message, event=None):
     """
     Log informational message.
     
     Args:
         message (str): Message to log
+        event (str, optional): Event name used for sampling (LOG_SAMPLE_RATES)
+                               and as a field in JSON output
     """
-    logger.info(message)
+    if event:
+        logger.info(message, extra={'event': event})
+    else:
+        logger.info(message)
 
 
 def log_error(message):
@@ -0,0 +1,560 @@
+"""
+Request metrics
+Per-endpoint wall time, DB time, query/row counts and response size,
+aggregated into histograms and rendered in Prometheus text format.
+Under Gunicorn, workers share their series through snapshot files so any
+worker can answer a scrape with the totals of all of them.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from flask import request
+from .logger import logger
+
+# ============================================================================
+# METRICS CONFIGURATION
+# ============================================================================
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+# Directory shared by all workers of one server (gunicorn.conf.py sets a
+# default); empty keeps metrics per process
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR', '')
+METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', '5'))
+
+
+# Histogram upper bounds (Prometheus "le" labels)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus-style quantile estimates"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by linear interpolation inside its bucket
+        (same method as PromQL histogram_quantile), clamped to the
+        observed min/max.
+
+        Args:
+            q (float): Quantile between 0 and 1
+
+        Returns:
+            float: Estimated value, or None before the first observation
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        estimate = self.max
+        for index, bound in enumerate(self.buckets):
+            in_bucket = self.counts[index]
+            if in_bucket and cumulative + in_bucket >= rank:
+                estimate = lower + (bound - lower) * (rank - cumulative) / in_bucket
+                break
+            cumulative += in_bucket
+            lower = bound
+        return min(max(estimate, self.min), self.max)
+
+    def to_dict(self):
+        """JSON-serializable state, for worker snapshots"""
+        return {'counts': list(self.counts), 'count': self.count, 'sum': self.sum,
+                'min': self.min, 'max': self.max}
+
+    def merge(self, state):
+        """Add another histogram's ``to_dict`` state into this one"""
+        if not state['count']:
+            return
+        self.counts = [a + b for a, b in zip(self.counts, state['counts'])]
+        self.count += state['count']
+        self.sum += state['sum']
+        if self.min is None or state['min'] < self.min:
+            self.min = state['min']
+        if self.max is None or state['max'] > self.max:
+            self.max = state['max']
+
+    def cumulative(self):
+        """Cumulative counts per bound, ending with +Inf"""
+        total = 0
+        for index, bound in enumerate(self.buckets):
+            total += self.counts[index]
+            yield bound, total
+        yield '+Inf', self.count
+
+
+class RequestTrace:
+    """DB work done while serving one request"""
+
+    __slots__ = ('started', 'db_time', 'queries', 'rows', 'connections', 'statements')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.connections = 0
+        # Statement log, only kept while QUERY_PROFILING is on
+        self.statements = None
+
+
+_local = threading.local()
+
+
+def start_trace():
+    """Start recording DB work for the current thread's request"""
+    _local.trace = RequestTrace()
+    return _local.trace
+
+
+def current_trace():
+    """The current request's trace, or None outside a request"""
+    return getattr(_local, 'trace', None)
+
+
+def end_trace():
+    """Stop recording and return the trace (None if none was started)"""
+    trace = getattr(_local, 'trace', None)
+    _local.trace = None
+    return trace
+
+
+class EndpointMetrics:
+    """Histograms for one method + URL rule"""
+
+    __slots__ = ('responses', 'wall', 'db', 'queries', 'connections', 'rows', 'bytes')
+
+    def __init__(self):
+        self.responses = {}
+        self.wall = Histogram(DURATION_BUCKETS)
+        self.db = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(COUNT_BUCKETS)
+        self.connections = Histogram(COUNT_BUCKETS)
+        self.rows = Histogram(ROW_BUCKETS)
+        self.bytes = Histogram(SIZE_BUCKETS)
+
+    HISTOGRAM_ATTRS = ('wall', 'db', 'queries', 'connections', 'rows', 'bytes')
+
+    def to_dict(self):
+        state = {attr: getattr(self, attr).to_dict() for attr in self.HISTOGRAM_ATTRS}
+        state['responses'] = {str(status): count for status, count in self.responses.items()}
+        return state
+
+    def merge(self, state):
+        for status, count in state['responses'].items():
+            status = int(status)
+            self.responses[status] = self.responses.get(status, 0) + count
+        for attr in self.HISTOGRAM_ATTRS:
+            getattr(self, attr).merge(state[attr])
+
+
+class RequestMetrics:
+    """
+    Process-wide request metrics registry.
+
+    Each Gunicorn worker keeps its own registry. With ``multiproc_dir`` set,
+    every worker writes a snapshot of it to ``metrics_<pid>.json`` every
+    ``flush_seconds``, and scrapes sum the snapshots of all workers, so
+    counters keep increasing whichever worker answers. Gauges describe a
+    single process and stay labelled ``worker="<pid>"``.
+    """
+
+    HISTOGRAMS = (
+        ('wall', 'gph_http_request_duration_seconds', 'Request wall time'),
+        ('db', 'gph_http_request_db_seconds', 'Time spent executing SQL per request'),
+        ('queries', 'gph_http_request_queries', 'SQL statements executed per request'),
+        ('connections', 'gph_http_request_db_connections', 'Pool connections checked out per request'),
+        ('rows', 'gph_http_request_rows', 'Rows fetched per request'),
+        ('bytes', 'gph_http_response_bytes', 'Response body size'),
+    )
+
+    def __init__(self, multiproc_dir=None, flush_seconds=5.0, gauges=None):
+        """
+        Args:
+            multiproc_dir (str, optional): Directory shared by all workers
+            flush_seconds (float): Seconds between snapshot writes
+            gauges (callable, optional): Returns name -> (help, value) gauges
+                to include in this worker's snapshots
+        """
+        self.multiproc_dir = multiproc_dir or None
+        self.flush_seconds = flush_seconds
+        self.gauges = gauges
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._endpoints = {}
+        self._totals = {'queries': 0, 'db_time': 0.0, 'rows': 0, 'untracked_queries': 0}
+        self._flusher_pid = None
+
+    def record_query(self, duration, rows):
+        """Count one executed statement against the current request, if any"""
+        trace = current_trace()
+        if trace is not None:
+            trace.db_time += duration
+            trace.queries += 1
+            trace.rows += rows
+        with self._lock:
+            self._totals['queries'] += 1
+            self._totals['db_time'] += duration
+            self._totals['rows'] += rows
+            if trace is None:
+                self._totals['untracked_queries'] += 1
+
+    def record_request(self, method, endpoint, status, trace, wall, response_bytes):
+        """
+        Fold a finished request into its endpoint's histograms.
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): URL rule (e.g. /api/duties/<duty_id>)
+            status (int): Response status code
+            trace (RequestTrace): DB work recorded for the request
+            wall (float): Seconds from the first before_request hook
+            response_bytes (int): Body size, or None for streamed responses
+        """
+        if self.multiproc_dir:
+            self._ensure_flusher()
+        with self._lock:
+            metrics = self._endpoints.get((method, endpoint))
+            if metrics is None:
+                metrics = self._endpoints[(method, endpoint)] = EndpointMetrics()
+            metrics.responses[status] = metrics.responses.get(status, 0) + 1
+            metrics.wall.observe(wall)
+            metrics.db.observe(trace.db_time)
+            metrics.queries.observe(trace.queries)
+            metrics.connections.observe(trace.connections)
+            metrics.rows.observe(trace.rows)
+            if response_bytes is not None:
+                metrics.bytes.observe(response_bytes)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            for key in self._totals:
+                self._totals[key] = 0
+
+    # ------------------------------------------------------------------
+    # Worker snapshots
+    # ------------------------------------------------------------------
+
+    def snapshot(self, gauges=None):
+        """
+        JSON-serializable state of this process's registry.
+
+        Args:
+            gauges (dict, optional): Gauges to include; defaults to ``self.gauges()``
+
+        Returns:
+            dict: {'pid', 'totals', 'endpoints', 'gauges'}
+        """
+        if gauges is None and self.gauges is not None:
+            try:
+                gauges = self.gauges()
+            except Exception as e:
+                logger.error(f"Metrics gauge collection failed: {str(e)}")
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'totals': dict(self._totals),
+                'endpoints': [[method, endpoint, metrics.to_dict()]
+                              for (method, endpoint), metrics in self._endpoints.items()],
+                'gauges': {name: list(gauge) for name, gauge in (gauges or {}).items()}
+            }
+
+    def write_snapshot(self, gauges=None):
+        """Write this worker's snapshot to the shared directory (no-op without one)"""
+        if not self.multiproc_dir:
+            return
+        path = os.path.join(self.multiproc_dir, f"metrics_{os.getpid()}.json")
+        # Snapshot and write together, so an older snapshot never replaces a newer one
+        with self._write_lock:
+            _write_json(path, self.snapshot(gauges))
+
+    def _ensure_flusher(self):
+        # Threads do not survive fork(); each worker starts its own
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+        threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            try:
+                self.write_snapshot()
+            except Exception as e:
+                logger.error(f"Metrics snapshot write failed: {str(e)}")
+            time.sleep(self.flush_seconds)
+
+    def _collect(self, gauges=None):
+        """
+        Series to report: this process's own, or the sum of every worker's
+        snapshot (including exited workers) when a shared directory is set.
+
+        Returns:
+            tuple: (endpoints, totals, {worker: gauges}, labelled by worker)
+        """
+        if not self.multiproc_dir:
+            snapshot = self.snapshot(gauges or {})
+            endpoints, totals = _merge_snapshots([snapshot])
+            return endpoints, totals, {str(snapshot['pid']): gauges or {}}, True
+
+        self.write_snapshot(gauges)
+        snapshots = []
+        for path in sorted(glob.glob(os.path.join(self.multiproc_dir, '*.json'))):
+            snapshot = _read_snapshot(path)
+            if snapshot is None and os.path.basename(path).startswith('metrics_'):
+                # Renamed by child_exit between glob and open
+                path = os.path.join(self.multiproc_dir, 'dead_' + os.path.basename(path)[len('metrics_'):])
+                snapshot = _read_snapshot(path)
+            if snapshot is None:
+                continue
+            snapshot['dead'] = os.path.basename(path).startswith('dead_')
+            snapshots.append(snapshot)
+        endpoints, totals = _merge_snapshots(snapshots)
+        worker_gauges = {str(snapshot['pid']): snapshot.get('gauges') or {}
+                         for snapshot in snapshots if not snapshot.get('dead')}
+        return endpoints, totals, worker_gauges, False
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+
+    def stats(self):
+        """
+        Per-endpoint summary with p50/p95/p99 estimates.
+
+        Returns:
+            dict: {'totals': {...}, 'endpoints': {'GET /path': {...}}}
+        """
+        endpoint_metrics, totals, _, _ = self._collect()
+        endpoints = {}
+        for (method, endpoint), metrics in sorted(endpoint_metrics.items()):
+            summary = {
+                'requests': metrics.wall.count,
+                'responses': {str(status): count for status, count in sorted(metrics.responses.items())},
+                'avg_queries': round(metrics.queries.sum / metrics.queries.count, 2),
+                'avg_connections': round(metrics.connections.sum / metrics.connections.count, 2),
+                'avg_rows': round(metrics.rows.sum / metrics.rows.count, 2)
+            }
+            for attr, label in (('wall', 'wall_ms'), ('db', 'db_ms')):
+                histogram = getattr(metrics, attr)
+                summary[label] = {
+                    f"p{int(q * 100)}": round(histogram.quantile(q) * 1000, 2) for q in QUANTILES
+                }
+            summary['queries'] = {
+                f"p{int(q * 100)}": round(metrics.queries.quantile(q), 1) for q in QUANTILES
+            }
+            if metrics.bytes.count:
+                summary['avg_bytes'] = int(metrics.bytes.sum / metrics.bytes.count)
+            endpoints[f"{method} {endpoint}"] = summary
+        return {'totals': totals, 'endpoints': endpoints}
+
+    def render_prometheus(self, gauges=None):
+        """
+        Render all series in Prometheus text exposition format (0.0.4).
+
+        Args:
+            gauges (dict, optional): Extra name -> (help, value) gauges
+
+        Returns:
+            str: Exposition text
+        """
+        endpoints, totals, worker_gauges, per_worker = self._collect(gauges)
+        endpoints = sorted(endpoints.items())
+        # Summed series carry no worker label; a single process keeps its own
+        base = {'worker': str(os.getpid())} if per_worker else {}
+        lines = []
+
+        lines.append('# HELP gph_http_requests_total Requests served')
+        lines.append('# TYPE gph_http_requests_total counter')
+        for (method, endpoint), metrics in endpoints:
+            for status, count in sorted(metrics.responses.items()):
+                labels = _labels(**base, method=method, endpoint=endpoint, status=status)
+                lines.append(f"gph_http_requests_total{labels} {count}")
+
+        for attr, name, help_text in self.HISTOGRAMS:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, endpoint), metrics in endpoints:
+                histogram = getattr(metrics, attr)
+                if not histogram.count:
+                    continue
+                for bound, count in histogram.cumulative():
+                    labels = _labels(**base, method=method, endpoint=endpoint, le=bound)
+                    lines.append(f"{name}_bucket{labels} {count}")
+                labels = _labels(**base, method=method, endpoint=endpoint)
+                lines.append(f"{name}_sum{labels} {_number(histogram.sum)}")
+                lines.append(f"{name}_count{labels} {histogram.count}")
+
+        labels = _labels(**base) if base else ''
+        for name, help_text, value in (
+            ('gph_db_queries_total', 'SQL statements executed', totals['queries']),
+            ('gph_db_query_seconds_total', 'Time spent executing SQL', totals['db_time']),
+            ('gph_db_rows_total', 'Rows fetched', totals['rows']),
+            ('gph_db_untracked_queries_total', 'SQL statements executed outside a request', totals['untracked_queries'])
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{labels} {_number(value)}")
+
+        by_name = {}
+        for worker, values in sorted(worker_gauges.items()):
+            for name, (help_text, value) in values.items():
+                by_name.setdefault(name, (help_text, []))[1].append((worker, value))
+        for name, (help_text, values) in by_name.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for worker, value in values:
+                lines.append(f"{name}{_labels(worker=worker)} {_number(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def _merge_snapshots(snapshots):
+    """Sum worker snapshots into ({(method, endpoint): EndpointMetrics}, totals)"""
+    endpoints = {}
+    totals = {'queries': 0, 'db_time': 0.0, 'rows': 0, 'untracked_queries': 0}
+    for snapshot in snapshots:
+        for key, value in snapshot['totals'].items():
+            totals[key] = totals.get(key, 0) + value
+        for method, endpoint, state in snapshot['endpoints']:
+            metrics = endpoints.get((method, endpoint))
+            if metrics is None:
+                metrics = endpoints[(method, endpoint)] = EndpointMetrics()
+            metrics.merge(state)
+    return endpoints, totals
+
+
+def _read_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    # Write then rename so readers never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def clear_multiproc_dir(directory):
+    """
+    Remove snapshots left by a previous server run.
+    Call from the Gunicorn master before workers start.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        os.remove(path)
+
+
+def mark_process_dead(pid, directory):
+    """
+    Keep an exited worker's counters so totals do not drop when workers are
+    recycled; its gauges are no longer reported.
+    Call from the Gunicorn master's ``child_exit`` hook.
+
+    The snapshot is renamed rather than merged into another file, so a
+    concurrent scrape sees the worker exactly once.
+
+    Args:
+        pid (int): Exited worker's pid
+        directory (str): Shared metrics directory
+    """
+    try:
+        os.replace(os.path.join(directory, f"metrics_{pid}.json"),
+                   os.path.join(directory, f"dead_{pid}.json"))
+    except FileNotFoundError:
+        pass
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+request_metrics = RequestMetrics(METRICS_MULTIPROC_DIR, METRICS_FLUSH_SECONDS)
+
+
+def init_metrics(app, gauges=None):
+    """
+    Install request timing hooks on a Flask app.
+    Register before other before_request hooks so wall time covers them.
+
+    Args:
+        app (Flask): Application to instrument
+        gauges (callable, optional): Returns this process's name -> (help, value)
+            gauges for worker snapshots
+    """
+    if not METRICS_ENABLED:
+        return
+    if gauges is not None:
+        request_metrics.gauges = gauges
+
+    @app.before_request
+    def start_request_metrics():
+        start_trace()
+
+    @app.after_request
+    def record_request_metrics(response):
+        trace = current_trace()
+        if trace is None:
+            return response
+        wall = time.perf_counter() - trace.started
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        # Streamed bodies (SSE, exports) have no size yet; their wall time
+        # covers only the time to the first byte
+        response_bytes = None if response.is_streamed else response.calculate_content_length()
+        request_metrics.record_request(
+            request.method, endpoint, response.status_code, trace, wall, response_bytes
+        )
+        return response
+
+    @app.teardown_request
+    def end_request_metrics(exc):
+        end_trace()
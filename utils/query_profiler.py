@@ -0,0 +1,316 @@
+"""
+Query profiler
+Debug mode that captures every SQL statement per request with its duration
+and call site, flags statements repeated in a loop (N+1) and logs slow
+queries with their EXPLAIN plan
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import deque, OrderedDict
+from datetime import datetime
+from flask import request
+from pymysql.cursors import DictCursor
+from .logger import logger
+from .metrics import current_trace, start_trace, end_trace
+
+# ============================================================================
+# PROFILER CONFIGURATION
+# ============================================================================
+
+QUERY_PROFILING = os.getenv('QUERY_PROFILING', 'false').lower() == 'true'
+QUERY_SLOW_MS = float(os.getenv('QUERY_SLOW_MS', '200'))
+QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', '5'))
+QUERY_PROFILE_HISTORY = int(os.getenv('QUERY_PROFILE_HISTORY', '100'))
+
+# Statements kept per report; counts and timings still cover all of them
+MAX_STATEMENTS_PER_REPORT = 500
+
+# Frames from these paths are skipped when looking for the call site
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SKIP_PATHS = (
+    os.path.join(_ROOT, 'utils') + os.sep,
+    os.path.join(_ROOT, 'models', 'db.py'),
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|%\(\w+\)s')
+_VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_REPEATED_GROUPS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(sql):
+    """
+    Normalize a statement so calls differing only in values compare equal.
+
+    Literals and placeholders become ``?``, value lists ``(...)``, and
+    multi-row VALUES collapse to one group.
+
+    Args:
+        sql (str): Statement template or final SQL
+
+    Returns:
+        str: Normalized statement
+    """
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    shape = _STRING_LITERAL.sub('?', sql)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _VALUE_LIST.sub('(...)', shape)
+    shape = _REPEATED_GROUPS.sub('(...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def call_site(depth=3):
+    """
+    Repo frames that issued the current statement, innermost first.
+
+    Args:
+        depth (int): Number of frames to report
+
+    Returns:
+        str: e.g. ``models/duty_model.py:204 get_duty_by_id <- controllers/...``
+    """
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None and len(frames) < depth:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_ROOT) and not filename.startswith(_SKIP_PATHS):
+            frames.append(f"{os.path.relpath(filename, _ROOT)}:{frame.f_lineno} {frame.f_code.co_name}")
+        frame = frame.f_back
+    return ' <- '.join(frames) or 'unknown'
+
+
+def explain(connection, sql):
+    """
+    EXPLAIN a SELECT on the connection that ran it.
+
+    Args:
+        connection: pymysql connection
+        sql (str): Final SQL with values inlined
+
+    Returns:
+        list: Compact plan rows, or None for non-SELECT statements
+    """
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    try:
+        # Plain cursor so the EXPLAIN itself is not profiled
+        with connection.cursor(DictCursor) as cursor:
+            cursor.execute(f"EXPLAIN {sql}")
+            return [
+                {key: row.get(key) for key in ('table', 'type', 'key', 'rows', 'filtered', 'Extra')}
+                for row in cursor.fetchall()
+            ]
+    except Exception as e:
+        return [{'error': str(e)}]
+
+
+class QueryProfiler:
+    """Collects statements per request and keeps recent request reports"""
+
+    def __init__(self, history=QUERY_PROFILE_HISTORY, slow_ms=QUERY_SLOW_MS,
+                 repeat_threshold=QUERY_REPEAT_THRESHOLD):
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self._lock = threading.Lock()
+        self._reports = OrderedDict()
+        self._history = history
+        self._slow_log = deque(maxlen=history)
+        self._stats = {'profiled_requests': 0, 'flagged_requests': 0, 'slow_query_count': 0}
+
+    def record(self, cursor, query, args, duration, rows):
+        """
+        Record one executed statement (called by models.db.MeteredCursor).
+
+        Args:
+            cursor: Cursor that ran the statement
+            query (str): Statement template
+            args: Statement parameters
+            duration (float): Seconds spent in execute()
+            rows (int): Rows fetched
+        """
+        elapsed_ms = duration * 1000
+        entry = {
+            'shape': statement_shape(query),
+            'ms': round(elapsed_ms, 3),
+            'rows': rows,
+            'call_site': call_site()
+        }
+
+        if elapsed_ms >= self.slow_ms:
+            try:
+                sql = cursor.mogrify(query, args)
+            except Exception:
+                sql = query
+            entry['sql'] = sql[:2000]
+            entry['plan'] = explain(cursor.connection, sql)
+            logger.warning(
+                f"SLOW_QUERY {elapsed_ms:.1f}ms at {entry['call_site']}: "
+                f"{entry['sql'][:500]} | plan: {entry['plan']}"
+            )
+            with self._lock:
+                self._stats['slow_query_count'] += 1
+                self._slow_log.append(dict(entry, at=datetime.utcnow().isoformat() + 'Z'))
+
+        trace = current_trace()
+        if trace is not None:
+            if trace.statements is None:
+                trace.statements = []
+            trace.statements.append(entry)
+
+    def finish(self, trace, method, path, status, wall):
+        """
+        Build the report for a finished request and keep it in history.
+
+        Args:
+            trace (RequestTrace): Trace holding the request's statements
+            method (str): HTTP method
+            path (str): Request path
+            status (int): Response status code
+            wall (float): Request seconds
+
+        Returns:
+            dict: Report with repeated and slow statements
+        """
+        statements = trace.statements or []
+        groups = {}
+        for entry in statements:
+            group = groups.get(entry['shape'])
+            if group is None:
+                group = groups[entry['shape']] = {
+                    'shape': entry['shape'], 'count': 0, 'total_ms': 0.0, 'call_sites': []
+                }
+            group['count'] += 1
+            group['total_ms'] += entry['ms']
+            if entry['call_site'] not in group['call_sites']:
+                group['call_sites'].append(entry['call_site'])
+
+        repeated = sorted(
+            (group for group in groups.values() if group['count'] > self.repeat_threshold),
+            key=lambda group: group['count'], reverse=True
+        )
+        for group in repeated:
+            group['total_ms'] = round(group['total_ms'], 3)
+
+        report = {
+            'id': uuid.uuid4().hex[:12],
+            'method': method,
+            'path': path,
+            'status': status,
+            'at': datetime.utcnow().isoformat() + 'Z',
+            'wall_ms': round(wall * 1000, 3),
+            'db_ms': round(sum(entry['ms'] for entry in statements), 3),
+            'query_count': len(statements),
+            'repeated': repeated,
+            'slow': [entry for entry in statements if 'plan' in entry],
+            'statements': statements[:MAX_STATEMENTS_PER_REPORT]
+        }
+
+        for group in repeated:
+            logger.warning(
+                f"N_PLUS_ONE {method} {path}: {group['count']}x {group['shape'][:300]} "
+                f"at {'; '.join(group['call_sites'][:3])}"
+            )
+
+        with self._lock:
+            self._stats['profiled_requests'] += 1
+            if repeated:
+                self._stats['flagged_requests'] += 1
+            self._reports[report['id']] = report
+            while len(self._reports) > self._history:
+                self._reports.popitem(last=False)
+        return report
+
+    def get_report(self, report_id):
+        """Full report for one request, or None once it left the history"""
+        with self._lock:
+            return self._reports.get(report_id)
+
+    def recent(self, flagged_only=False):
+        """
+        Summaries of recent requests, newest first.
+
+        Args:
+            flagged_only (bool): Only requests with repeated or slow statements
+
+        Returns:
+            dict: Counters, request summaries and recent slow queries
+        """
+        with self._lock:
+            reports = list(reversed(self._reports.values()))
+            slow = list(reversed(self._slow_log))
+            stats = dict(self._stats)
+        summaries = [
+            {
+                'id': report['id'],
+                'method': report['method'],
+                'path': report['path'],
+                'status': report['status'],
+                'at': report['at'],
+                'wall_ms': report['wall_ms'],
+                'db_ms': report['db_ms'],
+                'query_count': report['query_count'],
+                'repeated': len(report['repeated']),
+                'slow': len(report['slow'])
+            }
+            for report in reports
+            if not flagged_only or report['repeated'] or report['slow']
+        ]
+        return dict(stats, slow_ms=self.slow_ms, repeat_threshold=self.repeat_threshold,
+                    requests=summaries, slow_queries=slow)
+
+    def reset(self):
+        with self._lock:
+            self._reports.clear()
+            self._slow_log.clear()
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+query_profiler = QueryProfiler()
+
+
+def init_query_profiler(app):
+    """
+    Install per-request profiling hooks on a Flask app (QUERY_PROFILING only).
+    Each response gets an ``X-Query-Profile`` header whose id can be looked
+    up at ``/admin/query-profiles/<id>``.
+
+    Args:
+        app (Flask): Application to instrument
+    """
+    if not QUERY_PROFILING:
+        return
+
+    @app.before_request
+    def start_query_profile():
+        # Shares the request metrics trace when metrics are enabled
+        trace = current_trace() or start_trace()
+        trace.statements = []
+
+    @app.after_request
+    def finish_query_profile(response):
+        trace = current_trace()
+        if trace is None or request.path.startswith('/admin/query-profiles'):
+            return response
+        report = query_profiler.finish(
+            trace, request.method, request.path, response.status_code,
+            time.perf_counter() - trace.started
+        )
+        response.headers['X-Query-Profile'] = (
+            f"id={report['id']}; queries={report['query_count']}; db_ms={report['db_ms']}; "
+            f"repeated={len(report['repeated'])}; slow={len(report['slow'])}"
+        )
+        return response
+
+    @app.teardown_request
+    def end_query_profile(exc):
+        end_trace()
@@ -3,7 +3,7 @@ Response utilities
 Centralized JSON response helpers for consistent API responses
 """
 
-from flask import jsonify
+from flask import jsonify, make_response, request
 
 
 class ResponseHelper:
@@ -155,3 +155,29 @@ def error_response(message, status_code=400):
         'success': False,
         'error': message
     }), status_code
+
+
+def cached_response(data, etag):
+    """
+    Success response for a cached list, honouring If-None-Match.
+    
+    Args:
+        data: Response data
+        etag (str): ETag of the data (from the reference cache)
+        
+    Returns:
+        tuple: (response, status_code), 304 with no body if the client's
+               copy is current
+    """
+    # Weak comparison: compressed responses carry W/"<etag>"
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(jsonify({
+            'success': True,
+            'data': data
+        }), 200)
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate before reusing it
+    response.headers['Cache-Control'] = 'no-cache'
+    return response, response.status_code
@@ -0,0 +1,173 @@
+"""
+Response serialization
+Pluggable JSON provider (orjson when installed) and response compression
+"""
+
+import base64
+import dataclasses
+import decimal
+import gzip
+import os
+import uuid
+from datetime import date
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ============================================================================
+# SERIALIZATION CONFIGURATION
+# ============================================================================
+
+# auto: orjson if installed, else the stdlib encoder; stdlib: always stdlib
+JSON_SERIALIZER = os.getenv('JSON_SERIALIZER', 'auto').lower()
+RESPONSE_COMPRESSION = os.getenv('RESPONSE_COMPRESSION', 'false').lower() == 'true'
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', '5'))
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '4'))
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+if orjson is not None:
+    # Datetimes go through encode_default so they keep Flask's HTTP-date format
+    ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+def encode_default(o):
+    """
+    Encode values the JSON libraries do not handle natively.
+
+    Dates and Decimals match Flask's default provider (HTTP date, string)
+    so switching serializers does not change API output.
+
+    Args:
+        o: Value to encode
+
+    Returns:
+        JSON-compatible value
+    """
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, (bytes, bytearray, memoryview)):
+        raw = bytes(o)
+        try:
+            return raw.decode('utf-8')
+        except UnicodeDecodeError:
+            return base64.b64encode(raw).decode('ascii')
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson, falling back to the stdlib encoder
+    when orjson is not installed or a caller passes json.dumps options.
+
+    Unlike the default provider, keys are not sorted and non-ASCII text is
+    written as UTF-8 rather than escaped.
+    """
+
+    default = staticmethod(encode_default)
+
+    def __init__(self, app, use_orjson=True):
+        super().__init__(app)
+        self.use_orjson = use_orjson and orjson is not None
+
+    def dumps(self, obj, **kwargs):
+        if not self.use_orjson or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=encode_default, option=ORJSON_OPTIONS).decode('utf-8')
+
+    def dumps_bytes(self, obj):
+        """Serialize straight to UTF-8 bytes (no str round trip with orjson)"""
+        if not self.use_orjson:
+            return super().dumps(obj).encode('utf-8')
+        return orjson.dumps(obj, default=encode_default, option=ORJSON_OPTIONS)
+
+    def loads(self, s, **kwargs):
+        if not self.use_orjson or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Debug mode pretty-prints like the default provider
+        if not self.use_orjson or self._app.debug:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def compress_body(body, accept_encodings):
+    """
+    Compress a body with the best encoding the client accepts.
+
+    Args:
+        body (bytes): Uncompressed body
+        accept_encodings: werkzeug Accept-Encoding header
+
+    Returns:
+        tuple: (encoding, compressed) or (None, body) if nothing applies
+    """
+    if brotli is not None and accept_encodings['br']:
+        return 'br', brotli.compress(body, quality=BROTLI_QUALITY)
+    if accept_encodings['gzip']:
+        return 'gzip', gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return None, body
+
+
+def init_serialization(app):
+    """
+    Install the JSON provider and (if enabled) response compression.
+    Register after init_metrics so metrics see the compressed size.
+
+    Args:
+        app (Flask): Application to configure
+    """
+    app.json = FastJSONProvider(app, use_orjson=orjson is not None and JSON_SERIALIZER != 'stdlib')
+
+    if not RESPONSE_COMPRESSION:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.is_streamed or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        if len(body) < COMPRESSION_MIN_BYTES:
+            return response
+
+        encoding, compressed = compress_body(body, request.accept_encodings)
+        if encoding is None:
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes differ from the identity body, so a strong
+        # validator would be wrong; If-None-Match compares weakly anyway
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,63 @@
+"""
+WSGI Entry Point
+Production entry point for multi-worker servers (see gunicorn.conf.py):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import sys
+import os
+import time
+
+# Add backend directory to Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+from app import create_app
+from utils.logger import logger
+
+
+def warm_up():
+    """
+    Prepare this process before it accepts traffic: open the minimum pool
+    connections, build the duty conflict index and geofence, load the live
+    map snapshot and preload the reference caches.
+
+    Each step is independent; a failure is logged and the step is left to
+    happen lazily on the first request.
+
+    Returns:
+        dict: Seconds taken per step (None if the step failed)
+    """
+    from models.db import get_pool
+    from models.duty_model import DutyModel
+    from models.officer_model import OfficerModel
+    from models.vehicle_model import VehicleModel
+    from models.duty_location_model import DutyLocationModel
+    from models.live_location_model import LiveLocationModel
+
+    steps = [
+        ('db_pool', lambda: get_pool().prefill()),
+        ('duty_index', DutyModel.build_conflict_index),
+        ('geofence', DutyModel.build_geofence),
+        ('live_snapshot', LiveLocationModel.get_snapshot),
+        ('officers', OfficerModel.get_all_officers),
+        ('vehicles', VehicleModel.get_all_vehicles),
+        ('duty_locations', DutyLocationModel.get_all_duty_locations),
+    ]
+
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            # build_conflict_index/build_geofence report failure by returning False
+            ok = step() is not False
+        except Exception as e:
+            logger.error(f"Warm-up step {name} failed: {str(e)}")
+            ok = False
+        timings[name] = round(time.perf_counter() - started, 4) if ok else None
+    logger.info(f"Worker {os.getpid()} warmed up: {timings}")
+    return timings
+
+
+app = create_app()